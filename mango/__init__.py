@@ -10,6 +10,7 @@
 from .account import Account as Account
 from .account import AccountSlot as AccountSlot
 from .accountflags import AccountFlags as AccountFlags
+from .accountindex import AccountIndex as AccountIndex
 from .accountinfo import AccountInfo as AccountInfo
 from .accountinfoconverter import build_account_info_converter as build_account_info_converter
 from .accountinstrumentvalues import AccountInstrumentValues as AccountInstrumentValues
@@ -21,29 +22,42 @@ from .accountscout import ScoutReport as ScoutReport
 from .addressableaccount import AddressableAccount as AddressableAccount
 from .arguments import parse_args as parse_args
 from .arguments import setup_logging as setup_logging
+from .asyncreconnectingwebsocket import AsyncReconnectingWebsocket as AsyncReconnectingWebsocket
+from .asyncreconnectingwebsocket import SharedEventLoop as SharedEventLoop
 from .balancesheet import BalanceSheet as BalanceSheet
 from .cache import Cache as Cache
 from .cache import MarketCache as MarketCache
 from .cache import PerpMarketCache as PerpMarketCache
 from .cache import PriceCache as PriceCache
 from .cache import RootBankCache as RootBankCache
+from .client import BatchedRPCResult as BatchedRPCResult
 from .client import BetterClient as BetterClient
 from .client import ClusterUrlData as ClusterUrlData
 from .client import BlockhashNotFoundException as BlockhashNotFoundException
+from .client import BlockhashPrefetcher as BlockhashPrefetcher
 from .client import ClientException as ClientException
 from .client import CompoundException as CompoundException
 from .client import CompoundRPCCaller as CompoundRPCCaller
 from .client import FailedToFetchBlockhashException as FailedToFetchBlockhashException
 from .client import NodeIsBehindException as NodeIsBehindException
+from .client import ProviderStatistics as ProviderStatistics
+from .client import PrefetchedBlockhash as PrefetchedBlockhash
 from .client import RateLimitException as RateLimitException
+from .client import RPCBatch as RPCBatch
 from .client import RPCCaller as RPCCaller
+from .client import RPCRouting as RPCRouting
 from .client import SlotHolder as SlotHolder
 from .client import StaleSlotException as StaleSlotException
 from .client import TooManyRequestsRateLimitException as TooManyRequestsRateLimitException
 from .client import TooMuchBandwidthRateLimitException as TooMuchBandwidthRateLimitException
 from .client import TransactionAlreadyProcessedException as TransactionAlreadyProcessedException
+from .client import TransactionConfirmationTracker as TransactionConfirmationTracker
 from .client import TransactionException as TransactionException
+from .client import TransactionOutcome as TransactionOutcome
+from .client import TransactionStatus as TransactionStatus
+from .client import TransactionStatusCollector as TransactionStatusCollector
 from .combinableinstructions import CombinableInstructions as CombinableInstructions
+from .combinableinstructions import TransactionSubmission as TransactionSubmission
 from .constants import MangoConstants as MangoConstants
 from .constants import DATA_PATH as DATA_PATH
 from .constants import SOL_DECIMAL_DIVISOR as SOL_DECIMAL_DIVISOR
@@ -70,6 +84,9 @@ from .healthcheck import HealthCheck as HealthCheck
 from .idl import IdlParser as IdlParser
 from .idl import lazy_load_cached_idl_parser as lazy_load_cached_idl_parser
 from .idsjsonmarketlookup import IdsJsonMarketLookup as IdsJsonMarketLookup
+from .incrementalorderbook import IncrementalPerpOrderBookSide as IncrementalPerpOrderBookSide
+from .incrementalorderbook import OrderBookChange as OrderBookChange
+from .incrementalorderbook import OrderBookChangeType as OrderBookChangeType
 from .inventory import Inventory as Inventory
 from .inventory import PerpInventoryAccountWatcher as PerpInventoryAccountWatcher
 from .inventory import SpotInventoryAccountWatcher as SpotInventoryAccountWatcher
@@ -99,6 +116,10 @@ from .instructionreporter import InstructionReporter as InstructionReporter
 from .instructionreporter import SerumInstructionReporter as SerumInstructionReporter
 from .instructionreporter import MangoInstructionReporter as MangoInstructionReporter
 from .instructionreporter import CompoundInstructionReporter as CompoundInstructionReporter
+from .instructiontemplates import InstructionTemplate as InstructionTemplate
+from .instructiontemplates import PerpOrderInstructionTemplates as PerpOrderInstructionTemplates
+from .instructiontemplates import SerumOrderInstructionTemplates as SerumOrderInstructionTemplates
+from .instructiontemplates import SpotOrderInstructionTemplates as SpotOrderInstructionTemplates
 from .instructiontype import InstructionType as InstructionType
 from .instrumentlookup import InstrumentLookup as InstrumentLookup
 from .instrumentlookup import NullInstrumentLookup as NullInstrumentLookup
@@ -107,6 +128,10 @@ from .instrumentlookup import IdsJsonTokenLookup as IdsJsonTokenLookup
 from .instrumentlookup import NonSPLInstrumentLookup as NonSPLInstrumentLookup
 from .instrumentlookup import SPLTokenLookup as SPLTokenLookup
 from .instrumentvalue import InstrumentValue as InstrumentValue
+from .latencyrecorder import LatencyHistogram as LatencyHistogram
+from .latencyrecorder import LatencyMetricsServer as LatencyMetricsServer
+from .latencyrecorder import LatencyRecorder as LatencyRecorder
+from .latencyrecorder import LatencyRecordingTransactionStatusCollector as LatencyRecordingTransactionStatusCollector
 from .liquidatablereport import LiquidatableState as LiquidatableState
 from .liquidatablereport import LiquidatableReport as LiquidatableReport
 from .liquidationevent import LiquidationEvent as LiquidationEvent
@@ -163,6 +188,7 @@ from .oracle import Price as Price
 from .oracle import SupportedOracleFeature as SupportedOracleFeature
 from .orderbookside import OrderBookSideType as OrderBookSideType
 from .orderbookside import PerpOrderBookSide as PerpOrderBookSide
+from .orders import ColumnarOrderBookSide as ColumnarOrderBookSide
 from .orders import Order as Order
 from .orders import OrderType as OrderType
 from .orders import OrderBook as OrderBook
@@ -213,6 +239,7 @@ from .tokenbank import InterestRates as InterestRates
 from .tokenbank import NodeBank as NodeBank
 from .tokenbank import RootBank as RootBank
 from .tokenbank import TokenBank as TokenBank
+from .tokenbucket import TokenBucket as TokenBucket
 from .tradeexecutor import ImmediateTradeExecutor as ImmediateTradeExecutor
 from .tradeexecutor import NullTradeExecutor as NullTradeExecutor
 from .tradeexecutor import TradeExecutor as TradeExecutor
@@ -252,14 +279,19 @@ from .watchers import build_orderbook_watcher as build_orderbook_watcher
 from .watchers import build_serum_event_queue_watcher as build_serum_event_queue_watcher
 from .watchers import build_spot_event_queue_watcher as build_spot_event_queue_watcher
 from .watchers import build_perp_event_queue_watcher as build_perp_event_queue_watcher
+from .websocketsubscription import AsyncWebSocketSubscriptionManager as AsyncWebSocketSubscriptionManager
+from .websocketsubscription import FlushingWatcher as FlushingWatcher
 from .websocketsubscription import IndividualWebSocketSubscriptionManager as IndividualWebSocketSubscriptionManager
+from .websocketsubscription import PooledWebSocketSubscriptionManager as PooledWebSocketSubscriptionManager
 from .websocketsubscription import SharedWebSocketSubscriptionManager as SharedWebSocketSubscriptionManager
 from .websocketsubscription import WebSocketAccountSubscription as WebSocketAccountSubscription
 from .websocketsubscription import WebSocketLogSubscription as WebSocketLogSubscription
 from .websocketsubscription import WebSocketProgramSubscription as WebSocketProgramSubscription
 from .websocketsubscription import WebSocketSubscription as WebSocketSubscription
 from .websocketsubscription import WebSocketSubscriptionManager as WebSocketSubscriptionManager
+from .websocketsubscription import backfill_subscriptions as backfill_subscriptions
 
+from .layouts import decoders
 from .layouts import layouts
 
 import decimal
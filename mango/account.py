@@ -27,7 +27,7 @@ from .context import Context
 from .encoding import encode_key
 from .group import Group, GroupSlot, GroupSlotPerpMarket
 from .instrumentvalue import InstrumentValue
-from .layouts import layouts
+from .layouts import decoders, layouts
 from .metadata import Metadata
 from .openorders import OpenOrders
 from .orders import Side
@@ -56,6 +56,23 @@ class AccountSlot:
         self.spot_open_orders: typing.Optional[PublicKey] = spot_open_orders
         self.perp_account: typing.Optional[PerpAccount] = perp_account
 
+    # The same raw deposit and borrow, valued using the deposit and borrow indexes in `cache`.
+    def with_cache(self, cache: Cache) -> "AccountSlot":
+        if self.base_token_bank is None:
+            return self
+
+        root_bank_cache: typing.Optional[RootBankCache] = self.base_token_bank.root_bank_cache_from_cache(
+            cache, self.index)
+        if root_bank_cache is None:
+            raise Exception(f"No root bank cache found for token {self.base_token_bank} at index {self.index}")
+        deposit = InstrumentValue(self.base_instrument, self.base_instrument.shift_to_decimals(
+            root_bank_cache.deposit_index * self.raw_deposit))
+        borrow = InstrumentValue(self.base_instrument, self.base_instrument.shift_to_decimals(
+            root_bank_cache.borrow_index * self.raw_borrow))
+        return AccountSlot(self.index, self.base_instrument, self.base_token_bank, self.quote_token_bank,
+                           self.raw_deposit, deposit, self.raw_borrow, borrow, self.spot_open_orders,
+                           self.perp_account)
+
     @property
     def net_value(self) -> InstrumentValue:
         return self.deposit - self.borrow
@@ -121,6 +138,15 @@ class Account(AddressableAccount):
         self.not_upgradable: bool = not_upgradable
         self.delegate: PublicKey = delegate
 
+    # The same account, with deposits and borrows valued using the deposit and borrow indexes in `cache`
+    # instead of the cache it was parsed with.
+    def with_cache(self, cache: Cache) -> "Account":
+        return Account(self.account_info, self.version, self.meta_data, self.group_name, self.group_address,
+                       self.owner, self.info, self.shared_quote.with_cache(cache), self.in_margin_basket,
+                       self.slot_indices, [slot.with_cache(cache) for slot in self.base_slots], self.msrm_amount,
+                       self.being_liquidated, self.is_bankrupt, self.advanced_orders, self.not_upgradable,
+                       self.delegate)
+
     @property
     def shared_quote_token(self) -> Token:
         token_bank = self.shared_quote.base_token_bank
@@ -282,7 +308,7 @@ class Account(AddressableAccount):
             raise Exception(
                 f"Account data length ({len(data)}) does not match expected size ({layouts.MANGO_ACCOUNT.sizeof()})")
 
-        layout = layouts.MANGO_ACCOUNT.parse(data)
+        layout = decoders.MANGO_ACCOUNT.parse(data)
         return Account.from_layout(layout, account_info, Version.V3, group, cache)
 
     @staticmethod
@@ -0,0 +1,243 @@
+# # ⚠ Warning
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN
+# NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+# [🥭 Mango Markets](https://mango.markets/) support is available at:
+#   [Docs](https://docs.mango.markets/)
+#   [Discord](https://discord.gg/67jySBhxrg)
+#   [Twitter](https://twitter.com/mangomarkets)
+#   [Github](https://github.com/blockworks-foundation)
+#   [Email](mailto:hello@blockworks.foundation)
+
+
+import logging
+import threading
+import typing
+
+from decimal import Decimal
+from solana.publickey import PublicKey
+from solana.rpc.types import MemcmpOpts
+
+from .account import Account
+from .accountinfo import AccountInfo
+from .cache import Cache
+from .context import Context
+from .encoding import encode_key
+from .group import Group
+from .layouts import layouts
+from .websocketsubscription import WebSocketProgramSubscription, WebSocketSubscriptionManager
+
+
+# # 🥭 AccountIndex class
+#
+# Keeps every Mango account in a group in memory, so the liquidator doesn't have to reload and re-parse them
+# all on each pass.
+#
+# `seed()` loads all the group's accounts once using `getProgramAccounts`. `subscribe()` then keeps them
+# current with a `programSubscribe` stream using the same group filter. Each account's raw bytes are kept, and
+# an update only re-parses the account if its bytes have changed.
+#
+# Updates missed while the websocket is disconnected can't be fetched individually, so the subscription
+# re-seeds the index whenever it reconnects. Closed accounts no longer match the filter so they never get a
+# notification - they're only dropped by a `seed()`, so it should also be called periodically.
+#
+# Accounts are parsed with the `cache` the index has at the time. Only the raw borrow and position values are
+# used to decide if an account has liabilities, and those don't depend on the cache. Deposit and borrow values
+# do depend on the cache's root bank indexes though, so when a new `cache` has different indexes every account
+# is re-valued from its raw amounts (without re-parsing) the next time it's read.
+#
+class AccountIndex:
+    def __init__(self, context: Context, group: Group, cache: Cache,
+                 parser: typing.Callable[[AccountInfo, Group, Cache], Account] = Account.parse) -> None:
+        self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.context: Context = context
+        self.group: Group = group
+        self.parser: typing.Callable[[AccountInfo, Group, Cache], Account] = parser
+        self.parse_count: int = 0
+        self.unchanged_count: int = 0
+        self.revalue_count: int = 0
+
+        self.__lock: threading.Lock = threading.Lock()
+        self.__data: typing.Dict[str, bytes] = {}
+        self.__accounts: typing.Dict[str, Account] = {}
+        self.__with_liabilities: typing.Set[str] = set()
+        self.__updated_while_seeding: typing.Optional[typing.Set[str]] = None
+        self.__cache: Cache = cache
+        self.__root_bank_indexes: typing.Sequence[typing.Optional[typing.Tuple[Decimal, Decimal]]] = AccountIndex.__indexes(cache)
+        self.__cache_generation: int = 0
+        self.__valued_generation: typing.Dict[str, int] = {}
+
+    @property
+    def cache(self) -> Cache:
+        return self.__cache
+
+    @cache.setter
+    def cache(self, cache: Cache) -> None:
+        indexes: typing.Sequence[typing.Optional[typing.Tuple[Decimal, Decimal]]] = AccountIndex.__indexes(cache)
+        with self.__lock:
+            if indexes != self.__root_bank_indexes:
+                self.__root_bank_indexes = indexes
+                self.__cache_generation += 1
+            self.__cache = cache
+
+    @property
+    def memcmp_opts(self) -> typing.Sequence[MemcmpOpts]:
+        # mango_group is just after the METADATA, which is the first entry.
+        return [MemcmpOpts(offset=layouts.METADATA.sizeof(), bytes=encode_key(self.group.address))]
+
+    @property
+    def data_size(self) -> int:
+        return layouts.MANGO_ACCOUNT.sizeof()
+
+    @property
+    def accounts(self) -> typing.Sequence[Account]:
+        with self.__lock:
+            return [self.__current(key) for key in list(self.__accounts.keys())]
+
+    def account(self, address: PublicKey) -> typing.Optional[Account]:
+        key: str = str(address)
+        with self.__lock:
+            return self.__current(key) if key in self.__accounts else None
+
+    def accounts_with_borrows_or_perp_positions(self) -> typing.Sequence[Account]:
+        with self.__lock:
+            return [self.__current(key) for key in self.__with_liabilities]
+
+    # Loads every account in the group. Accounts that no longer exist are dropped, and accounts that changed
+    # while the load was in progress keep their streamed version since it's at least as new as the loaded one.
+    # If the load fails, the exception is raised and the index keeps the accounts it already had.
+    def seed(self) -> None:
+        with self.__lock:
+            self.__updated_while_seeding = set()
+
+        seen: typing.Set[str] = set()
+        try:
+            results = self.context.client.get_program_accounts(
+                self.context.mango_program_address, memcmp_opts=list(self.memcmp_opts), data_size=self.data_size)
+
+            for account_data in results:
+                address = PublicKey(account_data["pubkey"])
+                seen.add(str(address))
+                account_info = AccountInfo._from_response_values(account_data["account"], address)
+                self.__update(account_info, from_seed=True)
+        except Exception:
+            # A failed or partial load says nothing about which accounts are gone, so nothing is removed.
+            with self.__lock:
+                self.__updated_while_seeding = None
+            raise
+
+        with self.__lock:
+            updated: typing.Set[str] = self.__updated_while_seeding or set()
+            self.__updated_while_seeding = None
+            for missing in set(self.__data.keys()) - seen - updated:
+                self.__remove(missing)
+
+        self._logger.info(f"Seeded with {len(seen)} accounts, {len(self.__with_liabilities)} with liabilities.")
+
+    # Returns True if the account was (re-)parsed, False if its bytes were unchanged.
+    def update(self, account_info: AccountInfo) -> bool:
+        return self.__update(account_info, from_seed=False)
+
+    # Creates a subscription for all the group's accounts that feeds `update()`. If a `manager` is passed the
+    # subscription is added to it, otherwise it's opened on its own websocket. Disposing of it is up to the
+    # caller.
+    def subscribe(self, manager: typing.Optional[WebSocketSubscriptionManager] = None) -> WebSocketProgramSubscription[AccountInfo]:
+        # No coalescing - notifications are for different accounts so none of them can be dropped.
+        subscription = WebSocketProgramSubscription[AccountInfo](
+            self.context, self.context.mango_program_address, lambda account_info: account_info,
+            memcmp_opts=self.memcmp_opts, data_size=self.data_size)
+        subscription.publisher.subscribe(on_next=self.__on_update)
+        subscription.reconnected.subscribe(on_next=self.__on_reconnected)
+        if manager is not None:
+            manager.add(subscription)
+        else:
+            subscription.open()
+        return subscription
+
+    @staticmethod
+    def has_borrows_or_perp_positions(account: Account) -> bool:
+        for slot in account.slots:
+            if slot.raw_borrow > 0:
+                return True
+            if slot.perp_account is not None:
+                if slot.perp_account.base_position != 0 or slot.perp_account.quote_position < 0:
+                    return True
+        return False
+
+    def __on_update(self, account_info: AccountInfo) -> None:
+        self.update(account_info)
+
+    def __on_reconnected(self, _: typing.Any) -> None:
+        try:
+            self.seed()
+        except Exception as exception:
+            self._logger.warning(f"Failed to re-seed after websocket reconnection: {exception}")
+
+    def __update(self, account_info: AccountInfo, from_seed: bool) -> bool:
+        key: str = str(account_info.address)
+        data: bytes = account_info.data
+        with self.__lock:
+            if from_seed:
+                if self.__updated_while_seeding is not None and key in self.__updated_while_seeding:
+                    return False
+            elif self.__updated_while_seeding is not None:
+                self.__updated_while_seeding.add(key)
+
+            if self.__data.get(key) == data:
+                self.unchanged_count += 1
+                return False
+
+            try:
+                account: Account = self.parser(account_info, self.group, self.__cache)
+            except Exception as exception:
+                self._logger.warning(f"Could not parse account {key}: {exception}")
+                return False
+
+            self.parse_count += 1
+            self.__data[key] = data
+            self.__accounts[key] = account
+            self.__valued_generation[key] = self.__cache_generation
+            if AccountIndex.has_borrows_or_perp_positions(account):
+                self.__with_liabilities.add(key)
+            else:
+                self.__with_liabilities.discard(key)
+            return True
+
+    def __remove(self, key: str) -> None:
+        self.__data.pop(key, None)
+        self.__accounts.pop(key, None)
+        self.__valued_generation.pop(key, None)
+        self.__with_liabilities.discard(key)
+
+    # Must be called with the lock held. Returns the account, re-valued first if the root bank indexes have
+    # changed since it was last valued.
+    def __current(self, key: str) -> Account:
+        account: Account = self.__accounts[key]
+        if self.__valued_generation.get(key) == self.__cache_generation:
+            return account
+
+        try:
+            account = account.with_cache(self.__cache)
+            self.revalue_count += 1
+        except Exception as exception:
+            self._logger.warning(f"Could not re-value account {key}: {exception}")
+            return account
+
+        self.__accounts[key] = account
+        self.__valued_generation[key] = self.__cache_generation
+        return account
+
+    @staticmethod
+    def __indexes(cache: Cache) -> typing.Sequence[typing.Optional[typing.Tuple[Decimal, Decimal]]]:
+        return [(root_bank_cache.deposit_index, root_bank_cache.borrow_index) if root_bank_cache is not None else None
+                for root_bank_cache in cache.root_bank_cache]
+
+    def __str__(self) -> str:
+        return f"« AccountIndex [{self.group.address}] {len(self.__accounts)} accounts, {len(self.__with_liabilities)} with liabilities, parsed: {self.parse_count}, unchanged: {self.unchanged_count}, re-valued: {self.revalue_count} »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
@@ -26,6 +26,7 @@ from solana.rpc.types import RPCResponse
 from .constants import SOL_DECIMAL_DIVISOR
 from .context import Context
 from .encoding import decode_binary, encode_binary
+from .tokenbucket import TokenBucket
 
 
 # # 🥭 AccountInfo class
@@ -97,18 +98,46 @@ class AccountInfo:
         #  413 Client Error: Payload Too Large for url
         #  Error response from server: 'Too many inputs provided; max 100', code: -32602
         chunk_size: int = int(context.gma_chunk_size)
+        chunks: typing.Sequence[typing.Sequence[PublicKey]] = AccountInfo._split_list_into_chunks(addresses, chunk_size)
+        if context.gma_concurrency > 1 and len(chunks) > 1:
+            return AccountInfo._load_chunks_concurrently(context, chunks)
+
         sleep_between_calls: float = float(context.gma_chunk_pause)
         multiple: typing.List[AccountInfo] = []
-        chunks: typing.Sequence[typing.Sequence[PublicKey]] = AccountInfo._split_list_into_chunks(addresses, chunk_size)
         for counter, chunk in enumerate(chunks):
-            result: typing.Sequence[typing.Dict[str, typing.Any]] = context.client.get_multiple_accounts([*chunk])
-            response_value_list = zip(result, chunk)
-            multiple += list(map(lambda pair: AccountInfo._from_response_values(pair[0], pair[1]), response_value_list))
+            multiple += AccountInfo._load_chunk(context, chunk)
             if (sleep_between_calls > 0.0) and (counter < (len(chunks) - 1)):
                 time.sleep(sleep_between_calls)
 
         return multiple
 
+    # Fetches chunks on the context's shared pool of `context.gma_concurrency` threads. The rate of calls
+    # is limited by the context's shared token bucket (if there is one) instead of pausing between chunks.
+    #
+    # `executor.map()` returns results in the order of the chunks, so the resulting `AccountInfo`s are
+    # in the same order as the addresses, just like with the serial fetch. If any chunk fails, its
+    # exception is raised here.
+    @staticmethod
+    def _load_chunks_concurrently(context: Context, chunks: typing.Sequence[typing.Sequence[PublicKey]]) -> typing.List["AccountInfo"]:
+        token_bucket: typing.Optional[TokenBucket] = context.gma_token_bucket
+
+        def __load_rate_limited_chunk(chunk: typing.Sequence[PublicKey]) -> typing.Sequence[AccountInfo]:
+            if token_bucket is not None:
+                token_bucket.acquire()
+            return AccountInfo._load_chunk(context, chunk)
+
+        multiple: typing.List[AccountInfo] = []
+        for loaded in context.gma_executor().map(__load_rate_limited_chunk, chunks):
+            multiple += loaded
+
+        return multiple
+
+    @staticmethod
+    def _load_chunk(context: Context, chunk: typing.Sequence[PublicKey]) -> typing.Sequence["AccountInfo"]:
+        result: typing.Sequence[typing.Dict[str, typing.Any]] = context.client.get_multiple_accounts([*chunk])
+        response_value_list = zip(result, chunk)
+        return list(map(lambda pair: AccountInfo._from_response_values(pair[0], pair[1]), response_value_list))
+
     @staticmethod
     def _from_response_values(response_values: typing.Dict[str, typing.Any], address: PublicKey) -> "AccountInfo":
         executable = bool(response_values["executable"])
@@ -26,7 +26,7 @@ from .addressableaccount import AddressableAccount
 from .cache import Cache
 from .context import Context
 from .group import Group
-from .layouts import layouts
+from .layouts import decoders, layouts
 from .lotsizeconverter import NullLotSizeConverter
 from .openorders import OpenOrders
 from .orderbookside import PerpOrderBookSide
@@ -48,7 +48,7 @@ def build_account_info_converter(context: Context, account_type: str) -> typing.
         return lambda account_info: Group.parse_with_context(context, account_info)
     elif account_type_upper == "ACCOUNT":
         def account_loader(account_info: AccountInfo) -> Account:
-            layout_account = layouts.MANGO_ACCOUNT.parse(account_info.data)
+            layout_account = decoders.MANGO_ACCOUNT.parse(account_info.data)
             group_address = layout_account.group
             group: Group = Group.load(context, group_address)
             cache: Cache = group.fetch_cache(context)
@@ -0,0 +1,159 @@
+# # ⚠ Warning
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN
+# NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+# [🥭 Mango Markets](https://mango.markets/) support is available at:
+#   [Docs](https://docs.mango.markets/)
+#   [Discord](https://discord.gg/67jySBhxrg)
+#   [Twitter](https://twitter.com/mangomarkets)
+#   [Github](https://github.com/blockworks-foundation)
+#   [Email](mailto:hello@blockworks.foundation)
+
+import asyncio
+import concurrent.futures
+import json
+import threading
+import typing
+import websockets
+
+from datetime import datetime
+
+from .reconnectingwebsocket import ReconnectingWebsocket
+
+
+# # 🥭 SharedEventLoop class
+#
+# A single asyncio event loop, running in its own daemon thread, that all `AsyncReconnectingWebsocket`s in
+# the process share. The loop and its thread are only started the first time the loop is needed.
+#
+class SharedEventLoop:
+    _lock: threading.Lock = threading.Lock()
+    _loop: typing.Optional[asyncio.AbstractEventLoop] = None
+    _thread: typing.Optional[threading.Thread] = None
+
+    @staticmethod
+    def get() -> asyncio.AbstractEventLoop:
+        with SharedEventLoop._lock:
+            if SharedEventLoop._loop is None:
+                loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+                thread: threading.Thread = threading.Thread(
+                    target=loop.run_forever, name="SharedEventLoop", daemon=True)
+                thread.start()
+                SharedEventLoop._loop = loop
+                SharedEventLoop._thread = thread
+            return SharedEventLoop._loop
+
+
+# # 🥭 AsyncReconnectingWebsocket class
+#
+# The `AsyncReconnectingWebsocket` class is a drop-in replacement for `ReconnectingWebsocket` that runs on the
+# `SharedEventLoop` instead of in its own thread. It has the same observables (`item`, `connecting`,
+# `disconnected`, `ping` and `pong`) and the same `open()`, `close()`, `send()` and `force_reconnect()`
+# methods, and it will continue to automatically reconnect until it is explicitly closed.
+#
+# `on_open_call` is called with this object (which has a `send()` method) each time a connection opens.
+#
+# All the websockets share the loop's single thread, so `item` observers are called on that thread and should
+# do as little as possible - parsing can be deferred using coalescing subscriptions.
+#
+class AsyncReconnectingWebsocket(ReconnectingWebsocket):
+    def __init__(self, url: str, on_open_call: typing.Callable[[typing.Any], None],
+                 loop: typing.Optional[asyncio.AbstractEventLoop] = None) -> None:
+        super().__init__(url, on_open_call)
+        self.loop: asyncio.AbstractEventLoop = loop or SharedEventLoop.get()
+        self.pong_timeout: float = 20
+        self.reconnect_pause: float = 1
+        self._connection: typing.Optional[typing.Any] = None
+        self._outgoing: typing.Optional["asyncio.Queue[str]"] = None
+        self._task: typing.Optional["concurrent.futures.Future[None]"] = None
+
+    def open(self) -> None:
+        self.reconnect_required = True
+        self._task = asyncio.run_coroutine_threadsafe(self._run_async(), self.loop)
+
+    def close(self) -> None:
+        self._logger.info(f"Closing WebSocket for {self.url}")
+        self.reconnect_required = False
+        self.loop.call_soon_threadsafe(self._close_connection)
+
+    def force_reconnect(self) -> None:
+        self._logger.info(f"Forcing a reconnect on WebSocket for {self.url}")
+        self.loop.call_soon_threadsafe(self._close_connection)
+
+    # Safe to call from any thread. Messages are sent in order on the current connection.
+    def send(self, message: str) -> None:
+        self.loop.call_soon_threadsafe(self._enqueue, message)
+
+    def _enqueue(self, message: str) -> None:
+        if self._outgoing is not None:
+            self._outgoing.put_nowait(message)
+
+    def _close_connection(self) -> None:
+        if self._connection is not None:
+            self.loop.create_task(self._connection.close())
+
+    async def _run_async(self) -> None:
+        while self.reconnect_required:
+            self._logger.info(f"WebSocket connecting to: {self.url}")
+            self.connecting.on_next(datetime.now())
+            try:
+                async with websockets.connect(self.url, ping_interval=None, max_size=None) as connection:  # type: ignore[attr-defined]
+                    self._connection = connection
+                    if not self.reconnect_required:
+                        break
+                    # Anything queued for a previous connection is stale - on_open_call sends what's needed.
+                    self._outgoing = asyncio.Queue()
+                    self._logger.info(f"Opening WebSocket for {self.url}")
+                    self.on_open_call(self)
+                    tasks = [asyncio.ensure_future(self._read(connection)),
+                             asyncio.ensure_future(self._write(connection))]
+                    if self.ping_interval > 0:
+                        tasks += [asyncio.ensure_future(self._keepalive(connection))]
+                    _, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for task in pending:
+                        task.cancel()
+            except Exception as exception:
+                self._on_error(exception)
+                # Don't hammer a server that's refusing connections.
+                await asyncio.sleep(self.reconnect_pause)
+            finally:
+                self._connection = None
+                self._outgoing = None
+            self.disconnected.on_next(datetime.now())
+
+    async def _read(self, connection: typing.Any) -> None:
+        async for message in connection:
+            try:
+                self.item.on_next(json.loads(message))
+            except Exception as exception:
+                self._logger.error(f"Error handling message from WebSocket for {self.url}: {exception}")
+
+    async def _write(self, connection: typing.Any) -> None:
+        outgoing: typing.Optional["asyncio.Queue[str]"] = self._outgoing
+        if outgoing is None:
+            return
+        while True:
+            message: str = await outgoing.get()
+            await connection.send(message)
+
+    async def _keepalive(self, connection: typing.Any) -> None:
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            pong_waiter = await connection.ping()
+            self._on_ping()
+            try:
+                await asyncio.wait_for(pong_waiter, timeout=self.pong_timeout)
+            except asyncio.TimeoutError:
+                self._logger.warning(f"No pong from WebSocket for {self.url} in {self.pong_timeout} seconds")
+                return
+            self._on_pong()
+
+    def __str__(self) -> str:
+        return f"« AsyncReconnectingWebsocket [{self.url}] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
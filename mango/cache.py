@@ -23,7 +23,7 @@ from .accountinfo import AccountInfo
 from .addressableaccount import AddressableAccount
 from .context import Context
 from .instrumentvalue import InstrumentValue
-from .layouts import layouts
+from .layouts import decoders, layouts
 from .metadata import Metadata
 from .token import Instrument, Token
 from .version import Version
@@ -170,7 +170,7 @@ class Cache(AddressableAccount):
             raise Exception(
                 f"Cache data length ({len(data)}) does not match expected size ({layouts.CACHE.sizeof()})")
 
-        layout = layouts.CACHE.parse(data)
+        layout = decoders.CACHE.parse(data)
         return Cache.from_layout(layout, account_info, Version.V1)
 
     @staticmethod
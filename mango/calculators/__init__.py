@@ -1,3 +1,4 @@
+# from .batchhealthcalculator import BatchHealthCalculator, PackedAccounts
 # from .collateralcalculator import CollateralCalculator
 # from .healthcalculator import HealthType, HealthCalculator
 # from .perpcollateralcalculator import PerpCollateralCalculator
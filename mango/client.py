@@ -17,6 +17,8 @@ import enum
 import json
 import logging
 import requests
+import requests.adapters
+import threading
 import time
 import typing
 
@@ -26,7 +28,7 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from collections.abc import Mapping
 from collections import deque
-from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from decimal import Decimal
 from solana.blockhash import Blockhash, BlockhashCache
 from solana.keypair import Keypair
@@ -45,6 +47,8 @@ from .text import indent_collection_as_str
 
 _STUB_TRANSACTION_SIGNATURE: str = "stub-for-already-submitted-transaction-signature"
 
+T = typing.TypeVar("T")
+
 
 # # 🥭 CompoundException class
 #
@@ -325,72 +329,257 @@ class NullTransactionStatusCollector(TransactionStatusCollector):
         pass
 
 
-class TransactionWatcher:
-    def __init__(self, client: Client, slot_holder: SlotHolder, signature: str, collector: TransactionStatusCollector):
+# # 🥭 TransactionConfirmationTracker class
+#
+# A `TransactionConfirmationTracker` watches sent transactions until they're confirmed, fail, or time out,
+# and reports what happened to a `TransactionStatusCollector`.
+#
+# All pending signatures are checked together, using one `getSignatureStatuses` call per tick (or more if
+# there are more than the RPC node's limit of 256 signatures pending). A single background thread does the
+# polling, and it only runs while there are signatures pending.
+#
+# Slots of confirmed transactions are passed to the `SlotHolder` so subsequent fetches don't return data
+# from before the transaction.
+#
+# `watch()` returns a `Future` that completes with the `TransactionStatus` of a signature. The statuses of
+# recently-completed signatures are kept so a signature can still be watched after it's been reported.
+#
+class TransactionConfirmationTracker:
+    MAXIMUM_SIGNATURES_PER_CALL: int = 256
+    MAXIMUM_RECENT_STATUSES: int = 1000
+
+    def __init__(self, client: Client, slot_holder: SlotHolder, collector: TransactionStatusCollector,
+                 poll_interval: float = 0.5, timeout: float = 30) -> None:
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
         self.client: Client = client
         self.slot_holder: SlotHolder = slot_holder
-        self.signature: str = signature
-        self.collector = collector
-
-    def report_on_transaction(self) -> None:
-        started_at: datetime = datetime.now()
-        for pause in [0.1, 0.2, 0.3, 0.4, 0.5, 0.5, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]:
-            transaction_response = self.client.get_signature_statuses([self.signature])
-            if "result" in transaction_response and "value" in transaction_response["result"]:
-                [status] = transaction_response["result"]["value"]
+        self.collector: TransactionStatusCollector = collector
+        self.poll_interval: float = poll_interval
+        self.timeout: timedelta = timedelta(seconds=timeout)
+        self.__pending: typing.Dict[str, datetime] = {}
+        self.__watchers: typing.Dict[str, typing.List["Future[TransactionStatus]"]] = {}
+        self.__recent: typing.Dict[str, TransactionStatus] = {}
+        self.__lock: threading.Lock = threading.Lock()
+        self.__polling: bool = False
+
+    @property
+    def pending_signatures(self) -> typing.Sequence[str]:
+        with self.__lock:
+            return list(self.__pending.keys())
+
+    def add(self, signature: str) -> None:
+        with self.__lock:
+            self.__pending[signature] = datetime.now()
+            if self.__polling:
+                return
+            self.__polling = True
+
+        thread = threading.Thread(target=self.__poll_until_empty, name=self.__class__.__name__, daemon=True)
+        thread.start()
+
+    def watch(self, signature: str) -> "Future[TransactionStatus]":
+        future: Future[TransactionStatus] = Future()
+        with self.__lock:
+            recent: typing.Optional[TransactionStatus] = self.__recent.get(signature)
+            if recent is None:
+                self.__watchers.setdefault(signature, []).append(future)
+        if recent is not None:
+            future.set_result(recent)
+        return future
+
+    # Checks all pending signatures once. Called repeatedly by the background thread, but can be called
+    # directly if there's no need for the background thread.
+    def poll(self) -> None:
+        with self.__lock:
+            pending: typing.Dict[str, datetime] = dict(self.__pending)
+
+        signatures: typing.List[str] = list(pending.keys())
+        for start in range(0, len(signatures), TransactionConfirmationTracker.MAXIMUM_SIGNATURES_PER_CALL):
+            chunk: typing.List[str] = signatures[start:start + TransactionConfirmationTracker.MAXIMUM_SIGNATURES_PER_CALL]
+            try:
+                response = self.client.get_signature_statuses(list(chunk))
+            except Exception as exception:
+                self._logger.warning(f"Failed to fetch status of {len(chunk)} transactions - will retry: {exception}")
+                continue
+
+            statuses: typing.Sequence[typing.Any] = []
+            if "result" in response and "value" in response["result"]:
+                statuses = response["result"]["value"]
+            for signature, status in zip(chunk, statuses):
                 if status is not None:
-                    delta: timedelta = datetime.now() - started_at
-                    time_taken: float = delta.seconds + delta.microseconds / 1000000
-
-                    # value should be a dict that looks like:
-                    # {
-                    #   'confirmationStatus': 'processed',
-                    #   'confirmations': 0,
-                    #   'err': None,
-                    #   'slot': 116230143,
-                    #   'status': {'Ok': None}
-                    # }
-                    # If there's an error it should look like:
-                    # {
-                    #     'slot': 116235922,
-                    #     'confirmations': 0,
-                    #     'status': {'Err': {'InstructionError': [0, {'Custom': 24}]}},
-                    #     'err': {
-                    #         'InstructionError': [0, {'Custom': 24}]
-                    #     },
-                    #     'confirmationStatus': 'processed'
-                    # }
-                    if status["err"] is not None:
-                        self._logger.warning(
-                            f"Transaction {self.signature} failed after {time_taken:.2f} seconds with error {status['err']}")
-                        self.collector.add_transaction(TransactionStatus(
-                            self.signature, TransactionOutcome.FAIL, started_at, delta))
-                        return
-
-                    confirmation_status: str = status["confirmationStatus"]
-                    slot: int = status["slot"]
-                    self.slot_holder.require_data_from_fresh_slot(slot)
-                    self.collector.add_transaction(TransactionStatus(
-                        self.signature, TransactionOutcome.SUCCESS, started_at, delta))
-                    self._logger.info(
-                        f"Transaction {self.signature} reached confirmation status '{confirmation_status}' in slot {slot} after {time_taken:.2f} seconds")
+                    self.__report(signature, pending[signature], status)
+
+        cutoff: datetime = datetime.now() - self.timeout
+        for signature, started_at in pending.items():
+            if started_at < cutoff:
+                self.__report_timeout(signature, started_at)
+
+    def __poll_until_empty(self) -> None:
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.poll()
+            except Exception as exception:
+                self._logger.error(f"Unexpected error checking transaction statuses: {exception}")
+
+            with self.__lock:
+                if len(self.__pending) == 0:
+                    self.__polling = False
                     return
-            time.sleep(pause)
 
-        delta = datetime.now() - started_at
+    def __remove(self, signature: str) -> bool:
+        with self.__lock:
+            return self.__pending.pop(signature, None) is not None
+
+    def __report(self, signature: str, started_at: datetime, status: typing.Dict[str, typing.Any]) -> None:
+        if not self.__remove(signature):
+            return
+
+        delta: timedelta = datetime.now() - started_at
+        time_taken: float = delta.seconds + delta.microseconds / 1000000
+
+        # status should be a dict that looks like:
+        # {
+        #   'confirmationStatus': 'processed',
+        #   'confirmations': 0,
+        #   'err': None,
+        #   'slot': 116230143,
+        #   'status': {'Ok': None}
+        # }
+        # If there's an error it should look like:
+        # {
+        #     'slot': 116235922,
+        #     'confirmations': 0,
+        #     'status': {'Err': {'InstructionError': [0, {'Custom': 24}]}},
+        #     'err': {
+        #         'InstructionError': [0, {'Custom': 24}]
+        #     },
+        #     'confirmationStatus': 'processed'
+        # }
+        if status["err"] is not None:
+            self._logger.warning(
+                f"Transaction {signature} failed after {time_taken:.2f} seconds with error {status['err']}")
+            self.__complete(TransactionStatus(signature, TransactionOutcome.FAIL, started_at, delta))
+            return
+
+        confirmation_status: str = status["confirmationStatus"]
+        slot: int = status["slot"]
+        self.slot_holder.require_data_from_fresh_slot(slot)
+        self.__complete(TransactionStatus(signature, TransactionOutcome.SUCCESS, started_at, delta))
+        self._logger.info(
+            f"Transaction {signature} reached confirmation status '{confirmation_status}' in slot {slot} after {time_taken:.2f} seconds")
+
+    def __complete(self, status: TransactionStatus) -> None:
+        self.collector.add_transaction(status)
+        with self.__lock:
+            self.__recent[status.signature] = status
+            if len(self.__recent) > TransactionConfirmationTracker.MAXIMUM_RECENT_STATUSES:
+                # Dicts keep insertion order, so the first key is the oldest.
+                del self.__recent[next(iter(self.__recent))]
+            watchers: typing.List[Future[TransactionStatus]] = self.__watchers.pop(status.signature, [])
+        for watcher in watchers:
+            watcher.set_result(status)
+
+    def __report_timeout(self, signature: str, started_at: datetime) -> None:
+        if not self.__remove(signature):
+            return
+
+        delta: timedelta = datetime.now() - started_at
         time_wasted_looking: float = delta.seconds + delta.microseconds / 1000000
-        self.collector.add_transaction(TransactionStatus(self.signature, TransactionOutcome.TIMEOUT, started_at, delta))
+        self.__complete(TransactionStatus(signature, TransactionOutcome.TIMEOUT, started_at, delta))
         self._logger.warning(
-            f"Transaction {self.signature} disappeared despite spending {time_wasted_looking:.2f} seconds waiting for it")
+            f"Transaction {signature} disappeared despite spending {time_wasted_looking:.2f} seconds waiting for it")
+
+    def __str__(self) -> str:
+        return f"« TransactionConfirmationTracker with {len(self.pending_signatures)} pending signatures »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 _create_http_session function
+#
+# Creates a `requests.Session` with a connection pool sized for talking to a single RPC host.
+#
+# Each `RPCCaller` only ever talks to one host, so a single pool is enough - `pool_size` is the number
+# of connections that can be kept open to that host (useful when calls are made from multiple threads).
+#
+# If `keepalive` is False, every response closes its connection so the next call opens a fresh one.
+#
+def _create_http_session(pool_size: int, keepalive: bool) -> requests.Session:
+    session: requests.Session = requests.Session()
+    adapter: requests.adapters.HTTPAdapter = requests.adapters.HTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not keepalive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+# # 🥭 ProviderStatistics class
+#
+# `ProviderStatistics` tracks how well a single RPC provider has been performing, as exponentially-weighted
+# moving averages (EWMAs) of call latency and error rate, plus the latest slot seen in its responses.
+#
+# `smoothing` is the weight given to each new observation - higher values react faster to changes.
+#
+class ProviderStatistics:
+    def __init__(self, smoothing: float = 0.2) -> None:
+        self.smoothing: float = smoothing
+        self.latency: typing.Optional[float] = None
+        self.error_rate: float = 0
+        self.latest_slot: int = 0
+        self.calls: int = 0
+        self.last_updated: datetime = datetime.min
+
+    # Lower is better. Errors make a provider look slower than it is - a provider failing half its calls
+    # scores twice its latency.
+    @property
+    def score(self) -> float:
+        latency: float = self.latency or 0
+        return latency / max(1 - self.error_rate, 0.01)
+
+    def record_success(self, latency: float, slot: typing.Optional[int] = None) -> None:
+        self.latency = latency if self.latency is None else self.__smooth(self.latency, latency)
+        self.error_rate = self.__smooth(self.error_rate, 0)
+        if slot is not None and slot > self.latest_slot:
+            self.latest_slot = slot
+        self.__update()
+
+    def record_failure(self, latency: float) -> None:
+        # Only slow failures count towards latency - a fast failure shouldn't make a provider look fast.
+        if self.latency is None or latency > self.latency:
+            self.latency = latency if self.latency is None else self.__smooth(self.latency, latency)
+        self.error_rate = self.__smooth(self.error_rate, 1)
+        self.__update()
+
+    def __smooth(self, average: float, observation: float) -> float:
+        return (self.smoothing * observation) + ((1 - self.smoothing) * average)
+
+    def __update(self) -> None:
+        self.calls += 1
+        self.last_updated = datetime.now()
+
+    def __str__(self) -> str:
+        latency: str = f"{self.latency * 1000:.1f}ms" if self.latency is not None else "unknown"
+        return f"« ProviderStatistics latency: {latency}, error rate: {self.error_rate:.1%}, latest slot: {self.latest_slot}, calls: {self.calls} »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
 
 
 # # 🥭 RPCCaller class
 #
 # A `RPCCaller` extends the HTTPProvider with better error handling.
 #
+# Each `RPCCaller` has its own pooled HTTP session, so the TCP and TLS handshakes are paid once per
+# connection rather than once per call.
+#
 class RPCCaller(HTTPProvider):
-    def __init__(self, name: str, cluster_rpc_url: str, cluster_ws_url: str, http_request_timeout: float, stale_data_pauses_before_retry: typing.Sequence[float], slot_holder: SlotHolder, instruction_reporter: InstructionReporter):
+    DEFAULT_MAXIMUM_BATCH_SIZE: int = 100
+
+    def __init__(self, name: str, cluster_rpc_url: str, cluster_ws_url: str, http_request_timeout: float, stale_data_pauses_before_retry: typing.Sequence[float], slot_holder: SlotHolder, instruction_reporter: InstructionReporter, pool_size: int = 10, keepalive: bool = True):
         super().__init__(cluster_rpc_url)
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
         self.name: str = name
@@ -400,10 +589,25 @@ class RPCCaller(HTTPProvider):
         self.stale_data_pauses_before_retry: typing.Sequence[float] = stale_data_pauses_before_retry
         self.slot_holder: SlotHolder = slot_holder
         self.instruction_reporter: InstructionReporter = instruction_reporter
+        self.pool_size: int = pool_size
+        self.keepalive: bool = keepalive
+        self.session: requests.Session = _create_http_session(pool_size, keepalive)
+        self.statistics: ProviderStatistics = ProviderStatistics()
+        self.maximum_batch_size: int = RPCCaller.DEFAULT_MAXIMUM_BATCH_SIZE
 
     def require_data_from_fresh_slot(self, latest_slot: typing.Optional[int] = None) -> None:
         self.slot_holder.require_data_from_fresh_slot(latest_slot)
 
+    def is_connected(self) -> bool:
+        try:
+            response = self.session.get(self.health_uri)
+            response.raise_for_status()
+        except (IOError, requests.HTTPError) as exception:
+            self._logger.error(f"Health check failed with error: {exception}")
+            return False
+
+        return bool(response.ok)
+
     def make_request(self, method: RPCMethod, *params: typing.Any) -> RPCResponse:
         # No pauses specified means this funcitonality is turned off.
         if len(self.stale_data_pauses_before_retry) == 0:
@@ -445,11 +649,86 @@ class RPCCaller(HTTPProvider):
         # request_kwargs = self._before_request(method=method, params=params, is_async=False)
         # raw_response = requests.post(**request_kwargs)
         # return self._after_request(raw_response=raw_response, method=method)
+        #
+        # We post through our own pooled session instead of the module-level `requests.post()`.
 
         request_kwargs = self._before_request(method=method, params=params, is_async=False)
+        raw_response = self.__post(f"method '{method}'", request_kwargs)
+
+        # All seems OK, but maybe the server returned an error? If so, try to pass on as much
+        # information as we can.
+        response_text: str = raw_response.text
+        response: typing.Dict[str, typing.Any] = json.loads(response_text)
+
+        return self.__check_response(method, params, response, response_text)
+
+    # Sends multiple calls to the RPC node in a single JSON-RPC 'batch' POST.
+    #
+    # Problems with the POST itself (rate-limiting, HTTP errors, timeouts) are raised, just like with
+    # `make_request()`, so a `CompoundRPCCaller` can switch provider and try the whole batch again.
+    #
+    # Problems with an individual call are mapped to the same exceptions `make_request()` would raise
+    # but they are returned in place of that call's response rather than raised, so one failing call
+    # doesn't lose the results of all the others. (Stale-slot responses are returned as exceptions too
+    # - batches are not automatically retried.)
+    #
+    # Large batches are split into POSTs of at most `maximum_batch_size` calls, to stay inside the request
+    # count and body size limits RPC providers put on a batch.
+    #
+    # Results are returned in the same order as the calls.
+    #
+    def make_batch_request(self, calls: typing.Sequence[typing.Tuple[RPCMethod, typing.Sequence[typing.Any]]]) -> typing.Sequence[typing.Union[RPCResponse, Exception]]:
+        chunk_size: int = max(self.maximum_batch_size, 1)
+        results: typing.List[typing.Union[RPCResponse, Exception]] = []
+        for start in range(0, len(calls), chunk_size):
+            results += self.__make_batch_request(calls[start:start + chunk_size])
+        return results
+
+    def __make_batch_request(self, calls: typing.Sequence[typing.Tuple[RPCMethod, typing.Sequence[typing.Any]]]) -> typing.Sequence[typing.Union[RPCResponse, Exception]]:
+        request_ids: typing.List[int] = [self._increment_counter_and_get_id() for _ in calls]
+        batch: typing.List[typing.Dict[str, typing.Any]] = []
+        for request_id, (method, params) in zip(request_ids, calls):
+            batch += [{"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}]
+        self._logger.debug(f"Making batch request with {len(calls)} calls to {self.cluster_rpc_url}.")
+
+        request_kwargs: typing.Dict[str, typing.Any] = {
+            "url": self.endpoint_uri,
+            "headers": {"Content-Type": "application/json"},
+            "data": json.dumps(batch)
+        }
+        raw_response = self.__post(f"batch of {len(calls)} calls", request_kwargs)
+
+        response_text: str = raw_response.text
+        all_responses: typing.Any = json.loads(response_text)
+        if not isinstance(all_responses, list):
+            # Nodes that don't support batching tend to reply with a single error object.
+            raise ClientException(f"Batch request returned a non-batch response: {response_text}",
+                                  self.name, self.cluster_rpc_url)
+
+        responses_by_id: typing.Dict[int, typing.Dict[str, typing.Any]] = {}
+        for individual_response in all_responses:
+            if isinstance(individual_response, dict) and "id" in individual_response:
+                responses_by_id[individual_response["id"]] = individual_response
+
+        results: typing.List[typing.Union[RPCResponse, Exception]] = []
+        for request_id, (method, params) in zip(request_ids, calls):
+            if request_id not in responses_by_id:
+                results += [ClientException(f"No response to method '{method}' in batch",
+                                            self.name, self.cluster_rpc_url)]
+                continue
+
+            response = responses_by_id[request_id]
+            try:
+                results += [self.__check_response(method, tuple(params), response, json.dumps(response))]
+            except ClientException as exception:
+                results += [exception]
+
+        return results
+
+    def __post(self, description: str, request_kwargs: typing.Dict[str, typing.Any]) -> requests.Response:
         http_post_timeout: typing.Union[float,
                                         None] = self.http_request_timeout if self.http_request_timeout >= 0 else None
-        raw_response = requests.post(**request_kwargs, timeout=http_post_timeout)
+        raw_response = self.session.post(**request_kwargs, timeout=http_post_timeout)
 
         # Some custom exceptions specifically for rate-limiting. This allows calling code to handle this
         # specific case if they so choose.
@@ -457,19 +736,17 @@ class RPCCaller(HTTPProvider):
         # "You will see HTTP respose codes 429 for too many requests or 413 for too much bandwidth."
         if raw_response.status_code == 413:
             raise TooMuchBandwidthRateLimitException(
-                f"Rate limited (too much bandwidth) calling method '{method}' on {self.cluster_rpc_url}", self.name, self.cluster_rpc_url)
+                f"Rate limited (too much bandwidth) calling {description} on {self.cluster_rpc_url}", self.name, self.cluster_rpc_url)
         elif raw_response.status_code == 429:
             raise TooManyRequestsRateLimitException(
-                f"Rate limited (too many requests) calling method '{method}' on {self.cluster_rpc_url}", self.name, self.cluster_rpc_url)
+                f"Rate limited (too many requests) calling {description} on {self.cluster_rpc_url}", self.name, self.cluster_rpc_url)
 
         # Not a rate-limit problem, but maybe there was some other error?
         raw_response.raise_for_status()
 
-        # All seems OK, but maybe the server returned an error? If so, try to pass on as much
-        # information as we can.
-        response_text: str = raw_response.text
-        response: typing.Dict[str, typing.Any] = json.loads(response_text)
+        return raw_response
 
+    def __check_response(self, method: RPCMethod, params: typing.Tuple[typing.Any, ...], response: typing.Dict[str, typing.Any], response_text: str) -> RPCResponse:
         # Did we get sufficiently up-to-date information? It must be from the last slot we saw or a
         # newer slot.
         #
@@ -526,6 +803,9 @@ class RPCCaller(HTTPProvider):
         # The call succeeded.
         return typing.cast(RPCResponse, response)
 
+    def close(self) -> None:
+        self.session.close()
+
     def __str__(self) -> str:
         return f"« RPCCaller [{self.cluster_rpc_url}] »"
 
@@ -533,16 +813,101 @@ class RPCCaller(HTTPProvider):
         return f"{self}"
 
 
+# # 🥭 _slot_from_result function
+#
+# Finds the slot a response came from, if it says. Batch responses give the highest slot of any of their
+# responses.
+#
+def _slot_from_result(result: typing.Any) -> typing.Optional[int]:
+    if isinstance(result, Mapping):
+        if "result" in result and isinstance(result["result"], Mapping) and "context" in result["result"]:
+            context = result["result"]["context"]
+            if isinstance(context, Mapping) and "slot" in context:
+                return int(context["slot"])
+        return None
+
+    if isinstance(result, list):
+        slots: typing.List[int] = []
+        for individual_result in result:
+            slot: typing.Optional[int] = _slot_from_result(individual_result)
+            if slot is not None:
+                slots += [slot]
+        return max(slots) if len(slots) > 0 else None
+
+    return None
+
+
+# # 🥭 _FAILOVER_EXCEPTIONS
+#
+# The exceptions that mean a provider can't give a good answer right now, so another provider should be
+# tried. Anything else (like an RPC error for a bad request) would be the same from every provider, so it's
+# raised straight away.
+#
+_FAILOVER_EXCEPTIONS: typing.Tuple[typing.Type[Exception], ...] = (
+    requests.exceptions.HTTPError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    RateLimitException,
+    NodeIsBehindException,
+    StaleSlotException,
+    FailedToFetchBlockhashException)
+
+
+# # 🥭 RPCRouting enum
+#
+# How a `CompoundRPCCaller` chooses which provider to call.
+#
+# * FAILOVER uses the first provider until it fails, then moves on to the next.
+# * ADAPTIVE sends reads to the fastest provider that is up to date with the chain, based on each
+#   provider's `ProviderStatistics`. Transactions are still sent using FAILOVER ordering.
+#
+class RPCRouting(enum.Enum):
+    # We use strings here so that argparse can work with these as parameters.
+    FAILOVER = "FAILOVER"
+    ADAPTIVE = "ADAPTIVE"
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
 # # 🥭 CompoundRPCCaller class
 #
 # A `CompoundRPCCaller` will try multiple providers until it succeeds (or the all fail). Should only trap
 # and switch provider on exceptions that show that provider is no longer at the tip of the chain.
 #
+# Every call's latency, success or failure, and slot are recorded in the provider's `ProviderStatistics`.
+# With ADAPTIVE routing these are used to order the providers for reads:
+# * providers more than `maximum_slot_lag` slots behind the most up-to-date provider, or with an error
+#   rate above `maximum_error_rate`, are only tried after all the others;
+# * the rest are tried fastest first (see `ProviderStatistics.score`);
+# * providers that haven't been called for `probe_interval` seconds are tried first, healthy or not. A
+#   provider's statistics only change when it's called, so this is how a provider that was slow, lagging
+#   or failing gets a chance to show it has recovered.
+#
+# If `hedge_delay` is set, latency-critical reads (the methods in `HEDGED_METHODS`) are 'hedged'. The read
+# goes to the first provider as usual but if no acceptable response has arrived after `hedge_delay`
+# seconds (0 means immediately) the same read is also sent to the second provider. Whichever acceptable
+# response arrives first is used. A response is acceptable if it didn't fail and its slot is acceptable to
+# the `SlotHolder`. This trades some extra load on the providers for a shorter tail latency.
+#
 class CompoundRPCCaller(HTTPProvider):
-    def __init__(self, name: str, providers: typing.Sequence[RPCCaller]):
+    HEDGED_METHODS: typing.FrozenSet[str] = frozenset({"getAccountInfo", "getMultipleAccounts"})
+
+    def __init__(self, name: str, providers: typing.Sequence[RPCCaller], routing: RPCRouting = RPCRouting.FAILOVER,
+                 maximum_slot_lag: int = 20, maximum_error_rate: float = 0.5, probe_interval: float = 30,
+                 hedge_delay: typing.Optional[float] = None) -> None:
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
         self.__providers: typing.Sequence[RPCCaller] = providers
         self.name: str = name
+        self.routing: RPCRouting = routing
+        self.maximum_slot_lag: int = maximum_slot_lag
+        self.maximum_error_rate: float = maximum_error_rate
+        self.probe_interval: timedelta = timedelta(seconds=probe_interval)
+        self.hedge_delay: typing.Optional[float] = hedge_delay
+        self.__hedge_executor: typing.Optional[ThreadPoolExecutor] = None
         self.on_provider_change: typing.Callable[[], None] = lambda: None
 
     @property
@@ -567,25 +932,49 @@ class CompoundRPCCaller(HTTPProvider):
             self.on_provider_change()
         self._logger.debug(f"Told to shift provider - now using: {self.__providers[0]}")
 
+    # Returns the providers in the order they should be tried for reads.
+    def providers_for_reads(self) -> typing.Sequence[RPCCaller]:
+        if self.routing != RPCRouting.ADAPTIVE or len(self.__providers) < 2:
+            return self.__providers
+
+        highest_slot: int = max(provider.statistics.latest_slot for provider in self.__providers)
+        probe_before: datetime = datetime.now() - self.probe_interval
+
+        def __sort_key(provider: RPCCaller) -> typing.Tuple[bool, bool, float]:
+            statistics: ProviderStatistics = provider.statistics
+            # A provider that hasn't returned a slot yet isn't known to be lagging.
+            lagging: bool = statistics.latest_slot > 0 and (highest_slot - statistics.latest_slot) > self.maximum_slot_lag
+            unhealthy: bool = lagging or statistics.error_rate > self.maximum_error_rate
+            needs_probe: bool = statistics.last_updated < probe_before
+            return (unhealthy and not needs_probe, not needs_probe, statistics.score)
+
+        return sorted(self.__providers, key=__sort_key)
+
     def make_request(self, method: RPCMethod, *params: typing.Any) -> RPCResponse:
+        if self.hedge_delay is not None and method in CompoundRPCCaller.HEDGED_METHODS and len(self.__providers) > 1:
+            return self.__hedged_call(method, *params)
+        if method == "sendTransaction" or self.routing != RPCRouting.ADAPTIVE:
+            return self.__call_with_failover(self.__providers, True, lambda provider: provider.make_request(method, *params))
+        return self.__call_with_failover(self.providers_for_reads(), False, lambda provider: provider.make_request(method, *params))
+
+    def make_batch_request(self, calls: typing.Sequence[typing.Tuple[RPCMethod, typing.Sequence[typing.Any]]]) -> typing.Sequence[typing.Union[RPCResponse, Exception]]:
+        rebase: bool = self.routing != RPCRouting.ADAPTIVE
+        return self.__call_with_failover(self.providers_for_reads(), rebase, lambda provider: provider.make_batch_request(calls))
+
+    # If `rebase` is True, a successful provider becomes the current provider (which is how FAILOVER routing
+    # moves on from a failing provider).
+    def __call_with_failover(self, providers: typing.Sequence[RPCCaller], rebase: bool, call: typing.Callable[[RPCCaller], T]) -> T:
         all_exceptions: typing.List[Exception] = []
-        for provider in self.__providers:
+        for provider in providers:
+            started_at: float = time.perf_counter()
             try:
-                result = provider.make_request(method, *params)
-                successful_index: int = self.__providers.index(provider)
-                if successful_index != 0:
-                    # Rebase the providers' list so we continue to use this successful one (until it fails)
-                    self.__providers = [*self.__providers[successful_index:], *self.__providers[:successful_index]]
-                    self.on_provider_change()
-                    self._logger.debug(f"Shifted provider - now using: {self.__providers[0]}")
+                result = call(provider)
+                provider.statistics.record_success(time.perf_counter() - started_at, _slot_from_result(result))
+                if rebase:
+                    self.__rebase_to(provider)
                 return result
-            except (requests.exceptions.HTTPError,
-                    requests.exceptions.ConnectionError,
-                    requests.exceptions.Timeout,
-                    RateLimitException,
-                    NodeIsBehindException,
-                    StaleSlotException,
-                    FailedToFetchBlockhashException) as exception:
+            except _FAILOVER_EXCEPTIONS as exception:
+                provider.statistics.record_failure(time.perf_counter() - started_at)
                 all_exceptions += [exception]
                 self._logger.info(f"Moving to next provider - {provider} gave {exception}")
 
@@ -594,6 +983,98 @@ class CompoundRPCCaller(HTTPProvider):
 
         raise CompoundException(self.name, all_exceptions)
 
+    # Rebase the providers' list so we continue to use this successful one (until it fails)
+    def __rebase_to(self, provider: RPCCaller) -> None:
+        successful_index: int = self.__providers.index(provider)
+        if successful_index != 0:
+            self.__providers = [*self.__providers[successful_index:], *self.__providers[:successful_index]]
+            self.on_provider_change()
+            self._logger.debug(f"Shifted provider - now using: {self.__providers[0]}")
+
+    # Sends the read to the first provider and, if that hasn't given an acceptable response in time, the
+    # second provider too. The first acceptable response wins.
+    #
+    # Requests already in progress can't be interrupted, so the losing request is cancelled if it hasn't
+    # started yet, otherwise its response is just ignored. (It still counts towards that provider's
+    # statistics.)
+    #
+    # If neither gives an acceptable response, the read falls back to the usual failover handling, starting
+    # with the providers that haven't been tried. Only the exceptions that failover moves on from lead to the
+    # hedge or the other providers - anything else is raised straight away.
+    #
+    # With FAILOVER routing, a first provider that fails (now or after the hedge has already won) is moved
+    # away from just as it would be without hedging, so hedged reads don't keep starting with a dead provider.
+    def __hedged_call(self, method: RPCMethod, *params: typing.Any) -> RPCResponse:
+        providers: typing.Sequence[RPCCaller] = self.providers_for_reads()
+        hedged_providers: typing.Sequence[RPCCaller] = providers[:2]
+        executor: ThreadPoolExecutor = self.__get_hedge_executor()
+        rebase: bool = self.routing != RPCRouting.ADAPTIVE
+        winner: typing.Optional[RPCCaller] = None
+
+        def __on_first_done(first: Future[RPCResponse]) -> None:
+            # Only move if the first provider failed, another provider succeeded, and nothing else has
+            # moved the current provider in the meantime.
+            if rebase and winner is not None and not first.cancelled() and isinstance(first.exception(), _FAILOVER_EXCEPTIONS):
+                if self.current is hedged_providers[0]:
+                    self.__rebase_to(winner)
+
+        def __call(provider: RPCCaller) -> RPCResponse:
+            started_at: float = time.perf_counter()
+            try:
+                response: RPCResponse = provider.make_request(method, *params)
+            except _FAILOVER_EXCEPTIONS:
+                provider.statistics.record_failure(time.perf_counter() - started_at)
+                raise
+            slot: typing.Optional[int] = _slot_from_result(response)
+            provider.statistics.record_success(time.perf_counter() - started_at, slot)
+            if slot is not None and not provider.slot_holder.is_acceptable(slot):
+                raise StaleSlotException(provider.name, provider.cluster_rpc_url, provider.slot_holder.latest_slot, slot)
+            return response
+
+        all_exceptions: typing.List[Exception] = []
+        first: Future[RPCResponse] = executor.submit(__call, hedged_providers[0])
+        futures: typing.Dict[Future[RPCResponse], RPCCaller] = {first: hedged_providers[0]}
+        pending: typing.Set[Future[RPCResponse]] = set(futures.keys())
+        hedge_sent: bool = False
+        while len(pending) > 0 or not hedge_sent:
+            timeout: typing.Optional[float] = None if hedge_sent else self.hedge_delay
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                exception: typing.Optional[BaseException] = future.exception()
+                if exception is None:
+                    for loser in pending:
+                        loser.cancel()
+                    winner = futures[future]
+                    if winner is not hedged_providers[0]:
+                        first.add_done_callback(__on_first_done)
+                    return future.result()
+                if not isinstance(exception, _FAILOVER_EXCEPTIONS):
+                    for loser in pending:
+                        loser.cancel()
+                    raise exception
+                self._logger.info(f"Hedged call to {futures[future]} gave {exception}")
+                all_exceptions += [typing.cast(Exception, exception)]
+
+            if not hedge_sent:
+                # Either the hedge delay has passed or the first call failed - try the second provider too.
+                hedge_sent = True
+                self._logger.debug(f"Hedging '{method}' call with {hedged_providers[1]}")
+                hedge: Future[RPCResponse] = executor.submit(__call, hedged_providers[1])
+                futures[hedge] = hedged_providers[1]
+                pending.add(hedge)
+
+        remaining_providers: typing.Sequence[RPCCaller] = providers[2:]
+        if len(remaining_providers) > 0:
+            return self.__call_with_failover(remaining_providers, rebase, lambda provider: provider.make_request(method, *params))
+
+        raise CompoundException(self.name, all_exceptions)
+
+    def __get_hedge_executor(self) -> ThreadPoolExecutor:
+        if self.__hedge_executor is None:
+            self.__hedge_executor = ThreadPoolExecutor(max_workers=max(4, len(self.__providers) * 2),
+                                                       thread_name_prefix="HedgedRPCCall")
+        return self.__hedge_executor
+
     def is_connected(self) -> bool:
         # All we need for this to be true is for one of our providers to be connected.
         for provider in self.__providers:
@@ -608,6 +1089,192 @@ class CompoundRPCCaller(HTTPProvider):
         return f"{self}"
 
 
+# # 🥭 PrefetchedBlockhash class
+#
+# A recent blockhash, along with when and where it came from, and whether it's been handed out yet.
+#
+@dataclass
+class PrefetchedBlockhash:
+    blockhash: Blockhash
+    slot: int
+    fetched_at: datetime
+    used: bool = False
+
+
+# # 🥭 BlockhashPrefetcher class
+#
+# A `BlockhashPrefetcher` keeps a recent blockhash for each RPC provider, refreshing them in a background
+# thread every `refresh_interval` seconds. Sending a transaction can then use the current provider's
+# blockhash without having to wait for a `getRecentBlockhash` call first.
+#
+# Each prefetched blockhash is only handed out once, just like solana-py's `BlockhashCache` with
+# `used_immediately`. Otherwise identical transactions (like repeated cranks, settles or cancel-alls) sent
+# with the same blockhash would get identical signatures and be dropped as duplicates. Handing out a blockhash
+# wakes the background thread to prefetch the next one for that provider only - the other providers' blockhashes
+# are still unused, so they wait for the next `refresh_interval`.
+#
+# A blockhash is only handed out if it's fresh enough - fetched within the last `maximum_age` seconds and
+# no more than `maximum_slot_age` slots older than the latest slot seen by the `SlotHolder`. Blockhashes are
+# only valid for 150 slots, and these are fetched with 'finalized' commitment so they are already about 32
+# slots behind the slots seen with other commitments. The default of 100 allows for that plus a refresh
+# interval, and still leaves about 50 slots (20 seconds) for the transaction to land. If there's no fresh,
+# unused blockhash, one is fetched immediately.
+#
+# The background thread isn't started until the first blockhash is requested, so programs that never
+# send transactions never make these calls.
+#
+class BlockhashPrefetcher:
+    def __init__(self, client: Client, rpc_caller: CompoundRPCCaller, slot_holder: SlotHolder, refresh_interval: float,
+                 maximum_age: float = 30, maximum_slot_age: int = 100) -> None:
+        self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.client: Client = client
+        self.rpc_caller: CompoundRPCCaller = rpc_caller
+        self.slot_holder: SlotHolder = slot_holder
+        self.refresh_interval: float = refresh_interval
+        self.maximum_age: timedelta = timedelta(seconds=maximum_age)
+        self.maximum_slot_age: int = maximum_slot_age
+        self.__prefetched: typing.Dict[str, PrefetchedBlockhash] = {}
+        self.__used_up: typing.Set[str] = set()
+        self.__lock: threading.Lock = threading.Lock()
+        self.__wake: threading.Event = threading.Event()
+        self.__stopped: bool = False
+        self.__thread: typing.Optional[threading.Thread] = None
+
+    def blockhash(self) -> typing.Optional[Blockhash]:
+        self.__start_if_needed()
+        provider: RPCCaller = self.rpc_caller.current
+        blockhash: typing.Optional[Blockhash] = self.__take(provider)
+        if blockhash is None:
+            self._logger.debug(f"No fresh, unused blockhash for {provider} - fetching one now.")
+            # Whatever was just fetched is the best there is, even if it's been handed out already.
+            blockhash = self.__take(provider, self.refresh_provider(provider))
+
+        if blockhash is not None:
+            with self.__lock:
+                self.__used_up.add(provider.cluster_rpc_url)
+            self.__wake.set()
+        return blockhash
+
+    def prefetched(self, provider: RPCCaller) -> typing.Optional[PrefetchedBlockhash]:
+        with self.__lock:
+            return self.__prefetched.get(provider.cluster_rpc_url)
+
+    def is_fresh(self, prefetched: PrefetchedBlockhash) -> bool:
+        if datetime.now() - prefetched.fetched_at > self.maximum_age:
+            return False
+
+        latest_slot: int = self.slot_holder.latest_slot
+        return latest_slot == 0 or (latest_slot - prefetched.slot) <= self.maximum_slot_age
+
+    # Throws away all prefetched blockhashes and wakes the background thread to fetch new ones. This is
+    # called when a blockhash isn't recognised, since whatever is prefetched is probably just as bad.
+    def invalidate(self) -> None:
+        with self.__lock:
+            self.__prefetched = {}
+            self.__used_up = {provider.cluster_rpc_url for provider in self.rpc_caller.all_providers}
+        self.__wake.set()
+
+    def refresh_provider(self, provider: RPCCaller) -> typing.Optional[PrefetchedBlockhash]:
+        method, *params = self.client._get_recent_blockhash_args(Finalized)
+        try:
+            response = provider.make_request(method, *params)
+            prefetched = PrefetchedBlockhash(_blockhash_from_response(response),
+                                             response["result"]["context"]["slot"],
+                                             datetime.now())
+        except Exception as exception:
+            self._logger.warning(f"Failed to fetch recent blockhash from {provider}: {exception}")
+            return None
+
+        with self.__lock:
+            # A blockhash that's already been handed out stays used, even if it's fetched again.
+            previous: typing.Optional[PrefetchedBlockhash] = self.__prefetched.get(provider.cluster_rpc_url)
+            if previous is not None and previous.used and previous.blockhash == prefetched.blockhash:
+                prefetched.used = True
+            self.__prefetched[provider.cluster_rpc_url] = prefetched
+        return prefetched
+
+    def stop(self) -> None:
+        self.__stopped = True
+        self.__wake.set()
+
+    # Marks the provider's blockhash as used and returns it, if it's fresh and unused. If `fetched` is passed,
+    # that's marked and returned instead, whether it's fresh or not.
+    def __take(self, provider: RPCCaller, fetched: typing.Optional[PrefetchedBlockhash] = None) -> typing.Optional[Blockhash]:
+        with self.__lock:
+            if fetched is not None:
+                fetched.used = True
+                return fetched.blockhash
+
+            prefetched: typing.Optional[PrefetchedBlockhash] = self.__prefetched.get(provider.cluster_rpc_url)
+            if prefetched is None or prefetched.used or not self.is_fresh(prefetched):
+                return None
+            prefetched.used = True
+            return prefetched.blockhash
+
+    def __start_if_needed(self) -> None:
+        with self.__lock:
+            if self.__thread is not None or self.__stopped:
+                return
+            self.__thread = threading.Thread(target=self.__refresh_until_stopped,
+                                             name=self.__class__.__name__, daemon=True)
+        self.__thread.start()
+
+    # Refreshes every provider each `refresh_interval` seconds, and in between only refreshes the providers
+    # whose blockhashes have been used up.
+    def __refresh_until_stopped(self) -> None:
+        next_refresh_all: float = 0
+        while not self.__stopped:
+            providers: typing.Sequence[RPCCaller] = self.rpc_caller.all_providers
+            with self.__lock:
+                used_up: typing.Set[str] = self.__used_up
+                self.__used_up = set()
+            if time.monotonic() >= next_refresh_all:
+                next_refresh_all = time.monotonic() + self.refresh_interval
+            else:
+                providers = [provider for provider in providers if provider.cluster_rpc_url in used_up]
+
+            for provider in providers:
+                self.refresh_provider(provider)
+            self.__wake.wait(max(next_refresh_all - time.monotonic(), 0))
+            self.__wake.clear()
+
+    def __str__(self) -> str:
+        return f"« BlockhashPrefetcher refreshing every {self.refresh_interval} seconds »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 Response converters
+#
+# These functions take the raw `RPCResponse` from a call and turn it into the value returned by the
+# corresponding `BetterClient` method. They're shared by `BetterClient` and `RPCBatch` so a call made
+# individually gives the same result as the same call made as part of a batch.
+#
+def _result(response: RPCResponse) -> typing.Any:
+    return response["result"]
+
+
+def _result_value(response: RPCResponse) -> typing.Any:
+    return response["result"]["value"]
+
+
+def _balance_from_response(response: RPCResponse) -> Decimal:
+    value = Decimal(response["result"]["value"])
+    return value / SOL_DECIMAL_DIVISOR
+
+
+def _blockhash_from_response(response: RPCResponse) -> Blockhash:
+    return Blockhash(response["result"]["value"]["blockhash"])
+
+
+def _token_account_balance_from_response(response: RPCResponse) -> Decimal:
+    value = Decimal(response["result"]["value"]["amount"])
+    decimal_places = response["result"]["value"]["decimals"]
+    divisor = Decimal(10 ** decimal_places)
+    return value / divisor
+
+
 # # Data transfer class for cluster url
 #
 @dataclass
@@ -622,7 +1289,7 @@ class ClusterUrlData:
 
 
 class BetterClient:
-    def __init__(self, client: Client, name: str, cluster_name: str, commitment: Commitment, skip_preflight: bool, encoding: str, blockhash_cache_duration: int, rpc_caller: CompoundRPCCaller, transaction_status_collector: TransactionStatusCollector = NullTransactionStatusCollector()) -> None:
+    def __init__(self, client: Client, name: str, cluster_name: str, commitment: Commitment, skip_preflight: bool, encoding: str, blockhash_cache_duration: int, rpc_caller: CompoundRPCCaller, transaction_status_collector: TransactionStatusCollector = NullTransactionStatusCollector(), blockhash_prefetcher: typing.Optional[BlockhashPrefetcher] = None) -> None:
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
         self.compatible_client: Client = client
         self.name: str = name
@@ -632,37 +1299,46 @@ class BetterClient:
         self.encoding: str = encoding
         self.blockhash_cache_duration: int = blockhash_cache_duration
         self.rpc_caller: CompoundRPCCaller = rpc_caller
-        self.executor: Executor = ThreadPoolExecutor()
         self.transaction_status_collector: TransactionStatusCollector = transaction_status_collector
+        self.confirmation_tracker: TransactionConfirmationTracker = TransactionConfirmationTracker(
+            client, rpc_caller.current.slot_holder, transaction_status_collector)
+        self.blockhash_prefetcher: typing.Optional[BlockhashPrefetcher] = blockhash_prefetcher
 
     @staticmethod
-    def from_configuration(name: str, cluster_name: str, cluster_urls: typing.Sequence[ClusterUrlData], commitment: Commitment, skip_preflight: bool, encoding: str, blockhash_cache_duration: int, http_request_timeout: float, stale_data_pauses_before_retry: typing.Sequence[float], instruction_reporter: InstructionReporter, transaction_status_collector: TransactionStatusCollector) -> "BetterClient":
+    def from_configuration(name: str, cluster_name: str, cluster_urls: typing.Sequence[ClusterUrlData], commitment: Commitment, skip_preflight: bool, encoding: str, blockhash_cache_duration: int, http_request_timeout: float, stale_data_pauses_before_retry: typing.Sequence[float], instruction_reporter: InstructionReporter, transaction_status_collector: TransactionStatusCollector, rpc_pool_size: int = 10, rpc_keepalive: bool = True, blockhash_refresh_interval: float = 0, rpc_routing: RPCRouting = RPCRouting.FAILOVER, rpc_hedge_delay: typing.Optional[float] = None) -> "BetterClient":
         slot_holder: SlotHolder = SlotHolder()
         rpc_callers: typing.List[RPCCaller] = []
         cluster_url: ClusterUrlData
         for cluster_url in cluster_urls:
             rpc_caller: RPCCaller = RPCCaller(name, cluster_url.rpc, cluster_url.ws, http_request_timeout, stale_data_pauses_before_retry,
-                                              slot_holder, instruction_reporter)
+                                              slot_holder, instruction_reporter, rpc_pool_size, rpc_keepalive)
             rpc_callers += [rpc_caller]
 
-        provider: CompoundRPCCaller = CompoundRPCCaller(name, rpc_callers)
+        provider: CompoundRPCCaller = CompoundRPCCaller(name, rpc_callers, rpc_routing, hedge_delay=rpc_hedge_delay)
         blockhash_cache: typing.Union[BlockhashCache, bool] = False
         if blockhash_cache_duration > 0:
             blockhash_cache = BlockhashCache(blockhash_cache_duration)
         client: Client = Client(endpoint=cluster_url.rpc, commitment=commitment, blockhash_cache=blockhash_cache)
         client._provider = provider
 
+        blockhash_prefetcher: typing.Optional[BlockhashPrefetcher] = None
+        if blockhash_refresh_interval > 0:
+            blockhash_prefetcher = BlockhashPrefetcher(client, provider, slot_holder, blockhash_refresh_interval)
+
         def __on_provider_change() -> None:
             if client.blockhash_cache:
                 # Clear out the blockhash cache on retrying
                 logging.debug("Replacing client blockhash cache.")
                 client.blockhash_cache = BlockhashCache(blockhash_cache_duration)
-                blockhash_resp = client.get_recent_blockhash(Finalized)
-                client._process_blockhash_resp(blockhash_resp, used_immediately=False)
+                if blockhash_prefetcher is None:
+                    # The prefetcher already has a blockhash for the new provider, so there's no need to
+                    # block here fetching one unless there's no prefetcher.
+                    blockhash_resp = client.get_recent_blockhash(Finalized)
+                    client._process_blockhash_resp(blockhash_resp, used_immediately=False)
 
         provider.on_provider_change = __on_provider_change
 
-        return BetterClient(client, name, cluster_name, commitment, skip_preflight, encoding, blockhash_cache_duration, provider, transaction_status_collector)
+        return BetterClient(client, name, cluster_name, commitment, skip_preflight, encoding, blockhash_cache_duration, provider, transaction_status_collector, blockhash_prefetcher)
 
     @property
     def cluster_rpc_url(self) -> str:
@@ -695,14 +1371,35 @@ class BetterClient:
     def stale_data_pauses_before_retry(self) -> typing.Sequence[float]:
         return self.rpc_caller.current.stale_data_pauses_before_retry
 
+    @property
+    def rpc_pool_size(self) -> int:
+        return self.rpc_caller.current.pool_size
+
+    @property
+    def rpc_keepalive(self) -> bool:
+        return self.rpc_caller.current.keepalive
+
+    @property
+    def rpc_routing(self) -> RPCRouting:
+        return self.rpc_caller.routing
+
+    @property
+    def rpc_hedge_delay(self) -> typing.Optional[float]:
+        return self.rpc_caller.hedge_delay
+
+    @property
+    def blockhash_refresh_interval(self) -> float:
+        if self.blockhash_prefetcher is None:
+            return 0
+        return self.blockhash_prefetcher.refresh_interval
+
     def require_data_from_fresh_slot(self) -> None:
         self.rpc_caller.current.require_data_from_fresh_slot()
 
     def get_balance(self, pubkey: typing.Union[PublicKey, str], commitment: Commitment = UnspecifiedCommitment) -> Decimal:
         resolved_commitment, _ = self.__resolve_defaults(commitment)
         response = self.compatible_client.get_balance(pubkey, resolved_commitment)
-        value = Decimal(response["result"]["value"])
-        return value / SOL_DECIMAL_DIVISOR
+        return _balance_from_response(response)
 
     def get_account_info(self, pubkey: typing.Union[PublicKey, str], commitment: Commitment = UnspecifiedCommitment,
                          encoding: str = UnspecifiedEncoding, data_slice: typing.Optional[DataSliceOpts] = None) -> typing.Any:
@@ -738,15 +1435,16 @@ class BetterClient:
     def get_recent_blockhash(self, commitment: Commitment = UnspecifiedCommitment) -> Blockhash:
         resolved_commitment, _ = self.__resolve_defaults(commitment)
         response = self.compatible_client.get_recent_blockhash(resolved_commitment)
-        return Blockhash(response["result"]["value"]["blockhash"])
+        return _blockhash_from_response(response)
+
+    def get_signature_statuses(self, signatures: typing.Sequence[str], search_transaction_history: bool = False) -> typing.Sequence[typing.Any]:
+        response = self.compatible_client.get_signature_statuses(list(signatures), search_transaction_history)
+        return typing.cast(typing.Sequence[typing.Any], _result_value(response))
 
     def get_token_account_balance(self, pubkey: typing.Union[str, PublicKey], commitment: Commitment = UnspecifiedCommitment) -> Decimal:
         resolved_commitment, _ = self.__resolve_defaults(commitment)
         response = self.compatible_client.get_token_account_balance(pubkey, resolved_commitment)
-        value = Decimal(response["result"]["value"]["amount"])
-        decimal_places = response["result"]["value"]["decimals"]
-        divisor = Decimal(10 ** decimal_places)
-        return value / divisor
+        return _token_account_balance_from_response(response)
 
     def get_token_accounts_by_owner(self, owner: PublicKey, token_account_options: TokenAccountOpts, commitment: Commitment = UnspecifiedCommitment,) -> typing.Any:
         resolved_commitment, _ = self.__resolve_defaults(commitment)
@@ -760,6 +1458,15 @@ class BetterClient:
             pubkeys, resolved_commitment, resolved_encoding, data_slice)
         return response["result"]["value"]
 
+    # Like `get_multiple_accounts()` but returns the whole result, including the `context` with the slot the
+    # data is from.
+    def get_multiple_accounts_with_context(self, pubkeys: typing.List[typing.Union[PublicKey, str]], commitment: Commitment = UnspecifiedCommitment,
+                                           encoding: str = UnspecifiedEncoding, data_slice: typing.Optional[DataSliceOpts] = None) -> typing.Any:
+        resolved_commitment, resolved_encoding = self.__resolve_defaults(commitment, encoding)
+        response = self.compatible_client.get_multiple_accounts(
+            pubkeys, resolved_commitment, resolved_encoding, data_slice)
+        return response["result"]
+
     def send_transaction(self, transaction: Transaction, *signers: Keypair, opts: TxOpts = TxOpts(preflight_commitment=UnspecifiedCommitment)) -> str:
         # This method is an exception to the normal exception-handling to fail over to the next RPC provider.
         #
@@ -783,14 +1490,19 @@ class BetterClient:
                                      skip_confirmation=opts.skip_confirmation,
                                      skip_preflight=proper_skip_preflight)
 
-                response = self.compatible_client.send_transaction(transaction, *signers, opts=proper_opts)
+                # A prefetched blockhash saves waiting on a getRecentBlockhash call before sending. If
+                # there isn't one, passing None makes the compatible client fetch one as usual.
+                recent_blockhash: typing.Optional[Blockhash] = None
+                if self.blockhash_prefetcher is not None:
+                    recent_blockhash = self.blockhash_prefetcher.blockhash()
+
+                response = self.compatible_client.send_transaction(
+                    transaction, *signers, opts=proper_opts, recent_blockhash=recent_blockhash)
                 signature: str = str(response["result"])
                 self._logger.debug(f"Transaction signature: {signature}")
 
                 if signature != _STUB_TRANSACTION_SIGNATURE:
-                    tx_reporter: TransactionWatcher = TransactionWatcher(
-                        self.compatible_client, self.rpc_caller.current.slot_holder, signature, self.transaction_status_collector)
-                    self.executor.submit(tx_reporter.report_on_transaction)
+                    self.confirmation_tracker.add(signature)
                 else:
                     self._logger.error("Could not get status for stub signature")
 
@@ -800,10 +1512,23 @@ class BetterClient:
                     f"Trying next provider after intercepting blockhash exception on provider {provider}: {blockhash_not_found_exception}")
                 last_exception = blockhash_not_found_exception
                 transaction.recent_blockhash = None
+                if self.blockhash_prefetcher is not None:
+                    self.blockhash_prefetcher.invalidate()
                 self.rpc_caller.shift_to_next_provider()
 
         raise last_exception
 
+    # Returns an `RPCBatch` that gathers calls up and sends them to the RPC node in a single HTTP
+    # request. Typical use is:
+    #
+    #   with context.client.batch() as batch:
+    #       balance = batch.get_balance(wallet.address)
+    #       blockhash = batch.get_recent_blockhash()
+    #   print(balance.result, blockhash.result)
+    #
+    def batch(self) -> "RPCBatch":
+        return RPCBatch(self)
+
     def wait_for_confirmation(self, transaction_ids: typing.Sequence[str], max_wait_in_seconds: int = 60) -> typing.Sequence[str]:
         self._logger.info(f"Waiting up to {max_wait_in_seconds} seconds for {transaction_ids}.")
         all_confirmed: typing.List[str] = []
@@ -837,3 +1562,152 @@ class BetterClient:
 
     def __repr__(self) -> str:
         return f"{self}"
+
+
+# # 🥭 BatchedRPCResult class
+#
+# A `BatchedRPCResult` is a placeholder for the result of a call added to an `RPCBatch`. Its `result`
+# property is only available once the batch has been executed. If the individual call failed,
+# accessing `result` raises the exception for that call.
+#
+class BatchedRPCResult(typing.Generic[T]):
+    def __init__(self, method: RPCMethod, params: typing.Sequence[typing.Any], converter: typing.Callable[[RPCResponse], T]) -> None:
+        self.method: RPCMethod = method
+        self.params: typing.Sequence[typing.Any] = params
+        self.converter: typing.Callable[[RPCResponse], T] = converter
+        self.completed: bool = False
+        self.__result: typing.Optional[T] = None
+        self.__exception: typing.Optional[Exception] = None
+
+    @property
+    def result(self) -> T:
+        if not self.completed:
+            raise Exception(f"Batched call to '{self.method}' has not been executed yet.")
+        if self.__exception is not None:
+            raise self.__exception
+        return typing.cast(T, self.__result)
+
+    @property
+    def exception(self) -> typing.Optional[Exception]:
+        return self.__exception
+
+    def complete(self, response: typing.Union[RPCResponse, Exception]) -> None:
+        if isinstance(response, Exception):
+            self.__exception = response
+        else:
+            try:
+                self.__result = self.converter(response)
+            except Exception as exception:
+                self.__exception = exception
+        self.completed = True
+
+    def __str__(self) -> str:
+        if not self.completed:
+            return f"« BatchedRPCResult [{self.method}] pending »"
+        if self.__exception is not None:
+            return f"« BatchedRPCResult [{self.method}] failed: {self.__exception} »"
+        return f"« BatchedRPCResult [{self.method}]: {self.__result} »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 RPCBatch class
+#
+# An `RPCBatch` gathers up read calls and sends them all to the RPC node as a single JSON-RPC batch
+# request, saving a round-trip for every call after the first.
+#
+# Each method mirrors the `BetterClient` method of the same name but returns a `BatchedRPCResult`
+# instead of the value itself. The results are filled in when `execute()` is called, or when the
+# `with` block ends if the batch is used as a context manager.
+#
+# If the whole batch fails on every provider, `execute()` raises. If only some calls fail, only those
+# calls' `BatchedRPCResult`s raise when their `result` is accessed.
+#
+class RPCBatch:
+    def __init__(self, client: BetterClient) -> None:
+        self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.client: BetterClient = client
+        self.__pending: typing.List[BatchedRPCResult[typing.Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.__pending)
+
+    def get_balance(self, pubkey: typing.Union[PublicKey, str], commitment: Commitment = UnspecifiedCommitment) -> BatchedRPCResult[Decimal]:
+        resolved_commitment, _ = self.__resolve_defaults(commitment)
+        method, *params = self.client.compatible_client._get_balance_args(pubkey, resolved_commitment)
+        return self.__add(method, params, _balance_from_response)
+
+    def get_account_info(self, pubkey: typing.Union[PublicKey, str], commitment: Commitment = UnspecifiedCommitment,
+                         encoding: str = UnspecifiedEncoding, data_slice: typing.Optional[DataSliceOpts] = None) -> BatchedRPCResult[typing.Any]:
+        resolved_commitment, resolved_encoding = self.__resolve_defaults(commitment, encoding)
+        method, *params = self.client.compatible_client._get_account_info_args(
+            pubkey, resolved_commitment, resolved_encoding, data_slice)
+        return self.__add(method, params, _result)
+
+    def get_multiple_accounts(self, pubkeys: typing.List[typing.Union[PublicKey, str]], commitment: Commitment = UnspecifiedCommitment,
+                              encoding: str = UnspecifiedEncoding, data_slice: typing.Optional[DataSliceOpts] = None) -> BatchedRPCResult[typing.Any]:
+        resolved_commitment, resolved_encoding = self.__resolve_defaults(commitment, encoding)
+        method, *params = self.client.compatible_client._get_multiple_accounts_args(
+            pubkeys, resolved_commitment, resolved_encoding, data_slice)
+        return self.__add(method, params, _result_value)
+
+    def get_recent_blockhash(self, commitment: Commitment = UnspecifiedCommitment) -> BatchedRPCResult[Blockhash]:
+        resolved_commitment, _ = self.__resolve_defaults(commitment)
+        method, *params = self.client.compatible_client._get_recent_blockhash_args(resolved_commitment)
+        return self.__add(method, params, _blockhash_from_response)
+
+    def get_signature_statuses(self, signatures: typing.Sequence[str], search_transaction_history: bool = False) -> BatchedRPCResult[typing.Any]:
+        method, *params = Client._get_signature_statuses_args(list(signatures), search_transaction_history)
+        return self.__add(method, params, _result_value)
+
+    def get_token_account_balance(self, pubkey: typing.Union[str, PublicKey], commitment: Commitment = UnspecifiedCommitment) -> BatchedRPCResult[Decimal]:
+        resolved_commitment, _ = self.__resolve_defaults(commitment)
+        method, *params = self.client.compatible_client._get_token_account_balance_args(pubkey, resolved_commitment)
+        return self.__add(method, params, _token_account_balance_from_response)
+
+    def get_token_accounts_by_owner(self, owner: PublicKey, token_account_options: TokenAccountOpts, commitment: Commitment = UnspecifiedCommitment) -> BatchedRPCResult[typing.Any]:
+        resolved_commitment, _ = self.__resolve_defaults(commitment)
+        compatible_client: Client = self.client.compatible_client
+        method, *params = compatible_client._get_token_accounts_args(
+            *compatible_client._get_token_accounts_by_owner_args(owner, token_account_options, resolved_commitment))
+        return self.__add(method, params, _result_value)
+
+    def execute(self) -> None:
+        pending: typing.Sequence[BatchedRPCResult[typing.Any]] = self.__pending
+        self.__pending = []
+        if len(pending) == 0:
+            return
+
+        calls = [(batched.method, batched.params) for batched in pending]
+        responses = self.client.rpc_caller.make_batch_request(calls)
+        for batched, response in zip(pending, responses):
+            batched.complete(response)
+
+    def __add(self, method: RPCMethod, params: typing.Sequence[typing.Any], converter: typing.Callable[[RPCResponse], T]) -> BatchedRPCResult[T]:
+        batched: BatchedRPCResult[T] = BatchedRPCResult(method, params, converter)
+        self.__pending += [batched]
+        return batched
+
+    def __resolve_defaults(self, commitment: typing.Optional[Commitment], encoding: typing.Optional[str] = None) -> typing.Tuple[Commitment, str]:
+        if commitment is None or commitment == UnspecifiedCommitment:
+            commitment = self.client.commitment
+
+        if encoding is None or encoding == UnspecifiedEncoding:
+            encoding = self.client.encoding
+
+        return commitment, encoding
+
+    def __enter__(self) -> "RPCBatch":
+        return self
+
+    def __exit__(self, exc_type: typing.Optional[typing.Type[BaseException]], exc_value: typing.Optional[BaseException], traceback: typing.Any) -> None:
+        # Don't send anything if the block itself failed.
+        if exc_type is None:
+            self.execute()
+
+    def __str__(self) -> str:
+        return f"« RPCBatch [{self.client.cluster_name}] with {len(self.__pending)} pending calls »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
@@ -13,15 +13,19 @@
 #   [Github](https://github.com/blockworks-foundation)
 #   [Email](mailto:hello@blockworks.foundation)
 
+import asyncio
+import concurrent.futures
 import logging
 import typing
 
+from datetime import datetime
 from solana.blockhash import Blockhash
 from solana.keypair import Keypair
 from solana.publickey import PublicKey
 from solana.transaction import Transaction, TransactionInstruction
 from solana.utils import shortvec_encoding as shortvec
 
+from .client import TransactionOutcome, TransactionStatus
 from .context import Context
 from .instructionreporter import InstructionReporter
 from .wallet import Wallet
@@ -31,39 +35,219 @@ _PUBKEY_LENGTH = 32
 _SIGNATURE_LENGTH = 64
 
 
-def _split_instructions_into_chunks(context: Context, signers: typing.Sequence[Keypair], instructions: typing.Sequence[TransactionInstruction]) -> typing.Sequence[typing.Sequence[TransactionInstruction]]:
-    vetted_chunks: typing.List[typing.List[TransactionInstruction]] = []
-    current_chunk: typing.List[TransactionInstruction] = []
-    for counter, instruction in enumerate(instructions):
-        instruction_size_on_its_own = CombinableInstructions.transaction_size(signers, [instruction])
-        if instruction_size_on_its_own >= _MAXIMUM_TRANSACTION_LENGTH:
-            report = context.client.instruction_reporter.report(instruction)
-            raise Exception(
-                f"Instruction exceeds maximum size - instruction {counter} has {len(instruction.keys)} keys and creates a transaction {instruction_size_on_its_own} bytes long:\n{report}")
-
-        in_progress_chunk = current_chunk + [instruction]
-        transaction_size = CombinableInstructions.transaction_size(signers, in_progress_chunk)
-        if transaction_size < _MAXIMUM_TRANSACTION_LENGTH:
-            current_chunk = in_progress_chunk
-        else:
-            vetted_chunks += [current_chunk]
-            current_chunk = [instruction]
+def _shortvec_length(value: int) -> int:
+    return len(shortvec.encode_length(value))
+
 
-    all_chunks = vetted_chunks + [current_chunk]
+# # 🥭 _TransactionSizeAccumulator class
+#
+# Tracks the size a transaction would be as instructions are added to it, without recalculating everything
+# each time. It keeps the set of distinct public keys (including signers and program IDs), the instruction
+# count and the total size of the instruction parcels, and uses the same calculation as
+# `CombinableInstructions._calculate_transaction_size()`.
+#
+# `size_with()` only has to look at the keys of the new instruction, so packing N instructions is linear in N
+# rather than quadratic.
+#
+class _TransactionSizeAccumulator:
+    def __init__(self, signers: typing.Sequence[Keypair]) -> None:
+        self.instructions: typing.List[TransactionInstruction] = []
+        self.__signer_count: int = len(signers)
+        self.__keys: typing.Set[bytes] = {bytes(signer.public_key) for signer in signers}
+        self.__instructions_size: int = 0
+
+    @property
+    def size(self) -> int:
+        return self.__size(len(self.__keys), len(self.instructions), self.__instructions_size)
+
+    def size_with(self, instruction: TransactionInstruction) -> int:
+        return self.__size(len(self.__keys) + len(self.__new_keys(instruction)),
+                           len(self.instructions) + 1,
+                           self.__instructions_size + _TransactionSizeAccumulator.instruction_size(instruction))
+
+    def add(self, instruction: TransactionInstruction) -> None:
+        self.__keys |= self.__new_keys(instruction)
+        self.__instructions_size += _TransactionSizeAccumulator.instruction_size(instruction)
+        self.instructions += [instruction]
+
+    # 1 + (shortvec-length of number of keys) + (number of keys) + (shortvec-length of the data) + (length of the data)
+    @staticmethod
+    def instruction_size(instruction: TransactionInstruction) -> int:
+        return 1 + _shortvec_length(len(instruction.keys)) + len(instruction.keys) + \
+            _shortvec_length(len(instruction.data)) + len(instruction.data)
 
-    total_in_chunks = sum(map(lambda chunk: len(chunk), all_chunks))
+    def __new_keys(self, instruction: TransactionInstruction) -> typing.Set[bytes]:
+        keys: typing.Set[bytes] = {bytes(meta.pubkey) for meta in instruction.keys}
+        keys.add(bytes(instruction.program_id))
+        return keys - self.__keys
+
+    def __size(self, key_count: int, instruction_count: int, instructions_size: int) -> int:
+        header_size = 35 + _shortvec_length(key_count) + (key_count * _PUBKEY_LENGTH)
+        signatures_size = 1 + (self.__signer_count * _SIGNATURE_LENGTH)
+        return header_size + _shortvec_length(instruction_count) + instructions_size + signatures_size
+
+
+def _check_instruction_size(context: Context, signers: typing.Sequence[Keypair], counter: int, instruction: TransactionInstruction) -> None:
+    instruction_size_on_its_own = _TransactionSizeAccumulator(signers).size_with(instruction)
+    if instruction_size_on_its_own >= _MAXIMUM_TRANSACTION_LENGTH:
+        report = context.client.instruction_reporter.report(instruction)
+        raise Exception(
+            f"Instruction exceeds maximum size - instruction {counter} has {len(instruction.keys)} keys and creates a transaction {instruction_size_on_its_own} bytes long:\n{report}")
+
+
+def _check_all_chunked(chunks: typing.Sequence[typing.Sequence[TransactionInstruction]], instructions: typing.Sequence[TransactionInstruction]) -> None:
+    total_in_chunks = sum(map(lambda chunk: len(chunk), chunks))
     if total_in_chunks != len(instructions):
         raise Exception(
             f"Failed to chunk instructions. Have {total_in_chunks} instuctions in chunks. Should have {len(instructions)}.")
 
+
+def _split_instructions_into_chunks(context: Context, signers: typing.Sequence[Keypair], instructions: typing.Sequence[TransactionInstruction]) -> typing.Sequence[typing.Sequence[TransactionInstruction]]:
+    vetted_chunks: typing.List[typing.List[TransactionInstruction]] = []
+    current_chunk: _TransactionSizeAccumulator = _TransactionSizeAccumulator(signers)
+    for counter, instruction in enumerate(instructions):
+        _check_instruction_size(context, signers, counter, instruction)
+
+        if current_chunk.size_with(instruction) >= _MAXIMUM_TRANSACTION_LENGTH:
+            vetted_chunks += [current_chunk.instructions]
+            current_chunk = _TransactionSizeAccumulator(signers)
+        current_chunk.add(instruction)
+
+    all_chunks = vetted_chunks + [current_chunk.instructions]
+    _check_all_chunked(all_chunks, instructions)
+
+    return all_chunks
+
+
+# Like `_split_instructions_into_chunks()`, but runs of consecutive instructions in the same (non-None)
+# independent group can be reordered to fit them into fewer transactions.
+#
+# Instructions not in a group are kept in order, appended to the last chunk. Each run of grouped
+# instructions is packed largest-first into the first chunk it fits in, from the chunk that was last when
+# the run started. Nothing in a run can move before the instructions that came before it, or after the
+# instructions that come after it.
+def _pack_instructions_into_chunks(context: Context, signers: typing.Sequence[Keypair], instructions: typing.Sequence[TransactionInstruction], independent_groups: typing.Sequence[typing.Optional[str]]) -> typing.Sequence[typing.Sequence[TransactionInstruction]]:
+    chunks: typing.List[_TransactionSizeAccumulator] = [_TransactionSizeAccumulator(signers)]
+
+    def __add_to_first_fit(instruction: TransactionInstruction, first_chunk_index: int) -> None:
+        for chunk in chunks[first_chunk_index:]:
+            if chunk.size_with(instruction) < _MAXIMUM_TRANSACTION_LENGTH:
+                chunk.add(instruction)
+                return
+        new_chunk: _TransactionSizeAccumulator = _TransactionSizeAccumulator(signers)
+        new_chunk.add(instruction)
+        chunks.append(new_chunk)
+
+    def __packing_size(instruction: TransactionInstruction) -> int:
+        return _TransactionSizeAccumulator.instruction_size(instruction) + (len(instruction.keys) * _PUBKEY_LENGTH)
+
+    def __pack_run(run: typing.Sequence[TransactionInstruction]) -> None:
+        first_chunk_index: int = len(chunks) - 1
+        for instruction in sorted(run, key=__packing_size, reverse=True):
+            __add_to_first_fit(instruction, first_chunk_index)
+
+    run: typing.List[TransactionInstruction] = []
+    run_group: typing.Optional[str] = None
+    for counter, (instruction, group) in enumerate(zip(instructions, independent_groups)):
+        _check_instruction_size(context, signers, counter, instruction)
+
+        if group is not None and group == run_group:
+            run += [instruction]
+            continue
+
+        __pack_run(run)
+        run = []
+        run_group = group
+        if group is None:
+            __add_to_first_fit(instruction, len(chunks) - 1)
+        else:
+            run = [instruction]
+    __pack_run(run)
+
+    all_chunks = [chunk.instructions for chunk in chunks]
+    _check_all_chunked(all_chunks, instructions)
+
     return all_chunks
 
 
+# # 🥭 TransactionSubmission class
+#
+# A handle on transactions being sent in parallel by `CombinableInstructions.execute_pipelined()`. `sends`
+# has one `Future` per transaction, in the same order as the transactions, and each completes with the
+# transaction's signature once it has been sent.
+#
+# `signatures()` waits for all the transactions to be sent. `wait()` also waits for them to be confirmed (or
+# fail, or time out) using the client's `TransactionConfirmationTracker`.
+#
+# If `on_exception_continue` is `True`, transactions that couldn't be sent are left out of the results.
+# Otherwise the first problem is raised.
+#
+class TransactionSubmission:
+    def __init__(self, context: Context, sends: typing.Sequence["concurrent.futures.Future[str]"],
+                 on_exception_continue: bool = False) -> None:
+        self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.context: Context = context
+        self.sends: typing.Sequence[concurrent.futures.Future[str]] = sends
+        self.on_exception_continue: bool = on_exception_continue
+        self.started_at: datetime = datetime.now()
+
+    # Waits for every send to finish, even if one has already failed, so nothing is still being sent when this
+    # returns or raises.
+    def signatures(self) -> typing.Sequence[str]:
+        concurrent.futures.wait(self.sends)
+        results: typing.List[str] = []
+        for send in self.sends:
+            try:
+                results += [send.result()]
+            except Exception:
+                # The problem has already been logged when the transaction was sent.
+                if not self.on_exception_continue:
+                    raise
+        return results
+
+    def wait(self, timeout: float = 60) -> typing.Sequence[TransactionStatus]:
+        signatures: typing.Sequence[str] = self.signatures()
+        watches: typing.Sequence[concurrent.futures.Future[TransactionStatus]] = [
+            self.context.client.confirmation_tracker.watch(signature) for signature in signatures]
+        concurrent.futures.wait(watches, timeout=timeout)
+
+        statuses: typing.List[TransactionStatus] = []
+        for signature, watch in zip(signatures, watches):
+            if watch.done():
+                statuses += [watch.result()]
+            else:
+                statuses += [TransactionStatus(signature, TransactionOutcome.TIMEOUT,
+                                               self.started_at, datetime.now() - self.started_at)]
+        return statuses
+
+    async def signatures_async(self) -> typing.Sequence[str]:
+        if len(self.sends) > 0:
+            await asyncio.wait([asyncio.wrap_future(send) for send in self.sends])
+        return self.signatures()
+
+    async def wait_async(self, timeout: float = 60) -> typing.Sequence[TransactionStatus]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.wait, timeout)
+
+    def __str__(self) -> str:
+        sent: int = len([send for send in self.sends if send.done()])
+        return f"« TransactionSubmission [{sent} of {len(self.sends)} transactions sent] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
 # 🥭 CombinableInstructions class
 #
 # This class wraps up zero or more Solana instructions and signers, and allows instances to be combined
 # easily into a single instance. This instance can then be executed.
 #
+# Instructions that don't depend on each other (like cancels, or cranks) can be marked as an 'independent
+# group' using `as_independent()`. If the context has `transaction_bin_packing` set, consecutive instructions
+# in the same group can be reordered to fit them into fewer transactions.
+#
+# `execute()` sends the transactions one after the other. `execute_pipelined()` sends them in parallel,
+# optionally holding some back until the transactions they depend on have been sent or confirmed.
+#
 # This allows simple uses like, for example:
 # ```
 # (signers + place_orders + settle + crank).execute(context)
@@ -73,10 +257,12 @@ class CombinableInstructions():
     # A toggle to run both checks to ensure our calculations are accurate.
     __check_transaction_size_with_pyserum = False
 
-    def __init__(self, signers: typing.Sequence[Keypair], instructions: typing.Sequence[TransactionInstruction]) -> None:
+    def __init__(self, signers: typing.Sequence[Keypair], instructions: typing.Sequence[TransactionInstruction],
+                 independent_groups: typing.Optional[typing.Sequence[typing.Optional[str]]] = None) -> None:
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
         self.signers: typing.Sequence[Keypair] = signers
         self.instructions: typing.Sequence[TransactionInstruction] = instructions
+        self.independent_groups: typing.Sequence[typing.Optional[str]] = independent_groups or [None] * len(instructions)
 
     @staticmethod
     def empty() -> "CombinableInstructions":
@@ -210,15 +396,21 @@ class CombinableInstructions():
 
         return calculated_transaction_size
 
+    # Marks all the instructions as independent of each other, so they can be reordered among themselves
+    # (but not with instructions outside the group) when packing them into transactions.
+    def as_independent(self, group: str) -> "CombinableInstructions":
+        return CombinableInstructions(signers=self.signers, instructions=self.instructions,
+                                      independent_groups=[group] * len(self.instructions))
+
     def __add__(self, new_instruction_data: "CombinableInstructions") -> "CombinableInstructions":
         all_signers = [*self.signers, *new_instruction_data.signers]
         all_instructions = [*self.instructions, *new_instruction_data.instructions]
-        return CombinableInstructions(signers=all_signers, instructions=all_instructions)
+        all_independent_groups = [*self.independent_groups, *new_instruction_data.independent_groups]
+        return CombinableInstructions(signers=all_signers, instructions=all_instructions,
+                                      independent_groups=all_independent_groups)
 
     def execute(self, context: Context, on_exception_continue: bool = False) -> typing.Sequence[str]:
-        chunks: typing.Sequence[typing.Sequence[TransactionInstruction]
-                                ] = _split_instructions_into_chunks(context, self.signers, self.instructions)
-
+        chunks: typing.Sequence[typing.Sequence[TransactionInstruction]] = self.__chunks(context)
         if len(chunks) == 1 and len(chunks[0]) == 0:
             self._logger.info("No instructions to run.")
             return []
@@ -243,8 +435,79 @@ class CombinableInstructions():
 
         return results
 
-    async def execute_async(self, context: Context, on_exception_continue: bool = False) -> typing.Sequence[str]:
-        return self.execute(context, on_exception_continue)
+    # Signs and sends all the transactions in parallel, returning a `TransactionSubmission` straight away.
+    #
+    # `dependencies` is a list of (before, after) pairs of independent group names, where `None` means
+    # instructions not in any group. A transaction with an `after` instruction isn't sent until every earlier
+    # transaction with a `before` instruction has been sent. For example, `[("cancel", "place")]` sends all
+    # transactions with cancels before any later transactions with places. If `wait_for_confirmation` is
+    # `True`, it waits until those earlier transactions are confirmed instead, and a transaction isn't sent
+    # at all if one it depends on fails.
+    #
+    # With no dependencies, every transaction is sent at the same time and they can be processed in any order.
+    def execute_pipelined(self, context: Context, dependencies: typing.Sequence[typing.Tuple[typing.Optional[str], typing.Optional[str]]] = [], wait_for_confirmation: bool = False, on_exception_continue: bool = False) -> TransactionSubmission:
+        chunks: typing.Sequence[typing.Sequence[TransactionInstruction]] = self.__chunks(context)
+        if len(chunks) == 1 and len(chunks[0]) == 0:
+            self._logger.info("No instructions to run.")
+            return TransactionSubmission(context, [], on_exception_continue)
+
+        if len(chunks) > 1:
+            self._logger.info(f"Running instructions in {len(chunks)} parallel transactions.")
+
+        group_by_instruction: typing.Dict[int, typing.Optional[str]] = {
+            id(instruction): group for instruction, group in zip(self.instructions, self.independent_groups)}
+        chunk_groups: typing.Sequence[typing.Set[typing.Optional[str]]] = [
+            {group_by_instruction[id(instruction)] for instruction in chunk} for chunk in chunks]
+
+        def __depends_on(earlier: typing.Set[typing.Optional[str]], later: typing.Set[typing.Optional[str]]) -> bool:
+            return any(before in earlier and after in later for before, after in dependencies)
+
+        # There's one worker per transaction, so a transaction waiting on another never blocks it being sent.
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(chunks),
+                                                         thread_name_prefix=self.__class__.__name__)
+        sends: typing.List[concurrent.futures.Future[str]] = []
+        for index, chunk in enumerate(chunks):
+            prerequisites: typing.Sequence[concurrent.futures.Future[str]] = [
+                sends[earlier] for earlier in range(index) if __depends_on(chunk_groups[earlier], chunk_groups[index])]
+            sends += [executor.submit(self.__send_chunk, context, index, chunk, prerequisites, wait_for_confirmation)]
+        executor.shutdown(wait=False)
+
+        return TransactionSubmission(context, sends, on_exception_continue)
+
+    # Sends the transactions one after the other, just like `execute()`. If `parallel` is `True` they're sent
+    # using `execute_pipelined()` instead, with the given `dependencies`.
+    async def execute_async(self, context: Context, on_exception_continue: bool = False, parallel: bool = False, dependencies: typing.Sequence[typing.Tuple[typing.Optional[str], typing.Optional[str]]] = []) -> typing.Sequence[str]:
+        if not parallel:
+            return self.execute(context, on_exception_continue)
+
+        submission: TransactionSubmission = self.execute_pipelined(
+            context, dependencies, on_exception_continue=on_exception_continue)
+        return await submission.signatures_async()
+
+    def __chunks(self, context: Context) -> typing.Sequence[typing.Sequence[TransactionInstruction]]:
+        if context.transaction_bin_packing:
+            return _pack_instructions_into_chunks(context, self.signers, self.instructions, self.independent_groups)
+        return _split_instructions_into_chunks(context, self.signers, self.instructions)
+
+    def __send_chunk(self, context: Context, index: int, chunk: typing.Sequence[TransactionInstruction], prerequisites: typing.Sequence["concurrent.futures.Future[str]"], wait_for_confirmation: bool) -> str:
+        try:
+            for prerequisite in prerequisites:
+                signature: str = prerequisite.result()
+                if wait_for_confirmation:
+                    tracker = context.client.confirmation_tracker
+                    status: TransactionStatus = tracker.watch(signature).result(
+                        timeout=tracker.timeout.total_seconds() + tracker.poll_interval)
+                    if status.outcome != TransactionOutcome.SUCCESS:
+                        raise Exception(f"Transaction {signature} did not succeed: {status.outcome}")
+
+            transaction = Transaction()
+            transaction.instructions.extend(chunk)
+            signature_sent: str = context.client.send_transaction(transaction, *self.signers)
+            return signature_sent
+        except Exception as exception:
+            self._logger.error(f"""[{context.name}] Error executing chunk {index} ({len(chunk)} instructions) of CombinableInstruction.
+{exception}""")
+            raise
 
     def __str__(self) -> str:
         report: typing.List[str] = []
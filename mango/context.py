@@ -16,20 +16,23 @@
 import logging
 import multiprocessing
 import requests
+import threading
 import time
 import typing
 
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from rx.scheduler.threadpoolscheduler import ThreadPoolScheduler
 from solana.publickey import PublicKey
 from solana.rpc.commitment import Commitment
 
-from .client import BetterClient, ClusterUrlData, TransactionStatusCollector, NullTransactionStatusCollector
+from .client import BetterClient, ClusterUrlData, RPCRouting, TransactionStatusCollector, NullTransactionStatusCollector
 from .constants import MangoConstants
 from .instructionreporter import InstructionReporter, CompoundInstructionReporter
 from .instrumentlookup import InstrumentLookup
 from .marketlookup import MarketLookup
 from .text import indent_collection_as_str, indent_item_by
+from .tokenbucket import TokenBucket
 
 
 # # 🥭 Context class
@@ -42,24 +45,57 @@ class Context:
                  stale_data_pauses_before_retry: typing.Sequence[float], mango_program_address: PublicKey,
                  serum_program_address: PublicKey, group_name: str, group_address: PublicKey,
                  gma_chunk_size: Decimal, gma_chunk_pause: Decimal, instrument_lookup: InstrumentLookup,
-                 market_lookup: MarketLookup, transaction_status_collector: TransactionStatusCollector = NullTransactionStatusCollector()) -> None:
+                 market_lookup: MarketLookup, transaction_status_collector: TransactionStatusCollector = NullTransactionStatusCollector(),
+                 rpc_pool_size: int = 10, rpc_keepalive: bool = True, gma_concurrency: int = 1,
+                 gma_rate_limit: Decimal = Decimal(0), blockhash_refresh_interval: float = 0,
+                 rpc_routing: RPCRouting = RPCRouting.FAILOVER, rpc_hedge_delay: typing.Optional[float] = None,
+                 websocket_coalesce_interval: typing.Optional[float] = None,
+                 transaction_bin_packing: bool = False, transaction_pipelining: bool = False) -> None:
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
         self.name: str = name
         instruction_reporter: InstructionReporter = CompoundInstructionReporter.from_addresses(
             mango_program_address, serum_program_address)
         self.client: BetterClient = BetterClient.from_configuration(name, cluster_name, cluster_urls, Commitment(
-            commitment), skip_preflight, encoding, blockhash_cache_duration, http_request_timeout, stale_data_pauses_before_retry, instruction_reporter, transaction_status_collector)
+            commitment), skip_preflight, encoding, blockhash_cache_duration, http_request_timeout, stale_data_pauses_before_retry, instruction_reporter, transaction_status_collector,
+            rpc_pool_size, rpc_keepalive, blockhash_refresh_interval, rpc_routing, rpc_hedge_delay)
         self.mango_program_address: PublicKey = mango_program_address
         self.serum_program_address: PublicKey = serum_program_address
         self.group_name: str = group_name
         self.group_address: PublicKey = group_address
         self.gma_chunk_size: Decimal = gma_chunk_size
         self.gma_chunk_pause: Decimal = gma_chunk_pause
+        self.gma_concurrency: int = gma_concurrency
+        self.gma_rate_limit: Decimal = gma_rate_limit
+
+        # When fetching chunks concurrently, a fixed pause between calls doesn't make much sense. Instead
+        # all getMultipleAccounts() calls share a token bucket. If no explicit rate is given, the rate is
+        # derived from the pause so existing --gma-chunk-pause settings keep roughly the same throughput.
+        self.gma_token_bucket: typing.Optional[TokenBucket] = None
+        if gma_rate_limit > 0:
+            self.gma_token_bucket = TokenBucket(gma_rate_limit, Decimal(max(gma_concurrency, 1)))
+        elif gma_concurrency > 1 and gma_chunk_pause > 0:
+            self.gma_token_bucket = TokenBucket(Decimal(1) / gma_chunk_pause, Decimal(max(gma_concurrency, 1)))
         self.instrument_lookup: InstrumentLookup = instrument_lookup
         self.market_lookup: MarketLookup = market_lookup
 
+        # Concurrent getMultipleAccounts() chunks all run on one shared pool, created when it's first needed.
+        self.__gma_executor: typing.Optional[ThreadPoolExecutor] = None
+        self.__gma_executor_lock: threading.Lock = threading.Lock()
+
         self.ping_interval: int = 10
 
+        # If set, websocket account subscriptions used by watchers hold on to the latest raw update and only
+        # parse it when it's needed (or at most once per this many seconds) instead of parsing every update.
+        self.websocket_coalesce_interval: typing.Optional[float] = websocket_coalesce_interval
+
+        # If set, instructions marked as independent of each other (like cancels and cranks) can be reordered to
+        # pack them into as few transactions as possible.
+        self.transaction_bin_packing: bool = transaction_bin_packing
+
+        # If set, the market maker sends all the transactions for a pulse in parallel, instead of one after the
+        # other.
+        self.transaction_pipelining: bool = transaction_pipelining
+
         self._last_generated_client_id: int = 0
 
         # kangda said in Discord: https://discord.com/channels/791995070613159966/836239696467591186/847816026245693451
@@ -67,6 +103,15 @@ class Context:
         self.retry_pauses: typing.Sequence[Decimal] = [Decimal(4), Decimal(
             8), Decimal(16), Decimal(20), Decimal(30)]
 
+    # The shared pool is sized by `gma_concurrency` when it's created, and that bounds how many chunks are
+    # fetched at once across all threads.
+    def gma_executor(self) -> ThreadPoolExecutor:
+        with self.__gma_executor_lock:
+            if self.__gma_executor is None:
+                self.__gma_executor = ThreadPoolExecutor(max_workers=max(self.gma_concurrency, 1),
+                                                         thread_name_prefix="gma")
+            return self.__gma_executor
+
     def create_thread_pool_scheduler(self) -> ThreadPoolScheduler:
         return ThreadPoolScheduler(multiprocessing.cpu_count())
 
@@ -22,7 +22,7 @@ import typing
 from decimal import Decimal
 from solana.publickey import PublicKey
 
-from .client import BetterClient, ClusterUrlData, TransactionStatusCollector, NullTransactionStatusCollector
+from .client import BetterClient, ClusterUrlData, RPCRouting, TransactionStatusCollector, NullTransactionStatusCollector
 from .constants import MangoConstants, DATA_PATH
 from .context import Context
 from .idsjsonmarketlookup import IdsJsonMarketLookup
@@ -97,6 +97,22 @@ class ContextBuilder:
                             help="How long (in seconds) to cache 'recent' blockhashes")
         parser.add_argument("--http-request-timeout", type=float, default=20,
                             help="What is the timeout for HTTP requests to when calling to RPC nodes (in seconds), -1 means no timeout")
+        parser.add_argument("--rpc-pool-size", type=int, default=None,
+                            help="Maximum number of pooled HTTP connections to keep open to each RPC node")
+        parser.add_argument("--rpc-keepalive", action=argparse.BooleanOptionalAction, default=None,
+                            help="Keep HTTP connections to RPC nodes open between calls (default: on, use --no-rpc-keepalive to turn off)")
+        parser.add_argument("--rpc-routing", type=RPCRouting, default=None, choices=list(RPCRouting),
+                            help="How to choose which RPC node to call when multiple --cluster-url parameters are given - can be FAILOVER (the default) or ADAPTIVE")
+        parser.add_argument("--rpc-hedge-delay", type=float, default=None,
+                            help="Send latency-critical reads to a second RPC node if the first hasn't responded after this many seconds (0 sends to both immediately, default is not to hedge reads)")
+        parser.add_argument("--websocket-coalesce-interval", type=float, default=None,
+                            help="Only parse the latest websocket account update when it's needed, or at most once per this many seconds (0 parses only when needed, default is to parse every update)")
+        parser.add_argument("--transaction-bin-packing", action="store_true", default=None,
+                            help="Reorder independent instructions (like cancels and cranks) to fit them into as few transactions as possible")
+        parser.add_argument("--transaction-pipelining", action="store_true", default=None,
+                            help="Send a market maker's transactions in parallel instead of one after the other")
+        parser.add_argument("--blockhash-refresh-interval", type=float, default=None,
+                            help="How often (in seconds) to refresh prefetched blockhashes in the background, 0 turns off prefetching (default: 0)")
         parser.add_argument("--stale-data-pause-before-retry", type=Decimal,
                             help="How long (in seconds, e.g. 0.1) to pause after retrieving stale data before retrying")
         parser.add_argument("--stale-data-maximum-retries", type=int,
@@ -105,6 +121,10 @@ class ContextBuilder:
                             help="Maximum number of addresses to send in a single call to getMultipleAccounts()")
         parser.add_argument("--gma-chunk-pause", type=Decimal, default=None,
                             help="number of seconds to pause between successive getMultipleAccounts() calls to avoid rate limiting")
+        parser.add_argument("--gma-concurrency", type=int, default=None,
+                            help="Maximum number of getMultipleAccounts() chunks to fetch at the same time (default: 1, fetching chunks one after another)")
+        parser.add_argument("--gma-rate-limit", type=Decimal, default=None,
+                            help="Maximum number of getMultipleAccounts() calls per second when fetching chunks concurrently (default: derived from --gma-chunk-pause, or unlimited)")
 
         parser.add_argument("--token-data-file", type=str, default=SPLTokenLookup.DefaultDataFilepath,
                             help="data file that contains token symbols, names, mints and decimals (format is same as https://raw.githubusercontent.com/solana-labs/token-list/main/src/tokens/solana.tokenlist.json)")
@@ -129,10 +149,20 @@ class ContextBuilder:
         encoding: typing.Optional[str] = args.encoding
         blockhash_cache_duration: typing.Optional[int] = args.blockhash_cache_duration
         http_request_timeout: typing.Optional[float] = args.http_request_timeout
+        rpc_pool_size: typing.Optional[int] = args.rpc_pool_size
+        rpc_keepalive: typing.Optional[bool] = args.rpc_keepalive
+        blockhash_refresh_interval: typing.Optional[float] = args.blockhash_refresh_interval
+        rpc_routing: typing.Optional[RPCRouting] = args.rpc_routing
+        rpc_hedge_delay: typing.Optional[float] = args.rpc_hedge_delay
+        websocket_coalesce_interval: typing.Optional[float] = args.websocket_coalesce_interval
+        transaction_bin_packing: typing.Optional[bool] = args.transaction_bin_packing
+        transaction_pipelining: typing.Optional[bool] = args.transaction_pipelining
         stale_data_pause_before_retry: typing.Optional[Decimal] = args.stale_data_pause_before_retry
         stale_data_maximum_retries: typing.Optional[int] = args.stale_data_maximum_retries
         gma_chunk_size: typing.Optional[Decimal] = args.gma_chunk_size
         gma_chunk_pause: typing.Optional[Decimal] = args.gma_chunk_pause
+        gma_concurrency: typing.Optional[int] = args.gma_concurrency
+        gma_rate_limit: typing.Optional[Decimal] = args.gma_rate_limit
         token_filename: str = args.token_data_file
 
         # Do this here so build() only ever has to handle the sequence of retry times. (It gets messy
@@ -151,7 +181,14 @@ class ContextBuilder:
                                                 actual_stale_data_pauses_before_retry,
                                                 group_name, group_address, mango_program_address,
                                                 serum_program_address, gma_chunk_size, gma_chunk_pause,
-                                                token_filename)
+                                                token_filename, rpc_pool_size=rpc_pool_size,
+                                                rpc_keepalive=rpc_keepalive, gma_concurrency=gma_concurrency,
+                                                gma_rate_limit=gma_rate_limit,
+                                                blockhash_refresh_interval=blockhash_refresh_interval,
+                                                rpc_routing=rpc_routing, rpc_hedge_delay=rpc_hedge_delay,
+                                                websocket_coalesce_interval=websocket_coalesce_interval,
+                                                transaction_bin_packing=transaction_bin_packing,
+                                                transaction_pipelining=transaction_pipelining)
         logging.debug(f"{context}")
 
         return context
@@ -168,7 +205,17 @@ class ContextBuilder:
                                     context.client.stale_data_pauses_before_retry,
                                     group_name, None, None, None,
                                     context.gma_chunk_size, context.gma_chunk_pause,
-                                    SPLTokenLookup.DefaultDataFilepath)
+                                    SPLTokenLookup.DefaultDataFilepath,
+                                    rpc_pool_size=context.client.rpc_pool_size,
+                                    rpc_keepalive=context.client.rpc_keepalive,
+                                    gma_concurrency=context.gma_concurrency,
+                                    gma_rate_limit=context.gma_rate_limit,
+                                    blockhash_refresh_interval=context.client.blockhash_refresh_interval,
+                                    rpc_routing=context.client.rpc_routing,
+                                    rpc_hedge_delay=context.client.rpc_hedge_delay,
+                                    websocket_coalesce_interval=context.websocket_coalesce_interval,
+                                    transaction_bin_packing=context.transaction_bin_packing,
+                                    transaction_pipelining=context.transaction_pipelining)
 
     @staticmethod
     def forced_to_devnet(context: Context) -> Context:
@@ -185,7 +232,12 @@ class ContextBuilder:
                                                                -1,
                                                                context.client.stale_data_pauses_before_retry,
                                                                context.client.instruction_reporter,
-                                                               context.client.transaction_status_collector)
+                                                               context.client.transaction_status_collector,
+                                                               context.client.rpc_pool_size,
+                                                               context.client.rpc_keepalive,
+                                                               context.client.blockhash_refresh_interval,
+                                                               context.client.rpc_routing,
+                                                               context.client.rpc_hedge_delay)
 
         return fresh_context
 
@@ -204,7 +256,12 @@ class ContextBuilder:
                                                                -1,
                                                                context.client.stale_data_pauses_before_retry,
                                                                context.client.instruction_reporter,
-                                                               context.client.transaction_status_collector)
+                                                               context.client.transaction_status_collector,
+                                                               context.client.rpc_pool_size,
+                                                               context.client.rpc_keepalive,
+                                                               context.client.blockhash_refresh_interval,
+                                                               context.client.rpc_routing,
+                                                               context.client.rpc_hedge_delay)
 
         return fresh_context
 
@@ -220,7 +277,15 @@ class ContextBuilder:
               program_address: typing.Optional[PublicKey] = None, serum_program_address: typing.Optional[PublicKey] = None,
               gma_chunk_size: typing.Optional[Decimal] = None, gma_chunk_pause: typing.Optional[Decimal] = None,
               token_filename: str = SPLTokenLookup.DefaultDataFilepath,
-              transaction_status_collector: TransactionStatusCollector = NullTransactionStatusCollector()) -> "Context":
+              transaction_status_collector: TransactionStatusCollector = NullTransactionStatusCollector(),
+              rpc_pool_size: typing.Optional[int] = None, rpc_keepalive: typing.Optional[bool] = None,
+              gma_concurrency: typing.Optional[int] = None, gma_rate_limit: typing.Optional[Decimal] = None,
+              blockhash_refresh_interval: typing.Optional[float] = None,
+              rpc_routing: typing.Optional[RPCRouting] = None,
+              rpc_hedge_delay: typing.Optional[float] = None,
+              websocket_coalesce_interval: typing.Optional[float] = None,
+              transaction_bin_packing: typing.Optional[bool] = None,
+              transaction_pipelining: typing.Optional[bool] = None) -> "Context":
         def __public_key_or_none(address: typing.Optional[str]) -> typing.Optional[PublicKey]:
             if address is not None and address != "":
                 return PublicKey(address)
@@ -242,6 +307,12 @@ class ContextBuilder:
         actual_blockhash_cache_duration: int = blockhash_cache_duration or 0
         actual_stale_data_pauses_before_retry: typing.Sequence[float] = stale_data_pauses_before_retry or []
         actual_http_request_timeout: float = http_request_timeout or -1
+        actual_rpc_pool_size: int = rpc_pool_size or 10
+        actual_rpc_keepalive: bool = rpc_keepalive if rpc_keepalive is not None else True
+        actual_blockhash_refresh_interval: float = blockhash_refresh_interval if blockhash_refresh_interval is not None else 0
+        actual_rpc_routing: RPCRouting = rpc_routing or RPCRouting.FAILOVER
+        # Hedging is off unless a delay of 0 or more is given.
+        actual_rpc_hedge_delay: typing.Optional[float] = rpc_hedge_delay if rpc_hedge_delay is not None and rpc_hedge_delay >= 0 else None
 
         actual_cluster_urls: typing.Optional[typing.Sequence[ClusterUrlData]] = cluster_urls
         if actual_cluster_urls is None or len(actual_cluster_urls) == 0:
@@ -271,6 +342,8 @@ class ContextBuilder:
 
         actual_gma_chunk_size: Decimal = gma_chunk_size or Decimal(100)
         actual_gma_chunk_pause: Decimal = gma_chunk_pause or Decimal(0)
+        actual_gma_concurrency: int = gma_concurrency or 1
+        actual_gma_rate_limit: Decimal = gma_rate_limit or Decimal(0)
 
         ids_json_token_lookup: InstrumentLookup = IdsJsonTokenLookup(actual_cluster, actual_group_name)
         instrument_lookup: InstrumentLookup = ids_json_token_lookup
@@ -337,4 +410,4 @@ class ContextBuilder:
                 devnet_serum_market_lookup])
         market_lookup: MarketLookup = all_market_lookup
 
-        return Context(actual_name, actual_cluster, actual_cluster_urls, actual_skip_preflight, actual_commitment, actual_encoding, actual_blockhash_cache_duration, actual_http_request_timeout, actual_stale_data_pauses_before_retry, actual_program_address, actual_serum_program_address, actual_group_name, actual_group_address, actual_gma_chunk_size, actual_gma_chunk_pause, instrument_lookup, market_lookup, transaction_status_collector)
+        return Context(actual_name, actual_cluster, actual_cluster_urls, actual_skip_preflight, actual_commitment, actual_encoding, actual_blockhash_cache_duration, actual_http_request_timeout, actual_stale_data_pauses_before_retry, actual_program_address, actual_serum_program_address, actual_group_name, actual_group_address, actual_gma_chunk_size, actual_gma_chunk_pause, instrument_lookup, market_lookup, transaction_status_collector, actual_rpc_pool_size, actual_rpc_keepalive, actual_gma_concurrency, actual_gma_rate_limit, actual_blockhash_refresh_interval, actual_rpc_routing, actual_rpc_hedge_delay, websocket_coalesce_interval, bool(transaction_bin_packing), bool(transaction_pipelining))
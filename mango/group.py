@@ -26,7 +26,7 @@ from .constants import SYSTEM_PROGRAM_ADDRESS
 from .context import Context
 from .instrumentlookup import InstrumentLookup
 from .instrumentvalue import InstrumentValue
-from .layouts import layouts
+from .layouts import decoders, layouts
 from .lotsizeconverter import LotSizeConverter, RaisingLotSizeConverter
 from .marketlookup import MarketLookup
 from .metadata import Metadata
@@ -335,7 +335,7 @@ class Group(AddressableAccount):
             raise Exception(
                 f"Group data length ({len(data)}) does not match expected size ({layouts.GROUP.sizeof()})")
 
-        layout = layouts.GROUP.parse(data)
+        layout = decoders.GROUP.parse(data)
         return Group.from_layout(layout, name, account_info, Version.V3, instrument_lookup, market_lookup)
 
     @staticmethod
@@ -0,0 +1,238 @@
+# # ⚠ Warning
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN
+# NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+# [🥭 Mango Markets](https://mango.markets/) support is available at:
+#   [Docs](https://docs.mango.markets/)
+#   [Discord](https://discord.gg/67jySBhxrg)
+#   [Twitter](https://twitter.com/mangomarkets)
+#   [Github](https://github.com/blockworks-foundation)
+#   [Email](mailto:hello@blockworks.foundation)
+
+import bisect
+import enum
+import logging
+import typing
+
+from dataclasses import dataclass
+
+from .accountinfo import AccountInfo
+from .layouts import layouts
+from .lotsizeconverter import LotSizeConverter, NullLotSizeConverter
+from .observables import EventSource
+from .orderbookside import PerpOrderBookSide
+from .orders import ColumnarOrderBookSide, Order, Side
+from .perpmarketdetails import PerpMarketDetails
+
+
+# # 🥭 OrderBookChangeType enum
+#
+# The kind of change to a single order on one side of the book.
+#
+class OrderBookChangeType(enum.Enum):
+    # We use strings here so that argparse can work with these as parameters.
+    ADD = "ADD"
+    REMOVE = "REMOVE"
+    MODIFY = "MODIFY"
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 OrderBookChange class
+#
+# A single change to an order on the book. For an `ADD` or `MODIFY` the `order` is the order as it is now. For
+# a `REMOVE` it's the order that was removed. A `MODIFY` (usually a partial fill) also has the `previous` order.
+#
+@dataclass
+class OrderBookChange:
+    change_type: OrderBookChangeType
+    order: Order
+    previous: typing.Optional[Order] = None
+
+    def __str__(self) -> str:
+        if self.previous is not None:
+            return f"« OrderBookChange {self.change_type} {self.order} (was {self.previous.quantity}) »"
+        return f"« OrderBookChange {self.change_type} {self.order} »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 IncrementalPerpOrderBookSide class
+#
+# Maintains one side of a perp orderbook from successive account updates, without re-decoding the whole side
+# each time.
+#
+# The previous raw account data is kept, and each update compares it node-slot by node-slot (each node is a
+# fixed 88 bytes). Only slots whose bytes changed are decoded. Leaves that were in changed slots are
+# compared by order ID with leaves now in changed slots to find orders that were added, removed or
+# modified, and only those changes are applied to the maintained sorted list of orders. On busy books most
+# updates touch only a handful of nodes.
+#
+# Leaves are identified by their node tag rather than by walking the tree from the root, since free nodes are
+# always re-tagged by the program.
+#
+# Each update that changes anything publishes the list of `OrderBookChange`s to `changes`.
+#
+# Price and quantity lots are converted once, when an order is added or modified, and kept alongside the
+# sorted orders. `columnar` builds a `ColumnarOrderBookSide` from those columns without sorting or converting
+# anything, and keeps it until the next change.
+#
+class IncrementalPerpOrderBookSide:
+    def __init__(self, perp_market_details: PerpMarketDetails, lot_size_converter: LotSizeConverter = NullLotSizeConverter()) -> None:
+        self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.perp_market_details: PerpMarketDetails = perp_market_details
+        self.lot_size_converter: LotSizeConverter = lot_size_converter
+        self.changes: EventSource[typing.Sequence[OrderBookChange]] = EventSource[typing.Sequence[OrderBookChange]]()
+        self.changed_node_count: int = 0
+        self.side: typing.Optional[Side] = None
+
+        self.__data: typing.Optional[bytes] = None
+        self.__leaves: typing.Dict[int, Order] = {}
+        self.__keys: typing.List[int] = []
+        self.__orders: typing.List[Order] = []
+        self.__price_lots: typing.List[int] = []
+        self.__quantity_lots: typing.List[int] = []
+        self.__columnar: typing.Optional[ColumnarOrderBookSide] = None
+
+    # Orders, best first - the same order `PerpOrderBookSide.orders()` returns them.
+    @property
+    def orders(self) -> typing.Sequence[Order]:
+        return list(self.__orders)
+
+    # The same orders as a `ColumnarOrderBookSide`, built from the maintained columns.
+    @property
+    def columnar(self) -> ColumnarOrderBookSide:
+        if self.__columnar is None:
+            self.__columnar = ColumnarOrderBookSide(self.side or Side.BUY, self.lot_size_converter,
+                                                    [order.id for order in self.__orders],
+                                                    [order.client_id for order in self.__orders],
+                                                    [order.owner for order in self.__orders],
+                                                    self.__price_lots,
+                                                    self.__quantity_lots,
+                                                    self.__orders)
+        return self.__columnar
+
+    def update(self, account_info: AccountInfo) -> typing.Sequence[OrderBookChange]:
+        book_side: PerpOrderBookSide = PerpOrderBookSide.parse(account_info, self.perp_market_details)
+        data: bytes = account_info.data
+        if book_side.side != self.side:
+            # A different side (or the first update) means nothing we hold is still valid.
+            self.__reset(book_side.side)
+
+        changed_slots: typing.Sequence[int] = self.__changed_slots(data)
+        self.changed_node_count = len(changed_slots)
+
+        removed: typing.Dict[int, Order] = {}
+        added: typing.Dict[int, Order] = {}
+        for index in changed_slots:
+            previous: typing.Optional[Order] = self.__leaves.pop(index, None)
+            if previous is not None:
+                removed[previous.id] = previous
+
+            node = book_side.nodes[index]
+            if node.type_name == "leaf":
+                order: Order = book_side.order_from_leaf(node)
+                self.__leaves[index] = order
+                added[order.id] = order
+
+        changes: typing.List[OrderBookChange] = []
+        for order_id, previous_order in removed.items():
+            if order_id in added:
+                # The same order can move between slots without changing, so only changed orders are a MODIFY.
+                current_order: Order = added.pop(order_id)
+                if current_order != previous_order:
+                    self.__replace(current_order)
+                    changes += [OrderBookChange(OrderBookChangeType.MODIFY, current_order, previous_order)]
+            else:
+                self.__remove(previous_order)
+                changes += [OrderBookChange(OrderBookChangeType.REMOVE, previous_order)]
+
+        for added_order in added.values():
+            self.__insert(added_order)
+            changes += [OrderBookChange(OrderBookChangeType.ADD, added_order)]
+
+        self.__data = data
+        if len(changes) > 0:
+            self.__columnar = None
+            self._logger.debug(f"{len(changes)} changes from {len(changed_slots)} changed nodes.")
+            self.changes.publish(changes)
+
+        return changes
+
+    def __reset(self, side: Side) -> None:
+        self.side = side
+        self.__data = None
+        self.__leaves = {}
+        self.__keys = []
+        self.__orders = []
+        self.__price_lots = []
+        self.__quantity_lots = []
+        self.__columnar = None
+
+    def __changed_slots(self, data: bytes) -> typing.Sequence[int]:
+        node_size: int = layouts._NODE_SIZE
+        offset: int = layouts.ORDERBOOK_SIDE_HEADER.sizeof()
+        count: int = layouts.MAX_BOOK_NODES
+        previous: typing.Optional[bytes] = self.__data
+        if previous is None or len(previous) != len(data):
+            return range(count)
+
+        if previous == data:
+            return []
+
+        previous_view = memoryview(previous)
+        current_view = memoryview(data)
+        changed: typing.List[int] = []
+        for index in range(count):
+            start = offset + (index * node_size)
+            end = start + node_size
+            if previous_view[start:end] != current_view[start:end]:
+                changed += [index]
+        return changed
+
+    # Bids are best-first from the highest order ID, asks from the lowest, so bids sort on the negative ID.
+    def __sort_key(self, order: Order) -> int:
+        return -order.id if self.side == Side.BUY else order.id
+
+    def __position(self, order: Order) -> int:
+        key: int = self.__sort_key(order)
+        position: int = bisect.bisect_left(self.__keys, key)
+        if position >= len(self.__keys) or self.__keys[position] != key:
+            raise Exception(f"Order {order.id} not found in incremental orderbook.")
+        return position
+
+    def __insert(self, order: Order) -> None:
+        key: int = self.__sort_key(order)
+        position: int = bisect.bisect_left(self.__keys, key)
+        self.__keys.insert(position, key)
+        self.__orders.insert(position, order)
+        self.__price_lots.insert(position, self.lot_size_converter.price_number_to_lots(order.price))
+        self.__quantity_lots.insert(position, self.lot_size_converter.base_size_number_to_lots(order.quantity))
+
+    def __remove(self, order: Order) -> None:
+        position: int = self.__position(order)
+        del self.__keys[position]
+        del self.__orders[position]
+        del self.__price_lots[position]
+        del self.__quantity_lots[position]
+
+    def __replace(self, order: Order) -> None:
+        position: int = self.__position(order)
+        self.__orders[position] = order
+        self.__price_lots[position] = self.lot_size_converter.price_number_to_lots(order.price)
+        self.__quantity_lots[position] = self.lot_size_converter.base_size_number_to_lots(order.quantity)
+
+    def __str__(self) -> str:
+        return f"« IncrementalPerpOrderBookSide {self.side} [{len(self.__orders)} orders] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
@@ -0,0 +1,288 @@
+# # ⚠ Warning
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN
+# NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+# [🥭 Mango Markets](https://mango.markets/) support is available at:
+#   [Docs](https://docs.mango.markets/)
+#   [Discord](https://discord.gg/67jySBhxrg)
+#   [Twitter](https://twitter.com/mangomarkets)
+#   [Github](https://github.com/blockworks-foundation)
+#   [Email](mailto:hello@blockworks.foundation)
+
+
+import math
+import pyserum.enums
+import struct
+import typing
+
+from decimal import Decimal
+from pyserum.enums import OrderType as PySerumOrderType, Side as PySerumSide
+from pyserum.market.market import Market as PySerumMarket
+from solana.publickey import PublicKey
+from solana.transaction import AccountMeta, TransactionInstruction
+
+from .account import Account
+from .context import Context
+from .group import Group
+from .instructions import build_cancel_perp_order_instructions, build_cancel_spot_order_instructions, build_place_perp_order_instructions, build_spot_place_order_instructions
+from .orders import Order, OrderType, Side
+from .perpmarketdetails import PerpMarketDetails
+from .spotmarket import SpotMarket
+from .wallet import Wallet
+
+
+# # 🥭 InstructionTemplate class
+#
+# An `InstructionTemplate` holds everything about an instruction that doesn't change from one use to the
+# next: the program ID, the accounts, and a pre-sized data buffer with the instruction's fixed bytes (like its
+# variant) already in place. `build()` copies the buffer and packs the changing values into it at `offset`,
+# using a precompiled `struct` format.
+#
+# Templates are usually taken from an instruction built the normal way, so the accounts and fixed bytes are
+# exactly the same as that instruction's.
+#
+# New `AccountMeta`s are created for each instruction because `Transaction.compile_message()` can update them.
+#
+class InstructionTemplate:
+    def __init__(self, program_id: PublicKey, keys: typing.Sequence[AccountMeta], data: bytes,
+                 offset: int, values_format: str) -> None:
+        self.program_id: PublicKey = program_id
+        self.keys: typing.Sequence[typing.Tuple[PublicKey, bool, bool]] = [
+            (key.pubkey, key.is_signer, key.is_writable) for key in keys]
+        self.data: bytes = data
+        self.offset: int = offset
+        self.values: struct.Struct = struct.Struct(values_format)
+        if offset + self.values.size > len(data):
+            raise Exception(
+                f"Values format '{values_format}' at offset {offset} does not fit in {len(data)} bytes of instruction data.")
+
+    @staticmethod
+    def from_instruction(instruction: TransactionInstruction, offset: int, values_format: str) -> "InstructionTemplate":
+        return InstructionTemplate(instruction.program_id, instruction.keys, instruction.data, offset, values_format)
+
+    def build(self, *values: int) -> TransactionInstruction:
+        data: bytearray = bytearray(self.data)
+        self.values.pack_into(data, self.offset, *values)
+        keys: typing.List[AccountMeta] = [AccountMeta(pubkey, is_signer, is_writable)
+                                          for pubkey, is_signer, is_writable in self.keys]
+        return TransactionInstruction(keys=keys, program_id=self.program_id, data=bytes(data))
+
+    def __str__(self) -> str:
+        return f"« InstructionTemplate [{self.program_id}] {len(self.keys)} accounts, {len(self.data)} bytes »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# u128 values don't have a `struct` format, so they're packed as low and high u64s.
+def _split_u128(value: int) -> typing.Tuple[int, int]:
+    return value & 0xFFFFFFFFFFFFFFFF, value >> 64
+
+
+# # 🥭 PerpOrderInstructionTemplates class
+#
+# Templates for placing and cancelling orders on a perp market, built once from the normal instruction
+# builders.
+#
+# The place instruction's accounts include all the Mango account's spot open orders accounts, so the place
+# template is rebuilt if those change.
+#
+class PerpOrderInstructionTemplates:
+    def __init__(self, context: Context, wallet: Wallet, group: Group, account: Account,
+                 perp_market_details: PerpMarketDetails) -> None:
+        self.context: Context = context
+        self.wallet: Wallet = wallet
+        self.group: Group = group
+        self.account: Account = account
+        self.perp_market_details: PerpMarketDetails = perp_market_details
+
+        base_factor: Decimal = Decimal(10) ** perp_market_details.base_instrument.decimals
+        quote_factor: Decimal = Decimal(10) ** perp_market_details.quote_token.token.decimals
+        self.__price_numerator: Decimal = quote_factor * perp_market_details.base_lot_size
+        self.__price_denominator: Decimal = perp_market_details.quote_lot_size * base_factor
+        self.__base_factor: Decimal = base_factor
+
+        cancel_by_client_id = build_cancel_perp_order_instructions(
+            context, wallet, account, perp_market_details, Order.from_ids(id=0, client_id=1), False)
+        self.__cancel_by_client_id: InstructionTemplate = InstructionTemplate.from_instruction(
+            cancel_by_client_id.instructions[0], 4, "<Q?")
+        cancel_by_id = build_cancel_perp_order_instructions(
+            context, wallet, account, perp_market_details, Order.from_ids(id=1, client_id=0), False)
+        self.__cancel_by_id: InstructionTemplate = InstructionTemplate.from_instruction(
+            cancel_by_id.instructions[0], 4, "<QQ?")
+
+        self.__open_orders: typing.Sequence[typing.Optional[PublicKey]] = []
+        self.__place: InstructionTemplate = self.__build_place_template()
+
+    def place(self, order: Order) -> TransactionInstruction:
+        if self.account.spot_open_orders_by_index != self.__open_orders:
+            self.__place = self.__build_place_template()
+
+        # Same calculations as `build_place_perp_order_instructions()`.
+        native_price = (order.price * self.__price_numerator) / self.__price_denominator
+        native_quantity = (order.quantity * self.__base_factor) / self.perp_market_details.base_lot_size
+        raw_side: int = 1 if order.side == Side.SELL else 0
+        return self.__place.build(int(native_price), int(native_quantity), order.client_id, raw_side,
+                                  order.order_type.to_perp(), order.reduce_only)
+
+    def cancel(self, order: Order, invalid_id_ok: bool) -> TransactionInstruction:
+        # Prefer cancelling by client ID so we don't have to keep track of the order side.
+        if order.client_id is not None and order.client_id != 0:
+            return self.__cancel_by_client_id.build(order.client_id, invalid_id_ok)
+        return self.__cancel_by_id.build(*_split_u128(order.id), invalid_id_ok)
+
+    def __build_place_template(self) -> InstructionTemplate:
+        self.__open_orders = self.account.spot_open_orders_by_index
+        place = build_place_perp_order_instructions(self.context, self.wallet, self.group, self.account,
+                                                    self.perp_market_details, Decimal(0), Decimal(0), 0,
+                                                    Side.BUY, OrderType.LIMIT)
+        return InstructionTemplate.from_instruction(place.instructions[0], 4, "<qqQBB?")
+
+    def __str__(self) -> str:
+        return f"« PerpOrderInstructionTemplates [{self.perp_market_details.address}] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 SpotOrderInstructionTemplates class
+#
+# Templates for placing and cancelling orders on a Mango spot market, built once from the normal instruction
+# builders. This saves looking up token banks and deriving the vault signer for every order.
+#
+# Templates can only be built once the Mango account has an open orders account for the market. As with perp
+# markets, the place template is rebuilt if the account's spot open orders accounts change.
+#
+class SpotOrderInstructionTemplates:
+    def __init__(self, context: Context, wallet: Wallet, group: Group, account: Account,
+                 spot_market: SpotMarket, raw_market: PySerumMarket, market_index: int,
+                 open_orders_address: PublicKey, fee_discount_address: PublicKey) -> None:
+        self.context: Context = context
+        self.wallet: Wallet = wallet
+        self.group: Group = group
+        self.account: Account = account
+        self.spot_market: SpotMarket = spot_market
+        self.raw_market: PySerumMarket = raw_market
+        self.market_index: int = market_index
+        self.open_orders_address: PublicKey = open_orders_address
+        self.fee_discount_address: PublicKey = fee_discount_address
+
+        cancel = build_cancel_spot_order_instructions(context, wallet, group, account, raw_market,
+                                                      Order.from_ids(id=0, client_id=0), open_orders_address)
+        self.__cancel: InstructionTemplate = InstructionTemplate.from_instruction(cancel.instructions[0], 4, "<IQQ")
+
+        self.__open_orders: typing.Sequence[typing.Optional[PublicKey]] = []
+        self.__place: InstructionTemplate = self.__build_place_template()
+
+    def place(self, order: Order) -> TransactionInstruction:
+        if self.account.spot_open_orders_by_index != self.__open_orders:
+            self.__place = self.__build_place_template()
+
+        # Same calculations as `build_spot_place_order_instructions()`.
+        state = self.spot_market.underlying_serum_market.state
+        intrinsic_price = state.price_number_to_lots(float(order.price))
+        max_base_quantity = state.base_size_number_to_lots(float(order.quantity))
+        max_quote_quantity = max_base_quantity * state.quote_lot_size() * intrinsic_price
+        return self.__place.build(order.side.to_serum(), intrinsic_price, max_base_quantity, max_quote_quantity,
+                                  pyserum.enums.SelfTradeBehavior.DECREMENT_TAKE, order.order_type.to_serum(),
+                                  order.client_id)
+
+    def cancel(self, order: Order) -> TransactionInstruction:
+        raw_side: int = 1 if order.side == Side.SELL else 0
+        return self.__cancel.build(raw_side, *_split_u128(order.id))
+
+    def __build_place_template(self) -> InstructionTemplate:
+        self.__open_orders = self.account.spot_open_orders_by_index
+        # Building a place instruction without an open orders account would create one.
+        if self.__open_orders[self.market_index] is None:
+            raise Exception(f"No open orders account for spot market {self.spot_market.symbol} - cannot build template.")
+        place = build_spot_place_order_instructions(self.context, self.wallet, self.group, self.account,
+                                                    self.spot_market, OrderType.LIMIT, Side.BUY, Decimal(0),
+                                                    Decimal(0), 0, self.fee_discount_address)
+        return InstructionTemplate.from_instruction(place.instructions[0], 4, "<IQQQIIQ")
+
+    def __str__(self) -> str:
+        return f"« SpotOrderInstructionTemplates [{self.spot_market.address}] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 SerumOrderInstructionTemplates class
+#
+# Templates for placing and cancelling orders on a Serum market, built once using pyserum's instruction
+# builders. There's one place template for each side, since buys and sells are paid from different token
+# accounts.
+#
+# Only the current (v3) Serum instructions can be templated. `load()` returns `None` for older markets that
+# still use the request queue instructions.
+#
+class SerumOrderInstructionTemplates:
+    __NEW_ORDER_V3_PREFIX: bytes = bytes([0, 10, 0, 0, 0])
+    __CANCEL_ORDER_BY_CLIENT_ID_V2_PREFIX: bytes = bytes([0, 12, 0, 0, 0])
+
+    def __init__(self, raw_market: PySerumMarket, buy: InstructionTemplate, sell: InstructionTemplate,
+                 cancel_by_client_id: InstructionTemplate) -> None:
+        self.raw_market: PySerumMarket = raw_market
+        self.__buy: InstructionTemplate = buy
+        self.__sell: InstructionTemplate = sell
+        self.__cancel_by_client_id: InstructionTemplate = cancel_by_client_id
+
+        state = raw_market.state
+        self.__base_multiplier: int = state.base_spl_token_multiplier()
+        self.__quote_multiplier: int = state.quote_spl_token_multiplier()
+        self.__base_lot_size: int = state.base_lot_size()
+        self.__quote_lot_size: int = state.quote_lot_size()
+
+    @staticmethod
+    def load(wallet: Wallet, raw_market: PySerumMarket, base_token_account_address: PublicKey,
+             quote_token_account_address: PublicKey, open_orders_address: PublicKey,
+             fee_discount_address: PublicKey) -> typing.Optional["SerumOrderInstructionTemplates"]:
+        def __place_template(payer: PublicKey, side: PySerumSide) -> typing.Optional[InstructionTemplate]:
+            place = raw_market.make_place_order_instruction(payer, wallet.keypair, PySerumOrderType.LIMIT, side,
+                                                            0, 0, 0, open_orders_address, fee_discount_address)
+            if not place.data.startswith(SerumOrderInstructionTemplates.__NEW_ORDER_V3_PREFIX):
+                return None
+            return InstructionTemplate.from_instruction(place, 5, "<IQQQIIQ")
+
+        buy = __place_template(quote_token_account_address, PySerumSide.BUY)
+        sell = __place_template(base_token_account_address, PySerumSide.SELL)
+        cancel = raw_market.make_cancel_order_by_client_id_instruction(wallet.keypair, open_orders_address, 0)
+        if buy is None or sell is None or not cancel.data.startswith(SerumOrderInstructionTemplates.__CANCEL_ORDER_BY_CLIENT_ID_V2_PREFIX):
+            return None
+
+        cancel_by_client_id = InstructionTemplate.from_instruction(cancel, 5, "<Q")
+        return SerumOrderInstructionTemplates(raw_market, buy, sell, cancel_by_client_id)
+
+    def place(self, order: Order) -> TransactionInstruction:
+        # Same calculations as pyserum's `Market.make_place_order_instruction()`.
+        price: float = float(order.price)
+        limit_price: int = int(round((price * self.__quote_multiplier * self.__base_lot_size)
+                                     / (self.__base_multiplier * self.__quote_lot_size)))
+        max_base_quantity: int = int(math.floor(float(order.quantity) * self.__base_multiplier) / self.__base_lot_size)
+        if max_base_quantity < 0:
+            raise Exception("Size lot %d is too small" % order.quantity)
+        if limit_price < 0:
+            raise Exception("Price lot %d is too small" % order.price)
+        max_quote_quantity: int = max_base_quantity * self.__quote_lot_size * limit_price
+
+        # Same order type mapping as `build_serum_place_order_instructions()`.
+        serum_order_type: PySerumOrderType = PySerumOrderType.POST_ONLY if order.order_type == OrderType.POST_ONLY else PySerumOrderType.IOC if order.order_type == OrderType.IOC else PySerumOrderType.LIMIT
+        if order.side == Side.SELL:
+            return self.__sell.build(PySerumSide.SELL, limit_price, max_base_quantity, max_quote_quantity,
+                                     pyserum.enums.SelfTradeBehavior.DECREMENT_TAKE, serum_order_type, order.client_id)
+        return self.__buy.build(PySerumSide.BUY, limit_price, max_base_quantity, max_quote_quantity,
+                                pyserum.enums.SelfTradeBehavior.DECREMENT_TAKE, serum_order_type, order.client_id)
+
+    def cancel(self, order: Order) -> TransactionInstruction:
+        return self.__cancel_by_client_id.build(order.client_id)
+
+    def __str__(self) -> str:
+        return f"« SerumOrderInstructionTemplates [{self.raw_market.state.public_key()}] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
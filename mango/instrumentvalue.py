@@ -80,6 +80,30 @@ class InstrumentValue:
             return InstrumentValue(token, Decimal(0))
         return value
 
+    # Fetches the total values of many tokens in `account_public_key`'s wallet using two batched RPC
+    # requests - one to find all the token accounts and one to fetch all their balances - instead of
+    # separate requests for every token and every token account.
+    #
+    # Values are returned in the same order as `tokens`, with zero values for tokens that have no
+    # token accounts.
+    @staticmethod
+    def fetch_total_values(context: Context, account_public_key: PublicKey, tokens: typing.Sequence[Token]) -> typing.Sequence["InstrumentValue"]:
+        with context.client.batch() as accounts_batch:
+            all_token_accounts = [accounts_batch.get_token_accounts_by_owner(
+                account_public_key, TokenAccountOpts(mint=token.mint)) for token in tokens]
+
+        with context.client.batch() as balances_batch:
+            all_token_balances = [[balances_batch.get_token_account_balance(token_account["pubkey"])
+                                   for token_account in token_accounts.result]
+                                  for token_accounts in all_token_accounts]
+
+        values: typing.List[InstrumentValue] = []
+        for token, token_balances in zip(tokens, all_token_balances):
+            total_value = sum((token_balance.result for token_balance in token_balances), Decimal(0))
+            values += [InstrumentValue(token, total_value)]
+
+        return values
+
     @staticmethod
     def report(values: typing.Sequence["InstrumentValue"], reporter: typing.Callable[[str], None] = output) -> None:
         for value in values:
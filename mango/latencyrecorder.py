@@ -0,0 +1,235 @@
+# # ⚠ Warning
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN
+# NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+# [🥭 Mango Markets](https://mango.markets/) support is available at:
+#   [Docs](https://docs.mango.markets/)
+#   [Discord](https://discord.gg/67jySBhxrg)
+#   [Twitter](https://twitter.com/mangomarkets)
+#   [Github](https://github.com/blockworks-foundation)
+#   [Email](mailto:hello@blockworks.foundation)
+
+
+import contextlib
+import http.server
+import logging
+import math
+import rx
+import threading
+import time
+import typing
+
+from collections import deque
+
+from .client import TransactionOutcome, TransactionStatus, TransactionStatusCollector
+
+
+# # 🥭 LatencyHistogram class
+#
+# Keeps the most recent `capacity` durations (in seconds) for one phase of work, so percentiles reflect
+# recent behaviour rather than everything since startup. The total count and sum since startup are kept
+# too, for exporting as a metrics summary.
+#
+class LatencyHistogram:
+    def __init__(self, name: str, capacity: int = 1000) -> None:
+        self.name: str = name
+        self.count: int = 0
+        self.sum: float = 0
+        self.__durations: typing.Deque[float] = deque(maxlen=capacity)
+        self.__lock: threading.Lock = threading.Lock()
+
+    def record(self, duration: float) -> None:
+        with self.__lock:
+            self.__durations.append(duration)
+            self.count += 1
+            self.sum += duration
+
+    # Nearest-rank percentile of the recent durations, where `percent` is 0-100. Returns 0 if nothing
+    # has been recorded.
+    def percentile(self, percent: float) -> float:
+        with self.__lock:
+            durations: typing.List[float] = sorted(self.__durations)
+        if len(durations) == 0:
+            return 0
+        rank: int = max(math.ceil(len(durations) * percent / 100), 1)
+        return durations[rank - 1]
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+    @property
+    def maximum(self) -> float:
+        return self.percentile(100)
+
+    def __str__(self) -> str:
+        return f"« LatencyHistogram '{self.name}' count: {self.count}, p50: {self.p50 * 1000:,.1f}ms, p95: {self.p95 * 1000:,.1f}ms, p99: {self.p99 * 1000:,.1f}ms, max: {self.maximum * 1000:,.1f}ms »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 LatencyRecorder class
+#
+# Records how long each named phase of work takes, with a rolling `LatencyHistogram` per phase. Phases are
+# created the first time they're recorded. Phase names are dotted, from general to specific, for example
+# `pulse.chain` and `pulse.chain.ConfidenceIntervalElement`.
+#
+# Time a block with:
+# ```
+# with latency.time("pulse.reconcile"):
+#     reconciled = ...
+# ```
+#
+# The same recorder can be shared by everything involved in a pulse, so `log_summary()` and
+# `to_prometheus_text()` show all phases together.
+#
+# `with_prefix()` gives a recorder that shares the same histograms but puts a prefix on every phase it records,
+# so several markets can share one recorder without mixing their timings, for example `BTC-PERP.pulse.total`.
+#
+class LatencyRecorder:
+    def __init__(self, capacity: int = 1000) -> None:
+        self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.capacity: int = capacity
+        self.prefix: str = ""
+        self.__histograms: typing.Dict[str, LatencyHistogram] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+    def with_prefix(self, prefix: str) -> "LatencyRecorder":
+        prefixed: LatencyRecorder = LatencyRecorder(self.capacity)
+        prefixed.prefix = f"{self.prefix}{prefix}."
+        prefixed.__histograms = self.__histograms
+        prefixed.__lock = self.__lock
+        return prefixed
+
+    @property
+    def histograms(self) -> typing.Sequence[LatencyHistogram]:
+        with self.__lock:
+            return sorted(self.__histograms.values(), key=lambda histogram: histogram.name)
+
+    def histogram(self, phase: str) -> LatencyHistogram:
+        name: str = f"{self.prefix}{phase}"
+        with self.__lock:
+            if name not in self.__histograms:
+                self.__histograms[name] = LatencyHistogram(name, self.capacity)
+            return self.__histograms[name]
+
+    def record(self, phase: str, duration: float) -> None:
+        self.histogram(phase).record(duration)
+
+    @contextlib.contextmanager
+    def time(self, phase: str) -> typing.Iterator[None]:
+        started_at: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started_at)
+
+    def summary(self) -> str:
+        lines: typing.List[str] = [
+            f"{'Phase':<50} {'Count':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'Max ms':>10}"]
+        for histogram in self.histograms:
+            lines += [f"{histogram.name:<50} {histogram.count:>8} {histogram.p50 * 1000:>10,.1f} {histogram.p95 * 1000:>10,.1f} {histogram.p99 * 1000:>10,.1f} {histogram.maximum * 1000:>10,.1f}"]
+        return "\n".join(lines)
+
+    def log_summary(self) -> None:
+        self._logger.info(f"Latency summary:\n{self.summary()}")
+
+    # Prometheus text exposition format, with each phase as a label on a single summary metric.
+    def to_prometheus_text(self) -> str:
+        lines: typing.List[str] = [
+            "# HELP mango_latency_seconds Time taken by each phase of work.",
+            "# TYPE mango_latency_seconds summary"
+        ]
+        for histogram in self.histograms:
+            for quantile in [0.5, 0.95, 0.99]:
+                lines += [
+                    f'mango_latency_seconds{{phase="{histogram.name}",quantile="{quantile}"}} {histogram.percentile(quantile * 100)}']
+            lines += [f'mango_latency_seconds_sum{{phase="{histogram.name}"}} {histogram.sum}']
+            lines += [f'mango_latency_seconds_count{{phase="{histogram.name}"}} {histogram.count}']
+        return "\n".join(lines) + "\n"
+
+    def __str__(self) -> str:
+        return f"« LatencyRecorder [{len(self.histograms)} phases] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 LatencyRecordingTransactionStatusCollector class
+#
+# A `TransactionStatusCollector` that records how long transactions take to confirm (or fail) in a
+# `LatencyRecorder`, then passes the status on to another collector.
+#
+class LatencyRecordingTransactionStatusCollector(TransactionStatusCollector):
+    def __init__(self, latency: LatencyRecorder, inner: TransactionStatusCollector) -> None:
+        super().__init__()
+        self.latency: LatencyRecorder = latency
+        self.inner: TransactionStatusCollector = inner
+
+    def add_transaction(self, status: TransactionStatus) -> None:
+        if status.outcome == TransactionOutcome.SUCCESS:
+            self.latency.record("transaction.confirmation", status.duration.total_seconds())
+        elif status.outcome == TransactionOutcome.FAIL:
+            self.latency.record("transaction.failure", status.duration.total_seconds())
+        self.inner.add_transaction(status)
+
+
+# # 🥭 LatencyMetricsServer class
+#
+# Serves a `LatencyRecorder`'s histograms in Prometheus text format at `/metrics` on the given port, on a
+# daemon thread.
+#
+# The endpoint has no authentication, so it only listens on the loopback interface unless another `host` is
+# given.
+#
+class LatencyMetricsServer(rx.core.typing.Disposable):
+    def __init__(self, latency: LatencyRecorder, port: int, host: str = "127.0.0.1") -> None:
+        self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.latency: LatencyRecorder = latency
+
+        recorder: LatencyRecorder = latency
+
+        class _Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body: bytes = recorder.to_prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: typing.Any) -> None:
+                pass
+
+        self.server: http.server.ThreadingHTTPServer = http.server.ThreadingHTTPServer((host, port), _Handler)
+        self.port: int = self.server.server_address[1]
+        thread: threading.Thread = threading.Thread(
+            target=self.server.serve_forever, name=self.__class__.__name__, daemon=True)
+        thread.start()
+        self._logger.info(f"Serving latency metrics on {host}:{self.port}.")
+
+    def dispose(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __str__(self) -> str:
+        return f"« LatencyMetricsServer on port {self.port} »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
@@ -0,0 +1,417 @@
+# # ⚠ Warning
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN
+# NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+# [🥭 Mango Markets](https://mango.markets/) support is available at:
+#   [Docs](https://docs.mango.markets/)
+#   [Discord](https://discord.gg/67jySBhxrg)
+#   [Twitter](https://twitter.com/mangomarkets)
+#   [Github](https://github.com/blockworks-foundation)
+#   [Email](mailto:hello@blockworks.foundation)
+
+# # 🥭 Decoders
+#
+# This file contains precompiled decoders for the account layouts we parse most often.
+#
+# The `construct` layouts in [layouts](layouts.py) are the reference definitions, but parsing them
+# walks a stream field-by-field and builds a context for every nested struct. That's fine for the
+# occasional account but it dominates the time taken to load a `MangoAccount`, a `Group` or an
+# orderbook side on every pulse.
+#
+# The decoders here are generated from those same `construct` layouts. Each layout is compiled once
+# into a single `struct.Struct` format string (with 16-byte integers read as raw bytes) plus a tree
+# of small builder functions that turn the unpacked values into the same `Container`s and
+# `ListContainer`s the `construct` path would produce. Adapters are still used to convert values so
+# the results are identical.
+#
+# If a layout can't be compiled, or a compiled decoder fails on some data, the `construct` layout is
+# used instead, so the `construct` path remains the reference and the fallback.
+#
+
+import construct
+import logging
+import struct
+import typing
+
+from decimal import Decimal, Context as DecimalContext
+
+from . import layouts
+
+
+_Values = typing.Iterator[typing.Any]
+_Builder = typing.Callable[[_Values], typing.Any]
+_Decoder = typing.Callable[[bytes, int], typing.Any]
+
+_INTEGER_FORMATS: typing.Dict[int, str] = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+# These match the rounding in `FloatI80F48Adapter`, but are created once instead of on every value.
+_I80F48_QUANTUM: Decimal = Decimal('.00000000000000000001')
+_I80F48_CONTEXT: DecimalContext = DecimalContext(prec=100)
+
+
+def _next_value(values: _Values) -> typing.Any:
+    return next(values)
+
+
+def _no_value(values: _Values) -> typing.Any:
+    return None
+
+
+def _compile_bytes_integer(length: int, signed: bool, swapped: bool) -> typing.Tuple[str, _Builder]:
+    if swapped and length in _INTEGER_FORMATS:
+        code = _INTEGER_FORMATS[length]
+        return (code.lower() if signed else code), _next_value
+
+    byteorder: typing.Literal["little", "big"] = "little" if swapped else "big"
+
+    def build_bytes_integer(values: _Values) -> int:
+        return int.from_bytes(next(values), byteorder, signed=signed)
+    return f"{length}s", build_bytes_integer
+
+
+def _compile_opaque(node: typing.Any) -> typing.Tuple[str, _Builder]:
+    # Anything we don't have a specific rule for is read as raw bytes and handed to construct. That's
+    # still a lot quicker than parsing the whole layout with construct, and it keeps the results identical.
+    size = node.sizeof()
+
+    def build_opaque(values: _Values) -> typing.Any:
+        return node.parse(next(values))
+    return f"{size}s", build_opaque
+
+
+def _compile_struct(node: typing.Any) -> typing.Tuple[str, _Builder]:
+    formats: typing.List[str] = []
+    fields: typing.List[typing.Tuple[typing.Optional[str], _Builder]] = []
+    for subcon in node.subcons:
+        field_format, field_builder = _compile(subcon)
+        formats += [field_format]
+        fields += [(subcon.name, field_builder)]
+
+    def build_struct(values: _Values) -> construct.Container[typing.Any]:
+        container: construct.Container[typing.Any] = construct.Container()
+        for name, builder in fields:
+            value = builder(values)
+            if name:
+                container[name] = value
+        return container
+    return "".join(formats), build_struct
+
+
+def _compile_array(node: typing.Any) -> typing.Tuple[str, _Builder]:
+    count: int = node.count
+    element_format, element_builder = _compile(node.subcon)
+
+    def build_array(values: _Values) -> construct.ListContainer[typing.Any]:
+        return construct.ListContainer([element_builder(values) for _ in range(count)])
+    return element_format * count, build_array
+
+
+def _compile_const(node: typing.Any) -> typing.Tuple[str, _Builder]:
+    expected = node.value
+    value_format, value_builder = _compile(node.subcon)
+
+    def build_const(values: _Values) -> typing.Any:
+        value = value_builder(values)
+        if not value == expected:
+            raise construct.ConstError(f"parsing expected {repr(expected)} but parsed {repr(value)}")
+        return value
+    return value_format, build_const
+
+
+def _compile_computed(node: typing.Any) -> typing.Tuple[str, _Builder]:
+    func = node.func
+
+    def build_computed(values: _Values) -> typing.Any:
+        return func(None) if callable(func) else func
+    return "", build_computed
+
+
+def _compile_adapter(node: typing.Any) -> typing.Tuple[str, _Builder]:
+    value_format, value_builder = _compile(node.subcon)
+
+    # Plain integer adapters are by far the most common, so skip the adapter call for them.
+    if type(node) in (layouts.DecimalAdapter, layouts.SignedDecimalAdapter):
+        if value_builder is _next_value:
+            def build_decimal(values: _Values) -> Decimal:
+                return Decimal(next(values))
+            return value_format, build_decimal
+
+        def build_wide_decimal(values: _Values) -> Decimal:
+            return Decimal(value_builder(values))
+        return value_format, build_wide_decimal
+
+    if type(node) is layouts.FloatI80F48Adapter:
+        divisor: Decimal = typing.cast(typing.Any, node).divisor
+
+        def build_i80f48(values: _Values) -> Decimal:
+            divided: Decimal = Decimal(value_builder(values)) / divisor
+            return divided.quantize(_I80F48_QUANTUM, context=_I80F48_CONTEXT)
+        return value_format, build_i80f48
+
+    decode = node._decode
+
+    def build_adapted(values: _Values) -> typing.Any:
+        return decode(value_builder(values), None, None)
+    return value_format, build_adapted
+
+
+# The OrderBookNodeAdapter dispatches on the node's tag to one of the node layouts. We do the same, but with
+# each node layout compiled.
+def _compile_orderbook_node(node: typing.Any) -> typing.Tuple[str, _Builder]:
+    node_decoders: typing.Dict[int, _Decoder] = {
+        0: CompiledLayout(layouts.UNINITIALIZED_BOOK_NODE).unpack_from,
+        1: CompiledLayout(layouts.INNER_BOOK_NODE).unpack_from,
+        2: CompiledLayout(layouts.LEAF_BOOK_NODE).unpack_from,
+        3: CompiledLayout(layouts.FREE_BOOK_NODE).unpack_from,
+        4: CompiledLayout(layouts.LAST_FREE_BOOK_NODE).unpack_from,
+    }
+
+    def build_orderbook_node(values: _Values) -> typing.Any:
+        data: bytes = next(values)
+        tag = int.from_bytes(data[0:4], "little")
+        if tag not in node_decoders:
+            raise Exception(f"Unknown node type tag: {Decimal(tag)}")
+        return node_decoders[tag](data, 0)
+    return f"{layouts._NODE_SIZE}s", build_orderbook_node
+
+
+def _compile(node: typing.Any) -> typing.Tuple[str, _Builder]:
+    if isinstance(node, construct.Renamed):
+        return _compile(node.subcon)
+    if isinstance(node, construct.Struct):
+        return _compile_struct(node)
+    if isinstance(node, construct.Array) and isinstance(node.count, int):
+        return _compile_array(node)
+    if isinstance(node, construct.Const):
+        return _compile_const(node)
+    if isinstance(node, construct.Computed):
+        return _compile_computed(node)
+    if isinstance(node, construct.Padded) and isinstance(node.subcon, construct.Pass.__class__) \
+            and isinstance(node.length, int):
+        return f"{node.length}x", _no_value
+    if isinstance(node, layouts.OrderBookNodeAdapter):
+        return _compile_orderbook_node(node)
+    if isinstance(node, construct.Adapter):
+        return _compile_adapter(node)
+    if isinstance(node, construct.BytesInteger) and isinstance(node.length, int) \
+            and isinstance(node.signed, bool) and isinstance(node.swapped, bool):
+        return _compile_bytes_integer(node.length, node.signed, node.swapped)
+    if isinstance(node, construct.FormatField) and node.fmtstr[0] in "<=":
+        return node.fmtstr[1:], _next_value
+    if isinstance(node, construct.Flag.__class__):
+        return "?", _next_value
+    if isinstance(node, construct.Bytes) and isinstance(node.length, int):
+        return f"{node.length}s", _next_value
+
+    return _compile_opaque(node)
+
+
+# # 🥭 CompiledLayout class
+#
+# A `CompiledLayout` takes a `construct.Struct` layout and compiles it to a single `struct.Struct` and a
+# builder that assembles the unpacked values into a `Container`.
+#
+# A trailing `GreedyRange` of a `Select` (like the events in `PERP_EVENT_QUEUE`) can't be part of a
+# fixed-size format string, so it's handled separately. Each alternative in the `Select` must be a
+# fixed-size `Struct` starting with a `Const` of bytes (apart from a final catch-all), and all alternatives
+# must be the same size. Items are then decoded by looking at the leading bytes of each chunk rather than
+# by trying each alternative in turn.
+#
+class CompiledLayout:
+    def __init__(self, layout: typing.Any) -> None:
+        if not isinstance(layout, construct.Struct):
+            raise Exception(f"Can only compile Struct layouts, not {layout}.")
+
+        self.layout: typing.Any = layout
+        subcons = list(layout.subcons)
+        self.__tail_name: typing.Optional[str] = None
+        self.__tail_size: int = 0
+        self.__tail_decoders: typing.Dict[bytes, _Decoder] = {}
+        self.__tail_default: typing.Optional[_Decoder] = None
+        self.__tail_tag_size: int = 0
+        if len(subcons) > 0:
+            tail = subcons[-1]
+            greedy = tail.subcon if isinstance(tail, construct.Renamed) else tail
+            if isinstance(greedy, construct.GreedyRange):
+                if tail.name is None:
+                    raise Exception("Can only compile a GreedyRange that has a name.")
+                self.__compile_tail(tail.name, greedy.subcon)
+                subcons = subcons[:-1]
+
+        formats: typing.List[str] = []
+        fields: typing.List[typing.Tuple[typing.Optional[str], _Builder]] = []
+        for subcon in subcons:
+            field_format, field_builder = _compile(subcon)
+            formats += [field_format]
+            fields += [(subcon.name, field_builder)]
+        self.__fields = fields
+        self.__struct = struct.Struct("<" + "".join(formats))
+
+    @property
+    def size(self) -> int:
+        return self.__struct.size
+
+    def __compile_tail(self, name: str, select: typing.Any) -> None:
+        if not isinstance(select, construct.Select):
+            raise Exception(f"Can only compile a GreedyRange of a Select, not {select}.")
+
+        sizes: typing.Set[int] = set()
+        for alternative in select.subcons:
+            if self.__tail_default is not None:
+                raise Exception("Catch-all alternative must be the last alternative in the Select.")
+            decoder = CompiledLayout(alternative)
+            sizes.add(decoder.size)
+            first = typing.cast(typing.Any, alternative).subcons[0]
+            first = first.subcon if isinstance(first, construct.Renamed) else first
+            if isinstance(first, construct.Const) and isinstance(first.value, bytes):
+                self.__tail_decoders[first.value] = decoder.unpack_from
+                self.__tail_tag_size = len(first.value)
+            else:
+                self.__tail_default = decoder.unpack_from
+
+        tag_sizes = set(len(tag) for tag in self.__tail_decoders)
+        if len(sizes) != 1 or len(tag_sizes) > 1:
+            raise Exception("Can only compile Select alternatives of identical sizes and tags.")
+
+        self.__tail_name = name
+        self.__tail_size = sizes.pop()
+
+    def unpack_from(self, data: bytes, offset: int = 0) -> construct.Container[typing.Any]:
+        values = iter(self.__struct.unpack_from(data, offset))
+        container: construct.Container[typing.Any] = construct.Container()
+        for name, builder in self.__fields:
+            value = builder(values)
+            if name:
+                container[name] = value
+
+        if self.__tail_name is not None:
+            items: construct.ListContainer[typing.Any] = construct.ListContainer()
+            position = offset + self.__struct.size
+            while position + self.__tail_size <= len(data):
+                tag = data[position:position + self.__tail_tag_size]
+                decoder = self.__tail_decoders.get(tag, self.__tail_default)
+                if decoder is None:
+                    break
+                items += [decoder(data, position)]
+                position += self.__tail_size
+            container[self.__tail_name] = items
+
+        return container
+
+    def __str__(self) -> str:
+        return f"« CompiledLayout [{self.__struct.size} bytes] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 FastLayout class
+#
+# A `FastLayout` can be used in place of a `construct` layout for parsing. It parses using a
+# `CompiledLayout` where it can, falling back to the original `construct` layout if the layout can't
+# be compiled or the compiled decoder fails.
+#
+class FastLayout:
+    def __init__(self, layout: typing.Any) -> None:
+        self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.layout: typing.Any = layout
+        self.compiled: typing.Optional[CompiledLayout] = None
+        try:
+            self.compiled = CompiledLayout(layout)
+        except Exception as exception:
+            self._logger.warning(f"Could not compile layout - falling back to construct parsing: {exception}")
+
+    def sizeof(self) -> int:
+        size: int = self.layout.sizeof()
+        return size
+
+    def parse(self, data: bytes) -> typing.Any:
+        if self.compiled is not None:
+            try:
+                return self.compiled.unpack_from(bytes(data))
+            except Exception as exception:
+                self._logger.debug(f"Compiled decoder failed - falling back to construct parsing: {exception}")
+
+        return self.layout.parse(data)
+
+    def __str__(self) -> str:
+        return f"« FastLayout {self.compiled} »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 LazyOrderBookNodes class
+#
+# A `LazyOrderBookNodes` can be used in place of the `nodes` array of an `ORDERBOOK_SIDE`. Nothing is
+# decoded up-front - each node is decoded (and then cached) the first time it's accessed by index.
+#
+# Walking the book from its root only ever touches the nodes on the path to the leaves being returned,
+# so if only the best few orders are needed there's no need to pay for decoding all `MAX_BOOK_NODES`
+# nodes.
+#
+class LazyOrderBookNodes:
+    def __init__(self, data: bytes, offset: int = 0, count: int = layouts.MAX_BOOK_NODES) -> None:
+        if len(data) < offset + (count * layouts._NODE_SIZE):
+            raise Exception(
+                f"Data length ({len(data)}) is too short for {count} orderbook nodes starting at offset {offset}.")
+        self.data: bytes = data
+        self.offset: int = offset
+        self.count: int = count
+        self.__decoded: typing.Dict[int, typing.Any] = {}
+
+    @property
+    def decoded_count(self) -> int:
+        return len(self.__decoded)
+
+    def __getitem__(self, index: int) -> typing.Any:
+        if index < 0:
+            index += self.count
+        if index < 0 or index >= self.count:
+            raise IndexError(f"Orderbook node index {index} out of range.")
+
+        if index not in self.__decoded:
+            self.__decoded[index] = decode_orderbook_node(self.data, self.offset + (index * layouts._NODE_SIZE))
+        return self.__decoded[index]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __str__(self) -> str:
+        return f"« LazyOrderBookNodes [{self.decoded_count} of {self.count} decoded] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+MANGO_ACCOUNT = FastLayout(layouts.MANGO_ACCOUNT)
+GROUP = FastLayout(layouts.GROUP)
+CACHE = FastLayout(layouts.CACHE)
+ORDERBOOK_SIDE = FastLayout(layouts.ORDERBOOK_SIDE)
+ORDERBOOK_SIDE_HEADER = FastLayout(layouts.ORDERBOOK_SIDE_HEADER)
+PERP_EVENT_QUEUE = FastLayout(layouts.PERP_EVENT_QUEUE)
+
+ORDERBOOK_NODES: typing.Dict[int, FastLayout] = {
+    0: FastLayout(layouts.UNINITIALIZED_BOOK_NODE),
+    1: FastLayout(layouts.INNER_BOOK_NODE),
+    2: FastLayout(layouts.LEAF_BOOK_NODE),
+    3: FastLayout(layouts.FREE_BOOK_NODE),
+    4: FastLayout(layouts.LAST_FREE_BOOK_NODE),
+}
+
+
+# # 🥭 decode_orderbook_node function
+#
+# Decodes the single orderbook node at the given offset, using the node's tag to pick the layout the same
+# way `OrderBookNodeAdapter` does.
+#
+def decode_orderbook_node(data: bytes, offset: int) -> typing.Any:
+    node_data = data[offset:offset + layouts._NODE_SIZE]
+    tag = int.from_bytes(node_data[0:4], "little")
+    if tag not in ORDERBOOK_NODES:
+        raise Exception(f"Unknown node type tag: {Decimal(tag)}")
+    return ORDERBOOK_NODES[tag].parse(node_data)
@@ -993,6 +993,13 @@ ORDERBOOK_SIDE = construct.Struct(
     "nodes" / construct.Array(MAX_BOOK_NODES, OrderBookNodeAdapter())
 )
 
+# # 🥭 ORDERBOOK_SIDE_HEADER
+#
+# This is just the fields of `ORDERBOOK_SIDE` that come before the nodes. It allows loading the header
+# without decoding all `MAX_BOOK_NODES` nodes, so the nodes can be decoded only as they're needed.
+#
+ORDERBOOK_SIDE_HEADER = construct.Struct(*ORDERBOOK_SIDE.subcons[:-1])
+
 
 # # 🥭 FILL_EVENT
 #
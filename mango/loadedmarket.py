@@ -41,14 +41,16 @@ class LoadedMarket(Market):
     def asks_address(self) -> PublicKey:
         raise NotImplementedError("LoadedMarket.asks_address() is not implemented on the base type.")
 
-    def parse_account_info_to_orders(self, account_info: AccountInfo) -> typing.Sequence[Order]:
+    # If `depth` is specified, markets that can walk their book lazily only return (and only decode) the best
+    # `depth` orders. Other markets may return more.
+    def parse_account_info_to_orders(self, account_info: AccountInfo, depth: typing.Optional[int] = None) -> typing.Sequence[Order]:
         raise NotImplementedError("LoadedMarket.parse_account_info_to_orders() is not implemented on the base type.")
 
-    def parse_account_infos_to_orderbook(self, bids_account_info: AccountInfo, asks_account_info: AccountInfo) -> OrderBook:
-        bids_orderbook = self.parse_account_info_to_orders(bids_account_info)
-        asks_orderbook = self.parse_account_info_to_orders(asks_account_info)
+    def parse_account_infos_to_orderbook(self, bids_account_info: AccountInfo, asks_account_info: AccountInfo, depth: typing.Optional[int] = None) -> OrderBook:
+        bids_orderbook = self.parse_account_info_to_orders(bids_account_info, depth)
+        asks_orderbook = self.parse_account_info_to_orders(asks_account_info, depth)
         return OrderBook(self.symbol, self.lot_size_converter, bids_orderbook, asks_orderbook)
 
-    def fetch_orderbook(self, context: Context) -> OrderBook:
+    def fetch_orderbook(self, context: Context, depth: typing.Optional[int] = None) -> OrderBook:
         [bids_info, asks_info] = AccountInfo.load_multiple(context, [self.bids_address, self.asks_address])
-        return self.parse_account_infos_to_orderbook(bids_info, asks_info)
+        return self.parse_account_infos_to_orderbook(bids_info, asks_info, depth)
@@ -16,8 +16,11 @@ from .modelstatebuilder import SpotPollingModelStateBuilder as SpotPollingModelS
 from .modelstatebuilder import WebsocketModelStateBuilder as WebsocketModelStateBuilder
 from .modelstatebuilderfactory import ModelUpdateMode as ModelUpdateMode
 from .modelstatebuilderfactory import model_state_builder_factory as model_state_builder_factory
+from .modelstatebuilderfactory import SharedModelStateWatchers as SharedModelStateWatchers
 from .orderreconciler import AlwaysReplaceOrderReconciler as AlwaysReplaceOrderReconciler
 from .orderreconciler import NullOrderReconciler as NullOrderReconciler
 from .orderreconciler import OrderReconciler as OrderReconciler
+from .pulsetrigger import PulseMode as PulseMode
+from .pulsetrigger import StateChangePulseTrigger as StateChangePulseTrigger
 from .reconciledorders import ReconciledOrders as ReconciledOrders
 from .toleranceorderreconciler import ToleranceOrderReconciler as ToleranceOrderReconciler
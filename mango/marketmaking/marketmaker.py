@@ -16,6 +16,7 @@
 
 import logging
 import mango
+import time
 import traceback
 import typing
 
@@ -25,6 +26,7 @@ from decimal import Decimal
 from ..observables import EventSource
 from .orderreconciler import OrderReconciler
 from .orderchain.chain import Chain
+from .reconciledorders import ReconciledOrders
 
 
 # # 🥭 MarketMaker class
@@ -35,7 +37,8 @@ class MarketMaker:
     def __init__(self, wallet: mango.Wallet, market: mango.Market,
                  market_instruction_builder: mango.MarketInstructionBuilder,
                  desired_orders_chain: Chain, order_reconciler: OrderReconciler,
-                 redeem_threshold: typing.Optional[Decimal]) -> None:
+                 redeem_threshold: typing.Optional[Decimal],
+                 latency: typing.Optional[mango.LatencyRecorder] = None) -> None:
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
         self.wallet: mango.Wallet = wallet
         self.market: mango.Market = market
@@ -43,6 +46,7 @@ class MarketMaker:
         self.desired_orders_chain: Chain = desired_orders_chain
         self.order_reconciler: OrderReconciler = order_reconciler
         self.redeem_threshold: typing.Optional[Decimal] = redeem_threshold
+        self.latency: mango.LatencyRecorder = latency or mango.LatencyRecorder()
 
         self.pulse_complete: EventSource[datetime] = EventSource[datetime]()
         self.pulse_error: EventSource[Exception] = EventSource[Exception]()
@@ -50,13 +54,17 @@ class MarketMaker:
         self.buy_client_ids: typing.List[int] = []
         self.sell_client_ids: typing.List[int] = []
 
-    def pulse(self, context: mango.Context, model_state: mango.ModelState) -> None:
+    # Returns the reconciled orders the pulse acted on, with the client IDs of any placed orders, or None if the
+    # pulse failed.
+    def pulse(self, context: mango.Context, model_state: mango.ModelState) -> typing.Optional[ReconciledOrders]:
         try:
+            started_at: float = time.perf_counter()
             self._logger.debug(f"[{context.name}] Pulse started with oracle price:\n    {model_state.price}")
 
             payer = mango.CombinableInstructions.from_wallet(self.wallet)
 
-            desired_orders = self.desired_orders_chain.process(context, model_state)
+            with self.latency.time("pulse.chain"):
+                desired_orders = self.desired_orders_chain.process(context, model_state, self.latency)
 
             # This is here to give the orderchain the chance to look at state and set `not_quoting`. Any
             # element in the orderchain can set this, rather than just return an empty list of desired
@@ -66,12 +74,15 @@ class MarketMaker:
             # code has access to the `model_state`.
             if model_state.not_quoting:
                 self._logger.info(f"[{context.name}] Market-maker not quoting - model_state.not_quoting is set.")
-                return
+                not_quoting = ReconciledOrders()
+                not_quoting.to_keep = list(model_state.current_orders())
+                return not_quoting
 
             existing_orders = model_state.current_orders()
             self._logger.debug(f"""Before reconciliation: all owned orders on current orderbook [{model_state.market.symbol}]:
     {mango.indent_collection_as_str(existing_orders)}""")
-            reconciled = self.order_reconciler.reconcile(model_state, existing_orders, desired_orders)
+            with self.latency.time("pulse.reconcile"):
+                reconciled = self.order_reconciler.reconcile(model_state, existing_orders, desired_orders)
             self._logger.debug(f"""After reconciliation
 Keep:
     {mango.indent_collection_as_str(reconciled.to_keep)}
@@ -82,6 +93,7 @@ Place:
 Ignore:
     {mango.indent_collection_as_str(reconciled.to_ignore)}""")
 
+            building_started_at: float = time.perf_counter()
             cancellations = mango.CombinableInstructions.empty()
             # Perp markets have a CANCEL_ALL instruction that Spot and Serum markets don't. Use it if we can.
             if reconciled.cancelling_all and isinstance(self.market_instruction_builder, mango.PerpMarketInstructionBuilder):
@@ -96,6 +108,7 @@ Ignore:
                     cancellations += cancel
 
             place_orders = mango.CombinableInstructions.empty()
+            placing: typing.List[mango.Order] = []
             for to_place in reconciled.to_place:
                 desired_client_id: int = context.generate_client_id()
                 to_place_with_client_id = to_place.with_client_id(desired_client_id)
@@ -103,26 +116,51 @@ Ignore:
                 self._logger.info(f"Placing {self.market.symbol} {to_place_with_client_id}")
                 place_order = self.market_instruction_builder.build_place_order_instructions(to_place_with_client_id)
                 place_orders += place_order
-
-            crank = self.market_instruction_builder.build_crank_instructions(model_state.accounts_to_crank)
+                placing += [to_place_with_client_id]
+            reconciled.to_place = placing
+
+            # Cancels don't depend on each other, and neither do cranks, so they can be packed into fewer
+            # transactions if the context allows it.
+            cancellations = cancellations.as_independent("cancel")
+            crank = self.market_instruction_builder.build_crank_instructions(
+                model_state.accounts_to_crank).as_independent("crank")
             settle = self.market_instruction_builder.build_settle_instructions()
 
             redeem = mango.CombinableInstructions.empty()
             if self.redeem_threshold is not None and model_state.inventory.liquidity_incentives.value > self.redeem_threshold:
                 redeem = self.market_instruction_builder.build_redeem_instructions()
 
+            self.latency.record("pulse.build_instructions", time.perf_counter() - building_started_at)
+
             # Don't bother if we have no orders to change
             if len(cancellations.instructions) + len(place_orders.instructions) > 0:
-                (payer + cancellations + place_orders + crank + settle + redeem).execute(context)
-
+                with self.latency.time("pulse.send"):
+                    all_instructions = payer + cancellations + place_orders + crank + settle + redeem
+                    if context.transaction_pipelining:
+                        # Places, settles and redeems aren't sent until the cancels before them are confirmed,
+                        # and settles and redeems aren't sent until the cranks before them are confirmed. Solana
+                        # doesn't have to process transactions in the order they're sent, so just sending the
+                        # cancels first wouldn't stop new orders landing before the old ones are cancelled.
+                        # Everything else is sent at once. Waiting for the signatures means the pulse ends when
+                        # the sends do, and a failed send is raised here just like it would be from `execute()`.
+                        submission = all_instructions.execute_pipelined(
+                            context, dependencies=[("cancel", None), ("crank", None)], wait_for_confirmation=True)
+                        submission.signatures()
+                    else:
+                        all_instructions.execute(context)
+
+            self.latency.record("pulse.total", time.perf_counter() - started_at)
             self.pulse_complete.on_next(datetime.now())
+            return reconciled
         except (mango.RateLimitException, mango.NodeIsBehindException, mango.BlockhashNotFoundException, mango.FailedToFetchBlockhashException) as common_exception:
             # Don't bother with a long traceback for these common problems.
             self._logger.error(f"[{context.name}] Market-maker problem on pulse: {common_exception}")
             self.pulse_error.on_next(common_exception)
+            return None
         except Exception as exception:
             self._logger.error(f"[{context.name}] Market-maker error on pulse:\n{traceback.format_exc()}")
             self.pulse_error.on_next(exception)
+            return None
 
     def __str__(self) -> str:
         return f"""« MarketMaker for market '{self.market.symbol}' »"""
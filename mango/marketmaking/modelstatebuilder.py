@@ -16,13 +16,16 @@
 import abc
 import logging
 import mango
+import rx
 import time
 import typing
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from decimal import Decimal
 from solana.publickey import PublicKey
 
 from ..instrumentvalue import InstrumentValue
+from ..latencyrecorder import LatencyRecorder
 from ..modelstate import ModelState
 from ..token import Token
 
@@ -39,6 +42,7 @@ from ..calculators.spotcollateralcalculator import SpotCollateralCalculator
 class ModelStateBuilder(metaclass=abc.ABCMeta):
     def __init__(self) -> None:
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.latency: LatencyRecorder = LatencyRecorder()
 
     @abc.abstractmethod
     def build(self, context: mango.Context) -> ModelState:
@@ -53,12 +57,16 @@ class ModelStateBuilder(metaclass=abc.ABCMeta):
 
 # # 🥭 WebsocketModelStateBuilder class
 #
-# Base class for building a `ModelState` through polling.
+# Builds a `ModelState` that is kept up-to-date through websockets.
+#
+# `changes`, if available, is an observable that emits each time any of the model state's underlying data
+# changes, so event-driven code can react to changes instead of polling.
 #
 class WebsocketModelStateBuilder(ModelStateBuilder):
-    def __init__(self, model_state: ModelState) -> None:
+    def __init__(self, model_state: ModelState, changes: typing.Optional[rx.core.typing.Observable[typing.Any]] = None) -> None:
         super().__init__()
         self.model_state: ModelState = model_state
+        self.changes: typing.Optional[rx.core.typing.Observable[typing.Any]] = changes
 
     def build(self, context: mango.Context) -> ModelState:
         return self.model_state
@@ -74,10 +82,12 @@ class WebsocketModelStateBuilder(ModelStateBuilder):
 class PollingModelStateBuilder(ModelStateBuilder):
     def __init__(self) -> None:
         super().__init__()
+        self.__oracle_executor: typing.Optional[ThreadPoolExecutor] = None
 
     def build(self, context: mango.Context) -> ModelState:
         started_at = time.time()
-        built: ModelState = self.poll(context)
+        with self.latency.time("model_state.poll"):
+            built: ModelState = self.poll(context)
         time_taken = time.time() - started_at
         self._logger.debug(f"Poll for model state complete. Time taken: {time_taken:.2f} seconds.")
         return built
@@ -86,6 +96,37 @@ class PollingModelStateBuilder(ModelStateBuilder):
     def poll(self, context: mango.Context) -> ModelState:
         raise NotImplementedError("PollingModelStateBuilder.poll() is not implemented on the base type.")
 
+    # Loads the accounts at `addresses` and fetches the oracle price in a single round trip.
+    #
+    # If the oracle's price comes from on-chain accounts, they're loaded in the same `getMultipleAccounts`
+    # call as the other accounts. Otherwise (for example an HTTP price) the price is fetched on another thread
+    # while the accounts load.
+    #
+    # The returned `AccountInfo`s are in the same order as `addresses`.
+    def load_accounts_and_price(self, context: mango.Context, oracle: mango.Oracle, addresses: typing.Sequence[PublicKey]) -> typing.Tuple[typing.Sequence[mango.AccountInfo], mango.Price]:
+        price_addresses: typing.Sequence[PublicKey] = oracle.price_account_addresses(context)
+        if len(price_addresses) > 0:
+            with self.latency.time("model_state.fetch"):
+                account_infos: typing.Sequence[mango.AccountInfo] = mango.AccountInfo.load_multiple(
+                    context, [*addresses, *price_addresses])
+            with self.latency.time("model_state.parse.oracle"):
+                price: mango.Price = oracle.parse_price(account_infos[len(addresses):])
+            return account_infos[:len(addresses)], price
+
+        def __fetch_price() -> mango.Price:
+            with self.latency.time("model_state.oracle"):
+                return oracle.fetch_price(context)
+
+        price_future: Future[mango.Price] = self.__get_oracle_executor().submit(__fetch_price)
+        with self.latency.time("model_state.fetch"):
+            account_infos = mango.AccountInfo.load_multiple(context, addresses)
+        return account_infos, price_future.result()
+
+    def __get_oracle_executor(self) -> ThreadPoolExecutor:
+        if self.__oracle_executor is None:
+            self.__oracle_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="OracleFetch")
+        return self.__oracle_executor
+
     def from_values(self, order_owner: PublicKey, market: mango.Market, group: mango.Group, account: mango.Account,
                     price: mango.Price, placed_orders_container: mango.PlacedOrdersContainer,
                     inventory: mango.Inventory, orderbook: mango.OrderBook, event_queue: mango.EventQueue) -> ModelState:
@@ -150,24 +191,29 @@ class SerumPollingModelStateBuilder(PollingModelStateBuilder):
             self.market.asks_address,
             self.market.event_queue_address
         ]
-        account_infos: typing.Sequence[mango.AccountInfo] = mango.AccountInfo.load_multiple(context, addresses)
-        group: mango.Group = mango.Group.parse_with_context(context, account_infos[0])
-        cache: mango.Cache = mango.Cache.parse(account_infos[1])
-        account: mango.Account = mango.Account.parse(account_infos[2], group, cache)
-        placed_orders_container: mango.PlacedOrdersContainer = mango.OpenOrders.parse(
-            account_infos[3], self.market.base.decimals, self.market.quote.decimals)
+        account_infos, price = self.load_accounts_and_price(context, self.oracle, addresses)
+        with self.latency.time("model_state.parse.group"):
+            group: mango.Group = mango.Group.parse_with_context(context, account_infos[0])
+        with self.latency.time("model_state.parse.cache"):
+            cache: mango.Cache = mango.Cache.parse(account_infos[1])
+        with self.latency.time("model_state.parse.account"):
+            account: mango.Account = mango.Account.parse(account_infos[2], group, cache)
+        with self.latency.time("model_state.parse.open_orders"):
+            placed_orders_container: mango.PlacedOrdersContainer = mango.OpenOrders.parse(
+                account_infos[3], self.market.base.decimals, self.market.quote.decimals)
 
         # Serum markets don't accrue MNGO liquidity incentives
         mngo_accrued: InstrumentValue = InstrumentValue(group.liquidity_incentive_token, Decimal(0))
 
-        base_inventory_token_account = mango.TokenAccount.parse(account_infos[4], self.base_token)
-        quote_inventory_token_account = mango.TokenAccount.parse(account_infos[5], self.quote_token)
+        with self.latency.time("model_state.parse.token_accounts"):
+            base_inventory_token_account = mango.TokenAccount.parse(account_infos[4], self.base_token)
+            quote_inventory_token_account = mango.TokenAccount.parse(account_infos[5], self.quote_token)
 
-        orderbook: mango.OrderBook = self.market.parse_account_infos_to_orderbook(account_infos[6], account_infos[7])
+        with self.latency.time("model_state.parse.orderbook"):
+            orderbook: mango.OrderBook = self.market.parse_account_infos_to_orderbook(account_infos[6], account_infos[7])
 
-        event_queue: mango.EventQueue = mango.SerumEventQueue.parse(account_infos[8])
-
-        price: mango.Price = self.oracle.fetch_price(context)
+        with self.latency.time("model_state.parse.event_queue"):
+            event_queue: mango.EventQueue = mango.SerumEventQueue.parse(account_infos[8])
 
         available: Decimal = (base_inventory_token_account.value.value * price.mid_price) + \
             quote_inventory_token_account.value.value
@@ -222,10 +268,13 @@ class SpotPollingModelStateBuilder(PollingModelStateBuilder):
             self.market.event_queue_address,
             *self.all_open_orders_addresses
         ]
-        account_infos: typing.Sequence[mango.AccountInfo] = mango.AccountInfo.load_multiple(context, addresses)
-        group: mango.Group = mango.Group.parse_with_context(context, account_infos[0])
-        cache: mango.Cache = mango.Cache.parse(account_infos[1])
-        account: mango.Account = mango.Account.parse(account_infos[2], group, cache)
+        account_infos, price = self.load_accounts_and_price(context, self.oracle, addresses)
+        with self.latency.time("model_state.parse.group"):
+            group: mango.Group = mango.Group.parse_with_context(context, account_infos[0])
+        with self.latency.time("model_state.parse.cache"):
+            cache: mango.Cache = mango.Cache.parse(account_infos[1])
+        with self.latency.time("model_state.parse.account"):
+            account: mango.Account = mango.Account.parse(account_infos[2], group, cache)
 
         # Update our stash of OpenOrders addresses for next time, in case new OpenOrders accounts were added
         self.all_open_orders_addresses = account.spot_open_orders
@@ -238,10 +287,11 @@ class SpotPollingModelStateBuilder(PollingModelStateBuilder):
             if basket_token.spot_open_orders is not None and str(basket_token.spot_open_orders) in spot_open_orders_account_infos_by_address:
                 account_info: mango.AccountInfo = spot_open_orders_account_infos_by_address[str(
                     basket_token.spot_open_orders)]
-                open_orders: mango.OpenOrders = mango.OpenOrders.parse(
-                    account_info,
-                    basket_token.base_instrument.decimals,
-                    account.shared_quote_token.decimals)
+                with self.latency.time("model_state.parse.open_orders"):
+                    open_orders: mango.OpenOrders = mango.OpenOrders.parse(
+                        account_info,
+                        basket_token.base_instrument.decimals,
+                        account.shared_quote_token.decimals)
                 all_open_orders[str(basket_token.spot_open_orders)] = open_orders
 
         placed_orders_container: mango.PlacedOrdersContainer = all_open_orders[str(self.open_orders_address)]
@@ -260,11 +310,11 @@ class SpotPollingModelStateBuilder(PollingModelStateBuilder):
                                                      base_value,
                                                      quote_value)
 
-        orderbook: mango.OrderBook = self.market.parse_account_infos_to_orderbook(account_infos[3], account_infos[4])
-
-        event_queue: mango.EventQueue = mango.SerumEventQueue.parse(account_infos[5])
+        with self.latency.time("model_state.parse.orderbook"):
+            orderbook: mango.OrderBook = self.market.parse_account_infos_to_orderbook(account_infos[3], account_infos[4])
 
-        price: mango.Price = self.oracle.fetch_price(context)
+        with self.latency.time("model_state.parse.event_queue"):
+            event_queue: mango.EventQueue = mango.SerumEventQueue.parse(account_infos[5])
 
         return self.from_values(self.order_owner, self.market, group, account, price, placed_orders_container, inventory, orderbook, event_queue)
 
@@ -303,10 +353,13 @@ class PerpPollingModelStateBuilder(PollingModelStateBuilder):
             self.market.underlying_perp_market.asks,
             self.market.event_queue_address
         ]
-        account_infos: typing.Sequence[mango.AccountInfo] = mango.AccountInfo.load_multiple(context, addresses)
-        group: mango.Group = mango.Group.parse_with_context(context, account_infos[0])
-        cache: mango.Cache = mango.Cache.parse(account_infos[1])
-        account: mango.Account = mango.Account.parse(account_infos[2], group, cache)
+        account_infos, price = self.load_accounts_and_price(context, self.oracle, addresses)
+        with self.latency.time("model_state.parse.group"):
+            group: mango.Group = mango.Group.parse_with_context(context, account_infos[0])
+        with self.latency.time("model_state.parse.cache"):
+            cache: mango.Cache = mango.Cache.parse(account_infos[1])
+        with self.latency.time("model_state.parse.account"):
+            account: mango.Account = mango.Account.parse(account_infos[2], group, cache)
 
         slot = group.slot_by_perp_market_address(self.market.address)
         perp_account = account.perp_accounts_by_index[slot.index]
@@ -325,11 +378,11 @@ class PerpPollingModelStateBuilder(PollingModelStateBuilder):
                                                      base_token_value,
                                                      quote_token_value)
 
-        orderbook: mango.OrderBook = self.market.parse_account_infos_to_orderbook(account_infos[3], account_infos[4])
-
-        event_queue: mango.EventQueue = mango.PerpEventQueue.parse(account_infos[5], self.market.lot_size_converter)
+        with self.latency.time("model_state.parse.orderbook"):
+            orderbook: mango.OrderBook = self.market.parse_account_infos_to_orderbook(account_infos[3], account_infos[4])
 
-        price: mango.Price = self.oracle.fetch_price(context)
+        with self.latency.time("model_state.parse.event_queue"):
+            event_queue: mango.EventQueue = mango.PerpEventQueue.parse(account_infos[5], self.market.lot_size_converter)
 
         return self.from_values(self.order_owner, self.market, group, account, price, placed_orders_container, inventory, orderbook, event_queue)
 
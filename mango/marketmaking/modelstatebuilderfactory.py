@@ -15,6 +15,8 @@
 
 import enum
 import mango
+import rx
+import rx.operators
 import typing
 
 from solana.publickey import PublicKey
@@ -36,16 +38,68 @@ class ModelUpdateMode(enum.Enum):
         return f"{self}"
 
 
+# # 🥭 SharedModelStateWatchers class
+#
+# The group, cache and account watchers are the same for every market traded by an account, and the group
+# and cache are large accounts to parse. This builds them once so `ModelState`s for several markets can
+# share them.
+#
+# Spot open orders watchers are also shared, since every spot market's inventory depends on all the account's
+# spot open orders. The subscriptions created for each one are tracked so each market's `changes` can include
+# them.
+#
+class SharedModelStateWatchers:
+    def __init__(self, context: mango.Context, websocket_manager: mango.WebSocketSubscriptionManager,
+                 health_check: mango.HealthCheck, group: mango.Group, account: mango.Account) -> None:
+        first_subscription: int = len(websocket_manager.subscriptions)
+        self.group_watcher: mango.Watcher[mango.Group] = mango.build_group_watcher(
+            context, websocket_manager, health_check, group)
+        cache = mango.Cache.load(context, group.cache)
+        self.cache_watcher: mango.Watcher[mango.Cache] = mango.build_cache_watcher(
+            context, websocket_manager, health_check, cache, group)
+        self.account_subscription: mango.WebSocketSubscription[mango.Account]
+        self.account_watcher: mango.Watcher[mango.Account]
+        self.account_subscription, self.account_watcher = mango.build_account_watcher(
+            context, websocket_manager, health_check, account, self.group_watcher, self.cache_watcher)
+        self.subscriptions: typing.Sequence[mango.WebSocketSubscription[typing.Any]] = list(
+            websocket_manager.subscriptions[first_subscription:])
+
+        self.__spot_open_orders_watchers: typing.Dict[str, typing.Tuple[mango.Watcher[mango.OpenOrders], typing.Sequence[mango.WebSocketSubscription[typing.Any]]]] = {}
+
+    def spot_open_orders_watcher(self, context: mango.Context, websocket_manager: mango.WebSocketSubscriptionManager,
+                                 health_check: mango.HealthCheck, wallet: mango.Wallet, account: mango.Account,
+                                 group: mango.Group, spot_market: mango.SpotMarket) -> typing.Tuple[mango.Watcher[mango.OpenOrders], typing.Sequence[mango.WebSocketSubscription[typing.Any]]]:
+        if spot_market.symbol not in self.__spot_open_orders_watchers:
+            first_subscription: int = len(websocket_manager.subscriptions)
+            watcher = mango.build_spot_open_orders_watcher(
+                context, websocket_manager, health_check, wallet, account, group, spot_market)
+            self.__spot_open_orders_watchers[spot_market.symbol] = (
+                watcher, list(websocket_manager.subscriptions[first_subscription:]))
+        return self.__spot_open_orders_watchers[spot_market.symbol]
+
+    def __str__(self) -> str:
+        return f"« SharedModelStateWatchers [{len(self.subscriptions)} subscriptions, {len(self.__spot_open_orders_watchers)} spot open orders] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
 # # 🥭 ModelStateBuilder class
 #
 # Base class for building a `ModelState` through polling or websockets.
 #
+# Passing the same `SharedModelStateWatchers` when building for several markets means the group, cache and
+# account are only subscribed to and parsed once. (It's only used for WEBSOCKET mode.)
+#
 def model_state_builder_factory(mode: ModelUpdateMode, context: mango.Context, disposer: mango.DisposePropagator,
                                 websocket_manager: mango.WebSocketSubscriptionManager, health_check: mango.HealthCheck,
                                 wallet: mango.Wallet, group: mango.Group, account: mango.Account,
-                                market: mango.Market, oracle: mango.Oracle) -> ModelStateBuilder:
+                                market: mango.Market, oracle: mango.Oracle,
+                                shared_watchers: typing.Optional["SharedModelStateWatchers"] = None) -> ModelStateBuilder:
     if mode == ModelUpdateMode.WEBSOCKET:
-        return _websocket_model_state_builder_factory(context, disposer, websocket_manager, health_check, wallet, group, account, market, oracle)
+        shared: SharedModelStateWatchers = shared_watchers or SharedModelStateWatchers(
+            context, websocket_manager, health_check, group, account)
+        return _websocket_model_state_builder_factory(context, disposer, websocket_manager, health_check, wallet, group, account, market, oracle, shared)
     else:
         return _polling_model_state_builder_factory(context, wallet, group, account, market, oracle)
 
@@ -106,15 +160,17 @@ def _websocket_model_state_builder_factory(context: mango.Context, disposer: man
                                            websocket_manager: mango.WebSocketSubscriptionManager,
                                            health_check: mango.HealthCheck, wallet: mango.Wallet,
                                            group: mango.Group, account: mango.Account, market: mango.Market,
-                                           oracle: mango.Oracle) -> ModelStateBuilder:
-    group_watcher = mango.build_group_watcher(context, websocket_manager, health_check, group)
-    cache = mango.Cache.load(context, group.cache)
-    cache_watcher = mango.build_cache_watcher(context, websocket_manager, health_check, cache, group)
-    account_subscription, latest_account_observer = mango.build_account_watcher(
-        context, websocket_manager, health_check, account, group_watcher, cache_watcher)
+                                           oracle: mango.Oracle, shared: SharedModelStateWatchers) -> ModelStateBuilder:
+    group_watcher = shared.group_watcher
+    cache_watcher = shared.cache_watcher
+    account_subscription = shared.account_subscription
+    latest_account_observer = shared.account_watcher
+    first_market_subscription: int = len(websocket_manager.subscriptions)
+    shared_subscriptions: typing.List[mango.WebSocketSubscription[typing.Any]] = [*shared.subscriptions]
 
     initial_price = oracle.fetch_price(context)
-    price_feed = oracle.to_streaming_observable(context)
+    # Shared, so the model state's price and its change notifications come from the same fetches.
+    price_feed = oracle.to_streaming_observable(context).pipe(rx.operators.share())
     latest_price_observer = mango.LatestItemObserverSubscriber(initial_price)
     price_disposable = price_feed.subscribe(latest_price_observer)
     disposer.add_disposable(price_disposable)
@@ -147,8 +203,9 @@ def _websocket_model_state_builder_factory(context: mango.Context, disposer: man
                     raise Exception(f"Could not find spot market {spot_market_symbol}")
                 if not isinstance(spot_market, mango.SpotMarket):
                     raise Exception(f"Market {spot_market_symbol} is not a spot market")
-                oo_watcher = mango.build_spot_open_orders_watcher(
+                oo_watcher, oo_subscriptions = shared.spot_open_orders_watcher(
                     context, websocket_manager, health_check, wallet, account, group, spot_market)
+                shared_subscriptions += oo_subscriptions
                 all_open_orders_watchers += [oo_watcher]
                 if market.base == spot_market.base and market.quote == spot_market.quote:
                     latest_open_orders_observer = oo_watcher
@@ -175,4 +232,9 @@ def _websocket_model_state_builder_factory(context: mango.Context, disposer: man
     model_state = ModelState(order_owner, market, group_watcher, latest_account_observer,
                              latest_price_observer, latest_open_orders_observer,
                              inventory_watcher, latest_orderbook_watcher, latest_event_queue_watcher)
-    return WebsocketModelStateBuilder(model_state)
+    market_subscriptions = [*shared_subscriptions] + [subscription for subscription in websocket_manager.subscriptions[first_market_subscription:]
+                                                      if subscription not in shared_subscriptions]
+    subscription_changes: typing.List[rx.core.typing.Observable[typing.Any]] = [
+        subscription.notifications for subscription in market_subscriptions]
+    changes: rx.core.typing.Observable[typing.Any] = rx.merge(price_feed, *subscription_changes)
+    return WebsocketModelStateBuilder(model_state, changes)
@@ -51,15 +51,14 @@ class AfterAccumulatedDepthElement(Element):
     def from_command_line_parameters(args: argparse.Namespace) -> "AfterAccumulatedDepthElement":
         return AfterAccumulatedDepthElement(args.afteraccumulateddepth_depth, args.afteraccumulateddepth_adjustment_ticks)
 
-    def _accumulated_quantity_exceeds_order(self, orders: typing.Sequence[mango.Order], owner: PublicKey, quantity: Decimal) -> typing.Optional[mango.Order]:
-        accumulated_quantity: Decimal = Decimal(0)
-        for order in orders:
-            if order.owner != owner:
-                accumulated_quantity += order.quantity
-            if accumulated_quantity >= quantity:
-                # Success!
-                return order
-        return None
+    # Binary-searches the side's cumulative quantities rather than walking the orders from the top of the book.
+    def _accumulated_quantity_exceeds_order(self, orders: mango.ColumnarOrderBookSide, owner: PublicKey, quantity: Decimal) -> typing.Optional[mango.Order]:
+        index: typing.Optional[int] = orders.index_for_accumulated_quantity(quantity, excluding_owner=owner)
+        if index is None:
+            return None
+
+        # Success!
+        return orders[index]
 
     def process(self, context: mango.Context, model_state: ModelState, orders: typing.Sequence[mango.Order]) -> typing.Sequence[mango.Order]:
         new_orders: typing.List[mango.Order] = []
@@ -69,12 +68,12 @@ class AfterAccumulatedDepthElement(Element):
             depth: Decimal = self.depth or order.quantity
             if order.side == mango.Side.BUY:
                 place_below: typing.Optional[mango.Order] = self._accumulated_quantity_exceeds_order(
-                    model_state.bids, model_state.order_owner, depth)
+                    model_state.orderbook.columnar_bids, model_state.order_owner, depth)
                 if place_below is not None:
                     new_price = place_below.price - adjustment
             else:
                 place_above: typing.Optional[mango.Order] = self._accumulated_quantity_exceeds_order(
-                    model_state.asks, model_state.order_owner, depth)
+                    model_state.orderbook.columnar_asks, model_state.order_owner, depth)
                 if place_above is not None:
                     new_price = place_above.price + adjustment
 
@@ -35,10 +35,15 @@ class Chain:
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
         self.elements: typing.Sequence[Element] = elements
 
-    def process(self, context: mango.Context, model_state: ModelState) -> typing.Sequence[mango.Order]:
+    # If a `LatencyRecorder` is passed, the time taken by each `Element` is recorded in it.
+    def process(self, context: mango.Context, model_state: ModelState, latency: typing.Optional[mango.LatencyRecorder] = None) -> typing.Sequence[mango.Order]:
         orders: typing.Sequence[mango.Order] = []
         for element in self.elements:
-            orders = element.process(context, model_state, orders)
+            if latency is None:
+                orders = element.process(context, model_state, orders)
+            else:
+                with latency.time(f"pulse.chain.{element.__class__.__name__}"):
+                    orders = element.process(context, model_state, orders)
         return orders
 
     def __repr__(self) -> str:
@@ -0,0 +1,139 @@
+# # ⚠ Warning
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN
+# NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+# [🥭 Mango Markets](https://mango.markets/) support is available at:
+#   [Docs](https://docs.mango.markets/)
+#   [Discord](https://discord.gg/67jySBhxrg)
+#   [Twitter](https://twitter.com/mangomarkets)
+#   [Github](https://github.com/blockworks-foundation)
+#   [Email](mailto:hello@blockworks.foundation)
+
+
+import enum
+import logging
+import rx
+import time
+import typing
+
+from decimal import Decimal
+
+from ..modelstate import ModelState
+from .reconciledorders import ReconciledOrders
+
+
+class PulseMode(enum.Enum):
+    # We use strings here so that argparse can work with these as parameters.
+    INTERVAL = "INTERVAL"
+    EVENT = "EVENT"
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 StateChangePulseTrigger class
+#
+# Decides when an event-driven marketmaker should pulse. Instead of pulsing every `--pulse-interval` seconds
+# whether anything has changed or not, the marketmaker checks this on every change notification and only
+# pulses if:
+# * the oracle mid price has moved by more than `price_threshold` (a ratio, so 0.001 is 0.1%),
+# * the top bid or top ask price has moved by more than `top_of_book_threshold` (also a ratio),
+# * any of our own orders has been placed, filled or cancelled by something other than the last pulse, or
+# * it has been more than `maximum_staleness` seconds since the last pulse.
+#
+# No pulse happens within `minimum_gap` seconds of the previous pulse, so a burst of changes results in a
+# single pulse. Changes that arrive during that gap aren't lost - they're still there to be seen on the next
+# check.
+#
+# A pulse should only be recorded with `pulsed()` once it has succeeded, so a failed pulse is retried. Passing
+# the pulse's `ReconciledOrders` means the orders it kept and placed are what's expected next, and the orders it
+# cancelled are ignored, so the pulse's own changes don't trigger another pulse.
+#
+class StateChangePulseTrigger:
+    def __init__(self, price_threshold: Decimal, top_of_book_threshold: Decimal, minimum_gap: float,
+                 maximum_staleness: float) -> None:
+        self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.price_threshold: Decimal = price_threshold
+        self.top_of_book_threshold: Decimal = top_of_book_threshold
+        self.minimum_gap: float = minimum_gap
+        self.maximum_staleness: float = maximum_staleness
+
+        self.last_pulse_time: typing.Optional[float] = None
+        self.last_price: typing.Optional[Decimal] = None
+        self.last_top_bid: typing.Optional[Decimal] = None
+        self.last_top_ask: typing.Optional[Decimal] = None
+        self.last_client_ids: typing.FrozenSet[int] = frozenset()
+        self.cancelled_client_ids: typing.FrozenSet[int] = frozenset()
+
+    # Returns why a pulse is needed now, or None if no pulse is needed.
+    def pulse_reason(self, model_state: ModelState, now: typing.Optional[float] = None) -> typing.Optional[str]:
+        now = time.monotonic() if now is None else now
+        if self.last_pulse_time is None:
+            return "first pulse"
+
+        since_last_pulse: float = now - self.last_pulse_time
+        if since_last_pulse < self.minimum_gap:
+            return None
+
+        if since_last_pulse >= self.maximum_staleness:
+            return "stale"
+
+        if StateChangePulseTrigger.__moved(self.last_price, model_state.price.mid_price, self.price_threshold):
+            return "price moved"
+
+        top_bid, top_ask = StateChangePulseTrigger.__top_of_book(model_state)
+        if StateChangePulseTrigger.__moved(self.last_top_bid, top_bid, self.top_of_book_threshold) \
+                or StateChangePulseTrigger.__moved(self.last_top_ask, top_ask, self.top_of_book_threshold):
+            return "top of book moved"
+
+        if StateChangePulseTrigger.__client_ids(model_state) - self.cancelled_client_ids != self.last_client_ids:
+            return "open orders changed"
+
+        return None
+
+    # Records the state a successful pulse was based on, so later changes are measured against it. If the pulse's
+    # `reconciled` orders are given, our open orders are expected to be the ones it kept and placed.
+    def pulsed(self, model_state: ModelState, reconciled: typing.Optional[ReconciledOrders] = None,
+               now: typing.Optional[float] = None) -> None:
+        self.last_pulse_time = time.monotonic() if now is None else now
+        self.last_price = model_state.price.mid_price
+        self.last_top_bid, self.last_top_ask = StateChangePulseTrigger.__top_of_book(model_state)
+        if reconciled is None:
+            self.last_client_ids = StateChangePulseTrigger.__client_ids(model_state)
+            self.cancelled_client_ids = frozenset()
+        else:
+            self.last_client_ids = frozenset(order.client_id for order in [*reconciled.to_keep, *reconciled.to_place])
+            self.cancelled_client_ids = frozenset(order.client_id for order in reconciled.to_cancel)
+
+    # Merges the change notifications with a timer, so staleness is still noticed when nothing is changing.
+    def to_observable(self, changes: rx.core.typing.Observable[typing.Any]) -> rx.core.typing.Observable[typing.Any]:
+        return rx.merge(changes, rx.interval(max(self.minimum_gap, 0.1)))
+
+    @staticmethod
+    def __moved(previous: typing.Optional[Decimal], current: typing.Optional[Decimal], threshold: Decimal) -> bool:
+        if previous is None or current is None or previous == 0:
+            return previous != current
+        return abs(current - previous) / abs(previous) > threshold
+
+    @staticmethod
+    def __top_of_book(model_state: ModelState) -> typing.Tuple[typing.Optional[Decimal], typing.Optional[Decimal]]:
+        top_bid = model_state.top_bid
+        top_ask = model_state.top_ask
+        return (top_bid.price if top_bid is not None else None, top_ask.price if top_ask is not None else None)
+
+    @staticmethod
+    def __client_ids(model_state: ModelState) -> typing.FrozenSet[int]:
+        return frozenset(order.client_id for order in model_state.placed_orders_container.placed_orders)
+
+    def __str__(self) -> str:
+        return f"« StateChangePulseTrigger price threshold: {self.price_threshold}, top of book threshold: {self.top_of_book_threshold}, minimum gap: {self.minimum_gap}s, maximum staleness: {self.maximum_staleness}s »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
@@ -118,7 +118,7 @@ class MarketOperations(metaclass=abc.ABCMeta):
         raise NotImplementedError("MarketOperations.place_order() is not implemented on the base type.")
 
     @abc.abstractmethod
-    def load_orderbook(self) -> OrderBook:
+    def load_orderbook(self, depth: typing.Optional[int] = None) -> OrderBook:
         raise NotImplementedError("MarketOperations.load_orders() is not implemented on the base type.")
 
     @abc.abstractmethod
@@ -192,7 +192,7 @@ class NullMarketOperations(MarketOperations):
         self._logger.info(f"[Dry Run] Not placing order {order}.")
         return order
 
-    def load_orderbook(self) -> OrderBook:
+    def load_orderbook(self, depth: typing.Optional[int] = None) -> OrderBook:
         return OrderBook(self.market_name, NullLotSizeConverter(), [], [])
 
     def load_my_orders(self) -> typing.Sequence[Order]:
@@ -21,7 +21,9 @@ import typing
 
 from datetime import datetime
 from decimal import Decimal
+from solana.publickey import PublicKey
 
+from .accountinfo import AccountInfo
 from .context import Context
 from .market import Market
 
@@ -96,6 +98,11 @@ class Price():
 #
 # Derived versions of this class can fetch prices for a specific market.
 #
+# Oracles whose price comes from on-chain accounts can return those accounts' addresses from
+# `price_account_addresses()` and parse the loaded accounts with `parse_price()`. That allows callers to fetch
+# the price in the same `getMultipleAccounts` call as the other accounts they need, instead of a separate
+# round trip. Oracles that can't do this (the default) return no addresses.
+#
 class Oracle(metaclass=abc.ABCMeta):
     def __init__(self, name: str, market: Market) -> None:
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
@@ -114,6 +121,12 @@ class Oracle(metaclass=abc.ABCMeta):
     def to_streaming_observable(self, context: Context) -> rx.core.typing.Observable[Price]:
         raise NotImplementedError("Oracle.fetch_price() is not implemented on the base type.")
 
+    def price_account_addresses(self, context: Context) -> typing.Sequence[PublicKey]:
+        return []
+
+    def parse_price(self, account_infos: typing.Sequence[AccountInfo]) -> Price:
+        raise NotImplementedError("Oracle.parse_price() is not implemented on the base type.")
+
     def __str__(self) -> str:
         return f"« Oracle {self.name} [{self.market.symbol}] »"
 
@@ -20,7 +20,9 @@ import typing
 
 from datetime import datetime
 from decimal import Decimal
+from solana.publickey import PublicKey
 
+from ...accountinfo import AccountInfo
 from ...context import Context
 from ...ensuremarketloaded import ensure_market_loaded
 from ...loadedmarket import LoadedMarket
@@ -59,7 +61,19 @@ class MarketOracle(Oracle):
         self.source: OracleSource = OracleSource("Market", name, features, market)
 
     def fetch_price(self, context: Context) -> Price:
-        orderbook: OrderBook = self.loaded_market.fetch_orderbook(context)
+        orderbook: OrderBook = self.loaded_market.fetch_orderbook(context, depth=1)
+        return self.__price_from_orderbook(orderbook)
+
+    def price_account_addresses(self, context: Context) -> typing.Sequence[PublicKey]:
+        return [self.loaded_market.bids_address, self.loaded_market.asks_address]
+
+    def parse_price(self, account_infos: typing.Sequence[AccountInfo]) -> Price:
+        [bids_account_info, asks_account_info] = account_infos
+        orderbook: OrderBook = self.loaded_market.parse_account_infos_to_orderbook(
+            bids_account_info, asks_account_info, depth=1)
+        return self.__price_from_orderbook(orderbook)
+
+    def __price_from_orderbook(self, orderbook: OrderBook) -> Price:
         if orderbook.top_bid is None:
             raise Exception(f"[{self.source}] Cannot determine complete price data - no top bid")
         top_bid = orderbook.top_bid.price
@@ -75,6 +75,16 @@ class PythOracle(Oracle):
         if price_account_info is None:
             raise Exception(f"[{self.context.name}] Price account {self.product_data.px_acc} not found.")
 
+        return self.parse_price([price_account_info])
+
+    # The price account can only be loaded alongside other accounts if they're on the same cluster.
+    def price_account_addresses(self, context: Context) -> typing.Sequence[PublicKey]:
+        if context.client.cluster_name != self.context.client.cluster_name:
+            return []
+        return [self.product_data.px_acc]
+
+    def parse_price(self, account_infos: typing.Sequence[AccountInfo]) -> Price:
+        [price_account_info] = account_infos
         if len(price_account_info.data) != PRICE.sizeof():
             raise Exception(
                 f"[{self.context.name}] Price account data has incorrect size. Expected: {PRICE.sizeof()}, got {len(price_account_info.data)}.")
@@ -22,9 +22,10 @@ from solana.publickey import PublicKey
 from .accountinfo import AccountInfo
 from .addressableaccount import AddressableAccount
 from .context import Context
-from .layouts import layouts
+from .layouts import decoders, layouts
+from .lotsizeconverter import LotSizeConverter
 from .metadata import Metadata
-from .orders import Order, OrderType, Side
+from .orders import ColumnarOrderBookSide, Order, OrderType, Side
 from .perpmarketdetails import PerpMarketDetails
 from .version import Version
 
@@ -65,6 +66,8 @@ class PerpOrderBookSide(AddressableAccount):
         self.root_node: Decimal = root_node
         self.leaf_count: Decimal = leaf_count
         self.nodes: typing.Any = nodes
+        self.side: Side = Side.BUY if meta_data.data_type == layouts.DATA_TYPE.Bids else Side.SELL
+        self.__factors: typing.Optional[typing.Tuple[Decimal, Decimal, Decimal, Decimal]] = None
 
     @staticmethod
     def from_layout(layout: typing.Any, account_info: AccountInfo, version: Version, perp_market_details: PerpMarketDetails) -> "PerpOrderBookSide":
@@ -85,7 +88,10 @@ class PerpOrderBookSide(AddressableAccount):
             raise Exception(
                 f"PerpOrderBookSide data length ({len(data)}) does not match expected size ({layouts.ORDERBOOK_SIDE.sizeof()})")
 
-        layout = layouts.ORDERBOOK_SIDE.parse(data)
+        # Only the header is decoded here. Nodes are decoded lazily as the book is walked, so callers that
+        # only want the top of the book don't pay for decoding every node.
+        layout = decoders.ORDERBOOK_SIDE_HEADER.parse(data)
+        layout.nodes = decoders.LazyOrderBookNodes(data, layouts.ORDERBOOK_SIDE_HEADER.sizeof())
         return PerpOrderBookSide.from_layout(layout, account_info, Version.V1, perp_market_details)
 
     @staticmethod
@@ -95,47 +101,85 @@ class PerpOrderBookSide(AddressableAccount):
             raise Exception(f"PerpOrderBookSide account not found at address '{address}'")
         return PerpOrderBookSide.parse(account_info, perp_market_details)
 
-    def orders(self) -> typing.Sequence[Order]:
-        if self.leaf_count == 0:
-            return []
-
-        if self.meta_data.data_type == layouts.DATA_TYPE.Bids:
-            order_side = Side.BUY
-        else:
-            order_side = Side.SELL
-
-        stack = [self.root_node]
-        orders: typing.List[Order] = []
-        while len(stack) > 0:
-            index = int(stack.pop())
-            node = self.nodes[index]
-            if node.type_name == "leaf":
-                price = node.key["price"]
-                quantity = node.quantity
-
-                decimals_differential = self.perp_market_details.base_instrument.decimals - \
-                    self.perp_market_details.quote_token.token.decimals
-                native_to_ui = Decimal(10) ** decimals_differential
-                quote_lot_size = self.perp_market_details.quote_lot_size
-                base_lot_size = self.perp_market_details.base_lot_size
-                actual_price = price * (quote_lot_size / base_lot_size) * native_to_ui
-
-                base_factor = Decimal(10) ** self.perp_market_details.base_instrument.decimals
-                actual_quantity = (quantity * self.perp_market_details.base_lot_size) / base_factor
-
-                orders += [Order(int(node.key["order_id"]),
-                                 node.client_order_id,
-                                 node.owner,
-                                 order_side,
-                                 actual_price,
-                                 actual_quantity,
-                                 OrderType.UNKNOWN)]
-            elif node.type_name == "inner":
-                if order_side == Side.BUY:
-                    stack = [*stack, node.children[0], node.children[1]]
+    # Walks the book from the root node, best price first. If a `limit` is specified the walk stops after
+    # that many orders, so only the nodes on the path to those orders are ever visited.
+    def orders(self, limit: typing.Optional[int] = None) -> typing.Sequence[Order]:
+        return [self.order_from_leaf(node) for node in self.__leaves(limit)]
+
+    # Builds a `ColumnarOrderBookSide` straight from the leaves' raw lot values, without creating any `Order`s.
+    def to_columnar(self, lot_size_converter: LotSizeConverter, limit: typing.Optional[int] = None) -> ColumnarOrderBookSide:
+        ids: typing.List[int] = []
+        client_ids: typing.List[int] = []
+        owners: typing.List[PublicKey] = []
+        price_lots: typing.List[int] = []
+        quantity_lots: typing.List[int] = []
+        for node in self.__leaves(limit):
+            key = node.key
+            ids.append(int(key["order_id"]))
+            client_ids.append(node.client_order_id)
+            owners.append(node.owner)
+            price_lots.append(int(key["price"]))
+            quantity_lots.append(int(node.quantity))
+        return ColumnarOrderBookSide(self.side, lot_size_converter, ids, client_ids, owners, price_lots, quantity_lots)
+
+    # Walks the tree best-first, yielding decoded leaf nodes.
+    def __leaves(self, limit: typing.Optional[int]) -> typing.Iterator[typing.Any]:
+        if self.leaf_count == 0 or (limit is not None and limit <= 0):
+            return
+
+        # Bids are best-first from the highest key, so the higher child (children[1]) is popped first.
+        lower_child_first = self.side == Side.SELL
+        nodes = self.nodes
+        stack: typing.List[int] = [int(self.root_node)]
+        count: int = 0
+        while stack:
+            node = nodes[stack.pop()]
+            type_name = node.type_name
+            if type_name == "leaf":
+                yield node
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+            elif type_name == "inner":
+                children = node.children
+                if lower_child_first:
+                    stack.append(int(children[1]))
+                    stack.append(int(children[0]))
                 else:
-                    stack = [*stack, node.children[1], node.children[0]]
-        return orders
+                    stack.append(int(children[0]))
+                    stack.append(int(children[1]))
+
+    # Converts a decoded leaf node to an `Order`, with price and quantity in UI values.
+    def order_from_leaf(self, node: typing.Any) -> Order:
+        lot_ratio, native_to_ui, base_lot_size, base_factor = self.__conversion_factors()
+        key = node.key
+        actual_price = key["price"] * lot_ratio * native_to_ui
+        actual_quantity = (node.quantity * base_lot_size) / base_factor
+
+        return Order(int(key["order_id"]),
+                     node.client_order_id,
+                     node.owner,
+                     self.side,
+                     actual_price,
+                     actual_quantity,
+                     OrderType.UNKNOWN)
+
+    # The factors to convert native lot prices and quantities to UI values only depend on the market, so they're
+    # calculated once for the side rather than for every leaf.
+    def __conversion_factors(self) -> typing.Tuple[Decimal, Decimal, Decimal, Decimal]:
+        if self.__factors is None:
+            decimals_differential = self.perp_market_details.base_instrument.decimals - \
+                self.perp_market_details.quote_token.token.decimals
+            native_to_ui = Decimal(10) ** decimals_differential
+            quote_lot_size = self.perp_market_details.quote_lot_size
+            base_lot_size = self.perp_market_details.base_lot_size
+            base_factor = Decimal(10) ** self.perp_market_details.base_instrument.decimals
+            self.__factors = (quote_lot_size / base_lot_size, native_to_ui, base_lot_size, base_factor)
+        return self.__factors
+
+    def top_of_book(self) -> typing.Optional[Order]:
+        top: typing.Sequence[Order] = self.orders(limit=1)
+        return top[0] if len(top) > 0 else None
 
     def __str__(self) -> str:
         nodes = "\n        ".join([str(node).replace("\n", "\n        ") for node in self.orders()])
@@ -15,12 +15,14 @@
 
 
 import enum
+import numpy
+import numpy.typing
 import pandas
 import pyserum.enums
 import typing
 
 from dataclasses import dataclass
-from decimal import Decimal
+from decimal import Decimal, ROUND_CEILING
 from pyserum.market.types import Order as PySerumOrder
 from solana.publickey import PublicKey
 
@@ -221,12 +223,166 @@ class Order:
         return f"{self}"
 
 
+# # 🥭 ColumnarOrderBookSide class
+#
+# A compact, column-based representation of one side of an orderbook.
+#
+# Instead of holding a full `Order` object (with `Decimal` price and quantity) for every order, this holds
+# parallel columns: NumPy arrays of integer price and quantity lots, an index into a list of distinct owners,
+# and lists of order IDs and client IDs (order IDs are 128 bits so they stay as Python `int`s).
+#
+# Orders are always held best-first, so top-of-book is O(1). Price-based depth queries are binary searches
+# on the price column, and accumulated-quantity queries are binary searches on the cumulative quantity column.
+#
+# It's also a `typing.Sequence[Order]`, so existing code that wants `Order`s can still index and iterate it -
+# `Order` objects are only created for the orders that are actually accessed, and each one is kept so later
+# accesses return the same object. If the side was built from existing `Order`s, those same objects are returned.
+#
+class ColumnarOrderBookSide(typing.Sequence[Order]):
+    def __init__(self, side: Side, lot_size_converter: LotSizeConverter, ids: typing.Sequence[int],
+                 client_ids: typing.Sequence[int], owners: typing.Sequence[PublicKey],
+                 price_lots: typing.Sequence[int], quantity_lots: typing.Sequence[int],
+                 orders: typing.Optional[typing.Sequence[Order]] = None) -> None:
+        if not (len(ids) == len(client_ids) == len(owners) == len(price_lots) == len(quantity_lots)):
+            raise Exception("All columns of a ColumnarOrderBookSide must be the same length.")
+        if orders is not None and len(orders) != len(ids):
+            raise Exception("Orders of a ColumnarOrderBookSide must be the same length as the columns.")
+
+        self.side: Side = side
+        self.lot_size_converter: LotSizeConverter = lot_size_converter
+        self.ids: typing.List[int] = list(ids)
+        self.client_ids: typing.List[int] = list(client_ids)
+
+        # PublicKeys aren't hashable, so distinct owners are found by their bytes.
+        self.owners: typing.List[PublicKey] = []
+        self.__owner_lookup: typing.Dict[bytes, int] = {}
+        owner_indices: typing.List[int] = []
+        for owner in owners:
+            owner_bytes: bytes = bytes(owner)
+            if owner_bytes not in self.__owner_lookup:
+                self.__owner_lookup[owner_bytes] = len(self.owners)
+                self.owners += [owner]
+            owner_indices += [self.__owner_lookup[owner_bytes]]
+        self.owner_indices: numpy.typing.NDArray[numpy.int32] = numpy.array(owner_indices, dtype=numpy.int32)
+
+        self.price_lots: numpy.typing.NDArray[numpy.int64] = numpy.array(price_lots, dtype=numpy.int64)
+        self.quantity_lots: numpy.typing.NDArray[numpy.int64] = numpy.array(quantity_lots, dtype=numpy.int64)
+        self.cumulative_quantity_lots: numpy.typing.NDArray[numpy.int64] = numpy.cumsum(self.quantity_lots)
+
+        # searchsorted() needs ascending values, and bids are best-first from the highest price.
+        self.__searchable_prices: numpy.typing.NDArray[numpy.int64] = -self.price_lots if side == Side.BUY else self.price_lots
+        self.__cumulative_excluding_owner: typing.Dict[int, numpy.typing.NDArray[numpy.int64]] = {}
+        self.__orders: typing.List[typing.Optional[Order]] = list(orders) if orders is not None else [None] * len(self.ids)
+
+    # Builds a `ColumnarOrderBookSide` from `Order`s, sorting them best-first the same way `OrderBook` does.
+    @staticmethod
+    def from_orders(side: Side, lot_size_converter: LotSizeConverter, orders: typing.Sequence[Order]) -> "ColumnarOrderBookSide":
+        if isinstance(orders, ColumnarOrderBookSide):
+            return orders
+
+        sorted_orders: typing.List[Order] = sorted(orders, key=lambda order: order.id, reverse=(side == Side.BUY))
+        return ColumnarOrderBookSide(side, lot_size_converter,
+                                     [order.id for order in sorted_orders],
+                                     [order.client_id for order in sorted_orders],
+                                     [order.owner for order in sorted_orders],
+                                     [lot_size_converter.price_number_to_lots(order.price) for order in sorted_orders],
+                                     [lot_size_converter.base_size_number_to_lots(order.quantity) for order in sorted_orders],
+                                     sorted_orders)
+
+    @property
+    def top(self) -> typing.Optional[Order]:
+        return self[0] if len(self.ids) > 0 else None
+
+    @property
+    def top_price_lots(self) -> typing.Optional[int]:
+        return int(self.price_lots[0]) if len(self.ids) > 0 else None
+
+    # The number of orders priced at or better than `price_lots`.
+    def count_at_or_better(self, price_lots: int) -> int:
+        search: int = -price_lots if self.side == Side.BUY else price_lots
+        return int(numpy.searchsorted(self.__searchable_prices, search, side="right"))
+
+    # The total quantity, in lots, of orders priced at or better than `price_lots`.
+    def quantity_lots_at_or_better(self, price_lots: int) -> int:
+        count: int = self.count_at_or_better(price_lots)
+        return int(self.cumulative_quantity_lots[count - 1]) if count > 0 else 0
+
+    # The index of the first order where the accumulated quantity from the top of the book reaches `quantity`,
+    # optionally ignoring orders from `excluding_owner`. Returns `None` if the whole side doesn't have that much.
+    def index_for_accumulated_quantity(self, quantity: Decimal, excluding_owner: typing.Optional[PublicKey] = None) -> typing.Optional[int]:
+        # Order quantities are always whole lots, so reaching `quantity` means reaching the next whole lot.
+        lot_size: Decimal = self.lot_size_converter.lot_size
+        required_lots: int = int((quantity / lot_size).to_integral_value(rounding=ROUND_CEILING))
+        cumulative: numpy.typing.NDArray[numpy.int64] = self.__cumulative_excluding(excluding_owner)
+        index: int = int(numpy.searchsorted(cumulative, required_lots, side="left"))
+        return index if index < len(self.ids) else None
+
+    def __cumulative_excluding(self, owner: typing.Optional[PublicKey]) -> numpy.typing.NDArray[numpy.int64]:
+        owner_index: typing.Optional[int] = self.__owner_lookup.get(bytes(owner)) if owner is not None else None
+        if owner_index is None:
+            return self.cumulative_quantity_lots
+
+        if owner_index not in self.__cumulative_excluding_owner:
+            quantities = numpy.where(self.owner_indices == owner_index, 0, self.quantity_lots)
+            self.__cumulative_excluding_owner[owner_index] = numpy.cumsum(quantities)
+        return self.__cumulative_excluding_owner[owner_index]
+
+    def __materialise(self, index: int) -> Order:
+        existing: typing.Optional[Order] = self.__orders[index]
+        if existing is not None:
+            return existing
+
+        price: Decimal = self.lot_size_converter.price_lots_to_number(Decimal(int(self.price_lots[index])))
+        quantity: Decimal = self.lot_size_converter.base_size_lots_to_number(Decimal(int(self.quantity_lots[index])))
+        order: Order = Order(self.ids[index], self.client_ids[index], self.owners[int(self.owner_indices[index])],
+                             self.side, price, quantity, OrderType.UNKNOWN)
+        self.__orders[index] = order
+        return order
+
+    @typing.overload
+    def __getitem__(self, index: int) -> Order:
+        ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> typing.Sequence[Order]:
+        ...
+
+    def __getitem__(self, index: typing.Union[int, slice]) -> typing.Union[Order, typing.Sequence[Order]]:
+        if isinstance(index, slice):
+            return [self.__materialise(position) for position in range(*index.indices(len(self.ids)))]
+
+        if index < 0:
+            index += len(self.ids)
+        if index < 0 or index >= len(self.ids):
+            raise IndexError(f"Order index {index} out of range.")
+        return self.__materialise(index)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __str__(self) -> str:
+        return f"« ColumnarOrderBookSide {self.side} [{len(self.ids)} orders, top: {self.top}] »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# # 🥭 OrderBook class
+#
+# An `OrderBook` holds bids and asks, best first. Each side can be a regular sequence of `Order`s (which is
+# sorted on assignment) or a `ColumnarOrderBookSide` (which is already sorted and is kept as-is).
+#
+# `columnar_bids` and `columnar_asks` provide the columnar form of each side, building it once if the side
+# was assigned as `Order`s.
+#
 class OrderBook:
     def __init__(self, symbol: str, lot_size_converter: LotSizeConverter, bids: typing.Sequence[Order], asks: typing.Sequence[Order]) -> None:
         self.symbol: str = symbol
         self.__lot_size_converter: LotSizeConverter = lot_size_converter
         self.__bids: typing.Sequence[Order] = []
         self.__asks: typing.Sequence[Order] = []
+        self.__columnar_bids: typing.Optional[ColumnarOrderBookSide] = None
+        self.__columnar_asks: typing.Optional[ColumnarOrderBookSide] = None
         self.bids = bids
         self.asks = asks
 
@@ -237,10 +393,20 @@ class OrderBook:
     @bids.setter
     def bids(self, bids: typing.Sequence[Order]) -> None:
         """ Sort bids high to low, so best bid is at index 0 """
+        self.__columnar_bids = bids if isinstance(bids, ColumnarOrderBookSide) else None
+        if isinstance(bids, ColumnarOrderBookSide):
+            self.__bids = bids
+            return
         bids_list: typing.List[Order] = list(bids)
         bids_list.sort(key=lambda order: order.id, reverse=True)
         self.__bids = bids_list
 
+    @property
+    def columnar_bids(self) -> ColumnarOrderBookSide:
+        if self.__columnar_bids is None:
+            self.__columnar_bids = ColumnarOrderBookSide.from_orders(Side.BUY, self.__lot_size_converter, self.__bids)
+        return self.__columnar_bids
+
     @property
     def asks(self) -> typing.Sequence[Order]:
         return self.__asks
@@ -248,10 +414,20 @@ class OrderBook:
     @asks.setter
     def asks(self, asks: typing.Sequence[Order]) -> None:
         """ Sets asks low to high, so best ask is at index 0"""
+        self.__columnar_asks = asks if isinstance(asks, ColumnarOrderBookSide) else None
+        if isinstance(asks, ColumnarOrderBookSide):
+            self.__asks = asks
+            return
         asks_list: typing.List[Order] = list(asks)
         asks_list.sort(key=lambda order: order.id)
         self.__asks = asks_list
 
+    @property
+    def columnar_asks(self) -> ColumnarOrderBookSide:
+        if self.__columnar_asks is None:
+            self.__columnar_asks = ColumnarOrderBookSide.from_orders(Side.SELL, self.__lot_size_converter, self.__asks)
+        return self.__columnar_asks
+
     # The top bid is the highest price someone is willing to pay to BUY
     @property
     def top_bid(self) -> typing.Optional[Order]:
@@ -23,7 +23,7 @@ from solana.publickey import PublicKey
 from .accountinfo import AccountInfo
 from .addressableaccount import AddressableAccount
 from .context import Context
-from .layouts import layouts
+from .layouts import decoders
 from .lotsizeconverter import LotSizeConverter
 from .metadata import Metadata
 from .orders import Side
@@ -231,7 +231,7 @@ class PerpEventQueue(AddressableAccount):
     @ staticmethod
     def parse(account_info: AccountInfo, lot_size_converter: LotSizeConverter) -> "PerpEventQueue":
         # Data length isn't fixed so can't check we get the right value the way we normally do.
-        layout = layouts.PERP_EVENT_QUEUE.parse(account_info.data)
+        layout = decoders.PERP_EVENT_QUEUE.parse(account_info.data)
         return PerpEventQueue.from_layout(layout, account_info, Version.V1, lot_size_converter)
 
     @ staticmethod
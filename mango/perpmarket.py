@@ -118,9 +118,9 @@ class PerpMarket(LoadedMarket):
     def event_queue_address(self) -> PublicKey:
         return self.underlying_perp_market.event_queue
 
-    def parse_account_info_to_orders(self, account_info: AccountInfo) -> typing.Sequence[Order]:
+    def parse_account_info_to_orders(self, account_info: AccountInfo, depth: typing.Optional[int] = None) -> typing.Sequence[Order]:
         side: PerpOrderBookSide = PerpOrderBookSide.parse(account_info, self.underlying_perp_market)
-        return side.orders()
+        return side.to_columnar(self.lot_size_converter, depth)
 
     def fetch_funding(self, context: Context) -> FundingRate:
         stats = context.fetch_stats(f"perp/funding_rate?mangoGroup={self.group.name}&market={self.symbol}")
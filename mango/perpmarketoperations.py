@@ -25,6 +25,7 @@ from .constants import SYSTEM_PROGRAM_ADDRESS
 from .context import Context
 from .group import Group
 from .instructions import build_cancel_perp_order_instructions, build_mango_consume_events_instructions, build_cancel_all_perp_orders_instructions, build_place_perp_order_instructions, build_redeem_accrued_mango_instructions
+from .instructiontemplates import PerpOrderInstructionTemplates
 from .marketoperations import MarketInstructionBuilder, MarketOperations
 from .orders import Order, OrderBook
 from .perpmarket import PerpMarket
@@ -41,9 +42,13 @@ from .wallet import Wallet
 # existing data, requiring no fetches from Solana or other sources. All necessary data should all be loaded
 # on initial setup in the `load()` method.
 #
+# If the perp market is loaded, `load()` also builds `PerpOrderInstructionTemplates` so placing and cancelling
+# orders only has to fill in the details of each order.
+#
 class PerpMarketInstructionBuilder(MarketInstructionBuilder):
     def __init__(self, context: Context, wallet: Wallet, perp_market: PerpMarket,
-                 group: Group, account: Account) -> None:
+                 group: Group, account: Account,
+                 templates: typing.Optional[PerpOrderInstructionTemplates] = None) -> None:
         super().__init__()
         self.context: Context = context
         self.wallet: Wallet = wallet
@@ -51,20 +56,29 @@ class PerpMarketInstructionBuilder(MarketInstructionBuilder):
         self.group: Group = group
         self.account: Account = account
         self.mngo_token_bank: TokenBank = self.group.liquidity_incentive_token_bank
+        self.templates: typing.Optional[PerpOrderInstructionTemplates] = templates
 
     @staticmethod
     def load(context: Context, wallet: Wallet, perp_market: PerpMarket, group: Group, account: Account) -> "PerpMarketInstructionBuilder":
-        return PerpMarketInstructionBuilder(context, wallet, perp_market, group, account)
+        templates: typing.Optional[PerpOrderInstructionTemplates] = None
+        if perp_market.underlying_perp_market is not None:
+            templates = PerpOrderInstructionTemplates(
+                context, wallet, perp_market.underlying_perp_market.group, account, perp_market.underlying_perp_market)
+        return PerpMarketInstructionBuilder(context, wallet, perp_market, group, account, templates)
 
     def build_cancel_order_instructions(self, order: Order, ok_if_missing: bool = False) -> CombinableInstructions:
         if self.perp_market.underlying_perp_market is None:
             raise Exception(f"PerpMarket {self.perp_market.symbol} has not been loaded.")
+        if self.templates is not None:
+            return CombinableInstructions.from_instruction(self.templates.cancel(order, ok_if_missing))
         return build_cancel_perp_order_instructions(
             self.context, self.wallet, self.account, self.perp_market.underlying_perp_market, order, ok_if_missing)
 
     def build_place_order_instructions(self, order: Order) -> CombinableInstructions:
         if self.perp_market.underlying_perp_market is None:
             raise Exception(f"PerpMarket {self.perp_market.symbol} has not been loaded.")
+        if self.templates is not None:
+            return CombinableInstructions.from_instruction(self.templates.place(order))
         return build_place_perp_order_instructions(
             self.context, self.wallet, self.perp_market.underlying_perp_market.group, self.account, self.perp_market.underlying_perp_market, order.price, order.quantity, order.client_id, order.side, order.order_type, order.reduce_only)
 
@@ -161,8 +175,8 @@ class PerpMarketOperations(MarketOperations):
     def ensure_openorders(self) -> PublicKey:
         return SYSTEM_PROGRAM_ADDRESS
 
-    def load_orderbook(self) -> OrderBook:
-        return self.perp_market.fetch_orderbook(self.context)
+    def load_orderbook(self, depth: typing.Optional[int] = None) -> OrderBook:
+        return self.perp_market.fetch_orderbook(self.context, depth)
 
     def load_my_orders(self) -> typing.Sequence[Order]:
         orderbook: OrderBook = self.load_orderbook()
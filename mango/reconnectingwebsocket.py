@@ -37,7 +37,8 @@ class ReconnectingWebsocket:
                  on_open_call: typing.Callable[[websocket.WebSocketApp], None]) -> None:
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
         self.url = url
-        self.on_open_call = on_open_call
+        # `AsyncReconnectingWebsocket` calls this with itself rather than a `WebSocketApp`.
+        self.on_open_call: typing.Callable[[typing.Any], None] = on_open_call
         self.reconnect_required: bool = True
         self.ping_interval: int = 0
         self.connecting: rx.subject.behaviorsubject.BehaviorSubject = rx.subject.behaviorsubject.BehaviorSubject(
@@ -24,6 +24,7 @@ from .combinableinstructions import CombinableInstructions
 from .constants import SYSTEM_PROGRAM_ADDRESS
 from .context import Context
 from .instructions import build_create_serum_open_orders_instructions, build_serum_consume_events_instructions, build_serum_settle_instructions, build_serum_place_order_instructions
+from .instructiontemplates import SerumOrderInstructionTemplates
 from .marketoperations import MarketInstructionBuilder, MarketOperations
 from .openorders import OpenOrders
 from .orders import Order, OrderBook, Side
@@ -42,11 +43,15 @@ from .wallet import Wallet
 # existing data, requiring no fetches from Solana or other sources. All necessary data should all be loaded
 # on initial setup in the `load()` method.
 #
+# If there's already an open orders account, `load()` also builds `SerumOrderInstructionTemplates` so placing
+# and cancelling orders only has to fill in the details of each order.
+#
 class SerumMarketInstructionBuilder(MarketInstructionBuilder):
     def __init__(self, context: Context, wallet: Wallet, serum_market: SerumMarket, raw_market: PySerumMarket,
                  base_token_account: TokenAccount, quote_token_account: TokenAccount,
                  open_orders_address: typing.Optional[PublicKey],
-                 fee_discount_token_address: PublicKey) -> None:
+                 fee_discount_token_address: PublicKey,
+                 templates: typing.Optional[SerumOrderInstructionTemplates] = None) -> None:
         super().__init__()
         self.context: Context = context
         self.wallet: Wallet = wallet
@@ -56,6 +61,7 @@ class SerumMarketInstructionBuilder(MarketInstructionBuilder):
         self.quote_token_account: TokenAccount = quote_token_account
         self.open_orders_address: typing.Optional[PublicKey] = open_orders_address
         self.fee_discount_token_address: PublicKey = fee_discount_token_address
+        self.templates: typing.Optional[SerumOrderInstructionTemplates] = templates
 
     @staticmethod
     def load(context: Context, wallet: Wallet, serum_market: SerumMarket) -> "SerumMarketInstructionBuilder":
@@ -86,19 +92,31 @@ class SerumMarketInstructionBuilder(MarketInstructionBuilder):
         if quote_token_account is None:
             raise Exception(f"Could not find source token account for quote token {serum_market.quote.symbol}.")
 
-        return SerumMarketInstructionBuilder(context, wallet, serum_market, raw_market, base_token_account, quote_token_account, open_orders_address, fee_discount_token_address)
+        templates: typing.Optional[SerumOrderInstructionTemplates] = None
+        if open_orders_address is not None:
+            templates = SerumOrderInstructionTemplates.load(wallet, raw_market, base_token_account.address,
+                                                            quote_token_account.address, open_orders_address,
+                                                            fee_discount_token_address)
+
+        return SerumMarketInstructionBuilder(context, wallet, serum_market, raw_market, base_token_account, quote_token_account, open_orders_address, fee_discount_token_address, templates)
 
     def build_cancel_order_instructions(self, order: Order, ok_if_missing: bool = False) -> CombinableInstructions:
         # For us to cancel an order, an open_orders account must already exist (or have existed).
         if self.open_orders_address is None:
             raise Exception(f"Cannot cancel order with client ID {order.client_id} - no OpenOrders account.")
 
+        if self.templates is not None:
+            return CombinableInstructions.from_instruction(self.templates.cancel(order))
+
         raw_instruction = self.raw_market.make_cancel_order_by_client_id_instruction(
             self.wallet.keypair, self.open_orders_address, order.client_id
         )
         return CombinableInstructions.from_instruction(raw_instruction)
 
     def build_place_order_instructions(self, order: Order) -> CombinableInstructions:
+        if self.templates is not None:
+            return CombinableInstructions.from_instruction(self.templates.place(order))
+
         ensure_open_orders = CombinableInstructions.empty()
         if self.open_orders_address is None:
             ensure_open_orders = self.build_create_openorders_instructions()
@@ -143,6 +161,8 @@ class SerumMarketInstructionBuilder(MarketInstructionBuilder):
     def build_create_openorders_instructions(self) -> CombinableInstructions:
         create_open_orders = build_create_serum_open_orders_instructions(self.context, self.wallet, self.raw_market)
         self.open_orders_address = create_open_orders.signers[0].public_key
+        # Any templates were built for the old open orders account.
+        self.templates = None
         return create_open_orders
 
     def build_redeem_instructions(self) -> CombinableInstructions:
@@ -219,8 +239,8 @@ class SerumMarketOperations(MarketOperations):
             return self.market_instruction_builder.open_orders_address
         return self.create_openorders()
 
-    def load_orderbook(self) -> OrderBook:
-        return self.serum_market.fetch_orderbook(self.context)
+    def load_orderbook(self, depth: typing.Optional[int] = None) -> OrderBook:
+        return self.serum_market.fetch_orderbook(self.context, depth)
 
     def load_my_orders(self) -> typing.Sequence[Order]:
         open_orders_address = self.market_instruction_builder.open_orders_address
@@ -60,7 +60,7 @@ class SpotMarket(LoadedMarket):
     def event_queue_address(self) -> PublicKey:
         return self.underlying_serum_market.state.event_queue()
 
-    def parse_account_info_to_orders(self, account_info: AccountInfo) -> typing.Sequence[Order]:
+    def parse_account_info_to_orders(self, account_info: AccountInfo, depth: typing.Optional[int] = None) -> typing.Sequence[Order]:
         orderbook: PySerumOrderBook = PySerumOrderBook.from_bytes(self.underlying_serum_market.state, account_info.data)
         return list(map(Order.from_serum_order, orderbook.orders()))
 
@@ -26,6 +26,7 @@ from .constants import SYSTEM_PROGRAM_ADDRESS
 from .context import Context
 from .group import GroupSlot, Group
 from .instructions import build_serum_consume_events_instructions, build_spot_place_order_instructions, build_cancel_spot_order_instructions, build_spot_settle_instructions, build_spot_openorders_instructions
+from .instructiontemplates import SpotOrderInstructionTemplates
 from .marketoperations import MarketInstructionBuilder, MarketOperations
 from .orders import Order, OrderBook
 from .publickey import encode_public_key_for_sorting
@@ -41,10 +42,15 @@ from .wallet import Wallet
 # existing data, requiring no fetches from Solana or other sources. All necessary data should all be loaded
 # on initial setup in the `load()` method.
 #
+# If the Mango account already has an open orders account for the market, `load()` also builds
+# `SpotOrderInstructionTemplates` so placing and cancelling orders only has to fill in the details of each
+# order.
+#
 class SpotMarketInstructionBuilder(MarketInstructionBuilder):
     def __init__(self, context: Context, wallet: Wallet, spot_market: SpotMarket,
                  group: Group, account: Account, raw_market: PySerumMarket,
-                 market_index: int, fee_discount_token_address: PublicKey) -> None:
+                 market_index: int, fee_discount_token_address: PublicKey,
+                 templates: typing.Optional[SpotOrderInstructionTemplates] = None) -> None:
         super().__init__()
         self.context: Context = context
         self.wallet: Wallet = wallet
@@ -56,6 +62,7 @@ class SpotMarketInstructionBuilder(MarketInstructionBuilder):
         self.fee_discount_token_address: PublicKey = fee_discount_token_address
 
         self.open_orders_address: typing.Optional[PublicKey] = self.spot_market.derive_open_orders_address(self.context, self.account)
+        self.templates: typing.Optional[SpotOrderInstructionTemplates] = templates
 
     @staticmethod
     def load(context: Context, wallet: Wallet, spot_market: SpotMarket, group: Group, account: Account) -> "SpotMarketInstructionBuilder":
@@ -76,16 +83,27 @@ class SpotMarketInstructionBuilder(MarketInstructionBuilder):
         slot = group.slot_by_spot_market_address(spot_market.address)
         market_index = slot.index
 
-        return SpotMarketInstructionBuilder(context, wallet, spot_market, group, account, raw_market, market_index, fee_discount_token_address)
+        templates: typing.Optional[SpotOrderInstructionTemplates] = None
+        if account.spot_open_orders_by_index[market_index] is not None:
+            templates = SpotOrderInstructionTemplates(context, wallet, group, account, spot_market, raw_market,
+                                                      market_index,
+                                                      spot_market.derive_open_orders_address(context, account),
+                                                      fee_discount_token_address)
+
+        return SpotMarketInstructionBuilder(context, wallet, spot_market, group, account, raw_market, market_index, fee_discount_token_address, templates)
 
     def build_cancel_order_instructions(self, order: Order, ok_if_missing: bool = False) -> CombinableInstructions:
         if self.open_orders_address is None:
             return CombinableInstructions.empty()
 
+        if self.templates is not None:
+            return CombinableInstructions.from_instruction(self.templates.cancel(order))
         return build_cancel_spot_order_instructions(
             self.context, self.wallet, self.group, self.account, self.raw_market, order, self.open_orders_address)
 
     def build_place_order_instructions(self, order: Order) -> CombinableInstructions:
+        if self.templates is not None:
+            return CombinableInstructions.from_instruction(self.templates.place(order))
         return build_spot_place_order_instructions(self.context, self.wallet, self.group, self.account,
                                                    self.spot_market, order.order_type, order.side, order.price,
                                                    order.quantity, order.client_id,
@@ -219,8 +237,8 @@ class SpotMarketOperations(MarketOperations):
             return existing
         return self.create_openorders()
 
-    def load_orderbook(self) -> OrderBook:
-        return self.spot_market.fetch_orderbook(self.context)
+    def load_orderbook(self, depth: typing.Optional[int] = None) -> OrderBook:
+        return self.spot_market.fetch_orderbook(self.context, depth)
 
     def load_my_orders(self) -> typing.Sequence[Order]:
         if not self.open_orders_address:
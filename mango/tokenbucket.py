@@ -0,0 +1,78 @@
+# # ⚠ Warning
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT
+# LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN
+# NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+# WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+#
+# [🥭 Mango Markets](https://mango.markets/) support is available at:
+#   [Docs](https://docs.mango.markets/)
+#   [Discord](https://discord.gg/67jySBhxrg)
+#   [Twitter](https://twitter.com/mangomarkets)
+#   [Github](https://github.com/blockworks-foundation)
+#   [Email](mailto:hello@blockworks.foundation)
+
+import logging
+import threading
+import time
+import typing
+
+from decimal import Decimal
+
+
+# # 🥭 TokenBucket class
+#
+# A thread-safe token-bucket rate limiter.
+#
+# Tokens are added to the bucket at `rate` tokens per second, up to a maximum of `capacity` tokens.
+# Each call to `acquire()` takes one token, blocking until one is available. A full bucket allows
+# a burst of up to `capacity` calls before callers are held to the steady `rate`.
+#
+# Unlike pausing for a fixed time between calls, this doesn't add any delay when calls are already
+# spaced out, and it works the same no matter how many threads are making the calls.
+#
+# `clock` and `sleep` default to `time.monotonic()` and `time.sleep()`.
+#
+class TokenBucket:
+    def __init__(self, rate: Decimal, capacity: Decimal = Decimal(1),
+                 clock: typing.Callable[[], float] = time.monotonic,
+                 sleep: typing.Callable[[float], None] = time.sleep) -> None:
+        if rate <= 0:
+            raise Exception(f"TokenBucket rate must be positive - got {rate}.")
+        if capacity < 1:
+            raise Exception(f"TokenBucket capacity must be at least 1 - got {capacity}.")
+        self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
+        self.rate: Decimal = rate
+        self.capacity: Decimal = capacity
+        self.clock: typing.Callable[[], float] = clock
+        self.sleep: typing.Callable[[float], None] = sleep
+        self.__tokens: float = float(capacity)
+        self.__last_refill: float = clock()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            wait: float = self.__try_take()
+            if wait <= 0:
+                return
+            self.sleep(wait)
+
+    # Returns 0 if a token was taken, otherwise the number of seconds until one should be available.
+    def __try_take(self) -> float:
+        rate: float = float(self.rate)
+        with self.__lock:
+            now: float = self.clock()
+            self.__tokens = min(float(self.capacity), self.__tokens + ((now - self.__last_refill) * rate))
+            self.__last_refill = now
+            # Allow for rounding in the refill so a wait that lands exactly on the next token doesn't need another.
+            if self.__tokens >= 1 - 1e-9:
+                self.__tokens = max(self.__tokens - 1, 0)
+                return 0
+            return (1 - self.__tokens) / rate
+
+    def __str__(self) -> str:
+        return f"« TokenBucket {self.rate} per second, capacity {self.capacity} »"
+
+    def __repr__(self) -> str:
+        return f"{self}"
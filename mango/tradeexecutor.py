@@ -134,7 +134,7 @@ class ImmediateTradeExecutor(TradeExecutor):
 
     def buy(self, symbol: str, quantity: Decimal) -> Order:
         market_operations: MarketOperations = self._build_market_operations(symbol)
-        orderbook = market_operations.load_orderbook()
+        orderbook = market_operations.load_orderbook(depth=1)
         if orderbook.top_ask is None:
             raise Exception(f"Could not determine top ask on {orderbook.symbol}")
 
@@ -149,7 +149,7 @@ class ImmediateTradeExecutor(TradeExecutor):
 
     def sell(self, symbol: str, quantity: Decimal) -> Order:
         market_operations: MarketOperations = self._build_market_operations(symbol)
-        orderbook = market_operations.load_orderbook()
+        orderbook = market_operations.load_orderbook(depth=1)
         if orderbook.top_bid is None:
             raise Exception(f"Could not determine top bid on {orderbook.symbol}")
 
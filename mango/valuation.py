@@ -69,10 +69,9 @@ class TokenValuation:
         sol_balance = context.client.get_balance(address)
         balances += [InstrumentValue(SolToken, sol_balance)]
 
-        for slot_token_bank in group.tokens:
-            if isinstance(slot_token_bank.token, Token):
-                balance = InstrumentValue.fetch_total_value(context, address, slot_token_bank.token)
-                balances += [balance]
+        tokens: typing.List[Token] = [slot_token_bank.token for slot_token_bank in group.tokens
+                                      if isinstance(slot_token_bank.token, Token)]
+        balances += InstrumentValue.fetch_total_values(context, address, tokens)
 
         wallet_tokens: typing.List[TokenValuation] = []
         for balance in balances:
@@ -364,12 +364,7 @@ class LiveWalletBalancer(WalletBalancer):
                 self.trade_executor.buy(market_symbol, change.value.copy_abs())
 
     def _fetch_balances(self, context: Context, tokens: typing.Sequence[Token]) -> typing.Sequence[InstrumentValue]:
-        balances: typing.List[InstrumentValue] = []
-        for token in tokens:
-            balance = InstrumentValue.fetch_total_value(context, self.wallet.address, token)
-            balances += [balance]
-
-        return balances
+        return InstrumentValue.fetch_total_values(context, self.wallet.address, tokens)
 
 
 # # 🥭 LiveAccountBalancer class
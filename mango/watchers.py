@@ -29,16 +29,17 @@ from .group import GroupSlot, Group
 from .healthcheck import HealthCheck
 from .instructions import build_create_serum_open_orders_instructions
 from .instrumentvalue import InstrumentValue
+from .incrementalorderbook import IncrementalPerpOrderBookSide, OrderBookChange
 from .inventory import Inventory
 from .loadedmarket import LoadedMarket
 from .market import Market, InventorySource
 from .modelstate import EventQueue
-from .observables import DisposePropagator, LatestItemObserverSubscriber
+from .observables import DisposePropagator, EventSource, LatestItemObserverSubscriber
 from .openorders import OpenOrders
 from .oracle import Price
 from .oracle import OracleProvider
 from .oraclefactory import create_oracle_provider
-from .orders import OrderBook
+from .orders import Order, OrderBook
 from .perpeventqueue import PerpEventQueue
 from .perpmarket import PerpMarket
 from .placedorder import PlacedOrdersContainer
@@ -50,37 +51,40 @@ from .tokenaccount import TokenAccount
 from .token import Instrument, Token
 from .wallet import Wallet
 from .watcher import Watcher, LamdaUpdateWatcher
-from .websocketsubscription import WebSocketAccountSubscription, WebSocketSubscription, WebSocketSubscriptionManager
+from .websocketsubscription import FlushingWatcher, WebSocketAccountSubscription, WebSocketSubscription, WebSocketSubscriptionManager
 
 
 def build_group_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, group: Group) -> Watcher[Group]:
     group_subscription = WebSocketAccountSubscription[Group](
-        context, group.address, lambda account_info: Group.parse(account_info, group.name, context.instrument_lookup, context.market_lookup))
+        context, group.address, lambda account_info: Group.parse(account_info, group.name, context.instrument_lookup, context.market_lookup),
+        coalesce_interval=context.websocket_coalesce_interval)
     manager.add(group_subscription)
     latest_group_observer = LatestItemObserverSubscriber[Group](group)
     group_subscription.publisher.subscribe(latest_group_observer)
-    health_check.add("group_subscription", group_subscription.publisher)
-    return latest_group_observer
+    health_check.add("group_subscription", group_subscription.notifications)
+    return FlushingWatcher([group_subscription], latest_group_observer)
 
 
 def build_account_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, account: Account, group_observer: Watcher[Group], cache_observer: Watcher[Cache]) -> typing.Tuple[WebSocketSubscription[Account], Watcher[Account]]:
     account_subscription = WebSocketAccountSubscription[Account](
-        context, account.address, lambda account_info: Account.parse(account_info, group_observer.latest, cache_observer.latest))
+        context, account.address, lambda account_info: Account.parse(account_info, group_observer.latest, cache_observer.latest),
+        coalesce_interval=context.websocket_coalesce_interval)
     manager.add(account_subscription)
     latest_account_observer = LatestItemObserverSubscriber[Account](account)
     account_subscription.publisher.subscribe(latest_account_observer)
-    health_check.add("account_subscription", account_subscription.publisher)
-    return account_subscription, latest_account_observer
+    health_check.add("account_subscription", account_subscription.notifications)
+    return account_subscription, FlushingWatcher([account_subscription], latest_account_observer)
 
 
 def build_cache_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, cache: Cache, group: Group) -> Watcher[Cache]:
     cache_subscription = WebSocketAccountSubscription[Cache](
-        context, group.cache, lambda account_info: Cache.parse(account_info))
+        context, group.cache, lambda account_info: Cache.parse(account_info),
+        coalesce_interval=context.websocket_coalesce_interval)
     manager.add(cache_subscription)
     latest_cache_observer = LatestItemObserverSubscriber[Cache](cache)
     cache_subscription.publisher.subscribe(latest_cache_observer)
-    health_check.add("cache_subscription", cache_subscription.publisher)
-    return latest_cache_observer
+    health_check.add("cache_subscription", cache_subscription.notifications)
+    return FlushingWatcher([cache_subscription], latest_cache_observer)
 
 
 def build_spot_open_orders_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, wallet: Wallet, account: Account, group: Group, spot_market: SpotMarket) -> Watcher[OpenOrders]:
@@ -95,15 +99,16 @@ def build_spot_open_orders_watcher(context: Context, manager: WebSocketSubscript
         logging.info(f"Created {spot_market.symbol} OpenOrders at: {open_orders_address}")
 
     spot_open_orders_subscription = WebSocketAccountSubscription[OpenOrders](
-        context, open_orders_address, lambda account_info: OpenOrders.parse(account_info, spot_market.base.decimals, spot_market.quote.decimals))
+        context, open_orders_address, lambda account_info: OpenOrders.parse(account_info, spot_market.base.decimals, spot_market.quote.decimals),
+        coalesce_interval=context.websocket_coalesce_interval)
     manager.add(spot_open_orders_subscription)
     initial_spot_open_orders = OpenOrders.load(
         context, open_orders_address, spot_market.base.decimals, spot_market.quote.decimals)
     latest_open_orders_observer = LatestItemObserverSubscriber[OpenOrders](
         initial_spot_open_orders)
     spot_open_orders_subscription.publisher.subscribe(latest_open_orders_observer)
-    health_check.add("open_orders_subscription", spot_open_orders_subscription.publisher)
-    return latest_open_orders_observer
+    health_check.add("open_orders_subscription", spot_open_orders_subscription.notifications)
+    return FlushingWatcher([spot_open_orders_subscription], latest_open_orders_observer)
 
 
 def build_serum_open_orders_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, serum_market: SerumMarket, wallet: Wallet) -> Watcher[PlacedOrdersContainer]:
@@ -127,15 +132,16 @@ def build_serum_open_orders_watcher(context: Context, manager: WebSocketSubscrip
             context, open_orders_address, serum_market.base.decimals, serum_market.quote.decimals)
 
     serum_open_orders_subscription = WebSocketAccountSubscription[OpenOrders](
-        context, open_orders_address, lambda account_info: OpenOrders.parse(account_info, serum_market.base.decimals, serum_market.quote.decimals))
+        context, open_orders_address, lambda account_info: OpenOrders.parse(account_info, serum_market.base.decimals, serum_market.quote.decimals),
+        coalesce_interval=context.websocket_coalesce_interval)
 
     manager.add(serum_open_orders_subscription)
 
     latest_serum_open_orders_observer = LatestItemObserverSubscriber[PlacedOrdersContainer](
         initial_serum_open_orders)
     serum_open_orders_subscription.publisher.subscribe(latest_serum_open_orders_observer)
-    health_check.add("open_orders_subscription", serum_open_orders_subscription.publisher)
-    return latest_serum_open_orders_observer
+    health_check.add("open_orders_subscription", serum_open_orders_subscription.notifications)
+    return FlushingWatcher([serum_open_orders_subscription], latest_serum_open_orders_observer)
 
 
 def build_perp_open_orders_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, perp_market: PerpMarket, account: Account, group: Group, account_subscription: WebSocketSubscription[Account]) -> Watcher[PlacedOrdersContainer]:
@@ -148,8 +154,8 @@ def build_perp_open_orders_watcher(context: Context, manager: WebSocketSubscript
     latest_open_orders_observer = LatestItemObserverSubscriber[PlacedOrdersContainer](initial_open_orders)
     account_subscription.publisher.subscribe(
         on_next=lambda updated_account: latest_open_orders_observer.on_next(updated_account.perp_accounts_by_index[index].open_orders))  # type: ignore[call-arg]
-    health_check.add("open_orders_subscription", account_subscription.publisher)
-    return latest_open_orders_observer
+    health_check.add("open_orders_subscription", account_subscription.notifications)
+    return FlushingWatcher([account_subscription], latest_open_orders_observer)
 
 
 def build_price_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, disposer: DisposePropagator, provider_name: str, market: Market) -> LatestItemObserverSubscriber[Price]:
@@ -173,7 +179,8 @@ def build_serum_inventory_watcher(context: Context, manager: WebSocketSubscripti
     if base_account is None:
         raise Exception(f"Could not find token account owned by {wallet.address} for base token {market.base}.")
     base_token_subscription = WebSocketAccountSubscription[TokenAccount](
-        context, base_account.address, lambda account_info: TokenAccount.parse(account_info, market.base))
+        context, base_account.address, lambda account_info: TokenAccount.parse(account_info, market.base),
+        coalesce_interval=context.websocket_coalesce_interval)
     manager.add(base_token_subscription)
     latest_base_token_account_observer = LatestItemObserverSubscriber[TokenAccount](base_account)
     base_subscription_disposable = base_token_subscription.publisher.subscribe(latest_base_token_account_observer)
@@ -184,7 +191,8 @@ def build_serum_inventory_watcher(context: Context, manager: WebSocketSubscripti
     if quote_account is None:
         raise Exception(f"Could not find token account owned by {wallet.address} for quote token {market.quote}.")
     quote_token_subscription = WebSocketAccountSubscription[TokenAccount](
-        context, quote_account.address, lambda account_info: TokenAccount.parse(account_info, market.quote))
+        context, quote_account.address, lambda account_info: TokenAccount.parse(account_info, market.quote),
+        coalesce_interval=context.websocket_coalesce_interval)
     manager.add(quote_token_subscription)
     latest_quote_token_account_observer = LatestItemObserverSubscriber[TokenAccount](quote_account)
     quote_subscription_disposable = quote_token_subscription.publisher.subscribe(latest_quote_token_account_observer)
@@ -197,6 +205,8 @@ def build_serum_inventory_watcher(context: Context, manager: WebSocketSubscripti
     mngo_accrued: InstrumentValue = InstrumentValue(Token.ensure(mngo), Decimal(0))
 
     def serum_inventory_accessor() -> Inventory:
+        base_token_subscription.flush()
+        quote_token_subscription.flush()
         available: Decimal = (latest_base_token_account_observer.latest.value.value * price_watcher.latest.mid_price) + \
             latest_quote_token_account_observer.latest.value.value
         available_collateral: InstrumentValue = InstrumentValue(
@@ -209,7 +219,9 @@ def build_serum_inventory_watcher(context: Context, manager: WebSocketSubscripti
     return LamdaUpdateWatcher(serum_inventory_accessor)
 
 
-def build_orderbook_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, market: LoadedMarket) -> Watcher[OrderBook]:
+# Perp orderbooks are maintained incrementally - each update only decodes the nodes that changed. If `changes`
+# is provided, the `OrderBookChange`s from each perp update are published to it.
+def build_orderbook_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, market: LoadedMarket, changes: typing.Optional[EventSource[typing.Sequence[OrderBookChange]]] = None) -> Watcher[OrderBook]:
     orderbook_addresses: typing.List[PublicKey] = [
         market.bids_address,
         market.asks_address
@@ -218,61 +230,90 @@ def build_orderbook_watcher(context: Context, manager: WebSocketSubscriptionMana
     if len(orderbook_infos) != 2 or orderbook_infos[0] is None or orderbook_infos[1] is None:
         raise Exception(f"Could not find {market.symbol} order book at addresses {orderbook_addresses}.")
 
-    initial_orderbook: OrderBook = market.parse_account_infos_to_orderbook(orderbook_infos[0], orderbook_infos[1])
-    updatable_orderbook: OrderBook = market.parse_account_infos_to_orderbook(
-        orderbook_infos[0], orderbook_infos[1])
+    parse_bids: typing.Callable[[AccountInfo], typing.Sequence[Order]] = market.parse_account_info_to_orders
+    parse_asks: typing.Callable[[AccountInfo], typing.Sequence[Order]] = market.parse_account_info_to_orders
+    if isinstance(market, PerpMarket):
+        incremental_bids = IncrementalPerpOrderBookSide(market.underlying_perp_market, market.lot_size_converter)
+        incremental_asks = IncrementalPerpOrderBookSide(market.underlying_perp_market, market.lot_size_converter)
+
+        # The columnar sides are kept as-is by the `OrderBook`, so depth queries don't rebuild them.
+        def _parse_incremental_bids(account_info: AccountInfo) -> typing.Sequence[Order]:
+            incremental_bids.update(account_info)
+            return incremental_bids.columnar
+
+        def _parse_incremental_asks(account_info: AccountInfo) -> typing.Sequence[Order]:
+            incremental_asks.update(account_info)
+            return incremental_asks.columnar
+
+        parse_bids = _parse_incremental_bids
+        parse_asks = _parse_incremental_asks
+
+    initial_bids = parse_bids(orderbook_infos[0])
+    initial_asks = parse_asks(orderbook_infos[1])
+    initial_orderbook: OrderBook = OrderBook(market.symbol, market.lot_size_converter, initial_bids, initial_asks)
+    updatable_orderbook: OrderBook = OrderBook(market.symbol, market.lot_size_converter, initial_bids, initial_asks)
+
+    if changes is not None and isinstance(market, PerpMarket):
+        # Subscribed after the initial load so the change stream only carries changes after the initial book.
+        incremental_bids.changes.subscribe(changes)
+        incremental_asks.changes.subscribe(changes)
 
     def _update_bids(account_info: AccountInfo) -> OrderBook:
-        new_bids = market.parse_account_info_to_orders(account_info)
+        new_bids = parse_bids(account_info)
         updatable_orderbook.bids = new_bids
         return updatable_orderbook
 
     def _update_asks(account_info: AccountInfo) -> OrderBook:
-        new_asks = market.parse_account_info_to_orders(account_info)
+        new_asks = parse_asks(account_info)
         updatable_orderbook.asks = new_asks
         return updatable_orderbook
-    bids_subscription = WebSocketAccountSubscription[OrderBook](context, orderbook_addresses[0], _update_bids)
+    bids_subscription = WebSocketAccountSubscription[OrderBook](
+        context, orderbook_addresses[0], _update_bids, coalesce_interval=context.websocket_coalesce_interval)
     manager.add(bids_subscription)
-    asks_subscription = WebSocketAccountSubscription[OrderBook](context, orderbook_addresses[1], _update_asks)
+    asks_subscription = WebSocketAccountSubscription[OrderBook](
+        context, orderbook_addresses[1], _update_asks, coalesce_interval=context.websocket_coalesce_interval)
     manager.add(asks_subscription)
 
     orderbook_observer = LatestItemObserverSubscriber[OrderBook](initial_orderbook)
 
     bids_subscription.publisher.subscribe(orderbook_observer)
     asks_subscription.publisher.subscribe(orderbook_observer)
-    health_check.add("orderbook_bids_subscription", bids_subscription.publisher)
-    health_check.add("orderbook_asks_subscription", asks_subscription.publisher)
-    return orderbook_observer
+    health_check.add("orderbook_bids_subscription", bids_subscription.notifications)
+    health_check.add("orderbook_asks_subscription", asks_subscription.notifications)
+    return FlushingWatcher([bids_subscription, asks_subscription], orderbook_observer)
 
 
 def build_serum_event_queue_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, serum_market: SerumMarket) -> Watcher[EventQueue]:
     initial: EventQueue = SerumEventQueue.load(context, serum_market.event_queue_address)
     subscription = WebSocketAccountSubscription[EventQueue](
-        context, serum_market.event_queue_address, lambda account_info: SerumEventQueue.parse(account_info))
+        context, serum_market.event_queue_address, lambda account_info: SerumEventQueue.parse(account_info),
+        coalesce_interval=context.websocket_coalesce_interval)
     manager.add(subscription)
     latest_observer = LatestItemObserverSubscriber[EventQueue](initial)
     subscription.publisher.subscribe(latest_observer)
-    health_check.add("event_queue_subscription", subscription.publisher)
-    return latest_observer
+    health_check.add("event_queue_subscription", subscription.notifications)
+    return FlushingWatcher([subscription], latest_observer)
 
 
 def build_spot_event_queue_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, spot_market: SpotMarket) -> Watcher[EventQueue]:
     initial: EventQueue = SerumEventQueue.load(context, spot_market.event_queue_address)
     subscription = WebSocketAccountSubscription[EventQueue](
-        context, spot_market.event_queue_address, lambda account_info: SerumEventQueue.parse(account_info))
+        context, spot_market.event_queue_address, lambda account_info: SerumEventQueue.parse(account_info),
+        coalesce_interval=context.websocket_coalesce_interval)
     manager.add(subscription)
     latest_observer = LatestItemObserverSubscriber[EventQueue](initial)
     subscription.publisher.subscribe(latest_observer)
-    health_check.add("event_queue_subscription", subscription.publisher)
-    return latest_observer
+    health_check.add("event_queue_subscription", subscription.notifications)
+    return FlushingWatcher([subscription], latest_observer)
 
 
 def build_perp_event_queue_watcher(context: Context, manager: WebSocketSubscriptionManager, health_check: HealthCheck, perp_market: PerpMarket) -> Watcher[EventQueue]:
     initial: EventQueue = PerpEventQueue.load(context, perp_market.event_queue_address, perp_market.lot_size_converter)
     subscription = WebSocketAccountSubscription[EventQueue](
-        context, perp_market.event_queue_address, lambda account_info: PerpEventQueue.parse(account_info, perp_market.lot_size_converter))
+        context, perp_market.event_queue_address, lambda account_info: PerpEventQueue.parse(account_info, perp_market.lot_size_converter),
+        coalesce_interval=context.websocket_coalesce_interval)
     manager.add(subscription)
     latest_observer = LatestItemObserverSubscriber[EventQueue](initial)
     subscription.publisher.subscribe(latest_observer)
-    health_check.add("event_queue_subscription", subscription.publisher)
-    return latest_observer
+    health_check.add("event_queue_subscription", subscription.notifications)
+    return FlushingWatcher([subscription], latest_observer)
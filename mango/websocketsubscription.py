@@ -14,7 +14,12 @@
 #   [Email](mailto:hello@blockworks.foundation)
 
 import abc
+import bisect
+import hashlib
+import json
 import logging
+import threading
+import time
 import typing
 import websocket
 
@@ -22,12 +27,15 @@ from datetime import datetime
 from rx.subject.behaviorsubject import BehaviorSubject
 from rx.core.typing import Disposable
 from solana.publickey import PublicKey
-from solana.rpc.types import RPCResponse
+from solana.rpc.types import MemcmpOpts, RPCResponse
 
 from .accountinfo import AccountInfo
+from .asyncreconnectingwebsocket import AsyncReconnectingWebsocket
 from .context import Context
+from .healthcheck import HealthCheck
 from .observables import EventSource
 from .reconnectingwebsocket import ReconnectingWebsocket
+from .watcher import Watcher
 
 
 # # 🥭 WebSocketSubscription class
@@ -35,6 +43,18 @@ from .reconnectingwebsocket import ReconnectingWebsocket
 # The `WebSocketSubscription` maintains a mapping for an account subscription in a Solana websocket to
 # an actual instantiated object.
 #
+# If `coalesce_interval` is set, notifications aren't parsed as they arrive. Only the latest raw notification
+# is kept (earlier ones that haven't been parsed are dropped) and it's parsed and published when `flush()` is
+# called. If `coalesce_interval` is greater than zero, it's also flushed as notifications arrive, but at most
+# once every `coalesce_interval` seconds. `FlushingWatcher` calls `flush()` whenever its `latest` is read.
+#
+# `notifications` publishes every raw notification as it arrives, coalesced or not.
+#
+# For account subscriptions, `last_update_slot` and `last_update_time` track the most recent update, and
+# updates from an earlier slot than one already seen are dropped (and counted in `stale_count`). This lets
+# `backfill_subscriptions()` push fetched data through the same path after a reconnect without risk of
+# overwriting a newer notification.
+#
 
 
 TSubscriptionInstance = typing.TypeVar('TSubscriptionInstance')
@@ -42,7 +62,8 @@ TSubscriptionInstance = typing.TypeVar('TSubscriptionInstance')
 
 class WebSocketSubscription(Disposable, typing.Generic[TSubscriptionInstance], metaclass=abc.ABCMeta):
     def __init__(self, context: Context, address: PublicKey,
-                 constructor: typing.Callable[[AccountInfo], TSubscriptionInstance]) -> None:
+                 constructor: typing.Callable[[AccountInfo], TSubscriptionInstance],
+                 coalesce_interval: typing.Optional[float] = None) -> None:
         self._logger: logging.Logger = logging.getLogger(self.__class__.__name__)
         self.context: Context = context
         self.address: PublicKey = address
@@ -50,19 +71,42 @@ class WebSocketSubscription(Disposable, typing.Generic[TSubscriptionInstance], m
         self.subscription_id: int = 0
         self.from_account_info: typing.Callable[[AccountInfo], TSubscriptionInstance] = constructor
         self.publisher: EventSource[TSubscriptionInstance] = EventSource[TSubscriptionInstance]()
+        self.notifications: EventSource[RPCResponse] = EventSource[RPCResponse]()
+        self.reconnected: EventSource[datetime] = EventSource[datetime]()
+        self.coalesce_interval: typing.Optional[float] = coalesce_interval
+        self.coalesced_count: int = 0
+        self.update_count: int = 0
+        self.stale_count: int = 0
+        self.backfill_count: int = 0
+        self.last_update_slot: int = 0
+        self.last_update_time: typing.Optional[datetime] = None
+        self._pending: typing.Optional[RPCResponse] = None
+        self._last_flushed: float = 0
+        # Re-entrant because publishing can lead to reading a watcher that flushes this subscription again.
+        self._lock: threading.RLock = threading.RLock()
         self.ws: typing.Optional[ReconnectingWebsocket] = None
         self.pong: BehaviorSubject = BehaviorSubject(datetime.now())
         self._pong_subscription: typing.Optional[Disposable] = None
 
+    # Only subscriptions to a single account can be backfilled by fetching that account.
+    @property
+    def backfillable(self) -> bool:
+        return False
+
     @abc.abstractmethod
     def build_request(self) -> str:
         raise NotImplementedError("WebSocketSubscription.build_request() is not implemented on the base type.")
 
     def open(self,) -> None:
         websocket_url: str = self.context.client.cluster_ws_url
+        connected_before: bool = False
 
         def on_open(sock: websocket.WebSocketApp) -> None:
+            nonlocal connected_before
             sock.send(self.build_request())
+            if connected_before:
+                backfill_subscriptions_in_background(self.context, [self])
+            connected_before = True
         ws: ReconnectingWebsocket = ReconnectingWebsocket(websocket_url, on_open)
         ws.item.subscribe(on_next=self._on_item)  # type: ignore[call-arg]
         ws.ping_interval = self.context.ping_interval
@@ -86,11 +130,47 @@ class WebSocketSubscription(Disposable, typing.Generic[TSubscriptionInstance], m
                 self._logger.info(f"Subscription created with id {subscription_id}.")
         elif (response["method"] == "accountNotification") or (response["method"] == "programNotification") or (response["method"] == "logsNotification"):
             subscription_id = response["params"]["subscription"]
-            built = self.build_subscribed_instance(response["params"])
-            self.publisher.publish(built)
+            self.handle_notification(response["params"])
         else:
             self._logger.error(f"[{self.context.name}] Unknown response: {response}")
 
+    def handle_notification(self, response: RPCResponse) -> None:
+        # The slot check and the publish (or replacing `_pending`) happen under one lock, so a backfill can't
+        # publish an older slot after a newer notification has been checked and published.
+        with self._lock:
+            if self.backfillable:
+                slot: int = int(response.get("result", {}).get("context", {}).get("slot", 0))
+                if slot < self.last_update_slot:
+                    self.stale_count += 1
+                    self._logger.debug(f"Ignoring update for {self.address} from slot {slot} - already seen slot {self.last_update_slot}.")
+                    return
+                self.last_update_slot = slot
+
+            self.update_count += 1
+            self.last_update_time = datetime.now()
+            self.notifications.publish(response)
+            if self.coalesce_interval is None:
+                built = self.build_subscribed_instance(response)
+                self.publisher.publish(built)
+                return
+
+            if self._pending is not None:
+                self.coalesced_count += 1
+            self._pending = response
+            if self.coalesce_interval > 0 and (time.monotonic() - self._last_flushed) >= self.coalesce_interval:
+                self.flush()
+
+    # Parses and publishes the latest coalesced notification, if there's one that hasn't been published.
+    def flush(self) -> None:
+        with self._lock:
+            response: typing.Optional[RPCResponse] = self._pending
+            if response is None:
+                return
+            self._pending = None
+            self._last_flushed = time.monotonic()
+            built = self.build_subscribed_instance(response)
+            self.publisher.publish(built)
+
     def build_subscribed_instance(self, response: RPCResponse) -> TSubscriptionInstance:
         account_info: AccountInfo = AccountInfo.from_response(response, self.address)
         built: TSubscriptionInstance = self.from_account_info(account_info)
@@ -106,13 +186,38 @@ class WebSocketSubscription(Disposable, typing.Generic[TSubscriptionInstance], m
             self.ws.close()
             self.ws = None
 
+    def __str__(self) -> str:
+        return f"« {self.__class__.__name__} [{self.address}] updates: {self.update_count}, last slot: {self.last_update_slot}, last update: {self.last_update_time}, stale: {self.stale_count}, coalesced: {self.coalesced_count}, backfilled: {self.backfill_count} »"
 
+    def __repr__(self) -> str:
+        return f"{self}"
+
+
+# Program subscriptions can be narrowed with the same `memcmp_opts` and `data_size` filters as
+# `getProgramAccounts`. Each notification is for one of the program's accounts, so the `AccountInfo` passed to
+# the constructor has that account's address rather than the program's.
+#
 class WebSocketProgramSubscription(WebSocketSubscription[TSubscriptionInstance]):
     def __init__(self, context: Context, address: PublicKey,
-                 constructor: typing.Callable[[AccountInfo], TSubscriptionInstance]) -> None:
-        super().__init__(context, address, constructor)
+                 constructor: typing.Callable[[AccountInfo], TSubscriptionInstance],
+                 coalesce_interval: typing.Optional[float] = None,
+                 memcmp_opts: typing.Sequence[MemcmpOpts] = [],
+                 data_size: typing.Optional[int] = None) -> None:
+        super().__init__(context, address, constructor, coalesce_interval)
+        self.memcmp_opts: typing.Sequence[MemcmpOpts] = memcmp_opts
+        self.data_size: typing.Optional[int] = data_size
 
     def build_request(self) -> str:
+        filters: typing.List[typing.Dict[str, typing.Any]] = []
+        if self.data_size is not None:
+            filters += [{"dataSize": self.data_size}]
+        for memcmp in self.memcmp_opts:
+            filters += [{"memcmp": {"offset": memcmp.offset, "bytes": str(memcmp.bytes)}}]
+        filters_json: str = ""
+        if len(filters) > 0:
+            filters_json = """,
+            "filters": """ + json.dumps(filters)
+
         return """
 {
     "jsonrpc": "2.0",
@@ -121,17 +226,28 @@ class WebSocketProgramSubscription(WebSocketSubscription[TSubscriptionInstance])
     "params": [\"""" + str(self.address) + """\",
         {
             "encoding": "base64",
-            "commitment": \"""" + str(self.context.client.commitment) + """\"
+            "commitment": \"""" + str(self.context.client.commitment) + """\"""" + filters_json + """
         }
   ]
 }
 """
 
+    def build_subscribed_instance(self, response: RPCResponse) -> TSubscriptionInstance:
+        value: typing.Dict[str, typing.Any] = response["result"]["value"]
+        account_info: AccountInfo = AccountInfo._from_response_values(value["account"], PublicKey(value["pubkey"]))
+        built: TSubscriptionInstance = self.from_account_info(account_info)
+        return built
+
 
 class WebSocketAccountSubscription(WebSocketSubscription[TSubscriptionInstance]):
     def __init__(self, context: Context, address: PublicKey,
-                 constructor: typing.Callable[[AccountInfo], TSubscriptionInstance]) -> None:
-        super().__init__(context, address, constructor)
+                 constructor: typing.Callable[[AccountInfo], TSubscriptionInstance],
+                 coalesce_interval: typing.Optional[float] = None) -> None:
+        super().__init__(context, address, constructor, coalesce_interval)
+
+    @property
+    def backfillable(self) -> bool:
+        return True
 
     def build_request(self) -> str:
         return """
@@ -196,6 +312,73 @@ class WebSocketLogSubscription(WebSocketSubscription[LogEvent]):
         return LogEvent.from_response(response)
 
 
+# # 🥭 FlushingWatcher class
+#
+# A `Watcher` that flushes any coalesced notifications on its subscriptions before returning the `latest` of
+# the `Watcher` it wraps. This means coalesced updates are parsed when they're needed rather than as they
+# arrive. Subscriptions that aren't coalescing have nothing to flush, so it's harmless to use either way.
+#
+class FlushingWatcher(typing.Generic[TSubscriptionInstance]):
+    def __init__(self, subscriptions: typing.Sequence[WebSocketSubscription[typing.Any]], watcher: Watcher[TSubscriptionInstance]) -> None:
+        self.subscriptions: typing.Sequence[WebSocketSubscription[typing.Any]] = subscriptions
+        self.watcher: Watcher[TSubscriptionInstance] = watcher
+
+    @property
+    def latest(self) -> TSubscriptionInstance:
+        for subscription in self.subscriptions:
+            subscription.flush()
+        return self.watcher.latest
+
+
+# # 🥭 backfill_subscriptions function
+#
+# Updates that happen while a websocket is disconnected are lost, and a quiet account might not get another
+# notification for a long time. This fetches all the backfillable subscriptions' accounts (in as few
+# `getMultipleAccounts()` calls as the chunk size allows) and pushes each one through its subscription's
+# normal notification handling. Returns the number of subscriptions that were updated by the backfill.
+#
+def backfill_subscriptions(context: Context, subscriptions: typing.Sequence[WebSocketSubscription[typing.Any]]) -> int:
+    to_backfill: typing.List[WebSocketSubscription[typing.Any]] = [
+        subscription for subscription in subscriptions if subscription.backfillable]
+    chunk_size: int = max(int(context.gma_chunk_size), 1)
+    backfilled: int = 0
+    for start in range(0, len(to_backfill), chunk_size):
+        chunk: typing.Sequence[WebSocketSubscription[typing.Any]] = to_backfill[start:start + chunk_size]
+        result: typing.Any = context.client.get_multiple_accounts_with_context(
+            [subscription.address for subscription in chunk])
+        for subscription, value in zip(chunk, result["value"]):
+            if value is not None:
+                update_count: int = subscription.update_count
+                subscription.handle_notification(typing.cast(
+                    RPCResponse, {"result": {"context": result["context"], "value": value}}))
+                # A notification from a later slot may have arrived since the fetch, so it might be ignored.
+                if subscription.update_count > update_count:
+                    subscription.backfill_count += 1
+                    backfilled += 1
+    return backfilled
+
+
+# Reconnections are handled on websocket threads (or the shared event loop), which shouldn't be blocked by
+# an RPC call, so the backfill happens on its own short-lived thread.
+#
+# Subscriptions that can't be backfilled by fetching their address (like program subscriptions) publish to
+# their `reconnected` instead, on the same thread, so whatever owns them can catch up some other way.
+def backfill_subscriptions_in_background(context: Context, subscriptions: typing.Sequence[WebSocketSubscription[typing.Any]]) -> None:
+    def __backfill() -> None:
+        try:
+            backfilled: int = backfill_subscriptions(context, subscriptions)
+            logging.info(f"Backfilled {backfilled} subscription(s) after websocket reconnection.")
+        except Exception as exception:
+            logging.warning(f"Failed to backfill subscriptions after websocket reconnection: {exception}")
+
+        reconnected_at: datetime = datetime.now()
+        for subscription in subscriptions:
+            if not subscription.backfillable:
+                subscription.reconnected.publish(reconnected_at)
+
+    threading.Thread(target=__backfill, daemon=True).start()
+
+
 # # 🥭 WebSocketSubscriptionManager class
 #
 # The `WebSocketSubscriptionManager` is a base class for different websocket management approaches.
@@ -248,16 +431,27 @@ class IndividualWebSocketSubscriptionManager(WebSocketSubscriptionManager):
 # The `SharedWebSocketSubscriptionManager` runs a single websocket and sends updates to the correct
 # `WebSocketSubscription`.
 #
+# Subscriptions are indexed by their request ID and by the subscription ID the server gives them, so
+# dispatching a message doesn't depend on how many subscriptions share the websocket. Every time the
+# websocket (re)connects, all subscriptions are requested again and get new subscription IDs.
+#
 class SharedWebSocketSubscriptionManager(WebSocketSubscriptionManager):
     def __init__(self, context: Context, ping_interval: int = 10) -> None:
         super().__init__(context, ping_interval)
         self.ws: typing.Optional[ReconnectingWebsocket] = None
         self.pong: BehaviorSubject = BehaviorSubject(datetime.now())
         self._pong_subscription: typing.Optional[Disposable] = None
+        self._subscriptions_by_id: typing.Dict[int, WebSocketSubscription[typing.Any]] = {}
+        self._subscriptions_by_subscription_id: typing.Dict[int, WebSocketSubscription[typing.Any]] = {}
+        self._connected_before: bool = False
+
+    def add(self, subscription: WebSocketSubscription[typing.Any]) -> None:
+        super().add(subscription)
+        self._subscriptions_by_id[subscription.id] = subscription
 
     def open(self) -> None:
         websocket_url = self.context.client.cluster_ws_url
-        ws: ReconnectingWebsocket = ReconnectingWebsocket(websocket_url, self.open_handler)
+        ws: ReconnectingWebsocket = self._build_websocket(websocket_url)
         ws.item.subscribe(on_next=self.on_item)  # type: ignore[call-arg]
         ws.ping_interval = self.ping_interval
         self.ws = ws
@@ -272,20 +466,24 @@ class SharedWebSocketSubscriptionManager(WebSocketSubscriptionManager):
             self.ws.close()
             self.ws = None
 
+    def _build_websocket(self, websocket_url: str) -> ReconnectingWebsocket:
+        return ReconnectingWebsocket(websocket_url, self.open_handler)
+
     def add_subscription_id(self, id: int, subscription_id: int) -> None:
-        for subscription in self.subscriptions:
-            if subscription.id == id:
-                self._logger.info(
-                    f"Setting ID {subscription_id} on subscription {subscription.id} for {subscription.address}.")
-                subscription.subscription_id = subscription_id
-                return
-        self._logger.error(f"[{self.context.name}] Subscription ID {id} not found")
+        subscription: typing.Optional[WebSocketSubscription[typing.Any]] = self._subscriptions_by_id.get(id)
+        if subscription is None:
+            self._logger.error(f"[{self.context.name}] Subscription ID {id} not found")
+            return
+
+        self._logger.info(f"Setting ID {subscription_id} on subscription {subscription.id} for {subscription.address}.")
+        subscription.subscription_id = subscription_id
+        self._subscriptions_by_subscription_id[subscription_id] = subscription
 
     def subscription_by_subscription_id(self, subscription_id: int) -> WebSocketSubscription[typing.Any]:
-        for subscription in self.subscriptions:
-            if subscription.subscription_id == subscription_id:
-                return subscription
-        raise Exception(f"[{self.context.name}] No subscription with subscription ID {subscription_id} could be found.")
+        subscription = self._subscriptions_by_subscription_id.get(subscription_id)
+        if subscription is None:
+            raise Exception(f"[{self.context.name}] No subscription with subscription ID {subscription_id} could be found.")
+        return subscription
 
     def on_item(self, response: typing.Dict[str, typing.Any]) -> None:
         if "method" not in response:
@@ -295,15 +493,26 @@ class SharedWebSocketSubscriptionManager(WebSocketSubscriptionManager):
         elif (response["method"] == "accountNotification") or (response["method"] == "programNotification") or (response["method"] == "logsNotification"):
             subscription_id = response["params"]["subscription"]
             subscription = self.subscription_by_subscription_id(subscription_id)
-            built = subscription.build_subscribed_instance(response["params"])
-            subscription.publisher.publish(built)
+            subscription.handle_notification(response["params"])
         else:
             self._logger.error(f"[{self.context.name}] Unknown response: {response}")
 
     def open_handler(self, ws: websocket.WebSocketApp) -> None:
+        # Subscription IDs from a previous connection mean nothing on this one.
+        self._subscriptions_by_subscription_id = {}
         for subscription in self.subscriptions:
             ws.send(subscription.build_request())
 
+        # Anything that changed while disconnected would otherwise be missed until its next notification.
+        if self._connected_before:
+            backfill_subscriptions_in_background(self.context, list(self.subscriptions))
+        self._connected_before = True
+
+    def on_disconnected(self, ws: websocket.WebSocketApp) -> None:
+        super().on_disconnected(ws)
+        self._subscriptions_by_id = {}
+        self._subscriptions_by_subscription_id = {}
+
     def dispose(self) -> None:
         super().dispose()
         if self.ws is not None:
@@ -312,3 +521,119 @@ class SharedWebSocketSubscriptionManager(WebSocketSubscriptionManager):
                 self._pong_subscription = None
             self.ws.close()
             self.ws = None
+
+
+# # 🥭 AsyncWebSocketSubscriptionManager class
+#
+# The `AsyncWebSocketSubscriptionManager` multiplexes all its subscriptions over a single websocket, like
+# `SharedWebSocketSubscriptionManager`, but the websocket is an `AsyncReconnectingWebsocket` running on the
+# process-wide `SharedEventLoop` instead of having its own thread.
+#
+# Updates are still published through each subscription's `publisher`, so watchers don't need to know which
+# manager they're using.
+#
+class AsyncWebSocketSubscriptionManager(SharedWebSocketSubscriptionManager):
+    def __init__(self, context: Context, ping_interval: int = 10) -> None:
+        super().__init__(context, ping_interval)
+
+    def _build_websocket(self, websocket_url: str) -> ReconnectingWebsocket:
+        return AsyncReconnectingWebsocket(websocket_url, self.open_handler)
+
+
+# # 🥭 PooledWebSocketSubscriptionManager class
+#
+# The `PooledWebSocketSubscriptionManager` spreads subscriptions across a pool of `connection_count` shared
+# websockets. This allows watching thousands of accounts over a few websockets, without any one websocket
+# carrying all the traffic.
+#
+# Each websocket is a `SharedWebSocketSubscriptionManager`, with its own reader thread, and it requests all
+# its subscriptions again whenever it reconnects.
+#
+# Subscriptions are assigned to websockets by consistent hashing of their address. Each websocket has
+# `virtual_nodes` points on a hash ring, and an address goes to the websocket owning the next point after
+# the address' hash. An address always goes to the same websocket, and changing the number of websockets
+# only moves the addresses it has to.
+#
+# Each websocket's pongs are in `pongs`, and `add_health_checks()` registers each one separately, so a dead
+# websocket shows up even while the others are fine. The pool's own `pong` only fires once every open
+# websocket has ponged since it last fired.
+#
+class PooledWebSocketSubscriptionManager(WebSocketSubscriptionManager):
+    def __init__(self, context: Context, connection_count: int = 4, ping_interval: int = 10, virtual_nodes: int = 64) -> None:
+        super().__init__(context, ping_interval)
+        if connection_count < 1:
+            raise Exception(f"Websocket pool must have at least 1 connection, not {connection_count}.")
+        self.connections: typing.Sequence[SharedWebSocketSubscriptionManager] = [
+            SharedWebSocketSubscriptionManager(context, ping_interval) for _ in range(connection_count)]
+
+        ring: typing.List[typing.Tuple[int, int]] = sorted(
+            (PooledWebSocketSubscriptionManager._hash(f"{index}:{point}".encode()), index)
+            for index in range(connection_count) for point in range(virtual_nodes))
+        self._ring_hashes: typing.Sequence[int] = [point_hash for point_hash, _ in ring]
+        self._ring_connections: typing.Sequence[int] = [index for _, index in ring]
+
+        self.pong: BehaviorSubject = BehaviorSubject(datetime.now())
+        self._pong_subscriptions: typing.List[Disposable] = []
+        self._ponged: typing.Set[int] = set()
+        self._open_indices: typing.Set[int] = set()
+        self._pong_lock: threading.Lock = threading.Lock()
+
+    # The pong of each websocket, in the same order as `connections`.
+    @property
+    def pongs(self) -> typing.Sequence[BehaviorSubject]:
+        return [connection.pong for connection in self.connections]
+
+    # Registers each websocket's pong separately, as `{name}_0`, `{name}_1` and so on.
+    def add_health_checks(self, health_check: HealthCheck, name: str = "ws_pong") -> None:
+        for index, pong in enumerate(self.pongs):
+            health_check.add(f"{name}_{index}", pong)
+
+    def _on_connection_pong(self, index: int, when: datetime) -> None:
+        with self._pong_lock:
+            self._ponged.add(index)
+            if not self._open_indices.issubset(self._ponged):
+                return
+            self._ponged = set()
+        self.pong.on_next(when)
+
+    @staticmethod
+    def _hash(data: bytes) -> int:
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+    def connection_for(self, address: PublicKey) -> SharedWebSocketSubscriptionManager:
+        position: int = bisect.bisect(self._ring_hashes, PooledWebSocketSubscriptionManager._hash(bytes(address)))
+        return self.connections[self._ring_connections[position % len(self._ring_connections)]]
+
+    def add(self, subscription: WebSocketSubscription[typing.Any]) -> None:
+        super().add(subscription)
+        self.connection_for(subscription.address).add(subscription)
+
+    def open(self) -> None:
+        for index, connection in enumerate(self.connections):
+            if len(connection.subscriptions) > 0:
+                self._open_indices.add(index)
+                connection.open()
+
+        for index in self._open_indices:
+            self._pong_subscriptions += [self.connections[index].pong.subscribe(
+                on_next=lambda when, index=index: self._on_connection_pong(index, when))]  # type: ignore[misc]
+
+    def close(self) -> None:
+        for pong_subscription in self._pong_subscriptions:
+            pong_subscription.dispose()
+        self._pong_subscriptions = []
+        self._open_indices = set()
+        for connection in self.connections:
+            connection.close()
+
+    def on_disconnected(self, ws: websocket.WebSocketApp) -> None:
+        for connection in self.connections:
+            connection.on_disconnected(ws)
+        self.subscriptions = []
+
+    def dispose(self) -> None:
+        for pong_subscription in self._pong_subscriptions:
+            pong_subscription.dispose()
+        self._pong_subscriptions = []
+        for connection in self.connections:
+            connection.dispose()
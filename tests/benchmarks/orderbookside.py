@@ -0,0 +1,43 @@
+# Benchmarks walking a full perp orderbook side into `Order`s.
+#
+# Run with:
+#   python -m tests.benchmarks.orderbookside
+#
+# The book is a full side - 512 leaves and 511 inner nodes, so 1023 of the 1024 nodes are in use - built the
+# same way as the orderbook side fixtures used in the tests.
+
+import timeit
+import typing
+
+from ..context import mango
+from ..fakes import fake_account_info, fake_perp_orderbook_side_data, FakePerpMarketDetails
+
+
+def _full_construct_orders(account_info: mango.AccountInfo, details: mango.PerpMarketDetails) -> typing.Sequence[mango.Order]:
+    layout = mango.layouts.ORDERBOOK_SIDE.parse(account_info.data)
+    side = mango.PerpOrderBookSide.from_layout(layout, account_info, mango.Version.V1, details)
+    return side.orders()
+
+
+def _lazy_orders(account_info: mango.AccountInfo, details: mango.PerpMarketDetails) -> typing.Sequence[mango.Order]:
+    return mango.PerpOrderBookSide.parse(account_info, details).orders()
+
+
+def _lazy_top_of_book(account_info: mango.AccountInfo, details: mango.PerpMarketDetails) -> typing.Optional[mango.Order]:
+    return mango.PerpOrderBookSide.parse(account_info, details).top_of_book()
+
+
+def main(iterations: int = 20) -> None:
+    details = FakePerpMarketDetails()
+    for side in [mango.Side.BUY, mango.Side.SELL]:
+        data = fake_perp_orderbook_side_data(side, list(range(1000, 1512)))
+        account_info = fake_account_info(data=data)
+        baseline = min(timeit.repeat(lambda: _full_construct_orders(account_info, details), number=iterations, repeat=3))
+        print(f"{side} construct decode + walk: {baseline / iterations * 1000:.2f}ms per side")
+        for name, func in [("compiled decode + walk", _lazy_orders), ("top of book", _lazy_top_of_book)]:
+            elapsed = min(timeit.repeat(lambda: func(account_info, details), number=iterations, repeat=3))
+            print(f"{side} {name}: {elapsed / iterations * 1000:.2f}ms per side ({baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from ..fakes import fake_context
+from ..data import load_data_from_directory
+
+from mango.calculators.batchhealthcalculator import BatchHealthCalculator, PackedAccounts
+from mango.calculators.healthcalculator import HealthType, HealthCalculator
+
+
+def _assert_matches_health_calculator(directory: str) -> None:
+    context = fake_context()
+    group, cache, account, open_orders = load_data_from_directory(directory)
+
+    expected = HealthCalculator(context, HealthType.INITIAL).calculate(account, open_orders, group, cache)
+    actual = BatchHealthCalculator(context, HealthType.INITIAL).calculate_accounts(
+        [account, account], open_orders, group, cache)
+
+    assert len(actual) == 2
+    for health in actual:
+        assert abs(health - float(expected)) <= 1e-9 * max(abs(float(expected)), 1)
+
+
+def test_empty() -> None:
+    _assert_matches_health_calculator("tests/testdata/empty")
+
+
+def test_1deposit() -> None:
+    _assert_matches_health_calculator("tests/testdata/1deposit")
+
+
+def test_account1() -> None:
+    _assert_matches_health_calculator("tests/testdata/account1")
+
+
+def test_account2() -> None:
+    _assert_matches_health_calculator("tests/testdata/account2")
+
+
+def test_account3() -> None:
+    _assert_matches_health_calculator("tests/testdata/account3")
+
+
+def test_account4() -> None:
+    _assert_matches_health_calculator("tests/testdata/account4")
+
+
+def test_mixed_batch_and_maintenance() -> None:
+    context = fake_context()
+    # These share a group and cache, so they can go in the same batch.
+    group, cache, empty, _ = load_data_from_directory("tests/testdata/empty")
+    _, _, deposit, open_orders = load_data_from_directory("tests/testdata/1deposit")
+
+    packed = PackedAccounts.pack([empty, deposit], open_orders, group)
+    assert packed.raw_deposit.shape == (2, len(group.slots_by_index))
+
+    initial = BatchHealthCalculator(context, HealthType.INITIAL).calculate(packed, group, cache)
+    maintenance = BatchHealthCalculator(context, HealthType.MAINTENANCE).calculate(packed, group, cache)
+    assert initial[0] == 0
+    assert abs(initial[1] - 37904.26000005919) < 1e-6
+    # Maintenance weights are more generous to assets than initial weights.
+    assert maintenance[0] == 0
+    assert maintenance[1] > initial[1]
+
+
+def test_perp_only_slots() -> None:
+    context = fake_context()
+    group, cache, account, open_orders = load_data_from_directory("tests/testdata/account7")
+
+    initial = BatchHealthCalculator(context, HealthType.INITIAL).calculate_accounts([account], open_orders, group, cache)
+    maintenance = BatchHealthCalculator(context, HealthType.MAINTENANCE).calculate_accounts(
+        [account], open_orders, group, cache)
+    assert initial[0] < 0
+    assert maintenance[0] > initial[0]
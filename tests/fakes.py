@@ -2,6 +2,7 @@ import construct
 import datetime
 import mango
 import mango.marketmaking
+import struct
 import typing
 
 from decimal import Decimal
@@ -290,3 +291,38 @@ def fake_model_state(order_owner: typing.Optional[PublicKey] = None,
 
 def fake_mango_instruction() -> mango.MangoInstruction:
     return mango.MangoInstruction(mango.InstructionType.PlacePerpOrder, "", [fake_seeded_public_key("account")])
+
+
+class FakePerpMarketDetails(mango.PerpMarketDetails):
+    def __init__(self, base_decimals: int = 6, quote_decimals: int = 6,
+                 base_lot_size: Decimal = Decimal(1), quote_lot_size: Decimal = Decimal(1)) -> None:
+        self.base_instrument = fake_instrument("BASE", base_decimals)
+        self.quote_token = mango.TokenBank(fake_token("QUOTE", quote_decimals), fake_seeded_public_key("quote"))
+        self.base_lot_size = base_lot_size
+        self.quote_lot_size = quote_lot_size
+
+
+# Builds the data for a perp orderbook side holding one order at each of the given prices, with the leaves
+# in a balanced tree the way the on-chain crit-bit tree keeps them: lower keys to children[0], higher keys
+# to children[1].
+def fake_perp_orderbook_side_data(side: mango.Side, prices: typing.Sequence[int], quantity: int = 10) -> bytes:
+    owner = bytes(fake_seeded_public_key("orderbook owner"))
+    keys = sorted((price << 64) | sequence for sequence, price in enumerate(prices))
+    nodes: typing.List[bytes] = []
+
+    def add_subtree(low: int, high: int) -> int:
+        if high - low == 1:
+            nodes.append(struct.pack("<IB3x16s32sQQqQ", 2, 0, keys[low].to_bytes(16, "little"), owner,
+                                     quantity, low, 0, 1637212440))
+            return len(nodes) - 1
+        middle = (low + high) // 2
+        left = add_subtree(low, middle)
+        right = add_subtree(middle, high)
+        nodes.append(struct.pack("<II16sII56x", 1, 0, keys[middle].to_bytes(16, "little"), left, right))
+        return len(nodes) - 1
+
+    root = add_subtree(0, len(keys)) if len(keys) > 0 else 0
+    data_type = 5 if side == mango.Side.BUY else 6
+    header = struct.pack("<BBB5xQQIIQ", data_type, 0, 1, len(nodes), 0, 0, root, len(keys))
+    unused = bytes((mango.layouts.MAX_BOOK_NODES - len(nodes)) * 88)
+    return header + b"".join(nodes) + unused
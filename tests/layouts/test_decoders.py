@@ -0,0 +1,106 @@
+import construct
+import pytest
+import struct
+
+from decimal import Decimal
+from solana.publickey import PublicKey
+
+import mango
+
+
+def _load_data(filename: str) -> bytes:
+    return mango.AccountInfo.load_json(filename).data
+
+
+def _book_side_data() -> bytes:
+    header = struct.pack("<BBB5xQQIIQ", 5, 0, 1, 3, 0, 0, 0, 2)
+    owner = bytes(PublicKey("9Bq4ADKPXa3oxPA2Fp4Z3qBjCjjPkk4GE7zsuZfVT9jF"))
+    inner = struct.pack("<II16sII", 1, 0, (17 << 64).to_bytes(16, "little"), 1, 2) + bytes(56)
+    leaf1 = struct.pack("<IB3x8sQ32sqQqQ", 2, 3, (5).to_bytes(8, "little"), 2000, owner, 10, 77, -3, 1637212440)
+    leaf2 = struct.pack("<IB3x8sQ32sqQqQ", 2, 1, (6).to_bytes(8, "little"), 1990, owner, 20, 78, 4, 1637212441)
+    free = struct.pack("<II", 4, 0) + bytes(80)
+    uninitialized = bytes(mango.layouts.MAX_BOOK_NODES * 88 - (4 * 88))
+    return header + inner + leaf1 + leaf2 + free + uninitialized
+
+
+def _event_queue_data() -> bytes:
+    header = struct.pack("<BBB5xQQQ", 8, 0, 1, 1, 2, 300)
+    maker = bytes(PublicKey("9Bq4ADKPXa3oxPA2Fp4Z3qBjCjjPkk4GE7zsuZfVT9jF"))
+    fill = struct.pack("<BBB?4xQQ32s16sQ16sqQ32s16sQ16sqq",
+                       0, 1, 2, True, 1637212440, 299, maker, (-7).to_bytes(16, "little", signed=True), 11,
+                       (3 << 44).to_bytes(16, "little", signed=True), 5, 1637212400, bytes(32),
+                       (9).to_bytes(16, "little"), 12, (-(1 << 46)).to_bytes(16, "little", signed=True), 1500, 3)
+    out = struct.pack("<BBB5xQQ32sq", 1, 0, 4, 1637212441, 300, maker, 8) + bytes(136)
+    unknown = b"\x07" + bytes(199)
+    # Trailing partial event should be ignored, just like construct's GreedyRange does.
+    return header + fill + out + unknown + bytes(150)
+
+
+def test_compiled_layouts_compile() -> None:
+    assert mango.decoders.MANGO_ACCOUNT.compiled is not None
+    assert mango.decoders.GROUP.compiled is not None
+    assert mango.decoders.CACHE.compiled is not None
+    assert mango.decoders.ORDERBOOK_SIDE.compiled is not None
+    assert mango.decoders.PERP_EVENT_QUEUE.compiled is not None
+    assert mango.decoders.GROUP.sizeof() == mango.layouts.GROUP.sizeof()
+    assert mango.decoders.GROUP.compiled.size == mango.layouts.GROUP.sizeof()
+
+
+def test_account_group_and_cache_match_construct() -> None:
+    for directory in ["account1", "account2", "account3", "account4", "account5"]:
+        account_data = _load_data(f"tests/testdata/{directory}/account.json")
+        assert mango.decoders.MANGO_ACCOUNT.compiled is not None
+        assert mango.decoders.MANGO_ACCOUNT.compiled.unpack_from(
+            account_data) == mango.layouts.MANGO_ACCOUNT.parse(account_data)
+
+        group_data = _load_data(f"tests/testdata/{directory}/group.json")
+        assert mango.decoders.GROUP.compiled is not None
+        assert mango.decoders.GROUP.compiled.unpack_from(group_data) == mango.layouts.GROUP.parse(group_data)
+
+        cache_data = _load_data(f"tests/testdata/{directory}/cache.json")
+        assert mango.decoders.CACHE.compiled is not None
+        assert mango.decoders.CACHE.compiled.unpack_from(cache_data) == mango.layouts.CACHE.parse(cache_data)
+
+
+def test_decoded_values_have_construct_types() -> None:
+    account = mango.decoders.MANGO_ACCOUNT.parse(_load_data("tests/testdata/account1/account.json"))
+    assert isinstance(account, construct.Container)
+    assert isinstance(account.deposits, construct.ListContainer)
+    assert isinstance(account.meta_data.data_type, construct.EnumIntegerString)
+    assert account.meta_data.data_type == "Account"
+    assert account.meta_data.padding is None
+    assert isinstance(account.deposits[0], Decimal)
+    assert isinstance(account.is_bankrupt, bool)
+
+
+def test_orderbook_side_matches_construct() -> None:
+    data = _book_side_data()
+    assert mango.decoders.ORDERBOOK_SIDE.compiled is not None
+    actual = mango.decoders.ORDERBOOK_SIDE.compiled.unpack_from(data)
+    assert actual == mango.layouts.ORDERBOOK_SIDE.parse(data)
+    assert actual.nodes[0].type_name == "inner"
+    assert actual.nodes[1].type_name == "leaf"
+    assert actual.nodes[1].key["price"] == Decimal(2000)
+    assert actual.nodes[1].best_initial == Decimal(-3)
+    assert actual.nodes[3].type_name == "last_free"
+    assert actual.nodes[4].type_name == "uninitialized"
+
+
+def test_perp_event_queue_matches_construct() -> None:
+    data = _event_queue_data()
+    assert mango.decoders.PERP_EVENT_QUEUE.compiled is not None
+    actual = mango.decoders.PERP_EVENT_QUEUE.compiled.unpack_from(data)
+    assert actual == mango.layouts.PERP_EVENT_QUEUE.parse(data)
+    assert len(actual.events) == 3
+    assert actual.events[0].event_type == b"\x00"
+    assert actual.events[0].maker_out
+    assert actual.events[0].maker_order_id == Decimal(-7)
+    assert actual.events[1].event_type == b"\x01"
+    assert actual.events[2].event_type == b"\x07"
+
+
+def test_unknown_book_node_falls_back_to_construct() -> None:
+    data = bytearray(_book_side_data())
+    data[40] = 9
+    with pytest.raises(Exception, match="Unknown node type tag: 9"):
+        mango.decoders.ORDERBOOK_SIDE.parse(bytes(data))
@@ -0,0 +1,95 @@
+import base64
+import mango
+import mango.marketmaking
+import rx
+import threading
+import typing
+
+from solana.publickey import PublicKey
+
+from ..fakes import fake_context, fake_loaded_market, fake_model_state, fake_price, fake_seeded_public_key, MockClient
+
+
+class RecordingClient(MockClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: typing.List[typing.List[str]] = []
+        self.loading: threading.Event = threading.Event()
+        self.price_fetched: threading.Event = threading.Event()
+        self.price_fetched_during_load: bool = False
+
+    def get_multiple_accounts(self, pubkeys: typing.List[typing.Union[PublicKey, str]], *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        self.calls += [[str(pubkey) for pubkey in pubkeys]]
+        self.loading.set()
+        # An off-chain price must be fetched while the accounts are still loading.
+        self.price_fetched_during_load = self.price_fetched.wait(timeout=5)
+        return [{
+            "executable": False,
+            "lamports": 1,
+            "owner": str(fake_seeded_public_key("owner")),
+            "rentEpoch": 0,
+            "data": [base64.b64encode(str(pubkey).encode("ascii")).decode("ascii"), "base64"]
+        } for pubkey in pubkeys]
+
+
+class FakeOracle(mango.Oracle):
+    def __init__(self, client: RecordingClient, price_addresses: typing.Sequence[PublicKey]) -> None:
+        super().__init__("Fake Oracle", fake_loaded_market())
+        self.client: RecordingClient = client
+        self.price_addresses: typing.Sequence[PublicKey] = price_addresses
+        self.parsed: typing.List[typing.Sequence[mango.AccountInfo]] = []
+
+    def fetch_price(self, context: mango.Context) -> mango.Price:
+        assert self.client.loading.wait(timeout=5)
+        self.client.price_fetched.set()
+        return fake_price()
+
+    def to_streaming_observable(self, context: mango.Context) -> rx.core.typing.Observable[mango.Price]:
+        return rx.empty()
+
+    def price_account_addresses(self, context: mango.Context) -> typing.Sequence[PublicKey]:
+        return self.price_addresses
+
+    def parse_price(self, account_infos: typing.Sequence[mango.AccountInfo]) -> mango.Price:
+        self.parsed += [account_infos]
+        return fake_price()
+
+
+class FakePollingModelStateBuilder(mango.marketmaking.PollingModelStateBuilder):
+    def poll(self, context: mango.Context) -> mango.ModelState:
+        return fake_model_state()
+
+
+def test_on_chain_price_is_loaded_with_accounts() -> None:
+    context = fake_context()
+    client = RecordingClient()
+    client.price_fetched.set()
+    context.client = client
+    addresses = [fake_seeded_public_key("one"), fake_seeded_public_key("two")]
+    oracle = FakeOracle(client, [fake_seeded_public_key("price")])
+
+    account_infos, price = FakePollingModelStateBuilder().load_accounts_and_price(context, oracle, addresses)
+
+    assert client.calls == [[str(address) for address in [*addresses, fake_seeded_public_key("price")]]]
+    assert [account_info.address for account_info in account_infos] == addresses
+    assert len(oracle.parsed) == 1
+    assert oracle.parsed[0][0].address == fake_seeded_public_key("price")
+    assert price is not None
+
+
+def test_off_chain_price_is_fetched_concurrently() -> None:
+    context = fake_context()
+    client = RecordingClient()
+    context.client = client
+    addresses = [fake_seeded_public_key("one"), fake_seeded_public_key("two")]
+    oracle = FakeOracle(client, [])
+
+    account_infos, price = FakePollingModelStateBuilder().load_accounts_and_price(context, oracle, addresses)
+
+    # The account load waits for the price fetch, which waits for the account load to start, so this only
+    # completes if they run at the same time.
+    assert client.price_fetched_during_load
+    assert client.calls == [[str(address) for address in addresses]]
+    assert [account_info.address for account_info in account_infos] == addresses
+    assert len(oracle.parsed) == 0
+    assert price is not None
@@ -0,0 +1,101 @@
+import mango
+import mango.marketmaking
+import typing
+
+from decimal import Decimal
+
+from ..fakes import fake_model_state, fake_order, fake_price
+
+
+def _model_state(price: Decimal = Decimal(100), top_bid: Decimal = Decimal(99), top_ask: Decimal = Decimal(101),
+                 placed_orders: typing.Sequence[mango.PlacedOrder] = []) -> mango.ModelState:
+    orderbook = mango.OrderBook("FAKE", mango.NullLotSizeConverter(),
+                                [fake_order(price=top_bid, side=mango.Side.BUY)],
+                                [fake_order(price=top_ask, side=mango.Side.SELL)])
+    return fake_model_state(price=fake_price(price=price), orderbook=orderbook,
+                            placed_orders_container=mango.PerpOpenOrders(placed_orders))
+
+
+def _trigger() -> mango.marketmaking.StateChangePulseTrigger:
+    return mango.marketmaking.StateChangePulseTrigger(Decimal("0.01"), Decimal("0.01"), 1, 30)
+
+
+def test_first_check_pulses() -> None:
+    trigger = _trigger()
+    assert trigger.pulse_reason(_model_state(), now=0) == "first pulse"
+
+
+def test_no_pulse_without_changes() -> None:
+    trigger = _trigger()
+    model_state = _model_state()
+    trigger.pulsed(model_state, now=0)
+    assert trigger.pulse_reason(model_state, now=5) is None
+
+
+def test_small_changes_do_not_pulse() -> None:
+    trigger = _trigger()
+    trigger.pulsed(_model_state(), now=0)
+    assert trigger.pulse_reason(_model_state(price=Decimal("100.5"), top_ask=Decimal("101.5")), now=5) is None
+
+
+def test_price_move_pulses() -> None:
+    trigger = _trigger()
+    trigger.pulsed(_model_state(), now=0)
+    assert trigger.pulse_reason(_model_state(price=Decimal(102)), now=5) == "price moved"
+
+
+def test_top_of_book_move_pulses() -> None:
+    trigger = _trigger()
+    trigger.pulsed(_model_state(), now=0)
+    assert trigger.pulse_reason(_model_state(top_bid=Decimal(97)), now=5) == "top of book moved"
+
+
+def test_open_orders_change_pulses() -> None:
+    trigger = _trigger()
+    trigger.pulsed(_model_state(), now=0)
+    placed = [mango.PlacedOrder(id=1, client_id=2, side=mango.Side.BUY)]
+    assert trigger.pulse_reason(_model_state(placed_orders=placed), now=5) == "open orders changed"
+
+
+def _reconciled(keep: typing.Sequence[int] = [], place: typing.Sequence[int] = [],
+                cancel: typing.Sequence[int] = []) -> mango.marketmaking.ReconciledOrders:
+    reconciled = mango.marketmaking.ReconciledOrders()
+    reconciled.to_keep = [fake_order().with_client_id(client_id) for client_id in keep]
+    reconciled.to_place = [fake_order().with_client_id(client_id) for client_id in place]
+    reconciled.to_cancel = [fake_order().with_client_id(client_id) for client_id in cancel]
+    return reconciled
+
+
+def _placed(*client_ids: int) -> typing.Sequence[mango.PlacedOrder]:
+    return [mango.PlacedOrder(id=client_id * 10, client_id=client_id, side=mango.Side.BUY) for client_id in client_ids]
+
+
+def test_own_order_changes_do_not_pulse() -> None:
+    trigger = _trigger()
+    trigger.pulsed(_model_state(placed_orders=_placed(1, 2)), _reconciled(keep=[1], place=[3], cancel=[2]), now=0)
+
+    # The cancelled order hasn't gone yet, and then it has, and the placed order shows up.
+    assert trigger.pulse_reason(_model_state(placed_orders=_placed(1, 2, 3)), now=5) is None
+    assert trigger.pulse_reason(_model_state(placed_orders=_placed(1, 3)), now=5) is None
+
+
+def test_filled_order_after_pulse_pulses() -> None:
+    trigger = _trigger()
+    trigger.pulsed(_model_state(placed_orders=_placed(1)), _reconciled(keep=[1], place=[3]), now=0)
+    assert trigger.pulse_reason(_model_state(placed_orders=_placed(3)), now=5) == "open orders changed"
+
+
+def test_minimum_gap_debounces_changes() -> None:
+    trigger = _trigger()
+    trigger.pulsed(_model_state(), now=0)
+    moved = _model_state(price=Decimal(110))
+    assert trigger.pulse_reason(moved, now=0.5) is None
+    assert trigger.pulse_reason(moved, now=1) == "price moved"
+
+
+def test_maximum_staleness_forces_pulse() -> None:
+    trigger = _trigger()
+    model_state = _model_state()
+    trigger.pulsed(model_state, now=0)
+    assert trigger.pulse_reason(model_state, now=29) is None
+    assert trigger.pulse_reason(model_state, now=30) == "stale"
@@ -0,0 +1,218 @@
+import base64
+import datetime
+import json
+import pytest
+import threading
+import time
+import typing
+
+from decimal import Decimal
+from solana.publickey import PublicKey
+from solana.rpc.types import RPCResponse
+
+from .context import mango
+from .fakes import fake_account, fake_account_slot, fake_cache, fake_context, fake_group, fake_perp_account, fake_seeded_public_key, MockClient
+
+from mango.websocketsubscription import backfill_subscriptions_in_background
+
+
+class ProgramAccountsClient(MockClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.accounts: typing.Dict[str, bytes] = {}
+        self.on_fetch: typing.Callable[[], None] = lambda: None
+
+    def get_program_accounts(self, pubkey: typing.Union[str, PublicKey], *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        self.on_fetch()
+        return [{"pubkey": address, "account": _account_value(data)} for address, data in self.accounts.items()]
+
+
+def _account_value(data: bytes) -> typing.Dict[str, typing.Any]:
+    return {
+        "executable": False,
+        "lamports": 1000000,
+        "owner": str(fake_seeded_public_key("owner")),
+        "rentEpoch": 0,
+        "data": [base64.b64encode(data).decode("ascii"), "base64"]
+    }
+
+
+# The fake parser builds an account with a borrow or a perp position depending on the data.
+def _parse(parsed: typing.List[bytes]) -> typing.Callable[[mango.AccountInfo, mango.Group, mango.Cache], mango.Account]:
+    def __parse(account_info: mango.AccountInfo, group: mango.Group, cache: mango.Cache) -> mango.Account:
+        parsed.append(account_info.data)
+        account = fake_account()
+        account.account_info = account_info
+        if account_info.data.startswith(b"borrow"):
+            account.shared_quote.raw_borrow = Decimal(1)
+        if account_info.data.startswith(b"perp"):
+            perp_account = fake_perp_account()
+            perp_account.base_position = Decimal(-3)
+            slot = fake_account_slot()
+            slot.perp_account = perp_account
+            account.base_slots = [slot]
+        return account
+    return __parse
+
+
+def _index(parsed: typing.List[bytes]) -> typing.Tuple[mango.AccountIndex, ProgramAccountsClient]:
+    context = fake_context()
+    client = ProgramAccountsClient()
+    context.client = client
+    return mango.AccountIndex(context, fake_group(), fake_cache(), _parse(parsed)), client
+
+
+def test_seed_and_ripe_query() -> None:
+    parsed: typing.List[bytes] = []
+    index, client = _index(parsed)
+    addresses = [fake_seeded_public_key(f"account {counter}") for counter in range(3)]
+    client.accounts = {str(addresses[0]): b"clean", str(addresses[1]): b"borrow", str(addresses[2]): b"perp"}
+
+    index.seed()
+
+    assert len(index.accounts) == 3
+    ripe = sorted(str(account.address) for account in index.accounts_with_borrows_or_perp_positions())
+    assert ripe == sorted([str(addresses[1]), str(addresses[2])])
+
+    # Re-seeding drops accounts that have gone and doesn't re-parse unchanged ones.
+    del client.accounts[str(addresses[1])]
+    index.seed()
+    assert len(parsed) == 3
+    assert index.unchanged_count == 2
+    assert index.account(addresses[1]) is None
+    assert [str(account.address) for account in index.accounts_with_borrows_or_perp_positions()] == [str(addresses[2])]
+
+
+def test_failed_seed_keeps_index() -> None:
+    parsed: typing.List[bytes] = []
+    index, client = _index(parsed)
+    address = fake_seeded_public_key("account")
+    client.accounts = {str(address): b"borrow"}
+    index.seed()
+
+    def fail() -> None:
+        raise Exception("getProgramAccounts timed out")
+    client.on_fetch = fail
+    client.accounts = {}
+    with pytest.raises(Exception, match="getProgramAccounts timed out"):
+        index.seed()
+
+    assert index.account(address) is not None
+    assert len(index.accounts_with_borrows_or_perp_positions()) == 1
+
+    # A failed seed doesn't leave streamed updates being tracked as if a seed was still running.
+    client.on_fetch = lambda: None
+    client.accounts = {str(address): b"clean"}
+    index.seed()
+    assert index.accounts_with_borrows_or_perp_positions() == []
+
+
+def test_only_changed_bytes_are_parsed() -> None:
+    parsed: typing.List[bytes] = []
+    index, _ = _index(parsed)
+    address = fake_seeded_public_key("account")
+
+    assert index.update(mango.AccountInfo(address, False, Decimal(0), address, Decimal(0), b"clean"))
+    assert not index.update(mango.AccountInfo(address, False, Decimal(0), address, Decimal(0), b"clean"))
+    assert index.accounts_with_borrows_or_perp_positions() == []
+
+    assert index.update(mango.AccountInfo(address, False, Decimal(0), address, Decimal(0), b"borrow"))
+    assert parsed == [b"clean", b"borrow"]
+    assert index.parse_count == 2
+    assert index.unchanged_count == 1
+    assert len(index.accounts_with_borrows_or_perp_positions()) == 1
+
+
+def test_streamed_updates_win_over_seed() -> None:
+    parsed: typing.List[bytes] = []
+    index, client = _index(parsed)
+    address = fake_seeded_public_key("account")
+    client.accounts = {str(address): b"borrow"}
+
+    # The account is repaid while the seed is loading.
+    def repaid() -> None:
+        index.update(mango.AccountInfo(address, False, Decimal(0), address, Decimal(0), b"clean"))
+    client.on_fetch = repaid
+
+    index.seed()
+    assert parsed == [b"clean"]
+    assert index.accounts_with_borrows_or_perp_positions() == []
+
+
+def _cache_with_borrow_index(borrow_index: Decimal) -> mango.Cache:
+    cache = fake_cache()
+    cache.root_bank_cache = [None, mango.RootBankCache(Decimal(1), borrow_index, datetime.datetime.now())]
+    return cache
+
+
+def test_new_root_bank_indexes_revalue_accounts() -> None:
+    parsed: typing.List[bytes] = []
+    index, _ = _index(parsed)
+    index.cache = _cache_with_borrow_index(Decimal(2))
+    address = fake_seeded_public_key("account")
+    index.update(mango.AccountInfo(address, False, Decimal(0), address, Decimal(0), b"borrow"))
+    parsed_account = index.accounts_with_borrows_or_perp_positions()[0]
+
+    # The same indexes in a newer cache don't change anything.
+    index.cache = _cache_with_borrow_index(Decimal(2))
+    assert index.accounts_with_borrows_or_perp_positions()[0] is parsed_account
+    assert index.revalue_count == 0
+
+    # Interest has accrued, so the unchanged account's borrow is worth more without being re-parsed.
+    index.cache = _cache_with_borrow_index(Decimal(3))
+    revalued = index.accounts_with_borrows_or_perp_positions()[0]
+    quote = revalued.shared_quote
+    assert quote.borrow.value == quote.base_instrument.shift_to_decimals(Decimal(3))
+    assert index.account(address) is revalued
+    assert index.revalue_count == 1
+    assert parsed == [b"borrow"]
+
+
+def test_program_subscription_filters_and_notifications() -> None:
+    parsed: typing.List[bytes] = []
+    index, _ = _index(parsed)
+    subscription = mango.WebSocketProgramSubscription[mango.AccountInfo](
+        index.context, index.context.mango_program_address, lambda account_info: account_info,
+        memcmp_opts=index.memcmp_opts, data_size=index.data_size)
+
+    def on_update(account_info: mango.AccountInfo) -> None:
+        index.update(account_info)
+    subscription.publisher.subscribe(on_next=on_update)
+
+    request = json.loads(subscription.build_request())
+    assert request["method"] == "programSubscribe"
+    assert request["params"][1]["filters"] == [
+        {"dataSize": mango.layouts.MANGO_ACCOUNT.sizeof()},
+        {"memcmp": {"offset": mango.layouts.METADATA.sizeof(), "bytes": str(index.group.address)}}
+    ]
+
+    address = fake_seeded_public_key("account")
+    subscription.handle_notification(typing.cast(RPCResponse, {
+        "result": {"context": {"slot": 1}, "value": {"pubkey": str(address), "account": _account_value(b"perp")}},
+        "subscription": 1
+    }))
+    account = index.account(address)
+    assert account is not None
+    assert account.address == address
+    assert len(index.accounts_with_borrows_or_perp_positions()) == 1
+
+
+def test_reconnection_reseeds_index() -> None:
+    parsed: typing.List[bytes] = []
+    index, client = _index(parsed)
+    address = fake_seeded_public_key("account")
+    client.accounts = {str(address): b"borrow"}
+    seeded = threading.Event()
+    client.on_fetch = seeded.set
+
+    manager = mango.SharedWebSocketSubscriptionManager(index.context)
+    subscription = index.subscribe(manager)
+    assert manager.subscriptions == [subscription]
+
+    backfill_subscriptions_in_background(index.context, [subscription])
+    assert seeded.wait(5)
+    for _ in range(50):
+        if index.account(address) is not None:
+            break
+        time.sleep(0.1)
+    assert index.account(address) is not None
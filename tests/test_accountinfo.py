@@ -1,9 +1,32 @@
+import random
+import time
+import typing
+
 from .context import mango
+from .fakes import fake_context, fake_seeded_public_key, MockClient
 
 from decimal import Decimal
 from solana.publickey import PublicKey
 
 
+class SlowGetMultipleAccountsClient(MockClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.chunk_sizes: typing.List[int] = []
+
+    def get_multiple_accounts(self, pubkeys: typing.List[typing.Union[PublicKey, str]], *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        self.chunk_sizes += [len(pubkeys)]
+        # Random delays so chunks finish out of order.
+        time.sleep(random.uniform(0, 0.02))
+        return [{
+            "executable": False,
+            "lamports": 0,
+            "owner": "11111111111111111111111111111111",
+            "rentEpoch": 0,
+            "data": ["", "base64"]
+        } for pubkey in pubkeys]
+
+
 def test_constructor() -> None:
     address: PublicKey = PublicKey("11111111111111111111111111111118")
     executable: bool = False
@@ -40,3 +63,22 @@ def test_split_list_into_chunks() -> None:
     split_20 = mango.AccountInfo._split_list_into_chunks(list_to_split, 20)
     assert len(split_20) == 1
     assert split_20[0] == ["a", "b", "c", "d", "e", "f", "g", "h", "i", "j"]
+
+
+def test_load_multiple_concurrently_preserves_order() -> None:
+    context = fake_context()
+    context.gma_chunk_size = Decimal(3)
+    context.gma_concurrency = 4
+    client = SlowGetMultipleAccountsClient()
+    context.client = client
+    addresses = [fake_seeded_public_key(f"account {index}") for index in range(20)]
+
+    actual = mango.AccountInfo.load_multiple(context, addresses)
+
+    assert [account_info.address for account_info in actual] == addresses
+    assert sorted(client.chunk_sizes) == [2, 3, 3, 3, 3, 3, 3]
+
+    # Later loads re-use the same bounded pool.
+    executor = context.gma_executor()
+    mango.AccountInfo.load_multiple(context, addresses)
+    assert context.gma_executor() is executor
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import threading
+import typing
+import websockets
+
+from .context import mango
+
+
+def _start_server(loop: asyncio.AbstractEventLoop, connections: typing.List[typing.Any]) -> typing.Tuple[typing.Any, int]:
+    async def handler(connection: typing.Any, *_: typing.Any) -> None:
+        connections.append(connection)
+        async for message in connection:
+            await connection.send(json.dumps({"echo": json.loads(message)}))
+
+    async def serve() -> typing.Any:
+        return await websockets.serve(handler, "127.0.0.1", 0)  # type: ignore[attr-defined]
+
+    server = asyncio.run_coroutine_threadsafe(serve(), loop).result(timeout=5)
+    port: int = server.sockets[0].getsockname()[1]
+    return server, port
+
+
+def test_sends_on_open_and_receives_items() -> None:
+    loop = mango.SharedEventLoop.get()
+    connections: typing.List[typing.Any] = []
+    server, port = _start_server(loop, connections)
+
+    opened: typing.List[int] = []
+    received: typing.List[typing.Any] = []
+    got_first = threading.Event()
+    got_items = threading.Event()
+
+    def on_open(ws: mango.AsyncReconnectingWebsocket) -> None:
+        opened.append(len(opened))
+        ws.send(json.dumps({"open": len(opened)}))
+
+    def on_item(item: typing.Any) -> None:
+        received.append(item)
+        got_first.set()
+        if len(received) == 2:
+            got_items.set()
+
+    ws = mango.AsyncReconnectingWebsocket(f"ws://127.0.0.1:{port}", on_open)
+    ws.reconnect_pause = 0.05
+    ws.item.subscribe(on_next=on_item)
+    ws.open()
+    try:
+        # Drop the first connection from the server side - it should reconnect and call on_open again.
+        assert got_first.wait(timeout=5)
+        asyncio.run_coroutine_threadsafe(connections[0].close(), loop).result(timeout=5)
+
+        assert got_items.wait(timeout=5)
+        assert received == [{"echo": {"open": 1}}, {"echo": {"open": 2}}]
+        assert opened == [0, 1]
+    finally:
+        ws.close()
+        server.close()
+
+
+def test_all_sockets_share_one_loop() -> None:
+    first = mango.AsyncReconnectingWebsocket("ws://127.0.0.1:1", lambda _: None)
+    second = mango.AsyncReconnectingWebsocket("ws://127.0.0.1:2", lambda _: None)
+    assert first.loop is second.loop
+    assert first.loop is mango.SharedEventLoop.get()
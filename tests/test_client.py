@@ -1,8 +1,15 @@
+import json
 import pytest
+import requests
+import time
 import typing
 
 from .context import mango
 
+from datetime import datetime
+from decimal import Decimal
+from solana.rpc.api import Client
+from solana.rpc.commitment import Confirmed
 from solana.rpc.types import RPCMethod, RPCResponse
 
 
@@ -33,6 +40,28 @@ class RaisingRPCCaller(mango.RPCCaller):
         raise mango.TooManyRequestsRateLimitException("Fake", "fake-name", "https://fake")
 
 
+class FakeBatchSession(requests.Session):
+    def __init__(self, reply: typing.Callable[[typing.Any], typing.Any]) -> None:
+        super().__init__()
+        self.reply: typing.Callable[[typing.Any], typing.Any] = reply
+        self.posted: typing.List[typing.Any] = []
+
+    def post(self, url: typing.Union[str, bytes], *args: typing.Any, **kwargs: typing.Any) -> requests.Response:
+        posted = json.loads(kwargs["data"])
+        self.posted += [posted]
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(self.reply(posted)).encode()
+        return response
+
+
+def _batch_rpc_caller(reply: typing.Callable[[typing.Any], typing.Any]) -> typing.Tuple[mango.RPCCaller, FakeBatchSession]:
+    rpc_caller = mango.RPCCaller("Fake", "https://localhost", "wss://localhost", -1, [], mango.SlotHolder(), mango.InstructionReporter())
+    session = FakeBatchSession(reply)
+    rpc_caller.session = session
+    return rpc_caller, session
+
+
 def test_constructor_sets_correct_values() -> None:
     provider = FakeRPCCaller()
     actual = mango.CompoundRPCCaller("fake", [provider])
@@ -156,3 +185,441 @@ def test_all_failing_raises_exception() -> None:
         actual.make_request(__FAKE_RPC_METHOD, "fake")
 
     assert actual.current == provider1
+
+
+def test_rpc_caller_uses_pooled_session() -> None:
+    actual = mango.RPCCaller("Fake", "https://localhost", "wss://localhost", -1, [], mango.SlotHolder(), mango.InstructionReporter(), 5, True)
+    assert actual.pool_size == 5
+    assert actual.keepalive
+    adapter = actual.session.get_adapter("https://localhost")
+    assert adapter._pool_maxsize == 5  # type: ignore[attr-defined]
+    assert actual.session.headers["Connection"] == "keep-alive"
+
+
+def test_rpc_caller_without_keepalive_closes_connections() -> None:
+    actual = mango.RPCCaller("Fake", "https://localhost", "wss://localhost", -1, [], mango.SlotHolder(), mango.InstructionReporter(), 5, False)
+    assert not actual.keepalive
+    assert actual.session.headers["Connection"] == "close"
+
+
+def test_batch_request_maps_out_of_order_responses_to_calls() -> None:
+    def reply(posted: typing.Any) -> typing.Any:
+        return [{"jsonrpc": "2.0", "id": call["id"], "result": call["method"]} for call in reversed(posted)]
+
+    rpc_caller, session = _batch_rpc_caller(reply)
+    actual = rpc_caller.make_batch_request([(RPCMethod("first"), []), (RPCMethod("second"), ["param"])])
+
+    assert len(session.posted) == 1
+    assert [call["method"] for call in session.posted[0]] == ["first", "second"]
+    assert session.posted[0][1]["params"] == ["param"]
+    assert actual[0] == {"jsonrpc": "2.0", "id": session.posted[0][0]["id"], "result": "first"}
+    assert actual[1] == {"jsonrpc": "2.0", "id": session.posted[0][1]["id"], "result": "second"}
+
+
+def test_batch_request_returns_individual_errors() -> None:
+    def reply(posted: typing.Any) -> typing.Any:
+        return [
+            {"jsonrpc": "2.0", "id": posted[0]["id"], "result": 1},
+            {"jsonrpc": "2.0", "id": posted[1]["id"], "error": {"code": -32005, "message": "Node is behind", "data": {"numSlotsBehind": 5}}},
+            {"jsonrpc": "2.0", "id": posted[2]["id"], "result": 3}
+        ]
+
+    rpc_caller, _ = _batch_rpc_caller(reply)
+    actual = rpc_caller.make_batch_request([(RPCMethod("one"), []), (RPCMethod("two"), []), (RPCMethod("three"), [])])
+
+    assert actual[0]["result"] == 1  # type: ignore[index]
+    assert isinstance(actual[1], mango.NodeIsBehindException)
+    assert actual[1].slots_behind == 5
+    assert actual[2]["result"] == 3  # type: ignore[index]
+
+
+def test_batch_request_splits_large_batches() -> None:
+    def reply(posted: typing.Any) -> typing.Any:
+        return [{"jsonrpc": "2.0", "id": call["id"], "result": call["method"]} for call in posted]
+
+    rpc_caller, session = _batch_rpc_caller(reply)
+    rpc_caller.maximum_batch_size = 2
+    actual = rpc_caller.make_batch_request([(RPCMethod(f"call {index}"), []) for index in range(5)])
+
+    assert [len(posted) for posted in session.posted] == [2, 2, 1]
+    assert [response["result"] for response in actual] == [f"call {index}" for index in range(5)]  # type: ignore[index]
+
+
+def test_batch_request_rejects_non_batch_response() -> None:
+    rpc_caller, _ = _batch_rpc_caller(lambda _: {"jsonrpc": "2.0", "id": None, "error": {"code": -32600}})
+    with pytest.raises(mango.ClientException):
+        rpc_caller.make_batch_request([(RPCMethod("one"), [])])
+
+
+def test_rpc_batch_fills_results_on_exit() -> None:
+    def reply(posted: typing.Any) -> typing.Any:
+        return [
+            {"jsonrpc": "2.0", "id": posted[0]["id"], "result": {"context": {"slot": 1}, "value": 2500000000}},
+            {"jsonrpc": "2.0", "id": posted[1]["id"], "result": {"context": {"slot": 1}, "value": {"amount": "1234", "decimals": 2}}},
+            {"jsonrpc": "2.0", "id": posted[2]["id"], "error": {"code": -32602, "message": "Invalid param"}}
+        ]
+
+    rpc_caller, session = _batch_rpc_caller(reply)
+    compound = mango.CompoundRPCCaller("fake", [rpc_caller])
+    compatible_client = Client("https://localhost")
+    compatible_client._provider = compound
+    client = mango.BetterClient(compatible_client, "fake", "fake", Confirmed, False, "base64", 0, compound)
+
+    with client.batch() as batch:
+        balance = batch.get_balance("11111111111111111111111111111111")
+        token_balance = batch.get_token_account_balance("11111111111111111111111111111111")
+        failing = batch.get_account_info("11111111111111111111111111111111")
+        assert not balance.completed
+        assert len(batch) == 3
+
+    assert len(batch) == 0
+    assert len(session.posted) == 1
+    assert session.posted[0][0]["params"][1] == {"commitment": Confirmed}
+    assert balance.result == Decimal("2.5")
+    assert token_balance.result == Decimal("12.34")
+    with pytest.raises(mango.ClientException):
+        failing.result
+
+
+def test_rpc_batch_not_executed_if_block_raises() -> None:
+    rpc_caller, session = _batch_rpc_caller(lambda _: [])
+    compound = mango.CompoundRPCCaller("fake", [rpc_caller])
+    client = mango.BetterClient(Client("https://localhost"), "fake", "fake", Confirmed, False, "base64", 0, compound)
+
+    with pytest.raises(ZeroDivisionError):
+        with client.batch() as batch:
+            balance = batch.get_balance("11111111111111111111111111111111")
+            1 / 0
+
+    assert len(session.posted) == 0
+    assert not balance.completed
+
+
+class FakeSignatureStatusClient(Client):
+    def __init__(self, statuses: typing.Dict[str, typing.Any]) -> None:
+        super().__init__("https://localhost")
+        self.statuses: typing.Dict[str, typing.Any] = statuses
+        self.calls: typing.List[typing.Sequence[str]] = []
+
+    def get_signature_statuses(self, signatures: typing.List[typing.Union[bytes, str]], search_transaction_history: bool = False) -> RPCResponse:
+        self.calls += [[str(signature) for signature in signatures]]
+        return {"jsonrpc": "2.0", "id": 0, "result": {"value": [self.statuses.get(str(signature)) for signature in signatures]}}
+
+
+def test_confirmation_tracker_polls_all_signatures_together() -> None:
+    signatures = [f"signature-{index}" for index in range(300)]
+    client = FakeSignatureStatusClient({
+        "signature-0": {"err": None, "confirmationStatus": "processed", "slot": 1234},
+        "signature-299": {"err": {"InstructionError": [0, {"Custom": 24}]}, "confirmationStatus": "processed", "slot": 1235}
+    })
+    slot_holder = mango.SlotHolder()
+    collector = mango.TransactionStatusCollector()
+    actual = mango.TransactionConfirmationTracker(client, slot_holder, collector, poll_interval=60)
+    for signature in signatures:
+        # Bypass add() so no background thread is started.
+        actual._TransactionConfirmationTracker__pending[signature] = datetime.now()  # type: ignore[attr-defined]
+
+    actual.poll()
+
+    assert [len(call) for call in client.calls] == [256, 44]
+    assert len(actual.pending_signatures) == 298
+    assert [(status.signature, status.outcome) for status in collector.transactions] == [
+        ("signature-0", mango.TransactionOutcome.SUCCESS),
+        ("signature-299", mango.TransactionOutcome.FAIL)
+    ]
+    assert slot_holder.latest_slot == 1235
+
+
+def test_confirmation_tracker_times_out_signatures() -> None:
+    client = FakeSignatureStatusClient({})
+    collector = mango.TransactionStatusCollector()
+    actual = mango.TransactionConfirmationTracker(client, mango.SlotHolder(), collector, poll_interval=0.01, timeout=0)
+
+    actual.add("signature")
+    for _ in range(100):
+        if len(actual.pending_signatures) == 0:
+            break
+        time.sleep(0.01)
+
+    assert len(actual.pending_signatures) == 0
+    assert [(status.signature, status.outcome) for status in collector.transactions] == [
+        ("signature", mango.TransactionOutcome.TIMEOUT)
+    ]
+
+
+def test_confirmation_tracker_watch_completes_before_and_after_reporting() -> None:
+    client = FakeSignatureStatusClient({"signature": {"err": None, "confirmationStatus": "processed", "slot": 1234}})
+    actual = mango.TransactionConfirmationTracker(client, mango.SlotHolder(), mango.TransactionStatusCollector(),
+                                                  poll_interval=60)
+    actual._TransactionConfirmationTracker__pending["signature"] = datetime.now()  # type: ignore[attr-defined]
+
+    before = actual.watch("signature")
+    assert not before.done()
+
+    actual.poll()
+
+    after = actual.watch("signature")
+    assert before.result(timeout=1).outcome == mango.TransactionOutcome.SUCCESS
+    assert after.result(timeout=1) is before.result()
+
+
+class BlockhashRPCCaller(mango.RPCCaller):
+    def __init__(self, url: str) -> None:
+        super().__init__("Fake", url, "wss://localhost", -1, [], mango.SlotHolder(), mango.InstructionReporter())
+        self.counter = 0
+
+    def make_request(self, method: RPCMethod, *params: typing.Any) -> RPCResponse:
+        self.counter += 1
+        return {
+            "jsonrpc": "2.0",
+            "id": 0,
+            "result": {"context": {"slot": 1000 + self.counter}, "value": {"blockhash": f"{self.cluster_rpc_url}-{self.counter}"}}
+        }
+
+
+def test_blockhash_prefetcher_uses_current_provider_blockhash() -> None:
+    provider1 = BlockhashRPCCaller("https://one")
+    provider2 = BlockhashRPCCaller("https://two")
+    compound = mango.CompoundRPCCaller("fake", [provider1, provider2])
+    actual = mango.BlockhashPrefetcher(Client("https://localhost"), compound, mango.SlotHolder(), 60)
+    actual.stop()
+
+    assert actual.blockhash() == "https://one-1"
+    compound.shift_to_next_provider()
+    assert actual.blockhash() == "https://two-1"
+
+
+def test_blockhash_prefetcher_hands_out_each_blockhash_once() -> None:
+    provider = BlockhashRPCCaller("https://one")
+    actual = mango.BlockhashPrefetcher(Client("https://localhost"), mango.CompoundRPCCaller("fake", [provider]),
+                                       mango.SlotHolder(), 60)
+    actual.stop()
+
+    assert actual.blockhash() == "https://one-1"
+    assert actual.blockhash() == "https://one-2"
+    prefetched = actual.prefetched(provider)
+    assert prefetched is not None and prefetched.used
+
+    # A background refresh makes a new, unused blockhash available.
+    actual.refresh_provider(provider)
+    assert actual.blockhash() == "https://one-3"
+
+
+def test_blockhash_prefetcher_ignores_stale_blockhash() -> None:
+    provider = BlockhashRPCCaller("https://one")
+    slot_holder = mango.SlotHolder()
+    actual = mango.BlockhashPrefetcher(Client("https://localhost"), mango.CompoundRPCCaller("fake", [provider]),
+                                       slot_holder, 60, maximum_slot_age=10)
+    actual.stop()
+
+    assert actual.refresh_provider(provider) is not None
+    prefetched = actual.prefetched(provider)
+    assert prefetched is not None and actual.is_fresh(prefetched)
+    slot_holder.require_data_from_fresh_slot(1020)
+    assert not actual.is_fresh(prefetched)
+    assert actual.blockhash() == "https://one-2"
+
+    actual.invalidate()
+    assert actual.prefetched(provider) is None
+    assert actual.blockhash() == "https://one-3"
+
+
+def test_blockhash_prefetcher_only_refreshes_used_up_provider() -> None:
+    provider1 = BlockhashRPCCaller("https://one")
+    provider2 = BlockhashRPCCaller("https://two")
+    actual = mango.BlockhashPrefetcher(Client("https://localhost"), mango.CompoundRPCCaller("fake", [provider1, provider2]),
+                                       mango.SlotHolder(), 60)
+    try:
+        # Starts the background thread, which refreshes both providers and then the used-up one again.
+        actual.blockhash()
+        for _ in range(200):
+            if provider2.counter > 0:
+                break
+            time.sleep(0.01)
+        time.sleep(0.1)
+        fetched_from_one = provider1.counter
+        fetched_from_two = provider2.counter
+
+        # The prefetched blockhash is used, and only that provider is refreshed.
+        assert actual.blockhash() == f"https://one-{fetched_from_one}"
+        for _ in range(200):
+            if provider1.counter > fetched_from_one:
+                break
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+        assert provider1.counter == fetched_from_one + 1
+        assert provider2.counter == fetched_from_two
+    finally:
+        actual.stop()
+
+
+def test_provider_statistics_smooths_latency_and_errors() -> None:
+    actual = mango.ProviderStatistics(smoothing=0.5)
+    actual.record_success(1.0, 100)
+    assert actual.latency == 1.0
+    assert actual.error_rate == 0
+    actual.record_success(0.5, 99)
+    assert actual.latency == 0.75
+    assert actual.latest_slot == 100
+    actual.record_failure(0.1)
+    assert actual.latency == 0.75
+    assert actual.error_rate == 0.5
+    assert actual.score == 1.5
+    assert actual.calls == 3
+
+
+def _provider_with_statistics(latency: float, slot: int, error_rate: float = 0) -> FakeRPCCaller:
+    provider = FakeRPCCaller()
+    provider.statistics.record_success(latency, slot)
+    provider.statistics.error_rate = error_rate
+    return provider
+
+
+def test_adaptive_routing_prefers_fastest_current_provider() -> None:
+    slow = _provider_with_statistics(0.5, 1000)
+    fast = _provider_with_statistics(0.1, 1000)
+    fastest_but_lagging = _provider_with_statistics(0.05, 900)
+    fastest_but_failing = _provider_with_statistics(0.01, 1000, error_rate=0.9)
+    actual = mango.CompoundRPCCaller("fake", [slow, fastest_but_lagging, fastest_but_failing, fast],
+                                     mango.RPCRouting.ADAPTIVE)
+
+    assert actual.providers_for_reads() == [fast, slow, fastest_but_lagging, fastest_but_failing]
+
+    actual.make_request(__FAKE_RPC_METHOD, "fake")
+
+    assert fast.called
+    assert not slow.called
+    assert actual.current == slow
+
+
+def test_adaptive_routing_probes_idle_providers() -> None:
+    fast = _provider_with_statistics(0.1, 1000)
+    idle = FakeRPCCaller()
+    actual = mango.CompoundRPCCaller("fake", [fast, idle], mango.RPCRouting.ADAPTIVE)
+
+    actual.make_request(__FAKE_RPC_METHOD, "fake")
+
+    assert idle.called
+    assert not fast.called
+
+
+def test_adaptive_routing_probes_unhealthy_providers_until_they_recover() -> None:
+    fast = _provider_with_statistics(0.1, 1000)
+    recovering = _provider_with_statistics(0.01, 1000, error_rate=0.9)
+    actual = mango.CompoundRPCCaller("fake", [fast, recovering], mango.RPCRouting.ADAPTIVE)
+    assert actual.providers_for_reads() == [fast, recovering]
+
+    # Each time the unhealthy provider is due a probe it's tried first, and its successes bring it back.
+    for _ in range(4):
+        recovering.statistics.last_updated = datetime.min
+        assert actual.providers_for_reads()[0] is recovering
+        actual.make_request(__FAKE_RPC_METHOD, "fake")
+
+    assert recovering.statistics.error_rate < actual.maximum_error_rate
+    assert actual.providers_for_reads() == [recovering, fast]
+
+
+def test_failover_routing_ignores_statistics() -> None:
+    slow = _provider_with_statistics(0.5, 1000)
+    fast = _provider_with_statistics(0.1, 1000)
+    actual = mango.CompoundRPCCaller("fake", [slow, fast])
+
+    actual.make_request(__FAKE_RPC_METHOD, "fake")
+
+    assert slow.called
+    assert not fast.called
+
+
+class SleepyRPCCaller(mango.RPCCaller):
+    def __init__(self, name: str, delay: float, slot: int, slot_holder: mango.SlotHolder) -> None:
+        super().__init__(name, f"https://{name}", "wss://localhost", -1, [], slot_holder, mango.InstructionReporter())
+        self.delay: float = delay
+        self.slot: int = slot
+        self.called = False
+
+    def make_request(self, method: RPCMethod, *params: typing.Any) -> RPCResponse:
+        self.called = True
+        time.sleep(self.delay)
+        return {"jsonrpc": "2.0", "id": 0, "result": {"context": {"slot": self.slot}, "value": self.name}}
+
+
+def test_hedged_read_uses_first_acceptable_response() -> None:
+    slot_holder = mango.SlotHolder()
+    slow = SleepyRPCCaller("slow", 1, 100, slot_holder)
+    fast = SleepyRPCCaller("fast", 0, 100, slot_holder)
+    actual = mango.CompoundRPCCaller("fake", [slow, fast], hedge_delay=0.05)
+
+    started_at = time.perf_counter()
+    response = actual.make_request(RPCMethod("getAccountInfo"), "fake")
+
+    assert response["result"]["value"] == "fast"
+    assert time.perf_counter() - started_at < 0.5
+    assert slow.called
+    assert fast.called
+
+
+def test_hedged_read_ignores_stale_response() -> None:
+    slot_holder = mango.SlotHolder()
+    slot_holder.require_data_from_fresh_slot(99)
+    current = SleepyRPCCaller("current", 0.2, 100, slot_holder)
+    stale = SleepyRPCCaller("stale", 0, 50, slot_holder)
+    actual = mango.CompoundRPCCaller("fake", [current, stale], hedge_delay=0)
+
+    response = actual.make_request(RPCMethod("getMultipleAccounts"), "fake")
+
+    assert response["result"]["value"] == "current"
+
+
+def test_unhedged_method_only_calls_one_provider() -> None:
+    slot_holder = mango.SlotHolder()
+    first = SleepyRPCCaller("first", 0, 100, slot_holder)
+    second = SleepyRPCCaller("second", 0, 100, slot_holder)
+    actual = mango.CompoundRPCCaller("fake", [first, second], hedge_delay=0)
+
+    actual.make_request(RPCMethod("getBalance"), "fake")
+
+    assert first.called
+    assert not second.called
+
+
+class DeadRPCCaller(SleepyRPCCaller):
+    def make_request(self, method: RPCMethod, *params: typing.Any) -> RPCResponse:
+        self.called = True
+        time.sleep(self.delay)
+        raise requests.exceptions.ConnectionError("dead")
+
+
+def test_hedged_read_fails_over_from_dead_provider() -> None:
+    slot_holder = mango.SlotHolder()
+    dead = DeadRPCCaller("dead", 0.1, 100, slot_holder)
+    alive = SleepyRPCCaller("alive", 0, 100, slot_holder)
+    actual = mango.CompoundRPCCaller("fake", [dead, alive], hedge_delay=0)
+
+    response = actual.make_request(RPCMethod("getAccountInfo"), "fake")
+    assert response["result"]["value"] == "alive"
+
+    # The dead provider fails after the hedge has already won, and that still moves reads away from it.
+    time.sleep(0.3)
+    assert actual.current is alive
+
+
+class BadRequestRPCCaller(SleepyRPCCaller):
+    def make_request(self, method: RPCMethod, *params: typing.Any) -> RPCResponse:
+        self.called = True
+        raise Exception("bad request")
+
+
+def test_hedged_read_raises_errors_other_providers_would_repeat() -> None:
+    slot_holder = mango.SlotHolder()
+    first = BadRequestRPCCaller("first", 0, 100, slot_holder)
+    second = SleepyRPCCaller("second", 0, 100, slot_holder)
+    third = SleepyRPCCaller("third", 0, 100, slot_holder)
+    actual = mango.CompoundRPCCaller("fake", [first, second, third], hedge_delay=1)
+
+    with pytest.raises(Exception, match="bad request"):
+        actual.make_request(RPCMethod("getAccountInfo"), "fake")
+
+    assert not second.called
+    assert not third.called
+    assert first.statistics.error_rate == 0
@@ -0,0 +1,230 @@
+import asyncio
+import pytest
+import time
+import typing
+
+from .context import mango
+from .fakes import fake_context, fake_seeded_public_key, fake_wallet, MockClient
+
+from mango.combinableinstructions import _pack_instructions_into_chunks, _split_instructions_into_chunks, _TransactionSizeAccumulator
+from solana.keypair import Keypair
+from solana.rpc.api import Client
+from solana.rpc.types import RPCResponse
+from solana.transaction import AccountMeta, Transaction, TransactionInstruction
+
+
+def _instruction(name: str, data_length: int, key_count: int = 1) -> TransactionInstruction:
+    keys = [AccountMeta(fake_seeded_public_key(f"{name} {index}"), False, True) for index in range(key_count)]
+    return TransactionInstruction(keys=keys, program_id=fake_seeded_public_key("program"), data=bytes(data_length))
+
+
+def _data_lengths(chunks: typing.Sequence[typing.Sequence[TransactionInstruction]]) -> typing.Sequence[typing.Sequence[int]]:
+    return [[len(instruction.data) for instruction in chunk] for chunk in chunks]
+
+
+def test_accumulated_size_matches_calculated_size() -> None:
+    signers = [fake_wallet().keypair]
+    accumulator = _TransactionSizeAccumulator(signers)
+    instructions: typing.List[TransactionInstruction] = []
+    for index in range(12):
+        # Some keys are shared between instructions, some aren't.
+        instruction = _instruction(f"instruction {index % 4}", index * 10, index % 3 + 1)
+        assert accumulator.size_with(instruction) == mango.CombinableInstructions.transaction_size(
+            signers, [*instructions, instruction])
+        accumulator.add(instruction)
+        instructions += [instruction]
+        assert accumulator.size == mango.CombinableInstructions._transaction_size_from_pyserum(signers, instructions)
+
+
+def test_split_keeps_instructions_in_order() -> None:
+    signers = [fake_wallet().keypair]
+    instructions = [_instruction(f"instruction {index}", 200) for index in range(20)]
+    chunks = _split_instructions_into_chunks(fake_context(), signers, instructions)
+
+    assert [instruction for chunk in chunks for instruction in chunk] == instructions
+    for chunk in chunks:
+        assert mango.CombinableInstructions.transaction_size(signers, chunk) < 1232
+
+
+def test_split_no_instructions() -> None:
+    assert _split_instructions_into_chunks(fake_context(), [fake_wallet().keypair], []) == [[]]
+
+
+def test_packing_reorders_independent_instructions_into_fewer_transactions() -> None:
+    signers = [fake_wallet().keypair]
+    first = _instruction("first", 100)
+    cancels = [_instruction(f"cancel {index}", length) for index, length in enumerate([400, 700, 400, 700, 200])]
+    last = _instruction("last", 100)
+    instructions = [first, *cancels, last]
+    groups: typing.List[typing.Optional[str]] = [None, *(["cancel"] * len(cancels)), None]
+
+    split = _split_instructions_into_chunks(fake_context(), signers, instructions)
+    packed = _pack_instructions_into_chunks(fake_context(), signers, instructions, groups)
+
+    assert _data_lengths(split) == [[100, 400], [700], [400], [700, 200], [100]]
+    assert _data_lengths(packed) == [[100, 700], [700, 200], [400, 400, 100]]
+
+    # The ungrouped instructions stay at the start and end.
+    assert packed[0][0] is first
+    assert packed[-1][-1] is last
+    for chunk in packed:
+        assert mango.CombinableInstructions.transaction_size(signers, chunk) < 1232
+
+
+def test_packing_does_not_move_instructions_between_groups() -> None:
+    signers = [fake_wallet().keypair]
+    cancels = [_instruction(f"cancel {index}", 500) for index in range(3)]
+    place = _instruction("place", 100)
+    cranks = [_instruction(f"crank {index}", 100) for index in range(3)]
+    combined = mango.CombinableInstructions(signers, cancels).as_independent("cancel") + \
+        mango.CombinableInstructions.from_instruction(place) + \
+        mango.CombinableInstructions([], cranks).as_independent("crank")
+
+    packed = _pack_instructions_into_chunks(fake_context(), combined.signers,
+                                            combined.instructions, combined.independent_groups)
+    flattened = [instruction for chunk in packed for instruction in chunk]
+
+    # The small cranks would fit alongside the cancels, but they can't move before the place instruction.
+    assert flattened.index(place) > max(flattened.index(cancel) for cancel in cancels)
+    assert flattened.index(place) < min(flattened.index(crank) for crank in cranks)
+
+
+class SignatureStatusClient(Client):
+    def __init__(self, failed: typing.Sequence[str]) -> None:
+        super().__init__("https://localhost")
+        self.failed: typing.Sequence[str] = failed
+
+    def get_signature_statuses(self, signatures: typing.List[typing.Union[bytes, str]], search_transaction_history: bool = False) -> RPCResponse:
+        def __status(signature: str) -> typing.Dict[str, typing.Any]:
+            error = {"InstructionError": [0, {"Custom": 24}]} if signature in self.failed else None
+            return {"err": error, "confirmationStatus": "processed", "slot": 1234}
+        return {"jsonrpc": "2.0", "id": 0, "result": {"value": [__status(str(signature)) for signature in signatures]}}
+
+
+# Sends transactions by recording the name of the first instruction, after any delay given for that name.
+class PipelineClient(MockClient):
+    def __init__(self, delays: typing.Dict[str, float] = {}, failed: typing.Sequence[str] = [], raising: typing.Sequence[str] = []) -> None:
+        super().__init__()
+        self.delays: typing.Dict[str, float] = delays
+        self.raising: typing.Sequence[str] = raising
+        self.sent: typing.List[str] = []
+        self.confirmation_tracker = mango.TransactionConfirmationTracker(
+            SignatureStatusClient(failed), mango.SlotHolder(), mango.TransactionStatusCollector(), poll_interval=0.01)
+
+    def send_transaction(self, transaction: Transaction, *signers: Keypair, opts: typing.Any = None) -> str:
+        name: str = _names[bytes(transaction.instructions[0].data)]
+        time.sleep(self.delays.get(name, 0))
+        if name in self.raising:
+            raise Exception(f"Failed to send {name}.")
+        self.sent += [name]
+        self.confirmation_tracker.add(name)
+        return name
+
+
+_names: typing.Dict[bytes, str] = {}
+
+
+# Each of these instructions is big enough that it needs a transaction of its own.
+def _big_instructions(*names: str) -> mango.CombinableInstructions:
+    instructions: typing.List[TransactionInstruction] = []
+    for name in names:
+        data: bytes = name.encode().ljust(600, b"-")
+        _names[data] = name
+        instructions += [TransactionInstruction(keys=[], program_id=fake_seeded_public_key("program"), data=data)]
+    return mango.CombinableInstructions([fake_wallet().keypair], instructions)
+
+
+def test_pipelined_transactions_are_sent_in_parallel() -> None:
+    context = fake_context()
+    client = PipelineClient(delays={"first": 0.2})
+    context.client = client
+
+    submission = _big_instructions("first", "second", "third").execute_pipelined(context)
+
+    # The first transaction is slow to send, but it doesn't hold up the others.
+    assert submission.signatures() == ["first", "second", "third"]
+    assert client.sent[-1] == "first"
+
+
+def test_pipelined_dependencies_are_sent_first() -> None:
+    context = fake_context()
+    client = PipelineClient(delays={"cancel 1": 0.1, "cancel 2": 0.2})
+    context.client = client
+    instructions = _big_instructions("cancel 1", "cancel 2").as_independent("cancel") + \
+        _big_instructions("place 1", "place 2") + _big_instructions("crank").as_independent("crank")
+
+    submission = instructions.execute_pipelined(context, dependencies=[("cancel", None)])
+
+    assert submission.signatures() == ["cancel 1", "cancel 2", "place 1", "place 2", "crank"]
+    # The crank doesn't depend on the cancels so it doesn't wait for them.
+    assert client.sent.index("crank") < client.sent.index("cancel 1")
+    assert client.sent.index("place 1") > client.sent.index("cancel 2")
+    assert client.sent.index("place 2") > client.sent.index("cancel 2")
+
+
+def test_pipelined_dependencies_wait_for_confirmation() -> None:
+    context = fake_context()
+    client = PipelineClient(failed=["crank"])
+    context.client = client
+    instructions = _big_instructions("crank").as_independent("crank") + _big_instructions("settle")
+
+    submission = instructions.execute_pipelined(context, dependencies=[("crank", None)],
+                                                wait_for_confirmation=True, on_exception_continue=True)
+
+    # The crank failed, so the settle was never sent.
+    assert submission.signatures() == ["crank"]
+    assert client.sent == ["crank"]
+    assert [status.outcome for status in submission.wait()] == [mango.TransactionOutcome.FAIL]
+
+
+def test_pipelined_send_failure_raises_after_all_sends() -> None:
+    context = fake_context()
+    client = PipelineClient(delays={"second": 0.2}, raising=["first"])
+    context.client = client
+
+    submission = _big_instructions("first", "second").execute_pipelined(context)
+
+    with pytest.raises(Exception, match="Failed to send first"):
+        submission.signatures()
+    assert client.sent == ["second"]
+
+
+def test_pipelined_wait_returns_statuses() -> None:
+    context = fake_context()
+    context.client = PipelineClient()
+
+    submission = _big_instructions("first", "second").execute_pipelined(context)
+    statuses = submission.wait(timeout=5)
+
+    assert [(status.signature, status.outcome) for status in statuses] == [
+        ("first", mango.TransactionOutcome.SUCCESS),
+        ("second", mango.TransactionOutcome.SUCCESS)
+    ]
+
+
+def test_execute_async_sends_in_order_by_default() -> None:
+    context = fake_context()
+    client = PipelineClient(delays={"first": 0.2})
+    context.client = client
+
+    signatures = asyncio.run(_big_instructions("first", "second").execute_async(context))
+
+    assert signatures == ["first", "second"]
+    assert client.sent == ["first", "second"]
+
+
+def test_execute_async_sends_in_parallel() -> None:
+    context = fake_context()
+    client = PipelineClient(delays={"first": 0.2})
+    context.client = client
+
+    signatures = asyncio.run(_big_instructions("first", "second").execute_async(context, parallel=True))
+
+    assert signatures == ["first", "second"]
+    assert client.sent == ["second", "first"]
+
+
+def test_pipelined_no_instructions() -> None:
+    submission = mango.CombinableInstructions.empty().execute_pipelined(fake_context())
+    assert submission.signatures() == []
+    assert submission.wait() == []
@@ -0,0 +1,101 @@
+import typing
+
+from .context import mango
+from .fakes import fake_account_info, fake_perp_orderbook_side_data, FakePerpMarketDetails
+
+from decimal import Decimal
+
+
+def _with_quantity(data: bytes, node_index: int, quantity: int) -> bytes:
+    offset = mango.layouts.ORDERBOOK_SIDE_HEADER.sizeof() + (node_index * 88) + 56
+    return data[:offset] + quantity.to_bytes(8, "little") + data[offset + 8:]
+
+
+def _full_orders(data: bytes) -> typing.Sequence[mango.Order]:
+    return mango.PerpOrderBookSide.parse(fake_account_info(data=data), FakePerpMarketDetails()).orders()
+
+
+def test_initial_update_adds_all_orders() -> None:
+    data = fake_perp_orderbook_side_data(mango.Side.BUY, [100, 103, 101, 102])
+    actual = mango.IncrementalPerpOrderBookSide(FakePerpMarketDetails())
+    changes = actual.update(fake_account_info(data=data))
+    assert len(changes) == 4
+    assert all(change.change_type == mango.OrderBookChangeType.ADD for change in changes)
+    assert actual.side == mango.Side.BUY
+    assert actual.orders == _full_orders(data)
+    assert [order.price for order in actual.orders] == [103, 102, 101, 100]
+
+
+def test_unchanged_update_has_no_changes() -> None:
+    data = fake_perp_orderbook_side_data(mango.Side.SELL, [100, 103, 101, 102])
+    actual = mango.IncrementalPerpOrderBookSide(FakePerpMarketDetails())
+    actual.update(fake_account_info(data=data))
+    assert actual.update(fake_account_info(data=data)) == []
+    assert actual.changed_node_count == 0
+
+
+def test_quantity_change_is_a_modify() -> None:
+    data = fake_perp_orderbook_side_data(mango.Side.SELL, [100, 101, 102, 103])
+    actual = mango.IncrementalPerpOrderBookSide(FakePerpMarketDetails())
+    actual.update(fake_account_info(data=data))
+
+    # Node 0 is the leaf for the lowest price in the fake book.
+    updated = _with_quantity(data, 0, 4)
+    changes = actual.update(fake_account_info(data=updated))
+    assert actual.changed_node_count == 1
+    assert len(changes) == 1
+    assert changes[0].change_type == mango.OrderBookChangeType.MODIFY
+    assert changes[0].order.quantity == Decimal("0.000004")
+    assert changes[0].previous is not None
+    assert changes[0].previous.quantity == Decimal("0.00001")
+    assert actual.orders == _full_orders(updated)
+
+
+def test_adds_and_removes_match_full_decode() -> None:
+    prices = [100, 101, 102, 103, 104, 105, 106, 107]
+    actual = mango.IncrementalPerpOrderBookSide(FakePerpMarketDetails())
+    published: typing.List[typing.Sequence[mango.OrderBookChange]] = []
+    actual.changes.subscribe(on_next=published.append)
+    actual.update(fake_account_info(data=fake_perp_orderbook_side_data(mango.Side.BUY, prices)))
+
+    smaller = fake_perp_orderbook_side_data(mango.Side.BUY, prices[:-2])
+    changes = actual.update(fake_account_info(data=smaller))
+    assert sorted(change.order.price for change in changes) == [106, 107]
+    assert all(change.change_type == mango.OrderBookChangeType.REMOVE for change in changes)
+    assert actual.orders == _full_orders(smaller)
+
+    larger = fake_perp_orderbook_side_data(mango.Side.BUY, prices + [108])
+    changes = actual.update(fake_account_info(data=larger))
+    assert sorted(change.order.price for change in changes) == [106, 107, 108]
+    assert all(change.change_type == mango.OrderBookChangeType.ADD for change in changes)
+    assert actual.orders == _full_orders(larger)
+
+    assert len(published) == 3
+
+
+def test_switching_side_resets_book() -> None:
+    actual = mango.IncrementalPerpOrderBookSide(FakePerpMarketDetails())
+    actual.update(fake_account_info(data=fake_perp_orderbook_side_data(mango.Side.BUY, [100, 101])))
+    asks = fake_perp_orderbook_side_data(mango.Side.SELL, [100, 101, 102])
+    changes = actual.update(fake_account_info(data=asks))
+    assert len(changes) == 3
+    assert actual.side == mango.Side.SELL
+    assert actual.orders == _full_orders(asks)
+
+
+def test_columnar_matches_orders() -> None:
+    prices = [100, 101, 102, 103]
+    actual = mango.IncrementalPerpOrderBookSide(FakePerpMarketDetails())
+    data = fake_perp_orderbook_side_data(mango.Side.BUY, prices)
+    actual.update(fake_account_info(data=data))
+    columnar = actual.columnar
+    assert actual.columnar is columnar
+    assert list(columnar) == _full_orders(data)
+
+    updated = _with_quantity(data, 0, 4)
+    actual.update(fake_account_info(data=updated))
+    assert actual.columnar is not columnar
+    expected = mango.ColumnarOrderBookSide.from_orders(mango.Side.BUY, actual.lot_size_converter, _full_orders(updated))
+    assert actual.columnar.ids == expected.ids
+    assert list(actual.columnar.price_lots) == list(expected.price_lots)
+    assert list(actual.columnar.quantity_lots) == list(expected.quantity_lots)
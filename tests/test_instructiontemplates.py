@@ -0,0 +1,149 @@
+import typing
+
+from .context import mango
+from .fakes import fake_account, fake_account_info, fake_context, fake_group, fake_instrument, fake_instrument_value, fake_market, fake_root_bank, fake_seeded_public_key, fake_token_bank, fake_wallet, FakePerpMarketDetails
+
+from decimal import Decimal
+from solana.publickey import PublicKey
+from solana.transaction import AccountMeta, TransactionInstruction
+
+
+def _comparable(instruction: TransactionInstruction) -> typing.Tuple[typing.Any, ...]:
+    keys = [(key.pubkey, key.is_signer, key.is_writable) for key in instruction.keys]
+    return (instruction.program_id, keys, instruction.data)
+
+
+def _perp_market_details() -> mango.PerpMarketDetails:
+    details = FakePerpMarketDetails(base_decimals=8, quote_decimals=6,
+                                    base_lot_size=Decimal(100), quote_lot_size=Decimal(10))
+    details.account_info = fake_account_info(address=fake_seeded_public_key("perp market"))
+    details.bids = fake_seeded_public_key("bids")
+    details.asks = fake_seeded_public_key("asks")
+    details.event_queue = fake_seeded_public_key("event queue")
+    return details
+
+
+def _orders() -> typing.Sequence[mango.Order]:
+    return [
+        mango.Order.from_basic_info(mango.Side.BUY, Decimal("51.237"), Decimal("0.8"), mango.OrderType.POST_ONLY).with_client_id(1234),
+        mango.Order.from_basic_info(mango.Side.SELL, Decimal("0.0031"), Decimal("17"), mango.OrderType.IOC).with_client_id(99),
+        mango.Order.from_basic_info(mango.Side.SELL, Decimal("3400"), Decimal("2.5"), mango.OrderType.LIMIT, reduce_only=True).with_client_id(7),
+        mango.Order.from_basic_info(mango.Side.BUY, Decimal("1"), Decimal("1"), mango.OrderType.POST_ONLY_SLIDE).with_client_id(2 ** 63)
+    ]
+
+
+def test_instruction_template_packs_values_after_fixed_bytes() -> None:
+    instruction = TransactionInstruction(keys=[AccountMeta(fake_seeded_public_key("key"), False, True)],
+                                         program_id=fake_seeded_public_key("program"), data=bytes([9, 0, 0, 0, 0, 0, 7]))
+    template = mango.InstructionTemplate.from_instruction(instruction, 4, "<H")
+
+    first = template.build(0x0102)
+    second = template.build(3)
+
+    assert first.data == bytes([9, 0, 0, 0, 2, 1, 7])
+    assert second.data == bytes([9, 0, 0, 0, 3, 0, 7])
+    assert _comparable(first)[:2] == _comparable(instruction)[:2]
+    # Each instruction gets its own account metas.
+    assert first.keys[0] is not second.keys[0]
+
+
+def test_perp_templates_match_built_instructions() -> None:
+    context = fake_context()
+    wallet = fake_wallet()
+    group = fake_group()
+    account = fake_account()
+    details = _perp_market_details()
+    templates = mango.PerpOrderInstructionTemplates(context, wallet, group, account, details)
+
+    for order in _orders():
+        expected_place = mango.build_place_perp_order_instructions(
+            context, wallet, group, account, details, order.price, order.quantity, order.client_id,
+            order.side, order.order_type, order.reduce_only)
+        assert _comparable(templates.place(order)) == _comparable(expected_place.instructions[0])
+
+        expected_cancel = mango.build_cancel_perp_order_instructions(context, wallet, account, details, order, True)
+        assert _comparable(templates.cancel(order, True)) == _comparable(expected_cancel.instructions[0])
+
+    by_id = mango.Order.from_ids(id=(2 ** 100) + 5, client_id=0, side=mango.Side.SELL)
+    expected_by_id = mango.build_cancel_perp_order_instructions(context, wallet, account, details, by_id, False)
+    assert _comparable(templates.cancel(by_id, False)) == _comparable(expected_by_id.instructions[0])
+
+
+def test_serum_templates_match_pyserum_instructions() -> None:
+    wallet = fake_wallet()
+    market = fake_market()
+    base = fake_seeded_public_key("base token account")
+    quote = fake_seeded_public_key("quote token account")
+    open_orders = fake_seeded_public_key("open orders")
+    fee_discount = fake_seeded_public_key("fee discount")
+    templates = mango.SerumOrderInstructionTemplates.load(wallet, market, base, quote, open_orders, fee_discount)
+    assert templates is not None
+
+    for order in _orders():
+        payer = quote if order.side == mango.Side.BUY else base
+        expected_place = mango.build_serum_place_order_instructions(
+            fake_context(), wallet, market, payer, open_orders, order.order_type, order.side, order.price,
+            order.quantity, order.client_id, fee_discount)
+        assert _comparable(templates.place(order)) == _comparable(expected_place.instructions[0])
+
+        expected_cancel = market.make_cancel_order_by_client_id_instruction(
+            wallet.keypair, open_orders, order.client_id)
+        assert _comparable(templates.cancel(order)) == _comparable(expected_cancel)
+
+
+def _spot_market_and_account(group: mango.Group) -> typing.Tuple[mango.SpotMarket, mango.Account, PublicKey]:
+    raw_market = fake_market()
+    base_token_bank = fake_token_bank("BASE")
+    raw_market.state.base_mint = lambda: base_token_bank.token.mint  # type: ignore[method-assign]
+
+    # Both banks are already loaded, so the node bank choice is made without fetching anything.
+    for token_bank, name in [(base_token_bank, "base"), (group.shared_quote, "quote")]:
+        root_bank = fake_root_bank()
+        root_bank.account_info = fake_account_info(address=fake_seeded_public_key(f"{name} root bank"))
+        root_bank.loaded_node_banks = [
+            mango.NodeBank(fake_account_info(address=fake_seeded_public_key(f"{name} node bank")), mango.Version.V1,
+                           root_bank.meta_data, fake_seeded_public_key(f"{name} vault"),
+                           mango.BankBalances(Decimal(0), Decimal(0)))]
+        token_bank.loaded_root_bank = root_bank
+
+    spot_market = mango.SpotMarket(fake_seeded_public_key("program ID"), raw_market.state.public_key(),
+                                   mango.Token.ensure(base_token_bank.token), group.shared_quote_token, group,
+                                   raw_market)
+    slot_spot_market = mango.GroupSlotSpotMarket(spot_market.address, Decimal(0), Decimal(0), Decimal(0), Decimal(0))
+    group.slots = [mango.GroupSlot(2, base_token_bank.token, base_token_bank, group.shared_quote, slot_spot_market,
+                                   None, mango.NullLotSizeConverter(), fake_seeded_public_key("oracle"))]
+    group.slot_indices = [False, False, True]
+
+    open_orders = fake_seeded_public_key("spot open orders")
+    account = fake_account()
+    account.slot_indices = [False, True, True]
+    account.base_slots = [
+        mango.AccountSlot(1, fake_instrument("OTHER"), None, group.shared_quote, Decimal(0), fake_instrument_value(),
+                          Decimal(0), fake_instrument_value(), fake_seeded_public_key("other open orders"), None),
+        mango.AccountSlot(2, base_token_bank.token, base_token_bank, group.shared_quote, Decimal(0),
+                          fake_instrument_value(), Decimal(0), fake_instrument_value(), open_orders, None)
+    ]
+    return spot_market, account, open_orders
+
+
+def test_spot_templates_match_built_instructions() -> None:
+    context = fake_context()
+    wallet = fake_wallet()
+    group = fake_group()
+    spot_market, account, open_orders = _spot_market_and_account(group)
+    fee_discount = fake_seeded_public_key("fee discount")
+    raw_market = spot_market.underlying_serum_market
+    templates = mango.SpotOrderInstructionTemplates(context, wallet, group, account, spot_market, raw_market, 2,
+                                                    open_orders, fee_discount)
+
+    for order in _orders():
+        expected_place = mango.build_spot_place_order_instructions(
+            context, wallet, group, account, spot_market, order.order_type, order.side, order.price,
+            order.quantity, order.client_id, fee_discount)
+        assert len(expected_place.instructions) == 1
+        assert _comparable(templates.place(order)) == _comparable(expected_place.instructions[0])
+
+        with_id = order.with_id((2 ** 100) + order.client_id)
+        expected_cancel = mango.build_cancel_spot_order_instructions(
+            context, wallet, group, account, raw_market, with_id, open_orders)
+        assert _comparable(templates.cancel(with_id)) == _comparable(expected_cancel.instructions[0])
@@ -0,0 +1,98 @@
+import datetime
+import urllib.request
+
+from .context import mango
+
+
+def test_percentiles() -> None:
+    histogram = mango.LatencyHistogram("test")
+    for duration in range(1, 101):
+        histogram.record(duration / 1000)
+
+    assert histogram.count == 100
+    assert histogram.p50 == 0.050
+    assert histogram.p95 == 0.095
+    assert histogram.p99 == 0.099
+    assert histogram.maximum == 0.100
+
+
+def test_empty_histogram() -> None:
+    histogram = mango.LatencyHistogram("test")
+    assert histogram.count == 0
+    assert histogram.p99 == 0
+
+
+def test_histogram_is_rolling() -> None:
+    histogram = mango.LatencyHistogram("test", capacity=10)
+    for _ in range(10):
+        histogram.record(5)
+    for _ in range(10):
+        histogram.record(1)
+
+    # Percentiles only use the most recent durations, but the count and sum cover everything.
+    assert histogram.maximum == 1
+    assert histogram.count == 20
+    assert histogram.sum == 60
+
+
+def test_recorder_times_phases() -> None:
+    latency = mango.LatencyRecorder()
+    with latency.time("pulse.chain"):
+        pass
+    with latency.time("pulse.chain"):
+        pass
+    latency.record("pulse.send", 0.25)
+
+    assert [histogram.name for histogram in latency.histograms] == ["pulse.chain", "pulse.send"]
+    assert latency.histogram("pulse.chain").count == 2
+    assert latency.histogram("pulse.send").p50 == 0.25
+    assert "pulse.send" in latency.summary()
+
+
+def test_prefixed_recorders_share_histograms() -> None:
+    latency = mango.LatencyRecorder()
+    btc = latency.with_prefix("BTC-PERP")
+    sol = latency.with_prefix("SOL-PERP")
+    btc.record("pulse.total", 1)
+    sol.record("pulse.total", 2)
+    latency.record("transaction.confirmation", 3)
+
+    assert [histogram.name for histogram in latency.histograms] == [
+        "BTC-PERP.pulse.total", "SOL-PERP.pulse.total", "transaction.confirmation"]
+    assert btc.histogram("pulse.total").p50 == 1
+    assert latency.histogram("SOL-PERP.pulse.total").p50 == 2
+
+
+def test_prometheus_text() -> None:
+    latency = mango.LatencyRecorder()
+    latency.record("pulse.send", 0.25)
+    text = latency.to_prometheus_text()
+
+    assert '# TYPE mango_latency_seconds summary' in text
+    assert 'mango_latency_seconds{phase="pulse.send",quantile="0.99"} 0.25' in text
+    assert 'mango_latency_seconds_count{phase="pulse.send"} 1' in text
+
+
+def test_collector_records_confirmations() -> None:
+    latency = mango.LatencyRecorder()
+    inner = mango.TransactionStatusCollector()
+    collector = mango.LatencyRecordingTransactionStatusCollector(latency, inner)
+    status = mango.TransactionStatus("signature", mango.TransactionOutcome.SUCCESS,
+                                     datetime.datetime.now(), datetime.timedelta(seconds=2))
+    collector.add_transaction(status)
+
+    assert latency.histogram("transaction.confirmation").p50 == 2
+    assert list(inner.transactions) == [status]
+
+
+def test_metrics_server() -> None:
+    latency = mango.LatencyRecorder()
+    latency.record("pulse.total", 1)
+    server = mango.LatencyMetricsServer(latency, 0)
+    assert server.server.server_address[0] == "127.0.0.1"
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+            body = response.read().decode("utf-8")
+        assert 'mango_latency_seconds_count{phase="pulse.total"} 1' in body
+    finally:
+        server.dispose()
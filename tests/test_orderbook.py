@@ -4,6 +4,7 @@ import typing
 from .context import mango
 
 from decimal import Decimal
+from solana.publickey import PublicKey
 
 from .fakes import fake_order_id
 
@@ -47,6 +48,72 @@ def test_orderbook_spread() -> None:
     assert orderBook.spread == _get_order(asks).price - _get_order(bids, -1).price
 
 
+def test_columnar_sides_match_order_sides() -> None:
+    order_book = _construct_order_book(bids=_construct_order_book_side(mango.Side.BUY, 20),
+                                       asks=_construct_order_book_side(mango.Side.SELL, 20))
+    assert list(order_book.columnar_bids) == list(order_book.bids)
+    assert list(order_book.columnar_asks) == list(order_book.asks)
+    assert order_book.columnar_bids.top == order_book.top_bid
+    assert order_book.columnar_asks.top == order_book.top_ask
+    assert order_book.columnar_bids is order_book.columnar_bids
+
+
+def test_columnar_side_kept_as_is() -> None:
+    columnar = mango.ColumnarOrderBookSide.from_orders(
+        mango.Side.SELL, mango.NullLotSizeConverter(), _construct_order_book_side(mango.Side.SELL, 5))
+    order_book = _construct_order_book(bids=[], asks=columnar)
+    assert order_book.asks is columnar
+    assert order_book.columnar_asks is columnar
+    assert order_book.columnar_bids.top is None
+
+
+def test_columnar_price_depth_queries() -> None:
+    bids = mango.ColumnarOrderBookSide.from_orders(mango.Side.BUY, mango.NullLotSizeConverter(), [
+        _order(mango.Side.BUY, 0, 100, 1), _order(mango.Side.BUY, 1, 98, 2), _order(mango.Side.BUY, 2, 97, 4)
+    ])
+    assert bids.top_price_lots == 100
+    assert bids.count_at_or_better(101) == 0
+    assert bids.count_at_or_better(98) == 2
+    assert bids.quantity_lots_at_or_better(98) == 3
+    assert bids.quantity_lots_at_or_better(50) == 7
+
+    asks = mango.ColumnarOrderBookSide.from_orders(mango.Side.SELL, mango.NullLotSizeConverter(), [
+        _order(mango.Side.SELL, 0, 100, 1), _order(mango.Side.SELL, 1, 102, 2), _order(mango.Side.SELL, 2, 103, 4)
+    ])
+    assert asks.top_price_lots == 100
+    assert asks.count_at_or_better(99) == 0
+    assert asks.count_at_or_better(102) == 2
+    assert asks.quantity_lots_at_or_better(102) == 3
+
+
+def test_columnar_accumulated_quantity_excludes_owner() -> None:
+    owner = PublicKey(5)
+    asks = mango.ColumnarOrderBookSide.from_orders(mango.Side.SELL, mango.NullLotSizeConverter(), [
+        _order(mango.Side.SELL, 0, 100, 1), _order(mango.Side.SELL, 1, 101, 5, owner),
+        _order(mango.Side.SELL, 2, 102, 2), _order(mango.Side.SELL, 3, 103, 4)
+    ])
+    assert asks.index_for_accumulated_quantity(Decimal(0)) == 0
+    assert asks.index_for_accumulated_quantity(Decimal(3)) == 1
+    assert asks.index_for_accumulated_quantity(Decimal(3), excluding_owner=owner) == 2
+    assert asks.index_for_accumulated_quantity(Decimal("2.5"), excluding_owner=owner) == 2
+    assert asks.index_for_accumulated_quantity(Decimal(8), excluding_owner=owner) is None
+
+
+def test_columnar_orders_materialised_from_lots() -> None:
+    converter = mango.LotSizeConverter(mango.Instrument("BASE", "Base", Decimal(9)), Decimal(10000000),
+                                       mango.Instrument("QUOTE", "Quote", Decimal(6)), Decimal(100))
+    owner = PublicKey(7)
+    asks = mango.ColumnarOrderBookSide(mango.Side.SELL, converter, [11, 12], [0, 1], [owner, owner], [250, 260], [30, 40])
+    assert asks.owners == [owner]
+    assert len(asks) == 2
+    assert asks[0].id == 11
+    assert asks[0].price == Decimal("2.5")
+    assert asks[0].quantity == Decimal("0.3")
+    assert asks[-1].price == Decimal("2.6")
+    assert [order.id for order in asks[0:2]] == [11, 12]
+    assert asks[1] is asks[1]
+
+
 # ASK is SELL, BID is BUY
 def _construct_order_book_side(askOrBidSide: mango.Side, size: int) -> typing.Sequence[mango.Order]:
     result_orders: typing.List[mango.Order] = []
@@ -78,3 +145,8 @@ def _construct_order_book(
 
 def _get_order(orders: typing.Sequence[mango.Order], index: int = 0) -> mango.Order:
     return sorted(orders, key=lambda order: order.price)[index]
+
+
+def _order(side: mango.Side, index: int, price: int, quantity: int, owner: PublicKey = mango.SYSTEM_PROGRAM_ADDRESS) -> mango.Order:
+    return mango.Order(id=fake_order_id(index, price), client_id=0, owner=owner, side=side,
+                       price=Decimal(price), quantity=Decimal(quantity), order_type=mango.OrderType.LIMIT)
@@ -0,0 +1,88 @@
+import typing
+
+from .context import mango
+from .fakes import fake_account_info, fake_perp_orderbook_side_data, FakePerpMarketDetails
+
+from decimal import Decimal
+
+
+def _side(side: mango.Side, prices: typing.Sequence[int]) -> mango.PerpOrderBookSide:
+    data = fake_perp_orderbook_side_data(side, prices)
+    return mango.PerpOrderBookSide.parse(fake_account_info(data=data), FakePerpMarketDetails())
+
+
+def test_bids_walked_best_first() -> None:
+    bids = _side(mango.Side.BUY, [100, 104, 101, 103, 102])
+    assert [order.price for order in bids.orders()] == [104, 103, 102, 101, 100]
+    assert all(order.side == mango.Side.BUY for order in bids.orders())
+
+
+def test_asks_walked_best_first() -> None:
+    asks = _side(mango.Side.SELL, [100, 104, 101, 103, 102])
+    assert [order.price for order in asks.orders()] == [100, 101, 102, 103, 104]
+    assert all(order.side == mango.Side.SELL for order in asks.orders())
+
+
+def test_orders_with_limit_returns_best_orders() -> None:
+    bids = _side(mango.Side.BUY, list(range(100, 164)))
+    limited = bids.orders(limit=3)
+    assert [order.price for order in limited] == [163, 162, 161]
+    assert limited == bids.orders()[0:3]
+    assert bids.orders(limit=0) == []
+    assert len(bids.orders(limit=1000)) == 64
+
+
+def test_limited_walk_only_decodes_nodes_it_needs() -> None:
+    asks = _side(mango.Side.SELL, list(range(100, 612)))
+    top = asks.top_of_book()
+    assert top is not None
+    assert top.price == Decimal(100)
+    # 512 leaves in a balanced tree is 9 levels of inner nodes - not the 1024 nodes the full book has.
+    assert asks.nodes.decoded_count < 25
+
+
+def test_top_of_book_empty_side() -> None:
+    bids = _side(mango.Side.BUY, [])
+    assert bids.top_of_book() is None
+    assert bids.orders() == []
+
+
+def test_lazy_orders_match_full_decode() -> None:
+    data = fake_perp_orderbook_side_data(mango.Side.BUY, [5, 9, 7, 1, 3, 8])
+    lazy = mango.PerpOrderBookSide.parse(fake_account_info(data=data), FakePerpMarketDetails())
+    full = mango.PerpOrderBookSide.from_layout(mango.layouts.ORDERBOOK_SIDE.parse(data), lazy.account_info,
+                                               mango.Version.V1, FakePerpMarketDetails())
+    assert lazy.orders() == full.orders()
+
+
+def test_full_book_walk() -> None:
+    prices = list(range(1000, 1512))
+    bids = _side(mango.Side.BUY, prices)
+    asks = _side(mango.Side.SELL, prices)
+    assert [order.price for order in bids.orders()] == sorted(prices, reverse=True)
+    assert [order.price for order in asks.orders()] == prices
+
+
+def test_prices_and_quantities_converted_to_ui_values() -> None:
+    data = fake_perp_orderbook_side_data(mango.Side.SELL, [250], quantity=30)
+    details = FakePerpMarketDetails(base_decimals=9, quote_decimals=6,
+                                    base_lot_size=Decimal(10000000), quote_lot_size=Decimal(100))
+    asks = mango.PerpOrderBookSide.parse(fake_account_info(data=data), details)
+    top = asks.top_of_book()
+    assert top is not None
+    assert top.price == Decimal("2.5")
+    assert top.quantity == Decimal("0.3")
+
+
+def test_columnar_side_matches_orders() -> None:
+    data = fake_perp_orderbook_side_data(mango.Side.SELL, [250, 240, 260], quantity=30)
+    details = FakePerpMarketDetails(base_decimals=9, quote_decimals=6,
+                                    base_lot_size=Decimal(10000000), quote_lot_size=Decimal(100))
+    asks = mango.PerpOrderBookSide.parse(fake_account_info(data=data), details)
+    converter = mango.LotSizeConverter(details.base_instrument, details.base_lot_size,
+                                       details.quote_token.token, details.quote_lot_size)
+    columnar = asks.to_columnar(converter)
+    assert list(columnar.price_lots) == [240, 250, 260]
+    assert list(columnar.quantity_lots) == [30, 30, 30]
+    assert list(columnar) == list(asks.orders())
+    assert len(asks.to_columnar(converter, limit=1)) == 1
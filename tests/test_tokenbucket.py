@@ -0,0 +1,48 @@
+import typing
+
+from .context import mango
+
+from decimal import Decimal
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 1000
+        self.sleeps: typing.List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps += [seconds]
+        self.now += seconds
+
+
+def test_allows_burst_then_limits_rate() -> None:
+    clock = FakeClock()
+    bucket = mango.TokenBucket(Decimal(50), Decimal(3), clock, clock.sleep)
+
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+    for _ in range(5):
+        bucket.acquire()
+    # 5 more tokens at 50 per second need 0.1 seconds.
+    assert len(clock.sleeps) == 5
+    assert abs(sum(clock.sleeps) - 0.1) < 1e-9
+
+
+def test_refills_while_idle_up_to_capacity() -> None:
+    clock = FakeClock()
+    bucket = mango.TokenBucket(Decimal(10), Decimal(2), clock, clock.sleep)
+    bucket.acquire()
+    bucket.acquire()
+
+    # A long idle period only refills the bucket up to its capacity.
+    clock.now += 60
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert abs(sum(clock.sleeps) - 0.1) < 1e-9
@@ -0,0 +1,230 @@
+import base64
+import threading
+import time
+import typing
+
+from datetime import datetime
+from decimal import Decimal
+from solana.publickey import PublicKey
+
+from .context import mango
+from .fakes import fake_context, fake_seeded_public_key, MockClient
+
+from solana.rpc.types import RPCResponse
+
+
+class BackfillClient(MockClient):
+    def __init__(self, slot: int) -> None:
+        super().__init__()
+        self.slot: int = slot
+        self.chunk_sizes: typing.List[int] = []
+
+    def get_multiple_accounts_with_context(self, pubkeys: typing.List[typing.Union[PublicKey, str]], *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        self.chunk_sizes += [len(pubkeys)]
+        return {"context": {"slot": self.slot}, "value": [_account_value(b"backfill") for _ in pubkeys]}
+
+
+def _account_value(data: bytes) -> typing.Dict[str, typing.Any]:
+    return {
+        "executable": False,
+        "lamports": 1000000,
+        "owner": str(fake_seeded_public_key("owner")),
+        "rentEpoch": 0,
+        "data": [base64.b64encode(data).decode("ascii"), "base64"]
+    }
+
+
+def _notification(data: bytes, subscription_id: int = 1, slot: int = 1) -> RPCResponse:
+    return typing.cast(RPCResponse, {
+        "result": {
+            "context": {"slot": slot},
+            "value": _account_value(data)
+        },
+        "subscription": subscription_id
+    })
+
+
+def _subscription(coalesce_interval: typing.Optional[float], parsed: typing.List[bytes], context: typing.Optional[mango.Context] = None) -> mango.WebSocketAccountSubscription[bytes]:
+    def _parse(account_info: mango.AccountInfo) -> bytes:
+        parsed.append(account_info.data)
+        return account_info.data
+    return mango.WebSocketAccountSubscription[bytes](context or fake_context(), fake_seeded_public_key("account"), _parse,
+                                                     coalesce_interval=coalesce_interval)
+
+
+def test_uncoalesced_parses_every_notification() -> None:
+    parsed: typing.List[bytes] = []
+    subscription = _subscription(None, parsed)
+    published: typing.List[bytes] = []
+    subscription.publisher.subscribe(on_next=published.append)
+
+    subscription.handle_notification(_notification(b"one"))
+    subscription.handle_notification(_notification(b"two"))
+
+    assert parsed == [b"one", b"two"]
+    assert published == [b"one", b"two"]
+
+
+def test_coalesced_parses_only_latest_when_read() -> None:
+    parsed: typing.List[bytes] = []
+    subscription = _subscription(0, parsed)
+    observer = mango.LatestItemObserverSubscriber[bytes](b"initial")
+    subscription.publisher.subscribe(observer)
+    notified: typing.List[typing.Any] = []
+    subscription.notifications.subscribe(on_next=notified.append)
+    watcher = mango.FlushingWatcher([subscription], observer)
+
+    subscription.handle_notification(_notification(b"one"))
+    subscription.handle_notification(_notification(b"two"))
+    subscription.handle_notification(_notification(b"three"))
+
+    assert parsed == []
+    assert len(notified) == 3
+    assert watcher.latest == b"three"
+    assert parsed == [b"three"]
+    assert subscription.coalesced_count == 2
+
+    # Nothing new arrived, so nothing more is parsed.
+    assert watcher.latest == b"three"
+    assert parsed == [b"three"]
+
+
+def test_coalesced_with_interval_parses_at_most_once_per_interval() -> None:
+    parsed: typing.List[bytes] = []
+    subscription = _subscription(3600, parsed)
+    observer = mango.LatestItemObserverSubscriber[bytes](b"initial")
+    subscription.publisher.subscribe(observer)
+
+    subscription.handle_notification(_notification(b"one"))
+    subscription.handle_notification(_notification(b"two"))
+    subscription.handle_notification(_notification(b"three"))
+
+    # The first notification is parsed as it arrives, the rest wait for the interval or a flush.
+    assert parsed == [b"one"]
+    assert observer.latest == b"one"
+
+    subscription.flush()
+    assert parsed == [b"one", b"three"]
+    assert observer.latest == b"three"
+
+
+def test_shared_manager_dispatches_by_subscription_id() -> None:
+    context = fake_context()
+    manager = mango.SharedWebSocketSubscriptionManager(context)
+    parsed: typing.List[bytes] = []
+    subscriptions = [_subscription(None, parsed, context) for _ in range(100)]
+    for subscription in subscriptions:
+        manager.add(subscription)
+    for index, subscription in enumerate(subscriptions):
+        manager.on_item({"jsonrpc": "2.0", "id": str(subscription.id), "result": 1000 + index})
+
+    assert manager.subscription_by_subscription_id(1042) is subscriptions[42]
+
+    notification = _notification(b"data", 1042)
+    published: typing.List[bytes] = []
+    subscriptions[42].publisher.subscribe(on_next=published.append)
+    manager.on_item({"jsonrpc": "2.0", "method": "accountNotification", "params": notification})
+    assert published == [b"data"]
+
+
+def test_older_update_cannot_publish_after_newer_update() -> None:
+    parsing_old = threading.Event()
+    release_old = threading.Event()
+
+    def _parse(account_info: mango.AccountInfo) -> bytes:
+        if account_info.data == b"old":
+            parsing_old.set()
+            release_old.wait(5)
+        return account_info.data
+    subscription = mango.WebSocketAccountSubscription[bytes](fake_context(), fake_seeded_public_key("account"), _parse)
+    published: typing.List[bytes] = []
+    subscription.publisher.subscribe(on_next=published.append)
+
+    old = threading.Thread(target=subscription.handle_notification, args=(_notification(b"old", slot=10),))
+    old.start()
+    parsing_old.wait(5)
+    new = threading.Thread(target=subscription.handle_notification, args=(_notification(b"new", slot=11),))
+    new.start()
+    time.sleep(0.1)
+    release_old.set()
+    old.join(5)
+    new.join(5)
+
+    assert published == [b"old", b"new"]
+    assert subscription.last_update_slot == 11
+
+
+def test_pooled_manager_assigns_addresses_consistently() -> None:
+    context = fake_context()
+    manager = mango.PooledWebSocketSubscriptionManager(context, connection_count=4)
+    addresses = [fake_seeded_public_key(f"account {index}") for index in range(400)]
+    for address in addresses:
+        manager.add(mango.WebSocketAccountSubscription[mango.AccountInfo](context, address, lambda info: info))
+
+    assert len(manager.subscriptions) == 400
+    assert sum(len(connection.subscriptions) for connection in manager.connections) == 400
+    # Every connection gets a share, and the same address always goes to the same connection.
+    assert all(len(connection.subscriptions) > 40 for connection in manager.connections)
+    for connection in manager.connections:
+        for subscription in connection.subscriptions:
+            assert manager.connection_for(subscription.address) is connection
+
+    # Growing the pool only moves addresses to the new connection.
+    bigger = mango.PooledWebSocketSubscriptionManager(context, connection_count=5)
+    for address in addresses:
+        old_index = manager.connections.index(manager.connection_for(address))
+        new_index = bigger.connections.index(bigger.connection_for(address))
+        assert new_index == old_index or new_index == 4
+
+
+def test_pooled_manager_pong_waits_for_every_open_connection() -> None:
+    context = fake_context()
+    manager = mango.PooledWebSocketSubscriptionManager(context, connection_count=2)
+    assert len(manager.pongs) == 2
+    manager._open_indices = {0, 1}
+    pool_pongs: typing.List[datetime] = []
+    manager.pong.subscribe(on_next=pool_pongs.append)
+    pool_pongs.clear()
+
+    first = datetime(2021, 1, 1)
+    second = datetime(2021, 1, 2)
+    manager._on_connection_pong(0, first)
+    manager._on_connection_pong(0, first)
+    assert pool_pongs == []
+    manager._on_connection_pong(1, second)
+    assert pool_pongs == [second]
+
+
+def test_older_updates_are_dropped() -> None:
+    parsed: typing.List[bytes] = []
+    subscription = _subscription(None, parsed)
+
+    subscription.handle_notification(_notification(b"one", slot=10))
+    subscription.handle_notification(_notification(b"old", slot=9))
+    subscription.handle_notification(_notification(b"two", slot=10))
+
+    assert parsed == [b"one", b"two"]
+    assert subscription.last_update_slot == 10
+    assert subscription.last_update_time is not None
+    assert subscription.update_count == 2
+    assert subscription.stale_count == 1
+
+
+def test_backfill_pushes_fetched_accounts_through_subscriptions() -> None:
+    context = fake_context()
+    context.gma_chunk_size = Decimal(2)
+    client = BackfillClient(slot=20)
+    context.client = client
+    parsed: typing.List[bytes] = []
+    subscriptions = [_subscription(None, parsed, context) for _ in range(3)]
+    subscriptions[0].handle_notification(_notification(b"newer", slot=25))
+    log_subscription = mango.WebSocketLogSubscription(context, fake_seeded_public_key("log"))
+
+    backfilled = mango.backfill_subscriptions(context, [*subscriptions, log_subscription])
+
+    # The log subscription can't be backfilled, and the first subscription already has newer data.
+    assert client.chunk_sizes == [2, 1]
+    assert backfilled == 2
+    assert parsed == [b"newer", b"backfill", b"backfill"]
+    assert [subscription.backfill_count for subscription in subscriptions] == [0, 1, 1]
+    assert [subscription.last_update_slot for subscription in subscriptions] == [25, 20, 20]